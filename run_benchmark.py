@@ -0,0 +1,102 @@
+"""
+Routing benchmark driver script
+"""
+import argparse
+import contextlib
+import os
+import sys
+import time
+import traceback
+from typing import List
+
+from src.clock import VirtualClock
+from src.configuration import PublisherConfiguration
+from src.publisher import Publisher
+from src.transport import LoopbackNetwork, LoopbackTransport
+
+
+SUBMIT_BATCH_SIZE: int = 64
+
+
+def main(args: argparse.Namespace) -> int:
+    """
+    Create a `Publisher` on a loopback network with a virtual clock, subscribe the requested number of subscribers to
+    each publication, submit the requested number of messages round-robin over the publications, and print the rate at
+    which they were routed. Every message passes through the publisher's real decode, dispatch, and fan-out code, but
+    no socket, so the result measures routing alone and is repeatable.
+    """
+    return_value: int = 0
+
+    try:
+        network = LoopbackNetwork()
+        clock = VirtualClock()
+        config = PublisherConfiguration("127.0.0.1", 1337, 0.1, args.buffer_size, args.subscriber_timeout)
+        output = sys.stdout if args.verbose else open(os.devnull, "w")
+        with contextlib.redirect_stdout(output):
+            publisher = Publisher(config, LoopbackTransport(0.1, args.buffer_size, network), clock)
+            publisher._transport.bind(publisher.endpoint)
+            publications: List[str] = [f"publication-{i}" for i in range(args.publications)]
+            subscribe_message: bytes = f"subscribe,20211017150434567854,{','.join(publications)}".encode("utf-8")
+            subscribers: List[LoopbackTransport] = []
+            for _ in range(args.subscribers):
+                subscriber = LoopbackTransport(0.1, args.buffer_size, network)
+                subscriber.send(subscribe_message, publisher.endpoint)
+                publisher._execute()
+                subscriber.receive_waiting()
+                subscribers.append(subscriber)
+            producer = LoopbackTransport(0.1, args.buffer_size, network)
+            submit_messages: List[bytes] = [
+                f"submit,20211017150434567854,{publication},0.5,north".encode("utf-8") for publication in publications
+            ]
+
+            delivered: int = 0
+            start_s: float = time.perf_counter()
+            for i in range(0, args.messages, SUBMIT_BATCH_SIZE):
+                batch_size: int = min(SUBMIT_BATCH_SIZE, args.messages - i)
+                for j in range(i, i + batch_size):
+                    producer.send(submit_messages[j % len(submit_messages)], publisher.endpoint)
+                for _ in range(batch_size):
+                    publisher._execute()
+                    clock.advance(args.tick)
+                for subscriber in subscribers:
+                    while True:
+                        received_count: int = len(subscriber.receive_waiting())
+                        if not received_count:
+                            break
+                        delivered += received_count
+            elapsed_s: float = time.perf_counter() - start_s
+
+        print(f"Messages:   {args.messages}")
+        print(f"Deliveries: {delivered}")
+        print(f"Elapsed:    {elapsed_s:.3f} s")
+        print(f"Throughput: {args.messages / elapsed_s:.0f} messages/s, {delivered / elapsed_s:.0f} deliveries/s")
+    except KeyboardInterrupt:
+        pass
+    except Exception:
+        print("Abnormal termination")
+        if args.verbose:
+            print(traceback.format_exc())
+        return_value = 1
+
+    return return_value
+
+
+if __name__ == "__main__":
+
+    PARSER = argparse.ArgumentParser()
+    PARSER.add_argument("-m", "--messages", type=int, default=100000, help="Number of messages to submit")
+    PARSER.add_argument("-p", "--publications", type=int, default=1, help="Number of publications")
+    PARSER.add_argument("-s", "--subscribers", type=int, default=1, help="Number of subscribers to each publication")
+    PARSER.add_argument("-b", "--buffer-size", type=int, default=1024, help="Buffer size (in bytes)")
+    PARSER.add_argument(
+        "-t", "--subscriber-timeout", type=float, default=10.0, help="Subscriber timeout (in virtual seconds)"
+    )
+    PARSER.add_argument(
+        "--tick", type=float, default=0.000001, help="Virtual time to advance after each message (in seconds)"
+    )
+    PARSER.add_argument("-v", "--verbose", action="store_true", help="Enable verbose output")
+    ARGS: argparse.Namespace = PARSER.parse_args()
+
+    RETURN_VALUE: int = main(ARGS)
+
+    sys.exit(RETURN_VALUE)
@@ -0,0 +1,81 @@
+"""
+Replay driver script
+"""
+import argparse
+import contextlib
+import os
+from pathlib import Path
+import sys
+import tempfile
+import time
+import traceback
+from typing import Dict, Optional
+
+from src.capture import read_capture, replay
+from src.configuration import TRANSPORT_UNIX, PublisherConfiguration
+from src.endpoint import UnixEndpoint
+from src.transport import Transport
+
+
+def main(args: argparse.Namespace) -> int:
+    """
+    Read the publisher configuration from the specified file, and replay a capture file against the publisher it
+    configures, at the requested speed. Each source in the capture is stood in for by a transport of its own, so the
+    publisher sees as many distinct sources as were captured. Replies from the publisher are not read.
+    """
+    return_value: int = 0
+    transports: Dict[str, Transport] = {}
+
+    try:
+        config_path = Path(args.config).resolve()
+        config = PublisherConfiguration.from_yaml(config_path)
+        speed: Optional[float] = None if args.max_speed else args.speed
+        if speed is not None and speed <= 0:
+            raise ValueError(f"Invalid speed: {speed}")
+
+        def send(source: str, data: bytes) -> None:
+            transport: Optional[Transport] = transports.get(source)
+            if transport is None:
+                transport = transports[source] = Transport.from_configuration(config, config.endpoint)
+                if config.transport == TRANSPORT_UNIX:
+                    socket_name: str = f"pubsub-replay-{os.getpid()}-{len(transports)}.sock"
+                    transport.bind(UnixEndpoint(str(Path(tempfile.gettempdir()) / socket_name)))
+            transport.send(data, config.endpoint)
+            transport.flush()
+
+        output = sys.stdout if args.verbose else open(os.devnull, "w")
+        start_s: float = time.perf_counter()
+        with contextlib.redirect_stdout(output):
+            sent_count: int = replay(read_capture(Path(args.capture)), send, speed)
+        elapsed_s: float = time.perf_counter() - start_s
+
+        print(f"Replayed {sent_count} datagrams from {len(transports)} sources in {elapsed_s:.3f} s")
+        if elapsed_s > 0:
+            print(f"{sent_count / elapsed_s:,.0f} datagrams/s")
+    except KeyboardInterrupt:
+        pass
+    except Exception:
+        print("Abnormal termination")
+        if args.verbose:
+            print(traceback.format_exc())
+        return_value = 1
+    finally:
+        for transport in transports.values():
+            transport.close()
+
+    return return_value
+
+
+if __name__ == "__main__":
+
+    PARSER = argparse.ArgumentParser()
+    PARSER.add_argument("capture", type=str, help="Path to capture file")
+    PARSER.add_argument("-c", "--config", type=str, help="Path to publisher configuration file")
+    PARSER.add_argument("-s", "--speed", type=float, default=1.0, help="Multiple of the captured speed to replay at")
+    PARSER.add_argument("-m", "--max-speed", action="store_true", help="Replay as fast as possible")
+    PARSER.add_argument("-v", "--verbose", action="store_true", help="Enable verbose output")
+    ARGS: argparse.Namespace = PARSER.parse_args()
+
+    RETURN_VALUE: int = main(ARGS)
+
+    sys.exit(RETURN_VALUE)
@@ -0,0 +1,67 @@
+"""
+Stats driver script
+"""
+import argparse
+import contextlib
+import os
+from pathlib import Path
+import sys
+import time
+import traceback
+from typing import Dict
+
+from src.configuration import SubscriberConfiguration
+from src.subscriber import Subscriber
+
+
+def main(args: argparse.Namespace) -> int:
+    """
+    Read the configuration from the specified file, create a `Subscriber` object with the configuration, and print the
+    stats of its `Publisher`, once or every interval.
+    """
+    return_value: int = 0
+    subscriber = None
+
+    try:
+        config_path = Path(args.config).resolve()
+        config = SubscriberConfiguration.from_yaml(config_path)
+
+        output = sys.stdout if args.verbose else open(os.devnull, "w")
+        with contextlib.redirect_stdout(output):
+            subscriber = Subscriber(config)
+            subscriber.bind()
+        while True:
+            with contextlib.redirect_stdout(output):
+                stats: Dict[str, str] = subscriber.stats()
+            width: int = max(len(name) for name in stats)
+            for name, value in stats.items():
+                print(f"{name:<{width}}  {value}")
+            if args.interval is None:
+                break
+            print()
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        pass
+    except Exception:
+        print("Abnormal termination")
+        if args.verbose:
+            print(traceback.format_exc())
+        return_value = 1
+    finally:
+        if subscriber is not None:
+            subscriber.close()
+
+    return return_value
+
+
+if __name__ == "__main__":
+
+    PARSER = argparse.ArgumentParser()
+    PARSER.add_argument("-c", "--config", type=str, help="Path to subscriber configuration file")
+    PARSER.add_argument("-i", "--interval", type=float, help="Print the stats again every interval (in seconds)")
+    PARSER.add_argument("-v", "--verbose", action="store_true", help="Enable verbose output")
+    ARGS: argparse.Namespace = PARSER.parse_args()
+
+    RETURN_VALUE: int = main(ARGS)
+
+    sys.exit(RETURN_VALUE)
@@ -0,0 +1,99 @@
+"""
+Budget module
+"""
+from __future__ import annotations
+from typing import Dict, Optional, Union
+
+from src.subscription import Subscription, SubscriptionRequest
+
+
+SUBSCRIPTION_B: int = 512
+CONFLATED_MESSAGE_B: int = 512
+DURABLE_B: int = 1024
+BUCKET_B: int = 128
+
+
+def subscription_size_b(publication: str, subscription: Union[Subscription, SubscriptionRequest]) -> int:
+    """
+    Estimate the bytes a subscription to a publication takes up, in the registry and its indexes, with its compiled
+    filter, and with the pending message a conflated subscription may hold. The estimate only depends on the
+    subscription's options, so the same bytes are released when it is removed as were charged when it was added.
+    """
+    filter_expression: Optional[str] = subscription.filter_expression
+    size_b: int = SUBSCRIPTION_B + len(publication) + 2 * len(filter_expression or "")
+    if subscription.interval_s is not None:
+        size_b += CONFLATED_MESSAGE_B
+    return size_b
+
+
+class MemoryBudget(object):
+    """
+    Memory budget class
+
+    Approximate accounting of the memory a publisher's state takes up, against a global budget and a budget per
+    publication. Long-lived state, such as subscriptions, is charged an estimate when it is added and released when it
+    is removed, so that keeping count costs a couple of additions. Short-lived state, such as queued messages and
+    stream buffers, is bounded elsewhere, and only counts towards the global budget, as of when it is checked. A budget
+    of zero is unlimited.
+    """
+
+    def __init__(self: MemoryBudget, max_b: int, publication_max_b: int) -> None:
+        """
+        Initialize an empty `MemoryBudget` object with the global budget and the budget per publication (in bytes).
+        """
+        self.max_b: int = max_b
+        self.publication_max_b: int = publication_max_b
+        self.charged_b: int = 0
+        self.publication_charged_b: Dict[str, int] = {}
+
+    def is_over_publication(self: MemoryBudget, publication: str, size_b: int) -> bool:
+        """
+        Check whether charging a number of bytes to a publication would take it over its budget.
+        """
+        return (
+            self.publication_max_b > 0
+            and size_b > 0
+            and self.publication_charged_b.get(publication, 0) + size_b > self.publication_max_b
+        )
+
+    def is_over(self: MemoryBudget, size_b: int, transient_b: int = 0) -> bool:
+        """
+        Check whether charging a number of bytes, on top of the short-lived state, would go over the global budget.
+        """
+        return self.max_b > 0 and size_b > 0 and self.charged_b + transient_b + size_b > self.max_b
+
+    def could_fit(
+        self: MemoryBudget,
+        publication: str,
+        size_b: int,
+        publication_freeable_b: int,
+        freeable_b: int,
+        transient_b: int = 0
+    ) -> bool:
+        """
+        Check whether charging a number of bytes to a publication, on top of the short-lived state, would stay within
+        its budget and the global one once the bytes that could be freed, of the publication and in all, were released.
+        """
+        if size_b <= 0:
+            return True
+        publication_charged_b: int = self.publication_charged_b.get(publication, 0) - publication_freeable_b
+        if self.publication_max_b > 0 and publication_charged_b + size_b > self.publication_max_b:
+            return False
+        return self.max_b <= 0 or self.charged_b - freeable_b + transient_b + size_b <= self.max_b
+
+    def charge(self: MemoryBudget, publication: str, size_b: int) -> None:
+        """
+        Charge a number of bytes to a publication, or release them if the number is negative.
+        """
+        self.charged_b += size_b
+        charged_b: int = self.publication_charged_b.get(publication, 0) + size_b
+        if charged_b > 0:
+            self.publication_charged_b[publication] = charged_b
+        else:
+            self.publication_charged_b.pop(publication, None)
+
+    def release(self: MemoryBudget, publication: str, size_b: int) -> None:
+        """
+        Release a number of bytes charged to a publication.
+        """
+        self.charge(publication, -size_b)
@@ -0,0 +1,157 @@
+"""
+Capture module
+"""
+from __future__ import annotations
+from pathlib import Path
+import struct
+import threading
+import time
+from typing import BinaryIO, Callable, Dict, Iterator, List, Optional, Tuple
+
+from src.clock import Clock
+from src.endpoint import Endpoint
+from src.schema import to_microseconds
+
+
+CAPTURE_MAGIC: bytes = b"PSCAP"
+CAPTURE_VERSION: int = 1
+CAPTURE_HEADER = struct.Struct("!5sBq")
+RECORD_TYPE = struct.Struct("!B")
+SOURCE_RECORD = struct.Struct("!BIH")
+DATAGRAM_RECORD = struct.Struct("!BdII")
+
+RECORD_SOURCE: int = 1
+RECORD_DATAGRAM: int = 2
+
+DEFAULT_CAPTURE_BUFFER_B: int = 1048576
+
+CapturedDatagram = Tuple[float, str, bytes]
+
+
+class CaptureWriter(object):
+    """
+    Capture writer class
+
+    Appends received datagrams to a capture file, each with the time it was received, relative to when the capture
+    started, and its source. A source is written out in full the first time it is seen, and referred to by a number
+    after that, so a record of a datagram costs a fixed 17 bytes on top of the datagram. Writes go through a large
+    buffer and are only ever appended, so capturing costs little more than copying each datagram.
+    """
+
+    def __init__(
+        self: CaptureWriter,
+        path: Path,
+        clock: Optional[Clock] = None,
+        buffer_size_b: int = DEFAULT_CAPTURE_BUFFER_B
+    ) -> None:
+        """
+        Initialize a `CaptureWriter` object with the path of the capture file, the clock to time datagrams by, and the
+        size of the write buffer in bytes. An existing file is replaced.
+        """
+        self.path: Path = path
+        self._clock: Clock = clock if clock is not None else Clock()
+        self._lock = threading.Lock()
+        self._file: BinaryIO = path.open("wb", buffering=buffer_size_b)
+        self._started_s: float = self._clock.monotonic()
+        self._file.write(CAPTURE_HEADER.pack(CAPTURE_MAGIC, CAPTURE_VERSION, to_microseconds(self._clock.now())))
+        self._sources: Dict[Endpoint, int] = {}
+        self.datagram_count: int = 0
+
+    def write(self: CaptureWriter, received: List[Tuple[bytes, Endpoint]]) -> None:
+        """
+        Append datagrams received together, with their sources.
+        """
+        offset_s: float = self._clock.monotonic() - self._started_s
+        with self._lock:
+            for data, endpoint in received:
+                source_id: Optional[int] = self._sources.get(endpoint)
+                if source_id is None:
+                    source_id = self._sources[endpoint] = len(self._sources)
+                    source: bytes = str(endpoint).encode("utf-8")
+                    self._file.write(SOURCE_RECORD.pack(RECORD_SOURCE, source_id, len(source)))
+                    self._file.write(source)
+                self._file.write(DATAGRAM_RECORD.pack(RECORD_DATAGRAM, offset_s, source_id, len(data)))
+                self._file.write(data)
+            self.datagram_count += len(received)
+
+    def flush(self: CaptureWriter) -> None:
+        """
+        Write out the buffer.
+        """
+        with self._lock:
+            self._file.flush()
+
+    def close(self: CaptureWriter) -> None:
+        """
+        Write out the buffer and close the capture file.
+        """
+        with self._lock:
+            self._file.close()
+
+
+def read_capture(path: Path) -> Iterator[CapturedDatagram]:
+    """
+    Read the datagrams of a capture file, as `(offset_s, source, data)` triples, where the offset is the time in seconds
+    since the capture started. A record cut short at the end of the file, by a capture that was not closed, is ignored.
+    Raise `ValueError` if the file is not a capture file.
+    """
+    with path.open("rb") as capture_file:
+        header: bytes = capture_file.read(CAPTURE_HEADER.size)
+        if len(header) < CAPTURE_HEADER.size:
+            raise ValueError(f"Not a capture file: {path}")
+        magic, version, _ = CAPTURE_HEADER.unpack(header)
+        if magic != CAPTURE_MAGIC or version != CAPTURE_VERSION:
+            raise ValueError(f"Not a version {CAPTURE_VERSION} capture file: {path}")
+        sources: Dict[int, str] = {}
+        while True:
+            record_type: bytes = capture_file.read(RECORD_TYPE.size)
+            if not record_type:
+                return
+            if record_type[0] == RECORD_SOURCE:
+                fields: bytes = record_type + capture_file.read(SOURCE_RECORD.size - RECORD_TYPE.size)
+                if len(fields) < SOURCE_RECORD.size:
+                    return
+                _, source_id, length = SOURCE_RECORD.unpack(fields)
+                source: bytes = capture_file.read(length)
+                if len(source) < length:
+                    return
+                sources[source_id] = source.decode("utf-8")
+            elif record_type[0] == RECORD_DATAGRAM:
+                fields = record_type + capture_file.read(DATAGRAM_RECORD.size - RECORD_TYPE.size)
+                if len(fields) < DATAGRAM_RECORD.size:
+                    return
+                _, offset_s, source_id, length = DATAGRAM_RECORD.unpack(fields)
+                data: bytes = capture_file.read(length)
+                if len(data) < length:
+                    return
+                yield offset_s, sources[source_id], data
+            else:
+                raise ValueError(f"Invalid capture record type {record_type[0]} in {path}")
+
+
+def replay(
+    datagrams: Iterator[CapturedDatagram],
+    send: Callable[[str, bytes], None],
+    speed: Optional[float] = 1.0,
+    clock: Optional[Clock] = None,
+    sleep: Callable[[float], None] = time.sleep
+) -> int:
+    """
+    Send captured datagrams, each from a stand-in for its source, keeping the time between them divided by the speed,
+    or as fast as possible if the speed is `None`. Return the number of datagrams sent. A replay that falls behind,
+    because sending takes longer than the time between datagrams, sends without waiting until it has caught up.
+    """
+    clock = clock if clock is not None else Clock()
+    started_s: float = clock.monotonic()
+    first_offset_s: Optional[float] = None
+    sent_count: int = 0
+    for offset_s, source, data in datagrams:
+        if speed is not None:
+            if first_offset_s is None:
+                first_offset_s = offset_s
+            delay_s: float = started_s + (offset_s - first_offset_s) / speed - clock.monotonic()
+            if delay_s > 0:
+                sleep(delay_s)
+        send(source, data)
+        sent_count += 1
+    return sent_count
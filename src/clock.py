@@ -0,0 +1,62 @@
+"""
+Clock module
+"""
+from __future__ import annotations
+from datetime import datetime, timedelta
+import time
+
+
+class Clock(object):
+    """
+    Clock class
+
+    The source of the times a `Messager` runs its timers by and times leases by. The base class reads the system clocks;
+    `VirtualClock` is advanced by hand, so that tests and benchmarks can expire leases and run timers deterministically.
+    """
+
+    def monotonic(self: Clock) -> float:
+        """
+        Get the time in seconds from an arbitrary point, which never goes backwards.
+        """
+        return time.monotonic()
+
+    def now(self: Clock) -> datetime:
+        """
+        Get the current local date and time.
+        """
+        return datetime.now()
+
+
+class VirtualClock(Clock):
+    """
+    Virtual clock class
+
+    A clock that stands still until advanced.
+    """
+
+    def __init__(self: VirtualClock, start: datetime = datetime(2021, 10, 17, 15, 4, 34)) -> None:
+        """
+        Initialize a `VirtualClock` object at a start date and time.
+        """
+        self._start: datetime = start
+        self._elapsed_s: float = 0.0
+
+    def monotonic(self: VirtualClock) -> float:
+        """
+        Get the time in seconds since the clock started.
+        """
+        return self._elapsed_s
+
+    def now(self: VirtualClock) -> datetime:
+        """
+        Get the start date and time, advanced by the time elapsed since.
+        """
+        return self._start + timedelta(seconds=self._elapsed_s)
+
+    def advance(self: VirtualClock, seconds: float) -> None:
+        """
+        Move the clock forward by a number of seconds. Raise `ValueError` if the number is negative.
+        """
+        if seconds < 0:
+            raise ValueError(f"Cannot move a clock back: {seconds} s")
+        self._elapsed_s += seconds
@@ -0,0 +1,92 @@
+"""
+Columnar module
+"""
+from __future__ import annotations
+from datetime import datetime
+from typing import Any, Iterator
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from src.message import Message, MessageType
+from src.schema import BATCH, BINARY_MARKER, FLAG_BATCH, FLAG_TRACE, HEADER, Schema, TRACE
+
+
+def require_numpy() -> None:
+    """
+    Raise `ImportError` if NumPy is not installed.
+    """
+    if numpy is None:
+        raise ImportError("Columnar batches require NumPy")
+
+
+def dtype(schema: Schema) -> Any:
+    """
+    Get the NumPy structured dtype of a schema's records, with native byte order.
+    """
+    require_numpy()
+    return numpy.dtype([
+        (name, wire_dtype.lstrip(">")) for name, wire_dtype in zip(schema.field_names, schema.wire_dtypes)
+    ])
+
+
+def batches(schema: Schema, array: Any, timestamp: datetime, max_records: int) -> Iterator[Message]:
+    """
+    Split a NumPy structured array into submit messages, each a columnar batch of at most a number of records. The
+    array's fields are matched to the schema's by position. Raise `ValueError` if the array has the wrong number of
+    fields or a batch could not hold a single record.
+    """
+    require_numpy()
+    names = array.dtype.names or ()
+    if len(names) != len(schema.field_types):
+        raise ValueError(f"Expected {len(schema.field_types)} fields for {schema.publication}, got {len(names)}")
+    if max_records < 1:
+        raise ValueError(f"Records of {schema.publication} are too large to batch")
+    for start in range(0, len(array), max_records):
+        chunk = array[start:start + max_records]
+        yield Message(
+            MessageType.SUBMIT,
+            timestamp,
+            schema.publication,
+            *(chunk[name] for name in names),
+            schema=schema,
+            records=len(chunk)
+        )
+
+
+def is_batch(message_bytes: bytes, schema: Schema) -> bool:
+    """
+    Check whether a binary message is a columnar batch of a schema.
+    """
+    if len(message_bytes) < HEADER.size or message_bytes[:1] != BINARY_MARKER:
+        return False
+    _, _, flags, _, schema_id = HEADER.unpack_from(message_bytes)
+    return schema_id == schema.id and bool(flags & FLAG_BATCH)
+
+
+def decode_into(schema: Schema, message_bytes: bytes, out: Any) -> int:
+    """
+    Decode the records of a columnar batch message of a schema straight into a preallocated NumPy structured array,
+    converting each column in a single vectorized operation, and return the number of records. Raise `ValueError` if
+    the message is malformed or has more records than the array can hold.
+    """
+    require_numpy()
+    if len(message_bytes) < HEADER.size:
+        raise ValueError("Truncated binary message header")
+    flags: int = HEADER.unpack_from(message_bytes)[2]
+    offset: int = HEADER.size + (TRACE.size if flags & FLAG_TRACE else 0)
+    if len(message_bytes) < offset + BATCH.size:
+        raise ValueError("Truncated binary message record count")
+    records: int = BATCH.unpack_from(message_bytes, offset)[0]
+    offset += BATCH.size
+    if len(message_bytes) - offset != records * schema.size_b:
+        raise ValueError(f"Expected {records * schema.size_b} bytes of batch data for {schema.publication}")
+    if records > len(out):
+        raise ValueError(f"Batch of {records} records does not fit in an array of {len(out)}")
+    for name, wire_dtype in zip(out.dtype.names, schema.wire_dtypes):
+        column = numpy.frombuffer(message_bytes, dtype=wire_dtype, count=records, offset=offset)
+        out[name][:records] = column
+        offset += column.nbytes
+    return records
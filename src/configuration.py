@@ -1,241 +1,1117 @@
-"""
-Configuration module
-"""
-from __future__ import annotations
-from typing import Dict, List, Optional, Union
-
-import yaml
-
-from src.ipendpoint import IPEndpoint
-
-
-MIN: str = "min"
-MAX: str = "max"
-
-IP_ADDRESS: str = "ip-address"
-PORT: str = "port"
-BUFFER_SIZE_B: str = "buffer-size-b"
-SOCKET_TIMEOUT_S: str = "socket-timeout-s"
-SUBSCRIBER_TIMEOUT_S: str = "subscriber-timeout-s"
-PUBLISHER_IPV4: str = "publisher-ip-address"
-PUBLISHER_PORT: str = "publisher-port"
-SUBSCRIPTIONS: str = "subscriptions"
-PUBLICATIONS: str = "publications"
-
-
-class Configuration(object):
-    """
-    Configuration base class
-    """
-
-    DEFAULTS: Dict[str, Union[int, float]] = {
-        SOCKET_TIMEOUT_S: 0.1,
-        BUFFER_SIZE_B: 1024
-    }
-
-    LIMITS: Dict[str, Dict[str, Union[int, float]]] = {
-        MIN: {
-            SOCKET_TIMEOUT_S: 0,
-            BUFFER_SIZE_B: 0
-        },
-        MAX: {
-            SOCKET_TIMEOUT_S: 1.0,
-            BUFFER_SIZE_B: 16384
-        }
-    }
-
-    def __init__(
-        self: Configuration,
-        socket_timeout_s: float,
-        buffer_size_b: int
-    ) -> None:
-        """
-        Initialize a `Configuration` object with a socket timeout (in seconds) and a buffer size.
-        """
-        self._socket_timeout_s: Optional[float] = None
-        self.socket_timeout_s: float = socket_timeout_s
-        self._buffer_size_b: Optional[int] = None
-        self.buffer_size_b: int = buffer_size_b
-
-    @property
-    def socket_timeout_s(self: Configuration) -> float:
-        """
-        Get the socket timeout in seconds.
-        """
-        return self._socket_timeout_s
-
-    @socket_timeout_s.setter
-    def socket_timeout_s(self: Configuration, socket_timeout_s: float) -> None:
-        """
-        Set the socket timeout in seconds.
-        """
-        if self.LIMITS[MIN][SOCKET_TIMEOUT_S] < socket_timeout_s <= self.LIMITS[MAX][SOCKET_TIMEOUT_S]:
-            self._socket_timeout_s = socket_timeout_s
-            return
-        raise ValueError(f"Invalid socket timeout: {socket_timeout_s} s")
-
-    @property
-    def buffer_size_b(self: Configuration) -> int:
-        """
-        Get the buffer size in bytes.
-        """
-        return self._buffer_size_b
-
-    @buffer_size_b.setter
-    def buffer_size_b(self: Configuration, buffer_size_b: int) -> None:
-        """
-        Set the buffer size in bytes.
-        """
-        if self.LIMITS[MIN][BUFFER_SIZE_B] < buffer_size_b <= self.LIMITS[MAX][BUFFER_SIZE_B]:
-            self._buffer_size_b = buffer_size_b
-            return
-        raise ValueError(f"Invalid buffer size: {buffer_size_b}")
-
-
-class PublisherConfiguration(Configuration):
-    """
-    PublisherConfiguration class
-    """
-
-    DEFAULTS: Dict[str, Union[int, float]] = {
-        **Configuration.DEFAULTS,
-        IP_ADDRESS: "127.0.0.1",
-        PORT: 5005,
-        SUBSCRIBER_TIMEOUT_S: 5
-    }
-
-    LIMITS: Dict[str, Dict[str, Union[int, float]]] = {
-        MIN: {
-            **Configuration.LIMITS[MIN],
-            SUBSCRIBER_TIMEOUT_S: 0
-        },
-        MAX: {
-            **Configuration.LIMITS[MAX],
-            SUBSCRIBER_TIMEOUT_S: 10
-        }
-    }
-
-    @classmethod
-    def from_yaml(cls: PublisherConfiguration, config_path: Path) -> PublisherConfiguration:
-        """
-        Read Publisher configuration settings from a YAML file.
-        """
-        if not config_path.is_file():
-            raise FileNotFoundError(f"Cannot find configuration file {config_path}")
-
-        with config_path.open(mode="r") as config_file:
-            config: Dict[str, Union[str, int]] = yaml.safe_load(config_file)
-
-        ip_address: str = config.get(IP_ADDRESS, cls.DEFAULTS[IP_ADDRESS])
-        port: int = config.get(PORT, cls.DEFAULTS[PORT])
-        socket_timeout_s: float = config.get(SOCKET_TIMEOUT_S, cls.DEFAULTS[SOCKET_TIMEOUT_S])
-        buffer_size_b: int = config.get(BUFFER_SIZE_B, cls.DEFAULTS[BUFFER_SIZE_B])
-        subscriber_timeout_s: float = config.get(SUBSCRIBER_TIMEOUT_S, cls.DEFAULTS[SUBSCRIBER_TIMEOUT_S])
-
-        return cls(ip_address, port, socket_timeout_s, buffer_size_b, subscriber_timeout_s)
-
-    def __init__(
-        self: PublisherConfiguration,
-        ip_address: str,
-        port: int,
-        socket_timeout_s: float,
-        buffer_size_b: int,
-        subscriber_timeout_s: float
-    ) -> None:
-        """
-        Initialize a `PublisherConfiguration` object with an IPv4, a port, a socket timeout (in seconds), a buffer
-        size, and a subscriber timeout (in seconds).
-        """
-        self.endpoint = IPEndpoint(ip_address, port)
-        super().__init__(socket_timeout_s, buffer_size_b)
-        self._subscriber_timeout_s: Optional[float] = None
-        self.subscriber_timeout_s: float = subscriber_timeout_s
-
-    @property
-    def subscriber_timeout_s(self: Configuration) -> float:
-        """
-        Get the subscriber timeout in seconds.
-        """
-        return self._subscriber_timeout_s
-
-    @subscriber_timeout_s.setter
-    def subscriber_timeout_s(self: Configuration, subscriber_timeout_s: float) -> None:
-        """
-        Set the subscriber timeout in seconds.
-        """
-        if self.LIMITS[MIN][SUBSCRIBER_TIMEOUT_S] < subscriber_timeout_s <= self.LIMITS[MAX][SUBSCRIBER_TIMEOUT_S]:
-            self._subscriber_timeout_s = subscriber_timeout_s
-            return
-        raise ValueError(f"Invalid subscriber timeout: {subscriber_timeout_s} s")
-
-
-class SubscriberConfiguration(Configuration):
-    """
-    SubscriberConfiguration class
-    """
-
-    DEFAULTS: Dict[str, Union[int, float]] = {
-        **Configuration.DEFAULTS,
-        PUBLISHER_IPV4: "127.0.0.1",
-        PUBLISHER_PORT: 5005,
-    }
-
-    @classmethod
-    def from_yaml(cls: SubscriberConfiguration, config_path: Path) -> SubscriberConfiguration:
-        """
-        Read Subscriber configuration settings from a YAML file.
-        """
-        if not config_path.is_file():
-            raise FileNotFoundError(f"Cannot find configuration file {config_path}")
-
-        with config_path.open(mode="r") as config_file:
-            config: Dict[str, Union[str, int]] = yaml.safe_load(config_file)
-
-        publisher_ipv4: str = config.get(PUBLISHER_IPV4, cls.DEFAULTS[PUBLISHER_IPV4])
-        publisher_port: int = config.get(PUBLISHER_PORT, cls.DEFAULTS[PUBLISHER_PORT])
-        socket_timeout_s: float = config.get(SOCKET_TIMEOUT_S, cls.DEFAULTS[SOCKET_TIMEOUT_S])
-        buffer_size_b: int = config.get(BUFFER_SIZE_B, cls.DEFAULTS[BUFFER_SIZE_B])
-        subscriptions: Optional[List[str]] = config.get(SUBSCRIPTIONS, [])
-        publications: Optional[List[str]] = config.get(PUBLICATIONS, [])
-
-        return cls(publisher_ipv4, publisher_port, socket_timeout_s, buffer_size_b, subscriptions, publications)
-
-    def __init__(
-        self: SubscriberConfiguration,
-        publisher_ipv4: str,
-        publisher_port: int,
-        socket_timeout_s: float,
-        buffer_size_b: int,
-        subscriptions: Optional[List[str]],
-        publications: Optional[List[str]]
-    ) -> None:
-        """
-        Initialize a `SubscriberConfiguration` object with a list of subscriptions, a list of publications, an IPv4 for
-        the publisher, a port for the publisher, a socket timeout (in seconds), and a buffer size.
-
-        For now, a subscriber cannot simultaneously publish and subscribe to publications.
-        """
-        self.publisher_endpoint = IPEndpoint(publisher_ipv4, publisher_port)
-        super().__init__(socket_timeout_s, buffer_size_b)
-        self.subscriptions: Optional[List[str]] = subscriptions
-        self.publications: Optional[List[str]] = publications
-
-        self._validate()
-
-    def _validate(self):
-        """
-        Validate the subscriber configuration.
-
-        Raises:
-            ValueError
-                - If both subscriptions and publications are specified
-                - If subscriptions (publications) is not a list
-                - If any publication in subscriptions (publications) is not a string
-        """
-        if self.subscriptions and self.publications:
-            raise ValueError("Cannot have both subscriptions and publications")
-        for x in self.subscriptions, self.publications:
-            if x is None:
-                continue
-            if not isinstance(x, list) or not all(isinstance(y, str) for y in x):
-                raise ValueError(f"Subscriptions/publications list is invalid: {x}")
+"""
+Configuration module
+"""
+from __future__ import annotations
+import os
+from pathlib import Path
+import tempfile
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import yaml
+
+from src.endpoint import Endpoint, UnixEndpoint
+from src.ipendpoint import IPEndpoint, StreamEndpoint
+from src.schema import SchemaRegistry
+
+
+MIN: str = "min"
+MAX: str = "max"
+
+IP_ADDRESS: str = "ip-address"
+PORT: str = "port"
+BUFFER_SIZE_B: str = "buffer-size-b"
+SOCKET_TIMEOUT_S: str = "socket-timeout-s"
+SUBSCRIBER_TIMEOUT_S: str = "subscriber-timeout-s"
+PUBLISHER_IPV4: str = "publisher-ip-address"
+PUBLISHER_PORT: str = "publisher-port"
+SUBSCRIPTIONS: str = "subscriptions"
+PUBLICATIONS: str = "publications"
+TRANSPORT: str = "transport"
+SOCKET_PATH: str = "socket-path"
+PUBLISHER_SOCKET_PATH: str = "publisher-socket-path"
+STREAM_PORT: str = "stream-port"
+STREAM_HIGH_WATERMARK_B: str = "stream-high-watermark-b"
+STREAM_LOW_WATERMARK_B: str = "stream-low-watermark-b"
+HEARTBEAT_FRACTION: str = "heartbeat-fraction"
+PIPELINE_SENDER_THREADS: str = "pipeline-sender-threads"
+PIPELINE_QUEUE_DEPTH: str = "pipeline-queue-depth"
+PROFILE_DIRECTORY: str = "profile-directory"
+PROFILE_DURATION_S: str = "profile-duration-s"
+SCHEMAS: str = "schemas"
+SNAPSHOT_PATH: str = "snapshot-path"
+SNAPSHOT_INTERVAL_S: str = "snapshot-interval-s"
+SNAPSHOT_CONFLATED: str = "snapshot-conflated"
+SHARDS: str = "shards"
+INGRESS_RATE_PER_S: str = "ingress-rate-per-s"
+PUBLICATION_INGRESS_RATE_PER_S: str = "publication-ingress-rate-per-s"
+INGRESS_BURST: str = "ingress-burst"
+SPOOL_DIRECTORY: str = "spool-directory"
+SPOOL_MAX_B: str = "spool-max-b"
+SPOOL_DRAIN_RATE_PER_S: str = "spool-drain-rate-per-s"
+SPOOL_SYNC_INTERVAL_S: str = "spool-sync-interval-s"
+MEMORY_BUDGET_B: str = "memory-budget-b"
+PUBLICATION_MEMORY_BUDGET_B: str = "publication-memory-budget-b"
+MEMORY_POLICY: str = "memory-policy"
+SUBMIT_QUEUE_DEPTH: str = "submit-queue-depth"
+CAPTURE_PATH: str = "capture-path"
+QUARANTINE_THRESHOLD: str = "quarantine-threshold"
+QUARANTINE_S: str = "quarantine-s"
+LISTENERS: str = "listeners"
+PUBLISHERS: str = "publishers"
+
+TRANSPORT_UDP: str = "udp"
+TRANSPORT_UNIX: str = "unix"
+TRANSPORT_TCP: str = "tcp"
+TRANSPORTS: List[str] = [TRANSPORT_UDP, TRANSPORT_UNIX, TRANSPORT_TCP]
+
+MEMORY_POLICY_REJECT: str = "reject"
+MEMORY_POLICY_EVICT: str = "evict"
+MEMORY_POLICIES: List[str] = [MEMORY_POLICY_REJECT, MEMORY_POLICY_EVICT]
+
+PublisherEntry = Tuple[Endpoint, List[str], float]
+
+
+class Configuration(object):
+    """
+    Configuration base class
+    """
+
+    DEFAULTS: Dict[str, Union[int, float, str]] = {
+        SOCKET_TIMEOUT_S: 0.1,
+        BUFFER_SIZE_B: 1024,
+        TRANSPORT: TRANSPORT_UDP,
+        STREAM_HIGH_WATERMARK_B: 1048576,
+        STREAM_LOW_WATERMARK_B: 262144
+    }
+
+    LIMITS: Dict[str, Dict[str, Union[int, float]]] = {
+        MIN: {
+            SOCKET_TIMEOUT_S: 0,
+            BUFFER_SIZE_B: 0,
+            STREAM_HIGH_WATERMARK_B: 0,
+            STREAM_LOW_WATERMARK_B: 0
+        },
+        MAX: {
+            SOCKET_TIMEOUT_S: 1.0,
+            BUFFER_SIZE_B: 16384,
+            STREAM_HIGH_WATERMARK_B: 268435456,
+            STREAM_LOW_WATERMARK_B: 268435456
+        }
+    }
+
+    def __init__(
+        self: Configuration,
+        socket_timeout_s: float,
+        buffer_size_b: int,
+        transport: str = TRANSPORT_UDP,
+        stream_high_watermark_b: int = DEFAULTS[STREAM_HIGH_WATERMARK_B],
+        stream_low_watermark_b: int = DEFAULTS[STREAM_LOW_WATERMARK_B],
+        schemas: Optional[Dict[str, List[str]]] = None,
+        capture_path: Optional[str] = None
+    ) -> None:
+        """
+        Initialize a `Configuration` object with a socket timeout (in seconds), a buffer size, a transport, the high
+        and low write buffer watermarks (in bytes) of stream connections, the schemas of typed publications, as a
+        mapping of publications to lists of field types, and a capture path.
+
+        The capture path is optional. If given, every datagram received is recorded to a capture file at that path,
+        with when it was received and where from, so that the traffic can be replayed later.
+        """
+        self._socket_timeout_s: Optional[float] = None
+        self.socket_timeout_s: float = socket_timeout_s
+        self._buffer_size_b: Optional[int] = None
+        self.buffer_size_b: int = buffer_size_b
+        self._transport: Optional[str] = None
+        self.transport: str = transport
+        self._stream_high_watermark_b: Optional[int] = None
+        self.stream_high_watermark_b: int = stream_high_watermark_b
+        self._stream_low_watermark_b: Optional[int] = None
+        self.stream_low_watermark_b: int = stream_low_watermark_b
+        if schemas is not None and not isinstance(schemas, dict):
+            raise ValueError(f"Invalid schemas: {schemas}")
+        self.schemas: SchemaRegistry = SchemaRegistry.from_definitions(schemas or {})
+        self.capture_path: Optional[Path] = Path(capture_path) if capture_path is not None else None
+
+    @property
+    def socket_timeout_s(self: Configuration) -> float:
+        """
+        Get the socket timeout in seconds.
+        """
+        return self._socket_timeout_s
+
+    @socket_timeout_s.setter
+    def socket_timeout_s(self: Configuration, socket_timeout_s: float) -> None:
+        """
+        Set the socket timeout in seconds.
+        """
+        if self.LIMITS[MIN][SOCKET_TIMEOUT_S] < socket_timeout_s <= self.LIMITS[MAX][SOCKET_TIMEOUT_S]:
+            self._socket_timeout_s = socket_timeout_s
+            return
+        raise ValueError(f"Invalid socket timeout: {socket_timeout_s} s")
+
+    @property
+    def buffer_size_b(self: Configuration) -> int:
+        """
+        Get the buffer size in bytes.
+        """
+        return self._buffer_size_b
+
+    @buffer_size_b.setter
+    def buffer_size_b(self: Configuration, buffer_size_b: int) -> None:
+        """
+        Set the buffer size in bytes.
+        """
+        if self.LIMITS[MIN][BUFFER_SIZE_B] < buffer_size_b <= self.LIMITS[MAX][BUFFER_SIZE_B]:
+            self._buffer_size_b = buffer_size_b
+            return
+        raise ValueError(f"Invalid buffer size: {buffer_size_b}")
+
+    @property
+    def transport(self: Configuration) -> str:
+        """
+        Get the transport.
+        """
+        return self._transport
+
+    @transport.setter
+    def transport(self: Configuration, transport: str) -> None:
+        """
+        Set the transport.
+        """
+        if transport in TRANSPORTS:
+            self._transport = transport
+            return
+        raise ValueError(f"Invalid transport: {transport}")
+
+    @property
+    def stream_high_watermark_b(self: Configuration) -> int:
+        """
+        Get the stream connection write buffer high watermark in bytes.
+        """
+        return self._stream_high_watermark_b
+
+    @stream_high_watermark_b.setter
+    def stream_high_watermark_b(self: Configuration, stream_high_watermark_b: int) -> None:
+        """
+        Set the stream connection write buffer high watermark in bytes.
+        """
+        if (
+            self.LIMITS[MIN][STREAM_HIGH_WATERMARK_B] < stream_high_watermark_b
+            <= self.LIMITS[MAX][STREAM_HIGH_WATERMARK_B]
+        ):
+            self._stream_high_watermark_b = stream_high_watermark_b
+            return
+        raise ValueError(f"Invalid stream high watermark: {stream_high_watermark_b}")
+
+    @property
+    def stream_low_watermark_b(self: Configuration) -> int:
+        """
+        Get the stream connection write buffer low watermark in bytes.
+        """
+        return self._stream_low_watermark_b
+
+    @stream_low_watermark_b.setter
+    def stream_low_watermark_b(self: Configuration, stream_low_watermark_b: int) -> None:
+        """
+        Set the stream connection write buffer low watermark in bytes. It must not exceed the high watermark.
+        """
+        if (
+            self.LIMITS[MIN][STREAM_LOW_WATERMARK_B] < stream_low_watermark_b
+            <= min(self.LIMITS[MAX][STREAM_LOW_WATERMARK_B], self.stream_high_watermark_b)
+        ):
+            self._stream_low_watermark_b = stream_low_watermark_b
+            return
+        raise ValueError(f"Invalid stream low watermark: {stream_low_watermark_b}")
+
+
+class PublisherConfiguration(Configuration):
+    """
+    PublisherConfiguration class
+    """
+
+    DEFAULTS: Dict[str, Union[int, float]] = {
+        **Configuration.DEFAULTS,
+        IP_ADDRESS: "127.0.0.1",
+        PORT: 5005,
+        SUBSCRIBER_TIMEOUT_S: 5,
+        PIPELINE_SENDER_THREADS: 0,
+        PIPELINE_QUEUE_DEPTH: 1024,
+        PROFILE_DURATION_S: 10,
+        SNAPSHOT_INTERVAL_S: 1.0,
+        SNAPSHOT_CONFLATED: False,
+        SHARDS: 0,
+        INGRESS_RATE_PER_S: 0,
+        PUBLICATION_INGRESS_RATE_PER_S: 0,
+        INGRESS_BURST: 0,
+        SPOOL_MAX_B: 67108864,
+        SPOOL_DRAIN_RATE_PER_S: 1000,
+        SPOOL_SYNC_INTERVAL_S: 1.0,
+        MEMORY_BUDGET_B: 0,
+        PUBLICATION_MEMORY_BUDGET_B: 0,
+        MEMORY_POLICY: MEMORY_POLICY_REJECT,
+        QUARANTINE_THRESHOLD: 10,
+        QUARANTINE_S: 10.0
+    }
+
+    LIMITS: Dict[str, Dict[str, Union[int, float]]] = {
+        MIN: {
+            **Configuration.LIMITS[MIN],
+            SUBSCRIBER_TIMEOUT_S: 0,
+            PIPELINE_SENDER_THREADS: -1,
+            PIPELINE_QUEUE_DEPTH: 0,
+            PROFILE_DURATION_S: 0,
+            SNAPSHOT_INTERVAL_S: 0,
+            SHARDS: -1,
+            INGRESS_RATE_PER_S: -1,
+            PUBLICATION_INGRESS_RATE_PER_S: -1,
+            INGRESS_BURST: -1,
+            SPOOL_MAX_B: 0,
+            SPOOL_DRAIN_RATE_PER_S: 0,
+            SPOOL_SYNC_INTERVAL_S: 0,
+            MEMORY_BUDGET_B: -1,
+            PUBLICATION_MEMORY_BUDGET_B: -1,
+            QUARANTINE_THRESHOLD: -1,
+            QUARANTINE_S: 0
+        },
+        MAX: {
+            **Configuration.LIMITS[MAX],
+            SUBSCRIBER_TIMEOUT_S: 10,
+            PIPELINE_SENDER_THREADS: 64,
+            PIPELINE_QUEUE_DEPTH: 1048576,
+            PROFILE_DURATION_S: 600,
+            SNAPSHOT_INTERVAL_S: 3600,
+            SHARDS: 64,
+            INGRESS_RATE_PER_S: 1000000,
+            PUBLICATION_INGRESS_RATE_PER_S: 1000000,
+            INGRESS_BURST: 1000000,
+            SPOOL_MAX_B: 68719476736,
+            SPOOL_DRAIN_RATE_PER_S: 1000000,
+            SPOOL_SYNC_INTERVAL_S: 60,
+            MEMORY_BUDGET_B: 1099511627776,
+            PUBLICATION_MEMORY_BUDGET_B: 1099511627776,
+            QUARANTINE_THRESHOLD: 1000000,
+            QUARANTINE_S: 3600
+        }
+    }
+
+    @classmethod
+    def from_yaml(cls: PublisherConfiguration, config_path: Path) -> PublisherConfiguration:
+        """
+        Read Publisher configuration settings from a YAML file.
+        """
+        if not config_path.is_file():
+            raise FileNotFoundError(f"Cannot find configuration file {config_path}")
+
+        with config_path.open(mode="r") as config_file:
+            config: Dict[str, Union[str, int]] = yaml.safe_load(config_file)
+
+        ip_address: str = config.get(IP_ADDRESS, cls.DEFAULTS[IP_ADDRESS])
+        port: int = config.get(PORT, cls.DEFAULTS[PORT])
+        socket_timeout_s: float = config.get(SOCKET_TIMEOUT_S, cls.DEFAULTS[SOCKET_TIMEOUT_S])
+        buffer_size_b: int = config.get(BUFFER_SIZE_B, cls.DEFAULTS[BUFFER_SIZE_B])
+        subscriber_timeout_s: float = config.get(SUBSCRIBER_TIMEOUT_S, cls.DEFAULTS[SUBSCRIBER_TIMEOUT_S])
+        transport: str = config.get(TRANSPORT, cls.DEFAULTS[TRANSPORT])
+        socket_path: Optional[str] = config.get(SOCKET_PATH)
+        stream_port: Optional[int] = config.get(STREAM_PORT)
+        stream_high_watermark_b: int = config.get(STREAM_HIGH_WATERMARK_B, cls.DEFAULTS[STREAM_HIGH_WATERMARK_B])
+        stream_low_watermark_b: int = config.get(STREAM_LOW_WATERMARK_B, cls.DEFAULTS[STREAM_LOW_WATERMARK_B])
+        pipeline_sender_threads: int = config.get(PIPELINE_SENDER_THREADS, cls.DEFAULTS[PIPELINE_SENDER_THREADS])
+        pipeline_queue_depth: int = config.get(PIPELINE_QUEUE_DEPTH, cls.DEFAULTS[PIPELINE_QUEUE_DEPTH])
+        profile_directory: Optional[str] = config.get(PROFILE_DIRECTORY)
+        profile_duration_s: float = config.get(PROFILE_DURATION_S, cls.DEFAULTS[PROFILE_DURATION_S])
+        schemas: Optional[Dict[str, List[str]]] = config.get(SCHEMAS)
+        snapshot_path: Optional[str] = config.get(SNAPSHOT_PATH)
+        snapshot_interval_s: float = config.get(SNAPSHOT_INTERVAL_S, cls.DEFAULTS[SNAPSHOT_INTERVAL_S])
+        snapshot_conflated: bool = config.get(SNAPSHOT_CONFLATED, cls.DEFAULTS[SNAPSHOT_CONFLATED])
+        shards: int = config.get(SHARDS, cls.DEFAULTS[SHARDS])
+        ingress_rate_per_s: float = config.get(INGRESS_RATE_PER_S, cls.DEFAULTS[INGRESS_RATE_PER_S])
+        publication_ingress_rate_per_s: float = config.get(
+            PUBLICATION_INGRESS_RATE_PER_S, cls.DEFAULTS[PUBLICATION_INGRESS_RATE_PER_S]
+        )
+        ingress_burst: int = config.get(INGRESS_BURST, cls.DEFAULTS[INGRESS_BURST])
+        spool_directory: Optional[str] = config.get(SPOOL_DIRECTORY)
+        spool_max_b: int = config.get(SPOOL_MAX_B, cls.DEFAULTS[SPOOL_MAX_B])
+        spool_drain_rate_per_s: float = config.get(SPOOL_DRAIN_RATE_PER_S, cls.DEFAULTS[SPOOL_DRAIN_RATE_PER_S])
+        spool_sync_interval_s: float = config.get(SPOOL_SYNC_INTERVAL_S, cls.DEFAULTS[SPOOL_SYNC_INTERVAL_S])
+        memory_budget_b: int = config.get(MEMORY_BUDGET_B, cls.DEFAULTS[MEMORY_BUDGET_B])
+        publication_memory_budget_b: int = config.get(
+            PUBLICATION_MEMORY_BUDGET_B, cls.DEFAULTS[PUBLICATION_MEMORY_BUDGET_B]
+        )
+        memory_policy: str = config.get(MEMORY_POLICY, cls.DEFAULTS[MEMORY_POLICY])
+        capture_path: Optional[str] = config.get(CAPTURE_PATH)
+        quarantine_threshold: int = config.get(QUARANTINE_THRESHOLD, cls.DEFAULTS[QUARANTINE_THRESHOLD])
+        quarantine_s: float = config.get(QUARANTINE_S, cls.DEFAULTS[QUARANTINE_S])
+        listeners: Optional[List[Dict[str, Any]]] = config.get(LISTENERS)
+
+        return cls(
+            ip_address,
+            port,
+            socket_timeout_s,
+            buffer_size_b,
+            subscriber_timeout_s,
+            transport,
+            socket_path,
+            stream_port,
+            stream_high_watermark_b,
+            stream_low_watermark_b,
+            pipeline_sender_threads,
+            pipeline_queue_depth,
+            profile_directory,
+            profile_duration_s,
+            schemas,
+            snapshot_path,
+            snapshot_interval_s,
+            snapshot_conflated,
+            shards,
+            ingress_rate_per_s,
+            publication_ingress_rate_per_s,
+            ingress_burst,
+            spool_directory,
+            spool_max_b,
+            spool_drain_rate_per_s,
+            spool_sync_interval_s,
+            memory_budget_b,
+            publication_memory_budget_b,
+            memory_policy,
+            capture_path,
+            quarantine_threshold,
+            quarantine_s,
+            listeners
+        )
+
+    def __init__(
+        self: PublisherConfiguration,
+        ip_address: str,
+        port: int,
+        socket_timeout_s: float,
+        buffer_size_b: int,
+        subscriber_timeout_s: float,
+        transport: str = TRANSPORT_UDP,
+        socket_path: Optional[str] = None,
+        stream_port: Optional[int] = None,
+        stream_high_watermark_b: int = Configuration.DEFAULTS[STREAM_HIGH_WATERMARK_B],
+        stream_low_watermark_b: int = Configuration.DEFAULTS[STREAM_LOW_WATERMARK_B],
+        pipeline_sender_threads: int = DEFAULTS[PIPELINE_SENDER_THREADS],
+        pipeline_queue_depth: int = DEFAULTS[PIPELINE_QUEUE_DEPTH],
+        profile_directory: Optional[str] = None,
+        profile_duration_s: float = DEFAULTS[PROFILE_DURATION_S],
+        schemas: Optional[Dict[str, List[str]]] = None,
+        snapshot_path: Optional[str] = None,
+        snapshot_interval_s: float = DEFAULTS[SNAPSHOT_INTERVAL_S],
+        snapshot_conflated: bool = DEFAULTS[SNAPSHOT_CONFLATED],
+        shards: int = DEFAULTS[SHARDS],
+        ingress_rate_per_s: float = DEFAULTS[INGRESS_RATE_PER_S],
+        publication_ingress_rate_per_s: float = DEFAULTS[PUBLICATION_INGRESS_RATE_PER_S],
+        ingress_burst: int = DEFAULTS[INGRESS_BURST],
+        spool_directory: Optional[str] = None,
+        spool_max_b: int = DEFAULTS[SPOOL_MAX_B],
+        spool_drain_rate_per_s: float = DEFAULTS[SPOOL_DRAIN_RATE_PER_S],
+        spool_sync_interval_s: float = DEFAULTS[SPOOL_SYNC_INTERVAL_S],
+        memory_budget_b: int = DEFAULTS[MEMORY_BUDGET_B],
+        publication_memory_budget_b: int = DEFAULTS[PUBLICATION_MEMORY_BUDGET_B],
+        memory_policy: str = DEFAULTS[MEMORY_POLICY],
+        capture_path: Optional[str] = None,
+        quarantine_threshold: int = DEFAULTS[QUARANTINE_THRESHOLD],
+        quarantine_s: float = DEFAULTS[QUARANTINE_S],
+        listeners: Optional[List[Dict[str, Any]]] = None
+    ) -> None:
+        """
+        Initialize a `PublisherConfiguration` object with an IPv4, a port, a socket timeout (in seconds), a buffer
+        size, a subscriber timeout (in seconds), and the optional settings listed under Publisher configuration in the
+        README.
+        """
+        super().__init__(
+            socket_timeout_s,
+            buffer_size_b,
+            transport,
+            stream_high_watermark_b,
+            stream_low_watermark_b,
+            schemas,
+            capture_path
+        )
+        self.endpoint: Endpoint = self._endpoint_for(ip_address, port, socket_path)
+        self.listener_endpoints: List[Endpoint] = self._listener_endpoints(listeners or [])
+        self.stream_endpoint: Optional[StreamEndpoint] = (
+            StreamEndpoint(ip_address, stream_port) if stream_port is not None else None
+        )
+        self._pipeline_sender_threads: Optional[int] = None
+        self.pipeline_sender_threads: int = pipeline_sender_threads
+        self._pipeline_queue_depth: Optional[int] = None
+        self.pipeline_queue_depth: int = pipeline_queue_depth
+        self.profile_directory: Optional[Path] = Path(profile_directory) if profile_directory is not None else None
+        self._profile_duration_s: Optional[float] = None
+        self.profile_duration_s: float = profile_duration_s
+        self._subscriber_timeout_s: Optional[float] = None
+        self.subscriber_timeout_s: float = subscriber_timeout_s
+        self.snapshot_path: Optional[Path] = Path(snapshot_path) if snapshot_path is not None else None
+        self._snapshot_interval_s: Optional[float] = None
+        self.snapshot_interval_s: float = snapshot_interval_s
+        self._snapshot_conflated: Optional[bool] = None
+        self.snapshot_conflated: bool = snapshot_conflated
+        self._shards: Optional[int] = None
+        self.shards: int = shards
+        self._ingress_rate_per_s: Optional[float] = None
+        self.ingress_rate_per_s: float = ingress_rate_per_s
+        self._publication_ingress_rate_per_s: Optional[float] = None
+        self.publication_ingress_rate_per_s: float = publication_ingress_rate_per_s
+        self._ingress_burst: Optional[int] = None
+        self.ingress_burst: int = ingress_burst
+        self.spool_directory: Optional[Path] = Path(spool_directory) if spool_directory is not None else None
+        self._spool_max_b: Optional[int] = None
+        self.spool_max_b: int = spool_max_b
+        self._spool_drain_rate_per_s: Optional[float] = None
+        self.spool_drain_rate_per_s: float = spool_drain_rate_per_s
+        self._spool_sync_interval_s: Optional[float] = None
+        self.spool_sync_interval_s: float = spool_sync_interval_s
+        self._memory_budget_b: Optional[int] = None
+        self.memory_budget_b: int = memory_budget_b
+        self._publication_memory_budget_b: Optional[int] = None
+        self.publication_memory_budget_b: int = publication_memory_budget_b
+        self._memory_policy: Optional[str] = None
+        self.memory_policy: str = memory_policy
+        self._quarantine_threshold: Optional[int] = None
+        self.quarantine_threshold: int = quarantine_threshold
+        self._quarantine_s: Optional[float] = None
+        self.quarantine_s: float = quarantine_s
+
+    @property
+    def subscriber_timeout_s(self: Configuration) -> float:
+        """
+        Get the subscriber timeout in seconds.
+        """
+        return self._subscriber_timeout_s
+
+    @subscriber_timeout_s.setter
+    def subscriber_timeout_s(self: Configuration, subscriber_timeout_s: float) -> None:
+        """
+        Set the subscriber timeout in seconds.
+        """
+        if self.LIMITS[MIN][SUBSCRIBER_TIMEOUT_S] < subscriber_timeout_s <= self.LIMITS[MAX][SUBSCRIBER_TIMEOUT_S]:
+            self._subscriber_timeout_s = subscriber_timeout_s
+            return
+        raise ValueError(f"Invalid subscriber timeout: {subscriber_timeout_s} s")
+
+    @property
+    def pipeline_sender_threads(self: PublisherConfiguration) -> int:
+        """
+        Get the number of pipeline sender threads. Zero disables the pipeline.
+        """
+        return self._pipeline_sender_threads
+
+    @pipeline_sender_threads.setter
+    def pipeline_sender_threads(self: PublisherConfiguration, pipeline_sender_threads: int) -> None:
+        """
+        Set the number of pipeline sender threads. Raise `ValueError` if the pipeline is enabled with a stream
+        transport.
+        """
+        if not (
+            self.LIMITS[MIN][PIPELINE_SENDER_THREADS] < pipeline_sender_threads
+            <= self.LIMITS[MAX][PIPELINE_SENDER_THREADS]
+        ):
+            raise ValueError(f"Invalid number of pipeline sender threads: {pipeline_sender_threads}")
+        if pipeline_sender_threads and (self.transport == TRANSPORT_TCP or self.stream_endpoint is not None):
+            raise ValueError("The pipeline does not support stream transports")
+        self._pipeline_sender_threads = pipeline_sender_threads
+
+    @property
+    def pipeline_queue_depth(self: PublisherConfiguration) -> int:
+        """
+        Get the maximum depth of each pipeline queue.
+        """
+        return self._pipeline_queue_depth
+
+    @pipeline_queue_depth.setter
+    def pipeline_queue_depth(self: PublisherConfiguration, pipeline_queue_depth: int) -> None:
+        """
+        Set the maximum depth of each pipeline queue.
+        """
+        if self.LIMITS[MIN][PIPELINE_QUEUE_DEPTH] < pipeline_queue_depth <= self.LIMITS[MAX][PIPELINE_QUEUE_DEPTH]:
+            self._pipeline_queue_depth = pipeline_queue_depth
+            return
+        raise ValueError(f"Invalid pipeline queue depth: {pipeline_queue_depth}")
+
+    @property
+    def profile_duration_s(self: PublisherConfiguration) -> float:
+        """
+        Get the default profile capture duration in seconds.
+        """
+        return self._profile_duration_s
+
+    @profile_duration_s.setter
+    def profile_duration_s(self: PublisherConfiguration, profile_duration_s: float) -> None:
+        """
+        Set the default profile capture duration in seconds.
+        """
+        if self.LIMITS[MIN][PROFILE_DURATION_S] < profile_duration_s <= self.LIMITS[MAX][PROFILE_DURATION_S]:
+            self._profile_duration_s = profile_duration_s
+            return
+        raise ValueError(f"Invalid profile duration: {profile_duration_s} s")
+
+    @property
+    def snapshot_interval_s(self: PublisherConfiguration) -> float:
+        """
+        Get the interval between subscription snapshots in seconds.
+        """
+        return self._snapshot_interval_s
+
+    @snapshot_interval_s.setter
+    def snapshot_interval_s(self: PublisherConfiguration, snapshot_interval_s: float) -> None:
+        """
+        Set the interval between subscription snapshots in seconds.
+        """
+        if self.LIMITS[MIN][SNAPSHOT_INTERVAL_S] < snapshot_interval_s <= self.LIMITS[MAX][SNAPSHOT_INTERVAL_S]:
+            self._snapshot_interval_s = snapshot_interval_s
+            return
+        raise ValueError(f"Invalid snapshot interval: {snapshot_interval_s} s")
+
+    @property
+    def snapshot_conflated(self: PublisherConfiguration) -> bool:
+        """
+        Check whether snapshots include the pending messages of conflated subscriptions.
+        """
+        return self._snapshot_conflated
+
+    @snapshot_conflated.setter
+    def snapshot_conflated(self: PublisherConfiguration, snapshot_conflated: bool) -> None:
+        """
+        Set whether snapshots include the pending messages of conflated subscriptions.
+        """
+        if isinstance(snapshot_conflated, bool):
+            self._snapshot_conflated = snapshot_conflated
+            return
+        raise ValueError(f"Invalid snapshot conflated setting: {snapshot_conflated}")
+
+    @property
+    def shards(self: PublisherConfiguration) -> int:
+        """
+        Get the number of shards. Zero disables sharding.
+        """
+        return self._shards
+
+    @shards.setter
+    def shards(self: PublisherConfiguration, shards: int) -> None:
+        """
+        Set the number of shards. Raise `ValueError` if sharding is enabled with a stream transport.
+        """
+        if not self.LIMITS[MIN][SHARDS] < shards <= self.LIMITS[MAX][SHARDS]:
+            raise ValueError(f"Invalid number of shards: {shards}")
+        if shards and (self.transport == TRANSPORT_TCP or self.stream_endpoint is not None):
+            raise ValueError("Shards do not support stream transports")
+        self._shards = shards
+
+    @property
+    def ingress_rate_per_s(self: PublisherConfiguration) -> float:
+        """
+        Get the ingress rate limit of each source endpoint (in messages per second). Zero disables the limit.
+        """
+        return self._ingress_rate_per_s
+
+    @ingress_rate_per_s.setter
+    def ingress_rate_per_s(self: PublisherConfiguration, ingress_rate_per_s: float) -> None:
+        """
+        Set the ingress rate limit of each source endpoint (in messages per second).
+        """
+        if self.LIMITS[MIN][INGRESS_RATE_PER_S] < ingress_rate_per_s <= self.LIMITS[MAX][INGRESS_RATE_PER_S]:
+            self._ingress_rate_per_s = ingress_rate_per_s
+            return
+        raise ValueError(f"Invalid ingress rate: {ingress_rate_per_s} per s")
+
+    @property
+    def publication_ingress_rate_per_s(self: PublisherConfiguration) -> float:
+        """
+        Get the ingress rate limit of the submitted messages of each publication (in messages per second). Zero
+        disables the limit.
+        """
+        return self._publication_ingress_rate_per_s
+
+    @publication_ingress_rate_per_s.setter
+    def publication_ingress_rate_per_s(self: PublisherConfiguration, publication_ingress_rate_per_s: float) -> None:
+        """
+        Set the ingress rate limit of the submitted messages of each publication (in messages per second).
+        """
+        if (
+            self.LIMITS[MIN][PUBLICATION_INGRESS_RATE_PER_S] < publication_ingress_rate_per_s
+            <= self.LIMITS[MAX][PUBLICATION_INGRESS_RATE_PER_S]
+        ):
+            self._publication_ingress_rate_per_s = publication_ingress_rate_per_s
+            return
+        raise ValueError(f"Invalid publication ingress rate: {publication_ingress_rate_per_s} per s")
+
+    @property
+    def ingress_burst(self: PublisherConfiguration) -> int:
+        """
+        Get the number of messages let through at once by an ingress rate limit after a quiet spell. Zero lets through
+        one second's worth.
+        """
+        return self._ingress_burst
+
+    @ingress_burst.setter
+    def ingress_burst(self: PublisherConfiguration, ingress_burst: int) -> None:
+        """
+        Set the number of messages let through at once by an ingress rate limit after a quiet spell.
+        """
+        if self.LIMITS[MIN][INGRESS_BURST] < ingress_burst <= self.LIMITS[MAX][INGRESS_BURST]:
+            self._ingress_burst = ingress_burst
+            return
+        raise ValueError(f"Invalid ingress burst: {ingress_burst}")
+
+    @property
+    def spool_max_b(self: PublisherConfiguration) -> int:
+        """
+        Get the most bytes the spool of a durable subscription may hold.
+        """
+        return self._spool_max_b
+
+    @spool_max_b.setter
+    def spool_max_b(self: PublisherConfiguration, spool_max_b: int) -> None:
+        """
+        Set the most bytes the spool of a durable subscription may hold.
+        """
+        if self.LIMITS[MIN][SPOOL_MAX_B] < spool_max_b <= self.LIMITS[MAX][SPOOL_MAX_B]:
+            self._spool_max_b = spool_max_b
+            return
+        raise ValueError(f"Invalid spool size: {spool_max_b} B")
+
+    @property
+    def spool_drain_rate_per_s(self: PublisherConfiguration) -> float:
+        """
+        Get the rate in messages per second at which spooled messages are sent to a returning durable subscriber.
+        """
+        return self._spool_drain_rate_per_s
+
+    @spool_drain_rate_per_s.setter
+    def spool_drain_rate_per_s(self: PublisherConfiguration, spool_drain_rate_per_s: float) -> None:
+        """
+        Set the rate in messages per second at which spooled messages are sent to a returning durable subscriber.
+        """
+        if (
+            self.LIMITS[MIN][SPOOL_DRAIN_RATE_PER_S] < spool_drain_rate_per_s
+            <= self.LIMITS[MAX][SPOOL_DRAIN_RATE_PER_S]
+        ):
+            self._spool_drain_rate_per_s = spool_drain_rate_per_s
+            return
+        raise ValueError(f"Invalid spool drain rate: {spool_drain_rate_per_s} per s")
+
+    @property
+    def spool_sync_interval_s(self: PublisherConfiguration) -> float:
+        """
+        Get the interval between syncs of spooled messages to disk in seconds.
+        """
+        return self._spool_sync_interval_s
+
+    @spool_sync_interval_s.setter
+    def spool_sync_interval_s(self: PublisherConfiguration, spool_sync_interval_s: float) -> None:
+        """
+        Set the interval between syncs of spooled messages to disk in seconds.
+        """
+        if self.LIMITS[MIN][SPOOL_SYNC_INTERVAL_S] < spool_sync_interval_s <= self.LIMITS[MAX][SPOOL_SYNC_INTERVAL_S]:
+            self._spool_sync_interval_s = spool_sync_interval_s
+            return
+        raise ValueError(f"Invalid spool sync interval: {spool_sync_interval_s} s")
+
+    @property
+    def memory_budget_b(self: PublisherConfiguration) -> int:
+        """
+        Get the memory budget of the publisher's state in bytes. Zero is unlimited.
+        """
+        return self._memory_budget_b
+
+    @memory_budget_b.setter
+    def memory_budget_b(self: PublisherConfiguration, memory_budget_b: int) -> None:
+        """
+        Set the memory budget of the publisher's state in bytes.
+        """
+        if self.LIMITS[MIN][MEMORY_BUDGET_B] < memory_budget_b <= self.LIMITS[MAX][MEMORY_BUDGET_B]:
+            self._memory_budget_b = memory_budget_b
+            return
+        raise ValueError(f"Invalid memory budget: {memory_budget_b} B")
+
+    @property
+    def publication_memory_budget_b(self: PublisherConfiguration) -> int:
+        """
+        Get the memory budget of the state of each publication in bytes. Zero is unlimited.
+        """
+        return self._publication_memory_budget_b
+
+    @publication_memory_budget_b.setter
+    def publication_memory_budget_b(self: PublisherConfiguration, publication_memory_budget_b: int) -> None:
+        """
+        Set the memory budget of the state of each publication in bytes.
+        """
+        if (
+            self.LIMITS[MIN][PUBLICATION_MEMORY_BUDGET_B] < publication_memory_budget_b
+            <= self.LIMITS[MAX][PUBLICATION_MEMORY_BUDGET_B]
+        ):
+            self._publication_memory_budget_b = publication_memory_budget_b
+            return
+        raise ValueError(f"Invalid publication memory budget: {publication_memory_budget_b} B")
+
+    @property
+    def memory_policy(self: PublisherConfiguration) -> str:
+        """
+        Get the policy applied when a memory budget would be exceeded.
+        """
+        return self._memory_policy
+
+    @memory_policy.setter
+    def memory_policy(self: PublisherConfiguration, memory_policy: str) -> None:
+        """
+        Set the policy applied when a memory budget would be exceeded.
+        """
+        if memory_policy in MEMORY_POLICIES:
+            self._memory_policy = memory_policy
+            return
+        raise ValueError(f"Invalid memory policy: {memory_policy}")
+
+    @property
+    def quarantine_threshold(self: PublisherConfiguration) -> int:
+        """
+        Get the number of rejected messages within the quarantine duration that quarantines their source. Zero disables
+        quarantine.
+        """
+        return self._quarantine_threshold
+
+    @quarantine_threshold.setter
+    def quarantine_threshold(self: PublisherConfiguration, quarantine_threshold: int) -> None:
+        """
+        Set the number of rejected messages within the quarantine duration that quarantines their source.
+        """
+        if self.LIMITS[MIN][QUARANTINE_THRESHOLD] < quarantine_threshold <= self.LIMITS[MAX][QUARANTINE_THRESHOLD]:
+            self._quarantine_threshold = quarantine_threshold
+            return
+        raise ValueError(f"Invalid quarantine threshold: {quarantine_threshold}")
+
+    @property
+    def quarantine_s(self: PublisherConfiguration) -> float:
+        """
+        Get the quarantine duration in seconds.
+        """
+        return self._quarantine_s
+
+    @quarantine_s.setter
+    def quarantine_s(self: PublisherConfiguration, quarantine_s: float) -> None:
+        """
+        Set the quarantine duration in seconds.
+        """
+        if self.LIMITS[MIN][QUARANTINE_S] < quarantine_s <= self.LIMITS[MAX][QUARANTINE_S]:
+            self._quarantine_s = quarantine_s
+            return
+        raise ValueError(f"Invalid quarantine duration: {quarantine_s} s")
+
+    def _endpoint_for(self: PublisherConfiguration, ip_address: str, port: int, socket_path: Optional[str]) -> Endpoint:
+        """
+        Get an endpoint to listen on for the transport.
+        """
+        if self.transport == TRANSPORT_UNIX:
+            return UnixEndpoint(socket_path)
+        if self.transport == TRANSPORT_TCP:
+            return StreamEndpoint(ip_address, port)
+        return IPEndpoint(ip_address, port)
+
+    def _listener_endpoints(self: PublisherConfiguration, listeners: List[Dict[str, Any]]) -> List[Endpoint]:
+        """
+        Get the endpoints of the further listeners. Raise `ValueError` if the listeners are invalid, or repeat an
+        endpoint.
+        """
+        if not isinstance(listeners, list):
+            raise ValueError(f"Listeners list is invalid: {listeners}")
+        endpoints: List[Endpoint] = []
+        for listener in listeners:
+            if not isinstance(listener, dict):
+                raise ValueError(f"Listener settings are invalid: {listener}")
+            endpoint: Endpoint = self._endpoint_for(
+                listener.get(IP_ADDRESS, self.DEFAULTS[IP_ADDRESS]),
+                listener.get(PORT, self.DEFAULTS[PORT]),
+                listener.get(SOCKET_PATH)
+            )
+            if endpoint == self.endpoint or endpoint in endpoints:
+                raise ValueError(f"Listener {endpoint} is given more than once")
+            endpoints.append(endpoint)
+        return endpoints
+
+
+class SubscriberConfiguration(Configuration):
+    """
+    SubscriberConfiguration class
+    """
+
+    DEFAULTS: Dict[str, Union[int, float]] = {
+        **Configuration.DEFAULTS,
+        PUBLISHER_IPV4: "127.0.0.1",
+        PUBLISHER_PORT: 5005,
+        SUBSCRIBER_TIMEOUT_S: PublisherConfiguration.DEFAULTS[SUBSCRIBER_TIMEOUT_S],
+        HEARTBEAT_FRACTION: 0.5,
+        SUBMIT_QUEUE_DEPTH: 65536
+    }
+
+    LIMITS: Dict[str, Dict[str, Union[int, float]]] = {
+        MIN: {
+            **Configuration.LIMITS[MIN],
+            SUBSCRIBER_TIMEOUT_S: PublisherConfiguration.LIMITS[MIN][SUBSCRIBER_TIMEOUT_S],
+            HEARTBEAT_FRACTION: 0,
+            SUBMIT_QUEUE_DEPTH: 0
+        },
+        MAX: {
+            **Configuration.LIMITS[MAX],
+            SUBSCRIBER_TIMEOUT_S: PublisherConfiguration.LIMITS[MAX][SUBSCRIBER_TIMEOUT_S],
+            HEARTBEAT_FRACTION: 0.9,
+            SUBMIT_QUEUE_DEPTH: 1048576
+        }
+    }
+
+    @classmethod
+    def from_yaml(cls: SubscriberConfiguration, config_path: Path) -> SubscriberConfiguration:
+        """
+        Read Subscriber configuration settings from a YAML file.
+        """
+        if not config_path.is_file():
+            raise FileNotFoundError(f"Cannot find configuration file {config_path}")
+
+        with config_path.open(mode="r") as config_file:
+            config: Dict[str, Union[str, int]] = yaml.safe_load(config_file)
+
+        publisher_ipv4: str = config.get(PUBLISHER_IPV4, cls.DEFAULTS[PUBLISHER_IPV4])
+        publisher_port: int = config.get(PUBLISHER_PORT, cls.DEFAULTS[PUBLISHER_PORT])
+        socket_timeout_s: float = config.get(SOCKET_TIMEOUT_S, cls.DEFAULTS[SOCKET_TIMEOUT_S])
+        buffer_size_b: int = config.get(BUFFER_SIZE_B, cls.DEFAULTS[BUFFER_SIZE_B])
+        subscriptions: Optional[List[str]] = config.get(SUBSCRIPTIONS, [])
+        publications: Optional[List[str]] = config.get(PUBLICATIONS, [])
+        transport: str = config.get(TRANSPORT, cls.DEFAULTS[TRANSPORT])
+        publisher_socket_path: Optional[str] = config.get(PUBLISHER_SOCKET_PATH)
+        socket_path: Optional[str] = config.get(SOCKET_PATH)
+        stream_high_watermark_b: int = config.get(STREAM_HIGH_WATERMARK_B, cls.DEFAULTS[STREAM_HIGH_WATERMARK_B])
+        stream_low_watermark_b: int = config.get(STREAM_LOW_WATERMARK_B, cls.DEFAULTS[STREAM_LOW_WATERMARK_B])
+        subscriber_timeout_s: float = config.get(SUBSCRIBER_TIMEOUT_S, cls.DEFAULTS[SUBSCRIBER_TIMEOUT_S])
+        heartbeat_fraction: float = config.get(HEARTBEAT_FRACTION, cls.DEFAULTS[HEARTBEAT_FRACTION])
+        schemas: Optional[Dict[str, List[str]]] = config.get(SCHEMAS)
+        publishers: Optional[List[Dict[str, Any]]] = config.get(PUBLISHERS)
+        submit_queue_depth: int = config.get(SUBMIT_QUEUE_DEPTH, cls.DEFAULTS[SUBMIT_QUEUE_DEPTH])
+        capture_path: Optional[str] = config.get(CAPTURE_PATH)
+
+        return cls(
+            publisher_ipv4,
+            publisher_port,
+            socket_timeout_s,
+            buffer_size_b,
+            subscriptions,
+            publications,
+            transport,
+            publisher_socket_path,
+            socket_path,
+            stream_high_watermark_b,
+            stream_low_watermark_b,
+            subscriber_timeout_s,
+            heartbeat_fraction,
+            schemas,
+            publishers,
+            submit_queue_depth,
+            capture_path
+        )
+
+    def __init__(
+        self: SubscriberConfiguration,
+        publisher_ipv4: str,
+        publisher_port: int,
+        socket_timeout_s: float,
+        buffer_size_b: int,
+        subscriptions: Optional[List[str]],
+        publications: Optional[List[str]],
+        transport: str = TRANSPORT_UDP,
+        publisher_socket_path: Optional[str] = None,
+        socket_path: Optional[str] = None,
+        stream_high_watermark_b: int = Configuration.DEFAULTS[STREAM_HIGH_WATERMARK_B],
+        stream_low_watermark_b: int = Configuration.DEFAULTS[STREAM_LOW_WATERMARK_B],
+        subscriber_timeout_s: float = DEFAULTS[SUBSCRIBER_TIMEOUT_S],
+        heartbeat_fraction: float = DEFAULTS[HEARTBEAT_FRACTION],
+        schemas: Optional[Dict[str, List[str]]] = None,
+        publishers: Optional[List[Dict[str, Any]]] = None,
+        submit_queue_depth: int = DEFAULTS[SUBMIT_QUEUE_DEPTH],
+        capture_path: Optional[str] = None
+    ) -> None:
+        """
+        Initialize a `SubscriberConfiguration` object with a list of subscriptions, a list of publications, an IPv4 for
+        the publisher, a port for the publisher, a socket timeout (in seconds), a buffer size, a transport, a socket
+        path for the publisher, a socket path for the subscriber, the stream write buffer watermarks (in bytes), the
+        subscriber timeout (in seconds) of the publisher, the fraction of it between heartbeats, the schemas of typed
+        publications, any further publishers to subscribe to, the most records that may be queued for sending, and a
+        capture path.
+
+        The subscriber timeout is the lease the publisher grants each subscription. The subscriber renews its leases
+        by sending a heartbeat every `subscriber_timeout_s * heartbeat_fraction` seconds.
+
+        The socket paths are only used by the Unix datagram transport. The publisher socket path is then required; the
+        subscriber socket path defaults to a per-process path in the temporary directory, since the publisher can only
+        reply to a bound socket.
+
+        With the stream (TCP) transport, the publisher port is the publisher's stream port.
+
+        Typed publications are submitted in binary, and subscriptions to them ask the publisher for binary messages.
+        Their schemas must match the publisher's.
+
+        Further publishers are given as mappings of settings, each with the publisher's IP address and port, or socket
+        path, its subscriptions, and optionally its subscriber timeout, which defaults to that of the first publisher.
+        All of them are reached through the same transport, and their leases are renewed independently.
+
+        Records submitted without blocking are queued, up to the submit queue depth, and sent by a background thread,
+        packed into as few datagrams as possible.
+
+        The capture path is optional. If given, every datagram the subscriber receives is recorded to a capture file at
+        that path.
+
+        For now, a subscriber cannot simultaneously publish and subscribe to publications.
+        """
+        super().__init__(
+            socket_timeout_s,
+            buffer_size_b,
+            transport,
+            stream_high_watermark_b,
+            stream_low_watermark_b,
+            schemas,
+            capture_path
+        )
+        self.publisher_endpoint: Endpoint = self._publisher_endpoint_for(
+            publisher_ipv4, publisher_port, publisher_socket_path
+        )
+        self.endpoint: Optional[Endpoint] = None
+        if self.transport == TRANSPORT_UNIX:
+            self.endpoint = UnixEndpoint(
+                socket_path or str(Path(tempfile.gettempdir()) / f"pubsub-subscriber-{os.getpid()}.sock")
+            )
+        self.subscriptions: Optional[List[str]] = subscriptions
+        self.publications: Optional[List[str]] = publications
+        self._subscriber_timeout_s: Optional[float] = None
+        self.subscriber_timeout_s: float = subscriber_timeout_s
+        self._heartbeat_fraction: Optional[float] = None
+        self.heartbeat_fraction: float = heartbeat_fraction
+        self._submit_queue_depth: Optional[int] = None
+        self.submit_queue_depth: int = submit_queue_depth
+
+        self._validate()
+        self.publishers: List[PublisherEntry] = self._publisher_entries(publishers or [])
+
+    @property
+    def subscriber_timeout_s(self: SubscriberConfiguration) -> float:
+        """
+        Get the subscriber timeout of the publisher in seconds.
+        """
+        return self._subscriber_timeout_s
+
+    @subscriber_timeout_s.setter
+    def subscriber_timeout_s(self: SubscriberConfiguration, subscriber_timeout_s: float) -> None:
+        """
+        Set the subscriber timeout of the publisher in seconds.
+        """
+        if self.LIMITS[MIN][SUBSCRIBER_TIMEOUT_S] < subscriber_timeout_s <= self.LIMITS[MAX][SUBSCRIBER_TIMEOUT_S]:
+            self._subscriber_timeout_s = subscriber_timeout_s
+            return
+        raise ValueError(f"Invalid subscriber timeout: {subscriber_timeout_s} s")
+
+    @property
+    def heartbeat_fraction(self: SubscriberConfiguration) -> float:
+        """
+        Get the fraction of the subscriber timeout between heartbeats.
+        """
+        return self._heartbeat_fraction
+
+    @heartbeat_fraction.setter
+    def heartbeat_fraction(self: SubscriberConfiguration, heartbeat_fraction: float) -> None:
+        """
+        Set the fraction of the subscriber timeout between heartbeats.
+        """
+        if self.LIMITS[MIN][HEARTBEAT_FRACTION] < heartbeat_fraction <= self.LIMITS[MAX][HEARTBEAT_FRACTION]:
+            self._heartbeat_fraction = heartbeat_fraction
+            return
+        raise ValueError(f"Invalid heartbeat fraction: {heartbeat_fraction}")
+
+    @property
+    def submit_queue_depth(self: SubscriberConfiguration) -> int:
+        """
+        Get the most records that may be queued for sending by the background thread.
+        """
+        return self._submit_queue_depth
+
+    @submit_queue_depth.setter
+    def submit_queue_depth(self: SubscriberConfiguration, submit_queue_depth: int) -> None:
+        """
+        Set the most records that may be queued for sending by the background thread.
+        """
+        if self.LIMITS[MIN][SUBMIT_QUEUE_DEPTH] < submit_queue_depth <= self.LIMITS[MAX][SUBMIT_QUEUE_DEPTH]:
+            self._submit_queue_depth = submit_queue_depth
+            return
+        raise ValueError(f"Invalid submit queue depth: {submit_queue_depth}")
+
+    @property
+    def heartbeat_interval_s(self: SubscriberConfiguration) -> float:
+        """
+        Get the interval between heartbeats in seconds.
+        """
+        return self.subscriber_timeout_s * self.heartbeat_fraction
+
+    def _publisher_endpoint_for(
+        self: SubscriberConfiguration,
+        publisher_ipv4: str,
+        publisher_port: int,
+        publisher_socket_path: Optional[str]
+    ) -> Endpoint:
+        """
+        Get the endpoint of a publisher for the transport.
+        """
+        if self.transport == TRANSPORT_UNIX:
+            return UnixEndpoint(publisher_socket_path)
+        if self.transport == TRANSPORT_TCP:
+            return StreamEndpoint(publisher_ipv4, publisher_port)
+        return IPEndpoint(publisher_ipv4, publisher_port)
+
+    def _publisher_entries(self: SubscriberConfiguration, publishers: List[Dict[str, Any]]) -> List[PublisherEntry]:
+        """
+        Get the endpoint, subscriptions, and heartbeat interval (in seconds) of every publisher, starting with the
+        first. Raise `ValueError` if the further publishers are invalid, are given alongside publications, or repeat a
+        publisher.
+        """
+        entries: List[PublisherEntry] = [
+            (self.publisher_endpoint, list(self.subscriptions or []), self.heartbeat_interval_s)
+        ]
+        if not isinstance(publishers, list):
+            raise ValueError(f"Publishers list is invalid: {publishers}")
+        if publishers and self.publications:
+            raise ValueError("Cannot have both further publishers and publications")
+        for publisher in publishers:
+            if not isinstance(publisher, dict):
+                raise ValueError(f"Publisher settings are invalid: {publisher}")
+            endpoint: Endpoint = self._publisher_endpoint_for(
+                publisher.get(PUBLISHER_IPV4, self.DEFAULTS[PUBLISHER_IPV4]),
+                publisher.get(PUBLISHER_PORT, self.DEFAULTS[PUBLISHER_PORT]),
+                publisher.get(PUBLISHER_SOCKET_PATH)
+            )
+            subscriptions: Any = publisher.get(SUBSCRIPTIONS)
+            if not subscriptions or not isinstance(subscriptions, list) or not all(
+                isinstance(subscription, str) for subscription in subscriptions
+            ):
+                raise ValueError(f"Subscriptions list of {endpoint} is invalid: {subscriptions}")
+            subscriber_timeout_s: float = publisher.get(SUBSCRIBER_TIMEOUT_S, self.subscriber_timeout_s)
+            if not (
+                self.LIMITS[MIN][SUBSCRIBER_TIMEOUT_S] < subscriber_timeout_s <= self.LIMITS[MAX][SUBSCRIBER_TIMEOUT_S]
+            ):
+                raise ValueError(f"Invalid subscriber timeout of {endpoint}: {subscriber_timeout_s} s")
+            if any(endpoint == entry[0] for entry in entries):
+                raise ValueError(f"Publisher {endpoint} is given more than once")
+            entries.append((endpoint, subscriptions, subscriber_timeout_s * self.heartbeat_fraction))
+        return entries
+
+    def _validate(self):
+        """
+        Validate the subscriber configuration.
+
+        Raises:
+            ValueError
+                - If both subscriptions and publications are specified
+                - If subscriptions (publications) is not a list
+                - If any publication in subscriptions (publications) is not a string
+        """
+        if self.subscriptions and self.publications:
+            raise ValueError("Cannot have both subscriptions and publications")
+        for x in self.subscriptions, self.publications:
+            if x is None:
+                continue
+            if not isinstance(x, list) or not all(isinstance(y, str) for y in x):
+                raise ValueError(f"Subscriptions/publications list is invalid: {x}")
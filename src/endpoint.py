@@ -0,0 +1,108 @@
+"""
+Endpoint module
+"""
+from __future__ import annotations
+import socket
+from typing import Any, Hashable, Optional
+
+
+UNIX_SOCKET_PATH_MAX_LENGTH_B: int = 107
+
+
+class Endpoint(object):
+    """
+    Endpoint base class
+
+    An endpoint is anything a transport can send messages to and receive messages from. Subclasses must implement the
+    `address` and `family` properties.
+
+    An endpoint is created for each peer a datagram is received from, so endpoints keep their attributes in slots
+    rather than an instance dictionary.
+    """
+
+    __slots__ = ()
+
+    def __eq__(self: Endpoint, other: Any) -> bool:
+        """
+        Check the equality of two endpoints. Endpoints are equal if they are of the same type and their addresses are
+        equal.
+        """
+        return type(self) is type(other) and self.address == other.address
+
+    def __hash__(self: Endpoint) -> int:
+        """
+        Hash an endpoint by its address so that endpoints can be used as dictionary keys.
+        """
+        return hash(self.address)
+
+    @property
+    def address(self: Endpoint) -> Hashable:
+        """
+        Abstract property. Get the socket address of the endpoint in the form expected by `socket.sendto`.
+        """
+        raise NotImplementedError(f"Attempted to access abstract property {__class__.__name__}.address")
+
+    @property
+    def family(self: Endpoint) -> int:
+        """
+        Abstract property. Get the socket address family of the endpoint.
+        """
+        raise NotImplementedError(f"Attempted to access abstract property {__class__.__name__}.family")
+
+
+class UnixEndpoint(Endpoint):
+    """
+    Unix domain socket endpoint class
+    """
+
+    __slots__ = ("_path",)
+
+    def __init__(self: UnixEndpoint, path: str) -> None:
+        """
+        Initialize a `UnixEndpoint` object with a socket path.
+        """
+        self._path: Optional[str] = None
+        self.path: str = path
+
+    def __repr__(self: UnixEndpoint) -> str:
+        """
+        Generate a representational string for a `UnixEndpoint` object.
+        """
+        return f"{self.__class__.__name__}({self.path})"
+
+    def __str__(self: UnixEndpoint) -> str:
+        """
+        Convert a `UnixEndpoint` to a string.
+        """
+        return self.path
+
+    @property
+    def path(self: UnixEndpoint) -> str:
+        """
+        Get the socket path.
+        """
+        return self._path
+
+    @path.setter
+    def path(self: UnixEndpoint, path: str) -> None:
+        """
+        Validate and set the socket path. If invalid, raise `ValueError`.
+        """
+        if isinstance(path, str) and 0 < len(path.encode("utf-8")) <= UNIX_SOCKET_PATH_MAX_LENGTH_B:
+            self._path = path
+            return
+        raise ValueError(f"Invalid socket path: {path}")
+
+    @property
+    def address(self: UnixEndpoint) -> str:
+        """
+        Get the socket address, which for a Unix domain socket is its path.
+        """
+        return self._path
+
+    @property
+    def family(self: UnixEndpoint) -> int:
+        """
+        Get the socket address family.
+        """
+        return socket.AF_UNIX
@@ -0,0 +1,76 @@
+"""
+Filter module
+"""
+from __future__ import annotations
+import math
+import re
+from typing import Callable, List, Sequence, Union
+
+
+Predicate = Callable[[Sequence[str]], bool]
+
+ALTERNATIVE_SEPARATOR: str = "|"
+CONDITION_SEPARATOR: str = "&"
+OPERATORS: List[str] = ["==", "!=", "<=", ">=", "<", ">"]
+EQUALITY_OPERATORS: List[str] = ["==", "!="]
+
+CONDITION_PATTERN = re.compile(r"^(\d+)(==|!=|<=|>=|<|>)(.*)$")
+
+
+def compile_filter(expression: str) -> Predicate:
+    """
+    Compile a filter expression into a predicate over a message payload.
+
+    A filter expression is one or more alternatives separated by `|`, each of which is one or more conditions separated
+    by `&`. A condition has the form `<FIELD><OPERATOR><VALUE>`, where the field is the 1-based index of a data field
+    (the publication itself is field 0), and the operator is one of `==`, `!=`, `<`, `<=`, `>`, or `>=`. If the value is
+    a finite number, the field is compared numerically; otherwise it is compared as a string, for equality only. For
+    example, `2>30.5&1==north` matches messages whose second field exceeds 30.5 and whose first field is `north`.
+
+    The expression is translated to Python source once, so evaluating the predicate costs no more than the comparisons
+    themselves. Values are bound to the predicate as constants rather than written into its source. A payload that is
+    too short, or whose field is not numeric where a number is expected, does not match.
+
+    Raise `ValueError` if the expression is invalid.
+    """
+    values: List[Union[float, str]] = []
+    alternatives: List[str] = []
+    for alternative in expression.split(ALTERNATIVE_SEPARATOR):
+        conditions: List[str] = [_compile_condition(c, values) for c in alternative.split(CONDITION_SEPARATOR)]
+        alternatives.append(" and ".join(conditions))
+    source: str = (
+        "def predicate(payload):\n"
+        "    try:\n"
+        f"        return bool({' or '.join(f'({a})' for a in alternatives)})\n"
+        "    except (IndexError, TypeError, ValueError):\n"
+        "        return False\n"
+    )
+    namespace: dict = {f"value_{index}": value for index, value in enumerate(values)}
+    exec(compile(source, f"<filter {expression}>", "exec"), namespace)
+    return namespace["predicate"]
+
+
+def _compile_condition(condition: str, values: List[Union[float, str]]) -> str:
+    """
+    Translate a single condition to a Python expression over `payload`, appending its value to the values the
+    expression refers to by index. Raise `ValueError` if it is invalid.
+    """
+    match = CONDITION_PATTERN.match(condition.strip())
+    if not match:
+        raise ValueError(f"Invalid filter condition: {condition}")
+    field_string, operator, value_string = match.groups()
+    field: int = int(field_string)
+    if field < 1:
+        raise ValueError(f"Invalid filter field: {field}")
+    name: str = f"value_{len(values)}"
+    try:
+        value: float = float(value_string)
+    except ValueError:
+        if operator not in EQUALITY_OPERATORS:
+            raise ValueError(f"Invalid filter value for {operator}: {value_string}")
+        values.append(value_string)
+        return f"payload[{field}] {operator} {name}"
+    if not math.isfinite(value):
+        raise ValueError(f"Invalid filter value: {value_string}")
+    values.append(value)
+    return f"float(payload[{field}]) {operator} {name}"
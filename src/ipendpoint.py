@@ -1,77 +1,102 @@
-"""
-IP endpoint module
-"""
-from __future__ import annotations
-import ipaddress
-from typing import Generator, Optional, Tuple, Union
-
-
-class IPEndpoint(object):
-    """
-    IP Endpoint class
-    """
-
-    def __init__(self: IPEndpoint, ip_address: str, port: int) -> None:
-        """
-        Initialize an `IPEndpoint` object with an IP address and a port.
-        """
-        self._ip_address: Optional[Union[ipaddress.IPv4Address, ipaddress.IPv6Address]] = None
-        self.ip_address: Union[ipaddress.IPv4Address, ipaddress.IPv6Address] = ip_address
-        self._port: Optional[int] = None
-        self.port: int = port
-
-    def __repr__(self: IPEndpoint) -> str:
-        """
-        Generate a representational string for an `IPEndpoint` object.
-        """
-        return f"{self.__class__.__name__}({self.ip_address}, {self.port})"
-
-    def __str__(self: IPEndpoint) -> str:
-        """
-        Convert an `IPEndpoint` to a string.
-        """
-        return f"{self.ip_address}:{self.port}"
-
-    def __iter__(self: IPEndpoint) -> Generator:
-        """
-        Kind of a hack to allow for representation of an `IPEndpoint` object as a `tuple`.
-        """
-        yield self.ip_address
-        yield self.port
-
-    def __eq__(self: IPEndpoint, other: IPEndpoint) -> bool:
-        """
-        Check the equality of two endpoints. Endpoints are equal if their IP addresses and ports are equal.
-        """
-        return self.ip_address == other.ip_address and self.port == other.port
-
-    @property
-    def ip_address(self: IPEndpoint) -> str:
-        """
-        Get the IP Address as a string.
-        """
-        return format(self._ip_address)
-
-    @ip_address.setter
-    def ip_address(self: IPEndpoint, ip_address: Union[str, int, bytes]) -> None:
-        """
-        Set the IP address.
-        """
-        self._ip_address = ipaddress.ip_address(ip_address)
-
-    @property
-    def port(self: IPEndpoint) -> int:
-        """
-        Get the port as an `int`.
-        """
-        return self._port
-
-    @port.setter
-    def port(self: IPEndpoint, port: int) -> None:
-        """
-        Validate and set the port. If invalid, raise `ValueError`.
-        """
-        if 0 < port <= 65353:
-            self._port = port
-            return
-        raise ValueError(f"Invalid port: {port}")
+"""
+IP endpoint module
+"""
+from __future__ import annotations
+import ipaddress
+import socket
+from typing import Generator, Optional, Tuple, Union
+
+from src.endpoint import Endpoint
+
+
+class IPEndpoint(Endpoint):
+    """
+    IP Endpoint class
+    """
+
+    __slots__ = ("_ip_address", "_port")
+
+    def __init__(self: IPEndpoint, ip_address: str, port: int) -> None:
+        """
+        Initialize an `IPEndpoint` object with an IP address and a port.
+        """
+        self._ip_address: Optional[Union[ipaddress.IPv4Address, ipaddress.IPv6Address]] = None
+        self.ip_address: Union[ipaddress.IPv4Address, ipaddress.IPv6Address] = ip_address
+        self._port: Optional[int] = None
+        self.port: int = port
+
+    def __repr__(self: IPEndpoint) -> str:
+        """
+        Generate a representational string for an `IPEndpoint` object.
+        """
+        return f"{self.__class__.__name__}({self.ip_address}, {self.port})"
+
+    def __str__(self: IPEndpoint) -> str:
+        """
+        Convert an `IPEndpoint` to a string.
+        """
+        return f"{self.ip_address}:{self.port}"
+
+    def __iter__(self: IPEndpoint) -> Generator:
+        """
+        Kind of a hack to allow for representation of an `IPEndpoint` object as a `tuple`.
+        """
+        yield self.ip_address
+        yield self.port
+
+    @property
+    def address(self: IPEndpoint) -> Tuple[str, int]:
+        """
+        Get the socket address as an `(ip_address, port)` tuple. Endpoints are equal if their IP addresses and ports
+        are equal.
+        """
+        return self.ip_address, self.port
+
+    @property
+    def family(self: IPEndpoint) -> int:
+        """
+        Get the socket address family, which depends on the IP version of the address.
+        """
+        return socket.AF_INET6 if self._ip_address.version == 6 else socket.AF_INET
+
+    @property
+    def ip_address(self: IPEndpoint) -> str:
+        """
+        Get the IP Address as a string.
+        """
+        return format(self._ip_address)
+
+    @ip_address.setter
+    def ip_address(self: IPEndpoint, ip_address: Union[str, int, bytes]) -> None:
+        """
+        Set the IP address.
+        """
+        self._ip_address = ipaddress.ip_address(ip_address)
+
+    @property
+    def port(self: IPEndpoint) -> int:
+        """
+        Get the port as an `int`.
+        """
+        return self._port
+
+    @port.setter
+    def port(self: IPEndpoint, port: int) -> None:
+        """
+        Validate and set the port. If invalid, raise `ValueError`.
+        """
+        if 0 < port <= 65353:
+            self._port = port
+            return
+        raise ValueError(f"Invalid port: {port}")
+
+
+class StreamEndpoint(IPEndpoint):
+    """
+    Stream endpoint class
+
+    An IP endpoint reached over a persistent stream (TCP) connection rather than by datagram. It is a distinct type so
+    that a stream peer never compares equal to a datagram peer with the same IP address and port.
+    """
+
+    __slots__ = ()
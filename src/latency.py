@@ -0,0 +1,120 @@
+"""
+Latency module
+"""
+from __future__ import annotations
+from datetime import datetime
+from typing import Dict, List
+
+from src.message import Trace
+
+
+LEG_PRODUCER_TO_PUBLISHER: str = "producer-publisher"
+LEG_QUEUEING: str = "queueing"
+LEG_PUBLISHER_TO_CONSUMER: str = "publisher-consumer"
+LEGS: List[str] = [LEG_PRODUCER_TO_PUBLISHER, LEG_QUEUEING, LEG_PUBLISHER_TO_CONSUMER]
+
+
+class LatencyHistogram(object):
+    """
+    Latency histogram class
+
+    Counts latencies in buckets whose bounds double, from 1 us up to about 36 minutes, so that recording a latency
+    costs a constant, small amount of time and memory however many are recorded. Percentiles are reported as the upper
+    bound of the bucket they fall in, so are accurate to within a factor of two.
+
+    Negative latencies, which can only come from clock skew between hosts, are counted separately and as zero.
+    """
+
+    BUCKET_COUNT: int = 32
+
+    def __init__(self: LatencyHistogram) -> None:
+        """
+        Initialize an empty `LatencyHistogram` object.
+        """
+        self.buckets: List[int] = [0] * self.BUCKET_COUNT
+        self.count: int = 0
+        self.negative_count: int = 0
+        self.total_s: float = 0.0
+        self.max_s: float = 0.0
+
+    def record(self: LatencyHistogram, latency_s: float) -> None:
+        """
+        Record a latency in seconds.
+        """
+        if latency_s < 0:
+            self.negative_count += 1
+            latency_s = 0.0
+        self.buckets[min(int(latency_s * 1e6).bit_length(), self.BUCKET_COUNT - 1)] += 1
+        self.count += 1
+        self.total_s += latency_s
+        if latency_s > self.max_s:
+            self.max_s = latency_s
+
+    @property
+    def mean_s(self: LatencyHistogram) -> float:
+        """
+        Get the mean latency in seconds.
+        """
+        return self.total_s / self.count if self.count else 0.0
+
+    def percentile_s(self: LatencyHistogram, fraction: float) -> float:
+        """
+        Get the latency in seconds below which a fraction of the recorded latencies fall.
+        """
+        threshold: float = fraction * self.count
+        cumulative: int = 0
+        for bucket, count in enumerate(self.buckets):
+            cumulative += count
+            if count and cumulative >= threshold:
+                return min((1 << bucket) / 1e6, self.max_s)
+        return self.max_s
+
+
+class LatencyTracker(object):
+    """
+    Latency tracker class
+
+    Aggregates the traces of received messages into a latency histogram per publication for each leg of the journey
+    from producer to consumer:
+
+    - `producer-publisher`: from submission by the producer to receipt by the publisher.
+    - `queueing`: from receipt by the publisher to being sent on by it, including any conflation delay.
+    - `publisher-consumer`: from being sent on by the publisher to receipt by the consumer.
+
+    The first and last legs compare the clocks of different processes, so are only meaningful if those clocks are
+    synchronized.
+    """
+
+    def __init__(self: LatencyTracker) -> None:
+        """
+        Initialize an empty `LatencyTracker` object.
+        """
+        self.histograms: Dict[str, Dict[str, LatencyHistogram]] = {}
+
+    def record(self: LatencyTracker, publication: str, trace: Trace, received: datetime) -> None:
+        """
+        Record the latencies of a message of a publication from its trace and the time it was received.
+        """
+        histograms = self.histograms.get(publication)
+        if histograms is None:
+            histograms = self.histograms[publication] = {leg: LatencyHistogram() for leg in LEGS}
+        histograms[LEG_PRODUCER_TO_PUBLISHER].record((trace.ingress - trace.submitted).total_seconds())
+        histograms[LEG_QUEUEING].record((trace.egress - trace.ingress).total_seconds())
+        histograms[LEG_PUBLISHER_TO_CONSUMER].record((received - trace.egress).total_seconds())
+
+    def summary(self: LatencyTracker) -> str:
+        """
+        Format the latencies as a table, one publication and leg per line.
+        """
+        lines: List[str] = [
+            f"{'publication':<20} {'leg':<20} {'count':>8} {'mean (us)':>10} {'p50 (us)':>10} {'p99 (us)':>10} "
+            f"{'max (us)':>10}"
+        ]
+        for publication, histograms in self.histograms.items():
+            for leg, histogram in histograms.items():
+                lines.append(
+                    f"{publication:<20} {leg:<20} {histogram.count:>8d} {1e6 * histogram.mean_s:>10.0f} "
+                    f"{1e6 * histogram.percentile_s(0.5):>10.0f} {1e6 * histogram.percentile_s(0.99):>10.0f} "
+                    f"{1e6 * histogram.max_s:>10.0f}"
+                )
+        return "\n".join(lines)
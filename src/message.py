@@ -1,86 +1,266 @@
-"""
-Message module
-"""
-from __future__ import annotations
-from datetime import datetime
-from enum import auto, IntEnum
-from typing import List
-
-
-TIMESTAMP_FORMAT: str = "%Y%m%d%H%M%S%f"
-
-
-class MessageType(IntEnum):
-    """
-    Message type enum
-    """
-
-    SUBSCRIBE = auto()
-    SUBMIT = auto()
-    PUBLISH = auto()
-
-    @classmethod
-    def from_string(cls: MessageType, message_type_string: str) -> MessageType:
-        """
-        Convert a string to a `MessageType` object.
-        """
-        return {
-            "subscribe": cls.SUBSCRIBE,
-            "submit": cls.SUBMIT,
-            "publish": cls.PUBLISH
-        }[message_type_string.lower()]
-
-    def __str__(self: MessageType) -> str:
-        """
-        Convert a `MessageType` object to a string.
-        """
-        return self.name.lower()
-
-
-class Message(object):
-    """
-    Message class
-    """
-
-    @classmethod
-    def from_string(cls: Message, message_string: str) -> Message:
-        """
-        Create a `Message` object from a message string.
-        """
-        message_type_string, timestamp_string, *payload = message_string.split(",")
-        message_type: MessageType = MessageType.from_string(message_type_string)
-        timestamp: datetime = datetime.strptime(timestamp_string, TIMESTAMP_FORMAT)
-        return cls(message_type, timestamp, *payload)
-
-    @classmethod
-    def from_bytes(cls: Message, message_bytes: bytes) -> Message:
-        """
-        Create a `Message` object from a binary string.
-        """
-        message_string: str = message_bytes.decode("utf-8")
-        return cls.from_string(message_string)
-
-    def __init__(self: Message, message_type: MessageType, timestamp: datetime, *payload: str) -> None:
-        """
-        Initialize a `Message` object with a message type, a timestamp, and a payload.
-        """
-        self.message_type: MessageType = message_type
-        self.timestamp: datetime = timestamp
-        self.payload: List[str] = list(payload)
-
-    def __str__(self: Message) -> str:
-        """
-        Format a `Message` object as a string.
-        """
-        tokens: List[str] = [
-            str(self.message_type),
-            self.timestamp.strftime(TIMESTAMP_FORMAT),
-            *self.payload
-        ]
-        return ",".join(tokens)
-
-    def __bytes__(self: Message) -> bytes:
-        """
-        Convert a `Message` object as a binary string`.
-        """
-        return str(self).encode("utf-8")
+"""
+Message module
+"""
+from __future__ import annotations
+from datetime import datetime
+from enum import auto, IntEnum
+from typing import Any, List, Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from src.schema import Schema
+
+
+TIMESTAMP_FORMAT: str = "%Y%m%d%H%M%S%f"
+TIMESTAMP_LENGTH: int = 20
+TRACE_SEPARATOR: str = ";"
+
+
+def _parse_timestamp(timestamp_string: str) -> datetime:
+    """
+    Convert a timestamp string to a `datetime`. Timestamps of the full length, as they are always formatted, are
+    sliced into their fields directly, which is several times faster than `datetime.strptime`; anything else falls back
+    on it. Raise `ValueError` if the timestamp is invalid.
+    """
+    if len(timestamp_string) == TIMESTAMP_LENGTH and timestamp_string.isascii() and timestamp_string.isdigit():
+        return datetime(
+            int(timestamp_string[0:4]),
+            int(timestamp_string[4:6]),
+            int(timestamp_string[6:8]),
+            int(timestamp_string[8:10]),
+            int(timestamp_string[10:12]),
+            int(timestamp_string[12:14]),
+            int(timestamp_string[14:20])
+        )
+    return datetime.strptime(timestamp_string, TIMESTAMP_FORMAT)
+
+
+class MessageType(IntEnum):
+    """
+    Message type enum
+    """
+
+    SUBSCRIBE = auto()
+    SUBMIT = auto()
+    PUBLISH = auto()
+    HEARTBEAT = auto()
+    UNSUBSCRIBE = auto()
+    PROFILE = auto()
+    STATS = auto()
+    SHARDS = auto()
+
+    @classmethod
+    def from_string(cls: MessageType, message_type_string: str) -> MessageType:
+        """
+        Convert a string to a `MessageType` object.
+        """
+        return {
+            "subscribe": cls.SUBSCRIBE,
+            "submit": cls.SUBMIT,
+            "publish": cls.PUBLISH,
+            "heartbeat": cls.HEARTBEAT,
+            "unsubscribe": cls.UNSUBSCRIBE,
+            "profile": cls.PROFILE,
+            "stats": cls.STATS,
+            "shards": cls.SHARDS
+        }[message_type_string.lower()]
+
+    def __str__(self: MessageType) -> str:
+        """
+        Convert a `MessageType` object to a string.
+        """
+        return self.name.lower()
+
+
+class Trace(object):
+    """
+    Trace class
+
+    The times a published message passed each hop on its way from producer to consumer: when it was submitted by the
+    producer, when the publisher received it (ingress), and when the publisher sent it on (egress). A trace that has
+    not yet been sent on, such as that of a message held back for conflation, is written out with its ingress time as
+    its egress time, which is overwritten when it is sent.
+    """
+
+    __slots__ = ("submitted", "ingress", "egress")
+
+    @classmethod
+    def from_strings(cls: Trace, *timestamp_strings: str) -> Trace:
+        """
+        Create a `Trace` object from its timestamp strings. Raise `ValueError` if there are not three.
+        """
+        if len(timestamp_strings) != 3:
+            raise ValueError(f"Invalid trace: {TRACE_SEPARATOR.join(timestamp_strings)}")
+        return cls(*(_parse_timestamp(t) for t in timestamp_strings))
+
+    def __init__(
+        self: Trace,
+        submitted: datetime,
+        ingress: datetime,
+        egress: Optional[datetime] = None
+    ) -> None:
+        """
+        Initialize a `Trace` object with the submit, publisher ingress, and publisher egress times.
+        """
+        self.submitted: datetime = submitted
+        self.ingress: datetime = ingress
+        self.egress: Optional[datetime] = egress
+
+    def __str__(self: Trace) -> str:
+        """
+        Format a `Trace` object as `;`-separated timestamps.
+        """
+        return TRACE_SEPARATOR.join(t.strftime(TIMESTAMP_FORMAT) for t in self.timestamps())
+
+    def timestamps(self: Trace) -> List[datetime]:
+        """
+        Get the submit, publisher ingress, and publisher egress times, with the ingress time in place of an egress time
+        that has not been stamped yet.
+        """
+        return [self.submitted, self.ingress, self.egress if self.egress is not None else self.ingress]
+
+
+class Message(object):
+    """
+    Message class
+
+    Messages are created for every datagram, so their attributes are slots rather than an instance dictionary.
+    """
+
+    __slots__ = ("message_type", "timestamp", "payload", "trace", "schema", "records")
+
+    @classmethod
+    def from_string(cls: Message, message_string: str, pool: Optional[MessagePool] = None) -> Message:
+        """
+        Create a `Message` object from a message string, reusing one from a pool if given. The timestamp may be
+        followed by `;`-separated trace timestamps.
+        """
+        message_type_string, timestamp_string, *payload = message_string.split(",")
+        message_type: MessageType = MessageType.from_string(message_type_string)
+        trace: Optional[Trace] = None
+        if TRACE_SEPARATOR in timestamp_string:
+            timestamp_string, *trace_strings = timestamp_string.split(TRACE_SEPARATOR)
+            trace = Trace.from_strings(*trace_strings)
+        timestamp: datetime = _parse_timestamp(timestamp_string)
+        if pool is not None:
+            return pool.acquire(message_type, timestamp, *payload, trace=trace)
+        return cls(message_type, timestamp, *payload, trace=trace)
+
+    @classmethod
+    def from_bytes(cls: Message, message_bytes: bytes, pool: Optional[MessagePool] = None) -> Message:
+        """
+        Create a `Message` object from a binary string, reusing one from a pool if given.
+        """
+        message_string: str = message_bytes.decode("utf-8")
+        return cls.from_string(message_string, pool)
+
+    def __init__(
+        self: Message,
+        message_type: MessageType,
+        timestamp: datetime,
+        *payload: Any,
+        trace: Optional[Trace] = None,
+        schema: Optional[Schema] = None,
+        records: Optional[int] = None
+    ) -> None:
+        """
+        Initialize a `Message` object with a message type, a timestamp, a payload, an optional trace, an optional
+        schema, and, for a columnar batch, its number of records.
+
+        The payload of a text message is a list of strings. The payload of a message with a schema is its publication
+        followed by data fields of the schema's types, or for a batch by a column per field, and the message is
+        converted to binary by the schema.
+        """
+        self.message_type: MessageType = message_type
+        self.timestamp: datetime = timestamp
+        self.payload: List[Any] = list(payload)
+        self.trace: Optional[Trace] = trace
+        self.schema: Optional[Schema] = schema
+        self.records: Optional[int] = records
+
+    def __str__(self: Message) -> str:
+        """
+        Format a `Message` object as a string. Batches, which are only sent in binary, are summarized by their
+        publication and record count.
+        """
+        timestamp_string: str = self.timestamp.strftime(TIMESTAMP_FORMAT)
+        if self.trace is not None:
+            timestamp_string = f"{timestamp_string}{TRACE_SEPARATOR}{self.trace}"
+        payload: List[Any] = self.payload if self.records is None else [self.payload[0], f"<{self.records} records>"]
+        tokens: List[str] = [
+            str(self.message_type),
+            timestamp_string,
+            *map(str, payload)
+        ]
+        return ",".join(tokens)
+
+    def __bytes__(self: Message) -> bytes:
+        """
+        Convert a `Message` object as a binary string`. Messages with a schema are converted by it.
+        """
+        if self.schema is not None:
+            return self.schema.encode(self)
+        return str(self).encode("utf-8")
+
+    def copy(self: Message) -> Message:
+        """
+        Create a copy of a `Message` object with its own payload list.
+        """
+        return Message(
+            self.message_type,
+            self.timestamp,
+            *self.payload,
+            trace=self.trace,
+            schema=self.schema,
+            records=self.records
+        )
+
+
+class MessagePool(object):
+    """
+    Message pool class
+
+    A free list of `Message` objects for the receive loop, so that decoding a datagram reuses a message, and its payload
+    list, released once the previous one was processed, instead of creating new ones. A released message must no longer
+    be referred to; anything that keeps a received message beyond its processing must keep a copy instead.
+    """
+
+    DEFAULT_CAPACITY: int = 64
+
+    def __init__(self: MessagePool, capacity: int = DEFAULT_CAPACITY) -> None:
+        """
+        Initialize an empty `MessagePool` object that holds at most a number of released messages.
+        """
+        self.capacity: int = capacity
+        self.created_count: int = 0
+        self._free: List[Message] = []
+
+    def acquire(
+        self: MessagePool,
+        message_type: MessageType,
+        timestamp: datetime,
+        *payload: Any,
+        trace: Optional[Trace] = None,
+        schema: Optional[Schema] = None,
+        records: Optional[int] = None
+    ) -> Message:
+        """
+        Get a message initialized as by the `Message` constructor, reusing a released message if there is one.
+        """
+        if not self._free:
+            self.created_count += 1
+            return Message(message_type, timestamp, *payload, trace=trace, schema=schema, records=records)
+        message: Message = self._free.pop()
+        message.message_type = message_type
+        message.timestamp = timestamp
+        message.payload[:] = payload
+        message.trace = trace
+        message.schema = schema
+        message.records = records
+        return message
+
+    def release(self: MessagePool, message: Message) -> None:
+        """
+        Return a message to the pool once it has been processed, unless the pool is full.
+        """
+        if len(self._free) < self.capacity:
+            self._free.append(message)
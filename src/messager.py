@@ -1,91 +1,408 @@
-"""
-Messager module
-"""
-from __future__ import annotations
-from datetime import datetime
-from pathlib import Path
-import socket
-import time
-from typing import Callable, Dict, Optional, Tuple
-
-from src.configuration import Configuration
-from src.ipendpoint import IPEndpoint
-from src.message import Message
-
-
-MessageProcessor = Callable[[Message, IPEndpoint], Optional[Message]]
-
-
-class Messager(object):
-    """
-    Messager class
-
-    Intended to act as a base class for publisher and subscriber classes.
-    """
-
-    def __init__(self: Messager, configuration: Configuration) -> None:
-        """
-        Initialize a Messager object
-        """
-        self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        self._socket.settimeout(configuration.socket_timeout_s)
-        self._buffer_size_b: int = configuration.buffer_size_b
-        self._messages_sent_count: int = 0
-        self._messages_received_count: int = 0
-        self._message_dispatcher: Dict[str, MessageProcessor] = {}
-
-    def run(self: Messager) -> None:
-        """
-        Run the Messager
-        """
-        print(f"Running {__class__.__name__}...")
-        try:
-            while True:
-                self._execute()
-        except Exception as e:
-            self._socket.close()
-            raise e
-        print(f"Terminating  {__class__.__name__}")
-
-    def _execute(self: Messager) -> None:
-        """
-        Abstract method. Subclasses should implement the main code to be executed in the `run` method here.
-        """
-        raise NotImplementedError(f"Attempted to call abstract method {__class__.__name__}._execute")
-
-    def _send_message(self: Publisher, message: Message, endpoint: IPEndpoint) -> None:
-        """
-        Send a message
-        """
-        print(f"Sending message to {endpoint} [#{self._messages_sent_count:5d}]: {message}")
-        self._socket.sendto(bytes(message), tuple(endpoint))
-        self._messages_sent_count += 1
-
-    def _receive_message(self: Messager) -> Tuple[Message, IPEndpoint]:
-        """
-        Receive a message
-        """
-        while True:
-            try:
-                binary_message, address = self._socket.recvfrom(self._buffer_size_b)
-                break
-            except (socket.timeout, ConnectionResetError):
-                continue
-        message = Message.from_bytes(binary_message)
-        remote_endpoint = IPEndpoint(address[0], address[1])
-        self._messages_received_count += 1
-        print(f"Received message from {remote_endpoint} [#{self._messages_received_count:5d}]: {message}")
-        return message, remote_endpoint
-
-    def _process_message(self: Messager, message: Message, endpoint: IPEndpoint) -> Optional[Message]:
-        """
-        Process a message
-        """
-        print(f"Processing message from {endpoint}: {message}...")
-        start_time: float = time.perf_counter()
-        response: Optional[str] = self._message_dispatcher.get(
-            message.message_type,
-            lambda *args: print(f"Unhandled message type: {message.message_type}")
-        )(message, endpoint)
-        print(f"Processed message in {time.perf_counter() - start_time:.3f} seconds: {message}")
-        return response
+"""
+Messager module
+"""
+from __future__ import annotations
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+import selectors
+import socket
+import struct
+import time
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from src.capture import CaptureWriter
+from src.clock import Clock
+from src.configuration import Configuration
+from src.endpoint import Endpoint
+from src.ipendpoint import StreamEndpoint
+from src.message import Message, MessagePool, MessageType
+from src.profiling import STAGE_DECODE, STAGE_DISPATCH, STAGE_RECEIVE, StageHook
+from src.schema import BINARY_MARKER, SchemaRegistry
+from src.transport import Transport
+from src.validation import MALFORMED, QUARANTINED, DatagramValidator, Quarantine
+
+
+MessageProcessor = Callable[[Message, Endpoint], Optional[Message]]
+Middleware = Callable[[Message, Endpoint, MessageProcessor], Optional[Message]]
+TimerCallback = Callable[[], None]
+
+
+def chain(middleware: Middleware, processor: MessageProcessor) -> MessageProcessor:
+    """
+    Compose a middleware with the processor it wraps into a single processor.
+    """
+    return lambda message, endpoint: middleware(message, endpoint, processor)
+
+
+class Messager(object):
+    """
+    Messager class
+
+    Intended to act as a base class for publisher and subscriber classes.
+    """
+
+    def __init__(
+        self: Messager,
+        configuration: Configuration,
+        endpoint: Endpoint,
+        transport: Optional[Transport] = None,
+        clock: Optional[Clock] = None
+    ) -> None:
+        """
+        Initialize a Messager object. The endpoint is the one the Messager communicates through (its own for a
+        publisher, the publisher's for a subscriber) and selects the address family of the transport. A transport and a
+        clock may be given in place of the configured transport and the system clocks, e.g. a `LoopbackTransport` and a
+        `VirtualClock` to drive the Messager deterministically in tests and benchmarks.
+        """
+        self.clock: Clock = clock if clock is not None else Clock()
+        self._selector = selectors.DefaultSelector()
+        self._transports: List[Transport] = []
+        self._in_memory_transports: List[Transport] = []
+        self._received: Deque[Tuple[bytes, Endpoint]] = deque()
+        self._socket_timeout_s: float = configuration.socket_timeout_s
+        self._transport: Transport = (
+            transport if transport is not None else Transport.from_configuration(configuration, endpoint)
+        )
+        self._add_transport(self._transport)
+        self._reply_transports: Optional[Dict[Endpoint, Transport]] = None
+        self._buffer_size_b: int = configuration.buffer_size_b
+        self.schemas: SchemaRegistry = configuration.schemas
+        self._validator = DatagramValidator(self.schemas, self._buffer_size_b)
+        self._quarantine: Optional[Quarantine] = None
+        self._message_pool = MessagePool()
+        self._messages_sent_count: int = 0
+        self._messages_received_count: int = 0
+        self._bytes_sent_count: int = 0
+        self._bytes_received_count: int = 0
+        self._drop_counts: Dict[str, int] = {}
+        self._message_dispatcher: Dict[MessageType, MessageProcessor] = {}
+        self._middleware: Dict[MessageType, List[Middleware]] = {}
+        self._dispatch_table: List[MessageProcessor] = [self._process_unhandled] * (max(MessageType) + 1)
+        self._timers: List[List] = []
+        self._hooks: List[StageHook] = []
+        self._capture: Optional[CaptureWriter] = None
+        if configuration.capture_path is not None:
+            self.start_capture(configuration.capture_path)
+
+    def run(self: Messager) -> None:
+        """
+        Run the Messager
+        """
+        print(f"Running {__class__.__name__}...")
+        try:
+            while True:
+                self._execute()
+                self._flush_transports()
+        except Exception as e:
+            self.close()
+            raise e
+        print(f"Terminating  {__class__.__name__}")
+
+    def close(self: Messager) -> None:
+        """
+        Close every transport, and stop any capture. Subclasses that receive or send on threads of their own should
+        stop them before calling this
+        """
+        for transport in self._transports:
+            transport.close()
+        self.stop_capture()
+
+    def start_capture(self: Messager, path: Path) -> None:
+        """
+        Start recording every datagram received, with when it was received and where from, to a capture file, replacing
+        any capture in progress
+        """
+        self.stop_capture()
+        self._capture = CaptureWriter(path, self.clock)
+        print(f"Capturing received datagrams to {path}")
+
+    def stop_capture(self: Messager) -> None:
+        """
+        Stop any capture in progress, and close its capture file
+        """
+        capture: Optional[CaptureWriter] = self._capture
+        if capture is not None:
+            self._capture = None
+            capture.close()
+            print(f"Captured {capture.datagram_count} datagrams to {capture.path}")
+
+    def _execute(self: Messager) -> None:
+        """
+        Abstract method. Subclasses should implement the main code to be executed in the `run` method here.
+        """
+        raise NotImplementedError(f"Attempted to call abstract method {__class__.__name__}._execute")
+
+    def _send_message(self: Publisher, message: Message, endpoint: Endpoint) -> None:
+        """
+        Send a message
+        """
+        print(f"Sending message to {endpoint} [#{self._messages_sent_count:5d}]: {message}")
+        binary_message: bytes = bytes(message)
+        if self._send_binary_message(binary_message, endpoint):
+            self._count_sent(len(binary_message))
+
+    def _send_binary_message(self: Messager, binary_message: bytes, endpoint: Endpoint) -> bool:
+        """
+        Send a binary message through the transport for its endpoint, and return whether it was sent. Raise `OSError`
+        if the transport fails to send it
+        """
+        self._transport_for(endpoint).send(binary_message, endpoint)
+        return True
+
+    def _receive_message(self: Messager) -> Tuple[Message, Endpoint]:
+        """
+        Receive a message, dropping any that are rejected
+        """
+        while True:
+            binary_message, remote_endpoint = self._run_stage(STAGE_RECEIVE, self._receive_binary_message)
+            message = self._run_stage(STAGE_DECODE, self._decode_received, binary_message, remote_endpoint)
+            if message is not None:
+                break
+        self._messages_received_count += 1
+        self._bytes_received_count += len(binary_message)
+        print(f"Received message from {remote_endpoint} [#{self._messages_received_count:5d}]: {message}")
+        return message, remote_endpoint
+
+    def _decode_received(self: Messager, binary_message: bytes, endpoint: Endpoint) -> Optional[Message]:
+        """
+        Decode a binary message received from an endpoint, unless the endpoint is in quarantine or the message is
+        rejected by the validator or fails to decode, in which case it is dropped, counted by reason, and counted
+        against the endpoint. Callers should release the message back to the pool once it has been processed
+        """
+        return self._decode_received_with(self._decode_message, binary_message, endpoint)
+
+    def _decode_received_with(
+        self: Messager,
+        decode: Callable[[bytes], Any],
+        binary_message: bytes,
+        endpoint: Endpoint
+    ) -> Any:
+        """
+        Decode a binary message received from an endpoint with a decoding function, as `_decode_received` does, and
+        return what it returns, or `None` if the message is dropped
+        """
+        if self._quarantine is not None and self._quarantine.is_quarantined(endpoint, self.clock.monotonic()):
+            self._count_drop(QUARANTINED)
+            return None
+        reason: Optional[str] = self._validator.check(binary_message, type(endpoint) is not StreamEndpoint)
+        if reason is None:
+            try:
+                return decode(binary_message)
+            except (ValueError, KeyError, struct.error, OverflowError) as e:
+                print(f"Failed to decode message from {endpoint}: {e}")
+                reason = MALFORMED
+        self._reject(reason, endpoint)
+        return None
+
+    def _reject(self: Messager, reason: str, endpoint: Endpoint) -> None:
+        """
+        Drop a message received from an endpoint for a reason, and put the endpoint in quarantine if it has sent too
+        many rejected messages
+        """
+        print(f"Rejected message from {endpoint}: {reason}")
+        self._count_drop(reason)
+        if self._quarantine is not None and self._quarantine.strike(endpoint, self.clock.monotonic()):
+            print(f"Quarantined {endpoint} for {self._quarantine.duration_s} s")
+
+    def _decode_message(self: Messager, binary_message: bytes) -> Message:
+        """
+        Decode a binary message, with the schema registry if it is of a typed publication, into a message from the
+        pool. Callers should release the message back to the pool once it has been processed
+        """
+        if binary_message[:1] == BINARY_MARKER:
+            return self.schemas.decode(binary_message, self._message_pool)
+        return Message.from_bytes(binary_message, self._message_pool)
+
+    def _receive_binary_message(self: Messager) -> Tuple[bytes, Endpoint]:
+        """
+        Receive a binary message, running any timers that fall due while waiting
+        """
+        while not self._received:
+            self._received.extend(self._poll_transports(self._select_timeout_s()))
+            self._run_timers()
+        return self._received.popleft()
+
+    def _poll_transports(self: Messager, timeout_s: float) -> List[Tuple[bytes, Endpoint]]:
+        """
+        Flush the transports, then wait up to the timeout (in seconds) for any of them to receive binary messages, and
+        record where each arrived
+        """
+        self._flush_transports()
+        received: List[Tuple[bytes, Endpoint]] = []
+        for transport, polled in self._receive_polled(timeout_s):
+            self._record_received(transport, polled)
+            received.extend(polled)
+        return received
+
+    def _receive_polled(self: Messager, timeout_s: float) -> List[Tuple[Transport, List[Tuple[bytes, Endpoint]]]]:
+        """
+        Wait up to the timeout (in seconds) for any of the transports to receive binary messages, and return them
+        grouped by the transport they arrived on. Any messages waiting in in-memory transports are returned without
+        waiting. Nothing else of the Messager's is touched, so this may be called from a thread of its own
+        """
+        received: List[Tuple[Transport, List[Tuple[bytes, Endpoint]]]] = []
+        for transport in self._in_memory_transports:
+            waiting: List[Tuple[bytes, Endpoint]] = transport.receive_waiting()
+            if waiting:
+                received.append((transport, waiting))
+        if not received:
+            for key, events in self._selector.select(timeout_s):
+                try:
+                    polled: List[Tuple[bytes, Endpoint]] = key.data.poll(key.fileobj, events)
+                except (socket.timeout, ConnectionResetError):
+                    continue
+                if polled:
+                    received.append((key.data, polled))
+        return received
+
+    def _record_received(self: Messager, transport: Transport, received: List[Tuple[bytes, Endpoint]]) -> None:
+        """
+        Record binary messages received through a transport: if replies are routed, the transport is remembered as the
+        one to reply to their endpoints through, and if capturing, they are written to the capture file
+        """
+        if self._reply_transports is not None:
+            for _, endpoint in received:
+                self._reply_transports[endpoint] = transport
+        capture: Optional[CaptureWriter] = self._capture
+        if capture is not None:
+            capture.write(received)
+
+    def _add_transport(self: Messager, transport: Transport) -> None:
+        """
+        Add a transport to the set the Messager sends and receives through
+        """
+        transport.register(self._selector)
+        self._transports.append(transport)
+        if transport.IN_MEMORY:
+            self._in_memory_transports.append(transport)
+
+    def _transport_for(self: Messager, endpoint: Endpoint) -> Transport:
+        """
+        Get the transport that sends to an endpoint: the one a message from the endpoint last arrived on if replies are
+        routed, otherwise the first that handles it, falling back on the main transport
+        """
+        if self._reply_transports is not None:
+            reply_transport: Optional[Transport] = self._reply_transports.get(endpoint)
+            if reply_transport is not None:
+                return reply_transport
+        for transport in self._transports:
+            if transport.handles(endpoint):
+                return transport
+        return self._transport
+
+    def _flush_transports(self: Messager) -> None:
+        """
+        Write out messages buffered by any of the transports
+        """
+        for transport in self._transports:
+            transport.flush()
+
+    def add_middleware(self: Messager, middleware: Middleware, *message_types: MessageType) -> None:
+        """
+        Add a middleware around the processing of messages of the given types, or of every type if none are given.
+
+        A middleware is called with each message, the endpoint it came from, and the processor it wraps. It passes the
+        message on by calling the processor, and may inspect, alter, or drop it, or replace the response. Middleware
+        added first is outermost. The chain of each message type is composed into a single processor as middleware is
+        added, so dispatching a message costs one indexed call however much middleware there is
+        """
+        for message_type in message_types or list(MessageType):
+            self._middleware.setdefault(message_type, []).append(middleware)
+            self._compile_dispatch(message_type)
+
+    def _add_handlers(self: Messager, handlers: Dict[MessageType, MessageProcessor]) -> None:
+        """
+        Set the processors of message types, replacing any set before
+        """
+        for message_type, processor in handlers.items():
+            self._message_dispatcher[message_type] = processor
+            self._compile_dispatch(message_type)
+
+    def _compile_dispatch(self: Messager, message_type: MessageType) -> None:
+        """
+        Compose the middleware of a message type with its processor, or with the unhandled message processor if it has
+        none, into the dispatch table entry of the message type
+        """
+        processor: MessageProcessor = self._message_dispatcher.get(message_type, self._process_unhandled)
+        for middleware in reversed(self._middleware.get(message_type, [])):
+            processor = chain(middleware, processor)
+        self._dispatch_table[message_type] = processor
+
+    def _add_timer(self: Messager, interval_s: float, callback: TimerCallback) -> None:
+        """
+        Call a function every interval (in seconds) while the Messager is waiting for or receiving messages
+        """
+        self._timers.append([self.clock.monotonic() + interval_s, interval_s, callback])
+
+    def _run_timers(self: Messager) -> None:
+        """
+        Call the functions of any timers that are due
+        """
+        now: float = self.clock.monotonic()
+        for timer in self._timers:
+            if timer[0] <= now:
+                timer[0] = now + timer[1]
+                timer[2]()
+
+    def _select_timeout_s(self: Messager) -> float:
+        """
+        Get how long to wait for a message before the next timer is due, at most the socket timeout
+        """
+        if not self._timers:
+            return self._socket_timeout_s
+        return max(0.0, min(self._socket_timeout_s, min(t[0] for t in self._timers) - self.clock.monotonic()))
+
+    def _add_hook(self: Messager, hook: StageHook) -> None:
+        """
+        Add a hook to be called around each hot-path stage
+        """
+        self._hooks.append(hook)
+
+    def _run_stage(self: Messager, stage: str, function: Callable[..., Any], *args: Any) -> Any:
+        """
+        Call a function as a hot-path stage, surrounded by the calls of any hooks
+        """
+        if not self._hooks:
+            return function(*args)
+        for hook in self._hooks:
+            hook.enter(stage)
+        start_time: float = time.perf_counter()
+        try:
+            return function(*args)
+        finally:
+            elapsed_s: float = time.perf_counter() - start_time
+            for hook in self._hooks:
+                hook.exit(stage, elapsed_s)
+
+    def _process_message(self: Messager, message: Message, endpoint: Endpoint) -> Optional[Message]:
+        """
+        Process a message
+        """
+        print(f"Processing message from {endpoint}: {message}...")
+        start_time: float = time.perf_counter()
+        response: Optional[str] = self._run_stage(
+            STAGE_DISPATCH, self._dispatch_table[message.message_type], message, endpoint
+        )
+        print(f"Processed message in {time.perf_counter() - start_time:.3f} seconds: {message}")
+        return response
+
+    def _process_unhandled(self: Messager, message: Message, endpoint: Endpoint) -> None:
+        """
+        Drop a message of a type the Messager does not handle
+        """
+        print(f"Unhandled message type: {message.message_type}")
+        self._count_drop("unhandled")
+
+    def _count_sent(self: Messager, size_b: int) -> None:
+        """
+        Count a message of a size (in bytes) sent
+        """
+        self._messages_sent_count += 1
+        self._bytes_sent_count += size_b
+
+    def _count_drop(self: Messager, reason: str) -> None:
+        """
+        Count a message dropped for a reason
+        """
+        self._drop_counts[reason] = self._drop_counts.get(reason, 0) + 1
@@ -0,0 +1,187 @@
+"""
+Pipeline module
+"""
+from __future__ import annotations
+import queue
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src.endpoint import Endpoint
+from src.transport import Transport
+
+
+ReceiveFunction = Callable[[], List[Tuple[Transport, List[Tuple[bytes, Endpoint]]]]]
+
+
+class StageQueue(object):
+    """
+    Stage queue class
+
+    A bounded queue between two pipeline stages. A producer that finds the queue full blocks until there is room, so a
+    slow stage pushes back on the stages before it instead of letting the queue grow without limit. Counters record how
+    deep the queue gets and how often it pushes back.
+    """
+
+    STOP_POLL_INTERVAL_S: float = 0.1
+
+    def __init__(self: StageQueue, name: str, max_depth: int) -> None:
+        """
+        Initialize a `StageQueue` object with a name and a maximum depth.
+        """
+        self.name: str = name
+        self.max_depth: int = max_depth
+        self._queue: queue.Queue = queue.Queue(max_depth)
+        self.put_count: int = 0
+        self.blocked_count: int = 0
+        self.peak_depth: int = 0
+
+    def __len__(self: StageQueue) -> int:
+        """
+        Get the current depth of the queue.
+        """
+        return self._queue.qsize()
+
+    def put(self: StageQueue, item: Any, running: Optional[threading.Event] = None) -> bool:
+        """
+        Put an item on the queue, blocking while it is full, and return whether it was put. If an event is given, stop
+        blocking and drop the item once the event is cleared, so that a stage being stopped is not left waiting on a
+        stage that has already stopped.
+        """
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            self.blocked_count += 1
+            while True:
+                try:
+                    self._queue.put(item, timeout=None if running is None else self.STOP_POLL_INTERVAL_S)
+                    break
+                except queue.Full:
+                    if not running.is_set():
+                        return False
+        self.put_count += 1
+        depth: int = self._queue.qsize()
+        if depth > self.peak_depth:
+            self.peak_depth = depth
+        return True
+
+    def get(self: StageQueue, timeout_s: Optional[float] = None) -> Any:
+        """
+        Get an item from the queue, waiting up to the timeout (in seconds). Raise `queue.Empty` if there is none.
+        """
+        return self._queue.get(timeout=timeout_s)
+
+    def metrics(self: StageQueue) -> Dict[str, int]:
+        """
+        Get the depth and backpressure counters of the queue.
+        """
+        return {
+            "depth": len(self),
+            "peak-depth": self.peak_depth,
+            "max-depth": self.max_depth,
+            "put": self.put_count,
+            "blocked": self.blocked_count
+        }
+
+
+class Pipeline(object):
+    """
+    Pipeline class
+
+    Splits a Messager's work into stages on separate threads:
+
+    1. A receiver thread that only drains the transports into the ingress queue, along with the transport each message
+       arrived on, and touches nothing else, so that anything to be recorded about received messages is recorded by
+       the dispatch stage.
+    2. The dispatch stage, run by the thread that calls `get`, which decodes and processes messages.
+    3. A pool of sender threads, each with its own queue, that write outgoing messages to their transports. Each
+       endpoint is always sent to by the same sender thread, so messages to an endpoint stay in the order they were
+       dispatched, and with a single dispatch thread that preserves the order of each publication. Socket sends
+       release the GIL, so the sender threads overlap a large fan-out with receiving and dispatching.
+    """
+
+    def __init__(
+        self: Pipeline,
+        receive: ReceiveFunction,
+        sender_count: int,
+        max_queue_depth: int
+    ) -> None:
+        """
+        Initialize a `Pipeline` object with the function the receiver thread calls to receive binary messages, the
+        number of sender threads, and the maximum depth of each queue.
+        """
+        self._receive: ReceiveFunction = receive
+        self._running = threading.Event()
+        self.ingress = StageQueue("ingress", max_queue_depth)
+        self.egress: List[StageQueue] = [StageQueue(f"egress-{i}", max_queue_depth) for i in range(sender_count)]
+        self._threads: List[threading.Thread] = [threading.Thread(target=self._run_receiver, daemon=True)] + [
+            threading.Thread(target=self._run_sender, args=(egress,), daemon=True) for egress in self.egress
+        ]
+        self.send_error_count: int = 0
+
+    def start(self: Pipeline) -> None:
+        """
+        Start the receiver and sender threads.
+        """
+        self._running.set()
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self: Pipeline) -> None:
+        """
+        Stop the receiver and sender threads, letting the sender threads finish what is queued. Messages received but
+        not yet dispatched are dropped. Stopping a pipeline that is not running does nothing.
+        """
+        if not self._running.is_set():
+            return
+        self._running.clear()
+        for egress in self.egress:
+            egress.put(None)
+        for thread in self._threads:
+            thread.join()
+
+    def get(self: Pipeline, timeout_s: float) -> Optional[Tuple[bytes, Endpoint, Transport]]:
+        """
+        Get the next received binary message, its endpoint, and the transport it arrived on, or `None` if none arrives
+        within the timeout (in seconds).
+        """
+        try:
+            return self.ingress.get(timeout_s)
+        except queue.Empty:
+            return None
+
+    def send(self: Pipeline, data: bytes, endpoint: Endpoint, transport: Transport) -> None:
+        """
+        Queue a binary message for the sender thread that owns the endpoint.
+        """
+        self.egress[hash(endpoint) % len(self.egress)].put((data, endpoint, transport))
+
+    def metrics(self: Pipeline) -> Dict[str, Dict[str, int]]:
+        """
+        Get the depth and backpressure counters of every queue.
+        """
+        return {stage_queue.name: stage_queue.metrics() for stage_queue in [self.ingress, *self.egress]}
+
+    def _run_receiver(self: Pipeline) -> None:
+        """
+        Receive binary messages into the ingress queue until stopped.
+        """
+        while self._running.is_set():
+            for transport, received in self._receive():
+                for data, endpoint in received:
+                    if not self.ingress.put((data, endpoint, transport), self._running):
+                        return
+
+    def _run_sender(self: Pipeline, egress: StageQueue) -> None:
+        """
+        Send binary messages from an egress queue until stopped.
+        """
+        while True:
+            item = egress.get()
+            if item is None:
+                return
+            data, endpoint, transport = item
+            try:
+                transport.send(data, endpoint)
+            except OSError as e:
+                self.send_error_count += 1
+                print(f"Failed to send message to {endpoint}: {e}")
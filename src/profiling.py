@@ -0,0 +1,211 @@
+"""
+Profiling module
+"""
+from __future__ import annotations
+import cProfile
+from datetime import datetime
+from pathlib import Path
+import sys
+import threading
+import time
+from typing import Dict, List, Optional
+
+
+STAGE_RECEIVE: str = "receive"
+STAGE_DECODE: str = "decode"
+STAGE_DISPATCH: str = "dispatch"
+STAGE_FAN_OUT: str = "fan-out"
+STAGE_SWEEP: str = "sweep"
+
+MODE_CPROFILE: str = "cprofile"
+MODE_SAMPLE: str = "sample"
+MODES: List[str] = [MODE_CPROFILE, MODE_SAMPLE]
+
+
+class StageHook(object):
+    """
+    Stage hook class
+
+    Base class for hooks called around each hot-path stage of a Messager (receive, decode, dispatch, fan-out, and
+    sweep). Stages may be nested; fan-out happens within dispatch, for example. The default implementation does
+    nothing.
+    """
+
+    def enter(self: StageHook, stage: str) -> None:
+        """
+        Called when a stage begins.
+        """
+        pass
+
+    def exit(self: StageHook, stage: str, elapsed_s: float) -> None:
+        """
+        Called when a stage ends, with the time (in seconds) spent in it.
+        """
+        pass
+
+
+class StageTimer(StageHook):
+    """
+    Stage timer class
+
+    Accumulates the number of times each stage ran and the total and longest time spent in it.
+    """
+
+    def __init__(self: StageTimer) -> None:
+        """
+        Initialize a `StageTimer` object with no timings.
+        """
+        self.counts: Dict[str, int] = {}
+        self.totals_s: Dict[str, float] = {}
+        self.maxima_s: Dict[str, float] = {}
+
+    def exit(self: StageTimer, stage: str, elapsed_s: float) -> None:
+        """
+        Record the time spent in a stage.
+        """
+        self.counts[stage] = self.counts.get(stage, 0) + 1
+        self.totals_s[stage] = self.totals_s.get(stage, 0.0) + elapsed_s
+        if elapsed_s > self.maxima_s.get(stage, 0.0):
+            self.maxima_s[stage] = elapsed_s
+
+    def summary(self: StageTimer) -> str:
+        """
+        Format the timings as a table, one stage per line.
+        """
+        lines: List[str] = [f"{'stage':<10} {'count':>10} {'total (s)':>12} {'mean (us)':>12} {'max (us)':>12}"]
+        for stage, count in self.counts.items():
+            total_s: float = self.totals_s[stage]
+            lines.append(
+                f"{stage:<10} {count:>10d} {total_s:>12.6f} {1e6 * total_s / count:>12.1f} "
+                f"{1e6 * self.maxima_s[stage]:>12.1f}"
+            )
+        return "\n".join(lines)
+
+
+class Profiler(StageHook):
+    """
+    Profiler class
+
+    Captures a profile of the thread that starts it for a fixed duration, then writes it to a directory, without
+    interrupting the Messager. Two modes are supported:
+
+    - `cprofile`: deterministic profiling with `cProfile`, written in `pstats` format (`.prof`).
+    - `sample`: stack sampling from a background thread, which has far lower overhead. Samples are prefixed with the
+      stage that was running and written in collapsed-stack format (`.folded`), ready for flame graph tools.
+
+    Stage timings over the capture are written alongside the profile (`.stages`). The Messager must call `poll`
+    regularly so that the capture can be finished on the thread it was started on.
+    """
+
+    def __init__(self: Profiler, directory: Path, sample_interval_s: float = 0.001) -> None:
+        """
+        Initialize a `Profiler` object with the directory to write profiles to and the interval (in seconds) between
+        stack samples.
+        """
+        self.directory: Path = directory
+        self.sample_interval_s: float = sample_interval_s
+        self._mode: Optional[str] = None
+        self._path: Optional[Path] = None
+        self._deadline_s: float = 0.0
+        self._profile: Optional[cProfile.Profile] = None
+        self._sampler: Optional[threading.Thread] = None
+        self._samples: Dict[str, int] = {}
+        self._stages: List[str] = []
+        self._stage_timer: Optional[StageTimer] = None
+
+    @property
+    def is_capturing(self: Profiler) -> bool:
+        """
+        Check whether a capture is in progress.
+        """
+        return self._mode is not None
+
+    def start(self: Profiler, duration_s: float, mode: str = MODE_CPROFILE) -> Path:
+        """
+        Start capturing a profile of the calling thread for a duration (in seconds), and return the path it will be
+        written to. Raise `ValueError` if the mode is invalid or a capture is already in progress.
+        """
+        if mode not in MODES:
+            raise ValueError(f"Invalid profiling mode: {mode}")
+        if self.is_capturing:
+            raise ValueError(f"Already capturing a profile to {self._path}")
+        self.directory.mkdir(parents=True, exist_ok=True)
+        suffix: str = ".prof" if mode == MODE_CPROFILE else ".folded"
+        self._path = self.directory / f"profile-{datetime.now().strftime('%Y%m%d%H%M%S%f')}-{mode}{suffix}"
+        self._deadline_s = time.monotonic() + duration_s
+        self._stage_timer = StageTimer()
+        self._mode = mode
+        if mode == MODE_CPROFILE:
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        else:
+            self._samples = {}
+            self._sampler = threading.Thread(
+                target=self._sample,
+                args=(threading.get_ident(),),
+                daemon=True
+            )
+            self._sampler.start()
+        print(f"Started {mode} profile capture for {duration_s} s to {self._path}")
+        return self._path
+
+    def poll(self: Profiler) -> Optional[Path]:
+        """
+        Finish the capture if its duration has elapsed, returning the path of the profile written.
+        """
+        if self.is_capturing and time.monotonic() >= self._deadline_s:
+            return self.stop()
+        return None
+
+    def stop(self: Profiler) -> Optional[Path]:
+        """
+        Finish the capture now, returning the path of the profile written.
+        """
+        if not self.is_capturing:
+            return None
+        mode, path = self._mode, self._path
+        self._mode = None
+        if mode == MODE_CPROFILE:
+            self._profile.disable()
+            self._profile.dump_stats(str(path))
+            self._profile = None
+        else:
+            self._sampler.join()
+            self._sampler = None
+            with path.open(mode="w") as profile_file:
+                for stack, count in sorted(self._samples.items(), key=lambda item: -item[1]):
+                    profile_file.write(f"{stack} {count}\n")
+        path.with_suffix(".stages").write_text(self._stage_timer.summary() + "\n")
+        self._stage_timer = None
+        print(f"Wrote {mode} profile to {path}")
+        return path
+
+    def enter(self: Profiler, stage: str) -> None:
+        """
+        Track the running stage, so that stack samples can be attributed to it.
+        """
+        self._stages.append(stage)
+
+    def exit(self: Profiler, stage: str, elapsed_s: float) -> None:
+        """
+        Stop tracking a stage, and record its timing if capturing.
+        """
+        if self._stages:
+            self._stages.pop()
+        if self._stage_timer is not None:
+            self._stage_timer.exit(stage, elapsed_s)
+
+    def _sample(self: Profiler, thread_id: int) -> None:
+        """
+        Sample the stack of a thread until the capture is finished.
+        """
+        while self._mode is not None:
+            frame = sys._current_frames().get(thread_id)
+            frames: List[str] = []
+            while frame is not None:
+                code = frame.f_code
+                frames.append(f"{code.co_name} ({Path(code.co_filename).name}:{frame.f_lineno})")
+                frame = frame.f_back
+            stack: str = ";".join([self._stages[-1] if self._stages else "idle", *reversed(frames)])
+            self._samples[stack] = self._samples.get(stack, 0) + 1
+            time.sleep(self.sample_interval_s)
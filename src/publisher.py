@@ -1,84 +1,1081 @@
-"""
-Publisher module
-"""
-from __future__ import annotations
-from datetime import datetime
-from typing import Dict, List, Optional, Tuple
-
-from src.configuration import PublisherConfiguration
-from src.ipendpoint import IPEndpoint
-from src.message import MessageType, Message
-from src.messager import MessageProcessor, Messager
-
-
-class Publisher(Messager):
-    """
-    Publisher class
-    """
-
-    def __init__(self: Publisher, configuration: PublisherConfiguration) -> None:
-        """
-        Initialize a Publisher object
-        """
-        super().__init__(configuration)
-        self.endpoint = configuration.endpoint
-        self.subscriptions: Dict[str, List[Tuple[IPEndpoint, datetime]]] = {}
-        self.subscriber_timeout_s: float = configuration.subscriber_timeout_s
-        self._message_dispatcher: Dict[str, MessageProcessor] = {
-            MessageType.SUBSCRIBE: self._process_subscribe,
-            MessageType.SUBMIT: self._process_submit
-        }
-        print("Initialized Publisher")
-        print(f"  Endpoint:    {self.endpoint}")
-        print(f"  Buffer size: {self._buffer_size_b}")
-
-    def run(self: Publisher) -> None:
-        """
-        Run the Publisher
-        """
-        self._socket.bind(tuple(self.endpoint))
-        super().run()
-
-    def _execute(self: Publisher) -> None:
-        """
-        Main Publisher code
-        """
-        print("Waiting for a message...")
-        message, remote_endpoint = self._receive_message()
-        response: Optional[str] = self._process_message(message, remote_endpoint)
-        if response:
-            self._send_message(response, remote_endpoint)
-        self._remove_timed_out_subscribers()
-
-    def _process_subscribe(self: Publisher, subscribe_message: Message, endpoint: IPEndpoint) -> Message:
-        """
-        Process a subscription request
-        """
-        for publication in subscribe_message.payload:
-            print(f"  Added subscription to {publication}")
-            timestamp: datetime = subscribe_message.timestamp
-            self.subscriptions[publication] = [*self.subscriptions.get(publication, list()), (endpoint, timestamp)]
-        subscribe_message.timestamp = datetime.now()
-        return subscribe_message
-
-    def _process_submit(self: Publisher, submit_message: Message, endpoint: IPEndpoint) -> None:
-        """
-        Process a published message
-        """
-        if not submit_message.payload:
-            print(f"Invalid submit message: {submit_message}")
-            return
-        publication: str = submit_message.payload[0]
-        publish_message = Message(MessageType.PUBLISH, datetime.now(), publication, *submit_message.payload[1:])
-        for subscriber_endpoint, _ in self.subscriptions.get(publication, list()):
-            self._send_message(publish_message, subscriber_endpoint)
-
-    def _remove_timed_out_subscribers(self) -> None:
-        """
-        Check for and remove any timed-out subscribers
-        """
-        now = datetime.now()
-        for publication, subscribers in self.subscriptions.items():
-            self.subscriptions[publication] = [
-                s for s in subscribers if (now - s[1]).total_seconds() < self.subscriber_timeout_s
-            ]
+"""
+Publisher module
+"""
+from __future__ import annotations
+import contextlib
+from datetime import datetime
+from pathlib import Path
+import signal
+import threading
+from typing import ContextManager, Dict, List, Optional, Tuple, Union
+
+from src.budget import BUCKET_B, DURABLE_B, MemoryBudget, subscription_size_b
+from src.clock import Clock
+from src.configuration import MAX, MEMORY_POLICY_EVICT, PROFILE_DURATION_S, PublisherConfiguration, SHARDS
+from src.endpoint import Endpoint
+from src.message import MessageType, Message, TIMESTAMP_FORMAT, Trace
+from src.messager import Messager
+from src.pipeline import Pipeline
+from src.profiling import MODE_CPROFILE, MODE_SAMPLE, Profiler, STAGE_FAN_OUT, STAGE_SWEEP
+from src.ratelimit import IngressLimiter
+from src.schema import BINARY_MARKER, Schema
+from src.sharding import ShardCounts, ShardedSubscriptionRegistry, ShardWorkers
+from src.snapshot import ENDPOINT_KINDS, read_snapshot, SnapshotEntry, write_snapshot
+from src.spool import Durable, Spool
+from src.stats import format_stats, paginate, RateMeter, StatValue
+from src.subscription import QueueGroup, Subscription, SubscriptionRegistry, SubscriptionRequest
+from src.transport import Transport
+from src.validation import Quarantine
+
+
+class Publisher(Messager):
+    """
+    Publisher class
+    """
+
+    CONFLATION_TICK_S: float = 0.005
+    MAX_SWEEP_INTERVAL_S: float = 1.0
+    PROFILER_POLL_INTERVAL_S: float = 0.1
+    STATS_SAMPLE_INTERVAL_S: float = 1.0
+    INGRESS_EVICT_INTERVAL_S: float = 10.0
+    QUARANTINE_FORGET_INTERVAL_S: float = 10.0
+    REPLY_ROUTE_PRUNE_INTERVAL_S: float = 10.0
+    MAX_REPLY_ROUTES: int = 65536
+    SPOOL_DRAIN_TICK_S: float = 0.01
+
+    def __init__(
+        self: Publisher,
+        configuration: PublisherConfiguration,
+        transport: Optional[Transport] = None,
+        clock: Optional[Clock] = None
+    ) -> None:
+        """
+        Initialize a Publisher object, optionally with a transport and a clock in place of the configured transport and
+        the system clocks
+        """
+        super().__init__(configuration, configuration.endpoint, transport, clock)
+        self.endpoint = configuration.endpoint
+        self.stream_endpoint = configuration.stream_endpoint
+        self._stream_transport: Optional[Transport] = None
+        if self.stream_endpoint is not None:
+            self._stream_transport = Transport.from_configuration(configuration, self.stream_endpoint)
+            self._add_transport(self._stream_transport)
+        self.listener_endpoints: List[Endpoint] = configuration.listener_endpoints
+        self._listener_transports: List[Transport] = []
+        for listener_endpoint in self.listener_endpoints:
+            listener_transport: Transport = Transport.from_configuration(configuration, listener_endpoint)
+            self._add_transport(listener_transport)
+            self._listener_transports.append(listener_transport)
+        self.subscriptions: Union[SubscriptionRegistry, ShardedSubscriptionRegistry] = SubscriptionRegistry()
+        self._shard_workers: Optional[ShardWorkers] = None
+        if configuration.shards:
+            self.subscriptions = ShardedSubscriptionRegistry(configuration.shards)
+            self._shard_workers = ShardWorkers(
+                self._process_shard_submit, configuration.shards, configuration.pipeline_queue_depth
+            )
+        self._conflated: Dict[Subscription, Message] = {}
+        self.subscriber_timeout_s: float = configuration.subscriber_timeout_s
+        self._pipeline: Optional[Pipeline] = None
+        if configuration.pipeline_sender_threads:
+            self._pipeline = Pipeline(
+                lambda: self._receive_polled(self._socket_timeout_s),
+                configuration.pipeline_sender_threads,
+                configuration.pipeline_queue_depth
+            )
+        self._add_handlers({
+            MessageType.SUBSCRIBE: self._process_subscribe,
+            MessageType.SUBMIT: self._process_submit,
+            MessageType.HEARTBEAT: self._process_heartbeat,
+            MessageType.UNSUBSCRIBE: self._process_unsubscribe,
+            MessageType.PROFILE: self._process_profile,
+            MessageType.STATS: self._process_stats,
+            MessageType.SHARDS: self._process_shards
+        })
+        if self._shard_workers is not None:
+            self._add_handlers({MessageType.SUBMIT: self._route_submit})
+        self._add_timer(self.CONFLATION_TICK_S, self._flush_conflated)
+        if self.listener_endpoints:
+            self._reply_transports = {}
+            self._add_timer(self.REPLY_ROUTE_PRUNE_INTERVAL_S, self._prune_reply_transports)
+        self._add_timer(
+            min(self.MAX_SWEEP_INTERVAL_S, self.subscriber_timeout_s / 4),
+            lambda: self._run_stage(STAGE_SWEEP, self._remove_timed_out_subscribers)
+        )
+        self.profile_duration_s: float = configuration.profile_duration_s
+        self.profiler: Optional[Profiler] = None
+        if configuration.profile_directory is not None:
+            self.profiler = Profiler(configuration.profile_directory)
+            self._add_hook(self.profiler)
+            self._add_timer(self.PROFILER_POLL_INTERVAL_S, self.profiler.poll)
+        self._started_s: float = self.clock.monotonic()
+        self._leases_expired_count: int = 0
+        self._lease_backlog: int = 0
+        self._rates = RateMeter()
+        self._add_timer(self.STATS_SAMPLE_INTERVAL_S, lambda: self._rates.sample(self._traffic_counts()))
+        self._ingress_limiter: Optional[IngressLimiter] = None
+        if configuration.ingress_rate_per_s or configuration.publication_ingress_rate_per_s:
+            self._ingress_limiter = IngressLimiter(
+                self.schemas,
+                configuration.ingress_rate_per_s,
+                configuration.publication_ingress_rate_per_s,
+                configuration.ingress_burst
+            )
+            self._add_timer(
+                self.INGRESS_EVICT_INTERVAL_S, lambda: self._ingress_limiter.evict(self.clock.monotonic())
+            )
+        if configuration.quarantine_threshold:
+            self._quarantine = Quarantine(configuration.quarantine_threshold, configuration.quarantine_s)
+            self._add_timer(
+                self.QUARANTINE_FORGET_INTERVAL_S, lambda: self._quarantine.forget(self.clock.monotonic())
+            )
+        self._memory = MemoryBudget(configuration.memory_budget_b, configuration.publication_memory_budget_b)
+        self.memory_policy: str = configuration.memory_policy
+        self._memory_evicted_count: int = 0
+        self._memory_rejected_count: int = 0
+        self.spool_directory: Optional[Path] = configuration.spool_directory
+        self.spool_max_b: int = configuration.spool_max_b
+        self._durables: Dict[str, Durable] = {}
+        self._absent_durables: Dict[str, List[Durable]] = {}
+        self._spool_drain_count: int = 1
+        if self.spool_directory is not None:
+            drain_interval_s: float = max(self.SPOOL_DRAIN_TICK_S, 1 / configuration.spool_drain_rate_per_s)
+            self._spool_drain_count = round(configuration.spool_drain_rate_per_s * drain_interval_s)
+            self._add_timer(drain_interval_s, self._drain_spools)
+            self._add_timer(configuration.spool_sync_interval_s, self._sync_spools)
+        self.snapshot_path: Optional[Path] = configuration.snapshot_path
+        self.snapshot_conflated: bool = configuration.snapshot_conflated
+        if self.snapshot_path is not None:
+            self._add_timer(configuration.snapshot_interval_s, self._write_snapshot)
+        print("Initialized Publisher")
+        print(f"  Endpoint:    {self.endpoint}")
+        if self.stream_endpoint is not None:
+            print(f"  Stream:      {self.stream_endpoint}")
+        print(f"  Buffer size: {self._buffer_size_b}")
+        if self._pipeline is not None:
+            print(f"  Pipeline:    {configuration.pipeline_sender_threads} sender thread(s)")
+        if self._shard_workers is not None:
+            print(f"  Shards:      {configuration.shards}")
+        if self.profiler is not None:
+            print(f"  Profiles:    {self.profiler.directory}")
+        if self.snapshot_path is not None:
+            print(f"  Snapshot:    {self.snapshot_path}")
+        if self.spool_directory is not None:
+            print(f"  Spools:      {self.spool_directory}")
+        if self._memory.max_b or self._memory.publication_max_b:
+            print(
+                f"  Memory:      {self._memory.max_b} B, {self._memory.publication_max_b} B per publication, "
+                f"{self.memory_policy} on overflow"
+            )
+        if self._ingress_limiter is not None:
+            print(
+                f"  Ingress:     {configuration.ingress_rate_per_s} per s per endpoint, "
+                f"{configuration.publication_ingress_rate_per_s} per s per publication"
+            )
+
+    def run(self: Publisher) -> None:
+        """
+        Run the Publisher
+        """
+        self._transport.bind(self.endpoint)
+        if self._stream_transport is not None:
+            self._stream_transport.bind(self.stream_endpoint)
+        for listener_transport, listener_endpoint in zip(self._listener_transports, self.listener_endpoints):
+            listener_transport.bind(listener_endpoint)
+        if self.profiler is not None:
+            self._install_profile_signal_handlers()
+        if self.snapshot_path is not None:
+            self._restore_snapshot()
+        if self._pipeline is not None:
+            self._pipeline.start()
+        if self._shard_workers is not None:
+            self._shard_workers.start()
+        try:
+            super().run()
+        finally:
+            self._stop_workers()
+            if self.snapshot_path is not None:
+                self._write_snapshot()
+            self._close_spools()
+            self.stop_capture()
+
+    def close(self: Publisher) -> None:
+        """
+        Stop the pipeline and shard worker threads, if running, then close every transport and stop any capture
+        """
+        self._stop_workers()
+        super().close()
+
+    def _stop_workers(self: Publisher) -> None:
+        """
+        Stop the shard worker threads and the pipeline, if running
+        """
+        if self._shard_workers is not None and self._shard_workers.is_running:
+            self._shard_workers.stop()
+        if self._pipeline is not None:
+            self._pipeline.stop()
+
+    def _execute(self: Publisher) -> None:
+        """
+        Main Publisher code
+        """
+        print("Waiting for a message...")
+        message, remote_endpoint = self._receive_message()
+        response: Optional[str] = self._process_message(message, remote_endpoint)
+        if response:
+            self._send_message(response, remote_endpoint)
+        self._message_pool.release(message)
+
+    def _receive_binary_message(self: Publisher) -> Tuple[bytes, Endpoint]:
+        """
+        Receive a binary message, dropping any over the ingress limits before they are decoded
+        """
+        while True:
+            binary_message, endpoint = self._receive_any_binary_message()
+            if self._ingress_limiter is None:
+                return binary_message, endpoint
+            limit: Optional[str] = self._ingress_limiter.check(binary_message, endpoint, self.clock.monotonic())
+            if limit is None:
+                return binary_message, endpoint
+            self._count_drop(limit)
+
+    def _receive_any_binary_message(self: Publisher) -> Tuple[bytes, Endpoint]:
+        """
+        Receive a binary message, from the pipeline's receiver thread if the pipeline is enabled, in which case where it
+        arrived is recorded here rather than on the receiver thread
+        """
+        if self._pipeline is None:
+            return super()._receive_binary_message()
+        while True:
+            received: Optional[Tuple[bytes, Endpoint, Transport]] = self._pipeline.get(self._select_timeout_s())
+            self._run_timers()
+            if received is not None:
+                binary_message, endpoint, transport = received
+                self._record_received(transport, [(binary_message, endpoint)])
+                return binary_message, endpoint
+
+    def _send_binary_message(self: Publisher, binary_message: bytes, endpoint: Endpoint) -> bool:
+        """
+        Send a binary message, through the pipeline's sender threads if the pipeline is enabled, and return whether it
+        was sent or queued. A message that cannot be sent, e.g. to a subscriber that has gone away or whose receive
+        queue is full, is dropped, so that one subscriber cannot stop delivery to the others
+        """
+        if self._pipeline is not None:
+            self._pipeline.send(binary_message, endpoint, self._transport_for(endpoint))
+            return True
+        try:
+            return super()._send_binary_message(binary_message, endpoint)
+        except OSError as e:
+            print(f"  Failed to send message to {endpoint}: {e}")
+            self._count_drop("send-failed")
+            return False
+
+    def _process_subscribe(self: Publisher, subscribe_message: Message, endpoint: Endpoint) -> Message:
+        """
+        Process a subscription request. Only the subscription requests that were accepted are echoed back.
+
+        Leases are timed by the publisher's clock, from when the request is processed, so that they are unaffected by
+        clock skew between publisher and subscriber.
+        """
+        accepted: List[str] = []
+        now: datetime = self.clock.now()
+        for request_string in subscribe_message.payload:
+            try:
+                request = SubscriptionRequest.from_string(request_string)
+                self._add_subscription(request, endpoint, now)
+            except ValueError as e:
+                print(f"  Rejected subscription request {request_string}: {e}")
+                self._count_drop("rejected-subscription")
+                continue
+            print(f"  Added subscription to {request}")
+            accepted.append(request_string)
+        subscribe_message.timestamp = datetime.now()
+        subscribe_message.payload = accepted
+        return subscribe_message
+
+    def _add_subscription(
+        self: Publisher,
+        request: SubscriptionRequest,
+        endpoint: Endpoint,
+        timestamp: datetime
+    ) -> Subscription:
+        """
+        Add a subscription from a subscription request, replacing any existing subscription of the endpoint to the
+        publication, and have it take up the durable subscription it names, if any. Raise `ValueError` if the request
+        is invalid or there is no room for it in the memory budget
+        """
+        self._check_schema(request)
+        with self._shard_lock(request.publication):
+            previous: Optional[Subscription] = self.subscriptions.get(request.publication, endpoint)
+            size_b: int = subscription_size_b(request.publication, request)
+            if previous is not None:
+                size_b -= subscription_size_b(request.publication, previous)
+            self._reserve(request.publication, size_b, previous)
+            is_new_durable: bool = request.durable is not None and request.durable not in self._durables
+            durable: Optional[Durable] = None
+            try:
+                durable = self._durable_for(request) if request.durable is not None else None
+                subscription: Subscription = self.subscriptions.add(request, endpoint, timestamp)
+            except ValueError:
+                self._memory.release(request.publication, size_b)
+                if durable is not None and is_new_durable:
+                    self._delete_durable(durable)
+                raise
+            self._conflated.pop(previous, None)
+            if previous is not None and previous.durable != request.durable:
+                self._leave_durable(previous)
+            if durable is not None:
+                self._take_up_durable(durable, subscription)
+            return subscription
+
+    def _durable_for(self: Publisher, request: SubscriptionRequest) -> Durable:
+        """
+        Get the durable subscription a subscription request names, creating it, and opening its spool, if it is new.
+        Raise `ValueError` if durable subscriptions are disabled, or the request is in a queue group or does not match
+        the durable subscription
+        """
+        if self.spool_directory is None:
+            raise ValueError("Durable subscriptions are disabled")
+        if request.group is not None:
+            raise ValueError("A durable subscription cannot be in a queue group")
+        durable: Optional[Durable] = self._durables.get(request.durable)
+        if durable is None:
+            self._reserve(request.publication, DURABLE_B)
+            try:
+                durable = Durable(request.durable, request, self.spool_directory, self.spool_max_b)
+            except (OSError, ValueError) as e:
+                self._memory.release(request.publication, DURABLE_B)
+                raise ValueError(f"Cannot create durable subscription: {e}") from e
+            self._durables[durable.name] = durable
+            self._set_absent(durable, True)
+        elif not durable.matches(request):
+            raise ValueError(f"Durable subscription {durable.name} is to {durable.publication} with other options")
+        return durable
+
+    def _take_up_durable(self: Publisher, durable: Durable, subscription: Subscription) -> None:
+        """
+        Hand a durable subscription to a subscription, removing the subscription that held it, if any, and having the
+        new one drain the spool first if anything was spooled
+        """
+        holder: Optional[Subscription] = durable.subscription
+        if holder is not None and self.subscriptions.get(durable.publication, holder.endpoint) is holder:
+            self.subscriptions.remove(durable.publication, holder.endpoint)
+            self._forget_subscription(durable.publication, holder)
+            print(f"  Moved durable subscription {durable.name} from {holder.endpoint}")
+        durable.subscription = subscription
+        if len(durable.spool):
+            subscription.spool = durable.spool
+        self._set_absent(durable, False)
+
+    def _leave_durable(self: Publisher, subscription: Subscription) -> None:
+        """
+        Let go of the durable subscription a subscription holds, if any, so that its messages are spooled
+        """
+        durable: Optional[Durable] = self._durables.get(subscription.durable)
+        if durable is None or durable.subscription is not subscription:
+            return
+        durable.subscription = None
+        subscription.spool = None
+        self._set_absent(durable, True)
+
+    def _drop_durable(self: Publisher, subscription: Subscription) -> None:
+        """
+        Delete the durable subscription a subscription holds, if any, and its spool
+        """
+        durable: Optional[Durable] = self._durables.get(subscription.durable)
+        if durable is None or durable.subscription is not subscription:
+            return
+        subscription.spool = None
+        self._delete_durable(durable)
+        print(f"  Deleted durable subscription {durable.name}")
+
+    def _delete_durable(self: Publisher, durable: Durable) -> None:
+        """
+        Forget a durable subscription, remove its spool, and release its memory
+        """
+        del self._durables[durable.name]
+        self._set_absent(durable, False)
+        durable.spool.remove()
+        self._memory.release(durable.publication, DURABLE_B)
+
+    def _reserve(
+        self: Publisher,
+        publication: str,
+        size_b: int,
+        keep: Optional[Subscription] = None
+    ) -> None:
+        """
+        Charge a number of bytes to a publication in the memory budget. If that would go over the publication's budget
+        or the global one, the subscriptions least recently renewed, of the publication or of any, other than one to
+        keep, are evicted to make room with the evict policy. Nothing is evicted unless evicting would make enough room.
+        Raise `ValueError` if there is no room
+        """
+        transient_b: int = self._transient_memory_b()
+        can_make_room: Optional[bool] = None
+        while True:
+            if self._memory.is_over_publication(publication, size_b):
+                scope: Optional[str] = publication
+            elif self._memory.is_over(size_b, transient_b):
+                scope = None
+            else:
+                break
+            if can_make_room is None:
+                can_make_room = (
+                    self.memory_policy == MEMORY_POLICY_EVICT
+                    and self._could_make_room(publication, size_b, keep, transient_b)
+                )
+            if not can_make_room or not self._evict_least_recent(scope, keep):
+                self._memory_rejected_count += 1
+                raise ValueError(f"No room in the memory budget for {size_b} B of {publication}")
+        self._memory.charge(publication, size_b)
+
+    def _could_make_room(
+        self: Publisher,
+        publication: str,
+        size_b: int,
+        keep: Optional[Subscription],
+        transient_b: int
+    ) -> bool:
+        """
+        Check whether charging a number of bytes to a publication would fit in the memory budget once every
+        subscription that could be evicted, other than one to keep, was
+        """
+        evictable_b: int = 0
+        publication_evictable_b: int = 0
+        for evictable_publication, subscription in self.subscriptions.items():
+            if subscription is keep:
+                continue
+            subscription_b: int = subscription_size_b(evictable_publication, subscription)
+            evictable_b += subscription_b
+            if evictable_publication == publication:
+                publication_evictable_b += subscription_b
+        return self._memory.could_fit(publication, size_b, publication_evictable_b, evictable_b, transient_b)
+
+    def _evict_least_recent(self: Publisher, publication: Optional[str], keep: Optional[Subscription]) -> bool:
+        """
+        Evict the subscription least recently renewed, to a publication or to any, other than one to keep, and return
+        whether there was one
+        """
+        candidates: List[Tuple[str, Subscription]] = [
+            (p, s) for p, s in self.subscriptions.items() if (publication is None or p == publication) and s is not keep
+        ]
+        if not candidates:
+            return False
+        evicted_publication, evicted = min(candidates, key=lambda candidate: candidate[1].timestamp)
+        self.subscriptions.remove(evicted_publication, evicted.endpoint)
+        self._forget_subscription(evicted_publication, evicted)
+        self._leave_durable(evicted)
+        self._memory_evicted_count += 1
+        print(f"  Evicted subscription of {evicted.endpoint} to {evicted_publication} to stay within the memory budget")
+        return True
+
+    def _forget_subscription(self: Publisher, publication: str, subscription: Subscription) -> None:
+        """
+        Discard the pending conflated message of a removed subscription, and release its memory
+        """
+        self._conflated.pop(subscription, None)
+        self._memory.release(publication, subscription_size_b(publication, subscription))
+
+    def _transient_memory_b(self: Publisher) -> int:
+        """
+        Estimate the bytes held by the publisher's queues, transport buffers, and ingress rate limit buckets. Queued
+        messages are counted at the buffer size
+        """
+        queue_depth: int = 0
+        for workers in [self._pipeline, self._shard_workers]:
+            if workers is not None:
+                queue_depth += sum(metrics["depth"] for metrics in workers.metrics().values())
+        transient_b: int = queue_depth * self._buffer_size_b
+        transient_b += sum(transport.buffered_b() for transport in self._transports)
+        if self._ingress_limiter is not None:
+            transient_b += self._ingress_limiter.bucket_count() * BUCKET_B
+        return transient_b
+
+    def _set_absent(self: Publisher, durable: Durable, is_absent: bool) -> None:
+        """
+        Add a durable subscription to, or remove it from, those of its publication that no subscriber holds. The list
+        is replaced rather than changed, so that fan-out can read it without a lock
+        """
+        absent: List[Durable] = [d for d in self._absent_durables.get(durable.publication, []) if d is not durable]
+        if is_absent:
+            absent.append(durable)
+        if absent:
+            self._absent_durables[durable.publication] = absent
+        else:
+            self._absent_durables.pop(durable.publication, None)
+
+    def _check_schema(self: Publisher, request: SubscriptionRequest) -> None:
+        """
+        Check that the schema a subscription request expects, if any, is that of its publication. Raise `ValueError` if
+        not.
+        """
+        if request.schema_id is None:
+            return
+        schema: Optional[Schema] = self.schemas.for_publication(request.publication)
+        if schema is None or schema.id != request.schema_id:
+            raise ValueError(f"Schema {request.schema_id:08x} does not match that of {request.publication}")
+
+    def _process_heartbeat(self: Publisher, heartbeat_message: Message, endpoint: Endpoint) -> None:
+        """
+        Process a heartbeat by renewing the leases of all of the subscriber's subscriptions
+        """
+        renewed: int = self.subscriptions.renew(endpoint, self.clock.now())
+        if not renewed:
+            print(f"  Heartbeat from {endpoint}, which has no subscriptions")
+
+    def _process_unsubscribe(self: Publisher, unsubscribe_message: Message, endpoint: Endpoint) -> Message:
+        """
+        Process an unsubscription request. With no publications, every subscription of the subscriber is removed. The
+        publications that were unsubscribed from are echoed back.
+        """
+        if unsubscribe_message.payload:
+            removed = [(p, self.subscriptions.remove(p, endpoint)) for p in unsubscribe_message.payload]
+        else:
+            removed = self.subscriptions.remove_endpoint(endpoint)
+        unsubscribed: List[str] = []
+        for publication, subscription in removed:
+            if subscription is None:
+                continue
+            print(f"  Removed subscription to {publication}")
+            self._forget_subscription(publication, subscription)
+            self._drop_durable(subscription)
+            unsubscribed.append(publication)
+        unsubscribe_message.timestamp = datetime.now()
+        unsubscribe_message.payload = unsubscribed
+        return unsubscribe_message
+
+    def _process_submit(self: Publisher, submit_message: Message, endpoint: Endpoint) -> None:
+        """
+        Process a published message. The submit message is turned into the publish message in place rather than
+        copied
+        """
+        ingress: datetime = datetime.now()
+        if not submit_message.payload:
+            print(f"Invalid submit message: {submit_message}")
+            self._count_drop("invalid-submit")
+            return
+        submitted: datetime = submit_message.timestamp
+        schema: Optional[Schema] = self.schemas.for_publication(submit_message.payload[0])
+        if schema is not None and submit_message.schema is None:
+            try:
+                submit_message.payload[1:] = schema.coerce(submit_message.payload[1:])
+            except ValueError as e:
+                print(f"Invalid submit message: {e}")
+                self._count_drop("invalid-submit")
+                return
+        publish_message: Message = submit_message
+        publish_message.message_type = MessageType.PUBLISH
+        publish_message.timestamp = ingress
+        publish_message.trace = None
+        fan_out = self._fan_out if publish_message.records is None else self._fan_out_batch
+        self._run_stage(STAGE_FAN_OUT, fan_out, publish_message, submitted, ingress)
+
+    def _process_shard_submit(self: Publisher, submit_message: Message, endpoint: Endpoint) -> None:
+        """
+        Process a submitted message on the worker thread of its publication's shard. The shard's lock is held
+        throughout, so that the state kept for the publication's subscriptions, such as pending conflated messages,
+        queue group cursors, and spools, is only ever changed by one thread at a time. The transports are then flushed,
+        so that messages buffered by a stream transport go out without waiting for the main loop
+        """
+        with self.subscriptions.lock(submit_message.payload[0]):
+            self._process_submit(submit_message, endpoint)
+        self._flush_transports()
+
+    def _shard_lock(self: Publisher, publication: str) -> ContextManager:
+        """
+        Get the lock of a publication's shard if the publisher is sharded, or a lock that does nothing otherwise
+        """
+        if self._shard_workers is None:
+            return contextlib.nullcontext()
+        return self.subscriptions.lock(publication)
+
+    def _route_submit(self: Publisher, submit_message: Message, endpoint: Endpoint) -> None:
+        """
+        Queue a submitted message for the worker of its publication's shard, which processes it as usual. The message
+        is copied, as the received one is reused once it has been processed
+        """
+        if not submit_message.payload:
+            self._process_submit(submit_message, endpoint)
+            return
+        shard: int = self.subscriptions.ring.shard(submit_message.payload[0])
+        self._shard_workers.put(shard, submit_message.copy(), endpoint)
+
+    def _fan_out(self: Publisher, publish_message: Message, submitted: datetime, ingress: datetime) -> None:
+        """
+        Send a published message to each subscription to its publication whose filter it matches
+        """
+        variants: Dict[Tuple[bool, bool], Message] = {(publish_message.schema is not None, False): publish_message}
+        now_s: float = self.clock.monotonic()
+        for predicate, subscriptions, queue_groups in self.subscriptions.filter_groups(publish_message.payload[0]):
+            if predicate is not None and not predicate(publish_message.payload):
+                continue
+            if queue_groups:
+                subscriptions = subscriptions + self._next_members(queue_groups)
+            self._deliver(publish_message, variants, subscriptions, submitted, ingress, now_s)
+        for durable in self._absent_durables.get(publish_message.payload[0], []):
+            if durable.predicate is None or durable.predicate(publish_message.payload):
+                message: Message = self._variant(publish_message, variants, durable.schema_id is not None, False)
+                self._append_to_spool(durable.spool, message)
+
+    def _fan_out_batch(self: Publisher, publish_message: Message, submitted: datetime, ingress: datetime) -> None:
+        """
+        Send a published batch to each subscription to its publication. Subscriptions that take binary messages and
+        are not conflated are sent the records that match their filter as a single batch; the rest are sent each
+        matching record as a separate message
+        """
+        publication, *columns = publish_message.payload
+        rows: List[Tuple] = list(zip(*columns))
+        batch_variants: Dict[Tuple[bool, bool], Message] = {(True, False): publish_message}
+        now_s: float = self.clock.monotonic()
+        for predicate, subscriptions, queue_groups in self.subscriptions.filter_groups(publication):
+            matching: List[Tuple] = rows if predicate is None else [r for r in rows if predicate([publication, *r])]
+            if not matching:
+                continue
+            if queue_groups:
+                subscriptions = subscriptions + self._next_members(queue_groups)
+            batched = [s for s in subscriptions if s.schema_id is not None and s.interval_s is None]
+            unbatched = [s for s in subscriptions if s.schema_id is None or s.interval_s is not None]
+            if batched:
+                batch: Message = publish_message
+                variants = batch_variants
+                if predicate is not None:
+                    batch = Message(
+                        MessageType.PUBLISH, publish_message.timestamp, publication, *zip(*matching),
+                        schema=publish_message.schema, records=len(matching)
+                    )
+                    variants = {(True, False): batch}
+                self._deliver(batch, variants, batched, submitted, ingress, now_s)
+            for row in matching if unbatched else []:
+                record = Message(MessageType.PUBLISH, publish_message.timestamp, publication, *row)
+                self._deliver(record, {(False, False): record}, unbatched, submitted, ingress, now_s)
+        for durable in self._absent_durables.get(publication, []):
+            for row in rows:
+                if durable.predicate is None or durable.predicate([publication, *row]):
+                    record = Message(MessageType.PUBLISH, publish_message.timestamp, publication, *row)
+                    message: Message = self._variant(record, {}, durable.schema_id is not None, False)
+                    self._append_to_spool(durable.spool, message)
+
+    def _next_members(self: Publisher, queue_groups: List[QueueGroup]) -> List[Subscription]:
+        """
+        Get the member of each queue group to send the next message to
+        """
+        members: List[Optional[Subscription]] = [queue_group.next() for queue_group in queue_groups]
+        return [member for member in members if member is not None]
+
+    def _variant(
+        self: Publisher,
+        publish_message: Message,
+        variants: Dict[Tuple[bool, bool], Message],
+        is_binary: bool,
+        is_traced: bool,
+        submitted: Optional[datetime] = None,
+        ingress: Optional[datetime] = None
+    ) -> Message:
+        """
+        Get the variant of a published message in binary or as text, and with or without a trace of the submit time and
+        the time the publisher received it. Each variant is built at most once, and kept in the variants passed in so
+        that it can be reused
+        """
+        message: Optional[Message] = variants.get((is_binary, is_traced))
+        if message is None:
+            message = variants[(is_binary, is_traced)] = Message(
+                MessageType.PUBLISH,
+                publish_message.timestamp,
+                *publish_message.payload,
+                trace=Trace(submitted, ingress) if is_traced else None,
+                schema=self.schemas.for_publication(publish_message.payload[0]) if is_binary else None,
+                records=publish_message.records
+            )
+        return message
+
+    def _deliver(
+        self: Publisher,
+        publish_message: Message,
+        variants: Dict[Tuple[bool, bool], Message],
+        subscriptions: List[Subscription],
+        submitted: datetime,
+        ingress: datetime,
+        now_s: float
+    ) -> None:
+        """
+        Send a published message to subscriptions, or hold it back for conflated subscriptions whose interval has not
+        yet elapsed. Traced subscriptions are sent a variant that carries the submit time and the time the publisher
+        received it, and subscriptions with a schema a variant in binary. Subscriptions still draining the spool of a
+        durable subscription have the message appended to the spool instead, untraced, so that it follows what was
+        spooled
+        """
+        for subscription in subscriptions:
+            spool: Optional[Spool] = subscription.spool
+            message: Message = self._variant(
+                publish_message,
+                variants,
+                subscription.schema_id is not None,
+                subscription.trace and spool is None,
+                submitted,
+                ingress
+            )
+            if spool is not None:
+                self._append_to_spool(spool, message)
+            elif subscription.interval_s is None:
+                self._send_publish(message, subscription.endpoint)
+            elif now_s >= subscription.next_send_s:
+                self._send_publish(message, subscription.endpoint)
+                subscription.next_send_s = now_s + subscription.interval_s
+            elif message is publish_message:
+                # The published message may be the received one, which is reused once it has been processed
+                self._conflated[subscription] = message.copy()
+            else:
+                self._conflated[subscription] = message
+
+    def _append_to_spool(self: Publisher, spool: Spool, publish_message: Message) -> None:
+        """
+        Append a published message to a spool, dropping it if the spool is full or it cannot be written
+        """
+        try:
+            if not spool.append(bytes(publish_message)):
+                self._count_drop("spool-full")
+        except OSError as e:
+            print(f"  Failed to append to spool {spool.path}: {e}")
+            self._count_drop("spool-failed")
+
+    def _send_publish(self: Publisher, publish_message: Message, endpoint: Endpoint) -> None:
+        """
+        Send a published message, stamping its trace, if any, with the time it leaves the publisher
+        """
+        if publish_message.trace is not None:
+            publish_message.trace.egress = datetime.now()
+        self._send_message(publish_message, endpoint)
+
+    def _process_profile(self: Publisher, profile_message: Message, endpoint: Endpoint) -> Message:
+        """
+        Process a profile request, of the form `profile,<TIMESTAMP>[,<MODE>[,<DURATION_S>]]`. If a capture is started,
+        its mode, duration, and path are echoed back; otherwise the payload is empty.
+        """
+        request: List[str] = profile_message.payload
+        mode: str = request[0] if request else MODE_CPROFILE
+        duration_s: float = self.profile_duration_s
+        profile_message.timestamp = datetime.now()
+        profile_message.payload = []
+        try:
+            if len(request) > 1:
+                duration_s = float(request[1])
+            path: Path = self._start_profile(mode, duration_s)
+        except ValueError as e:
+            print(f"  Rejected profile request: {e}")
+            return profile_message
+        profile_message.payload = [mode, str(duration_s), str(path)]
+        return profile_message
+
+    def _process_stats(self: Publisher, stats_message: Message, endpoint: Endpoint) -> None:
+        """
+        Process a stats request, of the form `stats,<TIMESTAMP>[,<PAGE>]`. The stats are sent back as `<NAME>=<VALUE>`
+        tokens, split over as many pages as it takes for each to fit in a datagram, in responses of the form
+        `stats,<TIMESTAMP>,<PAGE>,<PAGES>,<STATS>`: every page, or only the one requested
+        """
+        tokens: List[str] = format_stats(self._stats())
+        now: datetime = datetime.now()
+        header_b: int = len(f"{MessageType.STATS},{now.strftime(TIMESTAMP_FORMAT)},{len(tokens)},{len(tokens)}")
+        pages: List[List[str]] = paginate(tokens, self._buffer_size_b - header_b)
+        try:
+            requested: List[int] = [int(stats_message.payload[0])] if stats_message.payload else list(range(len(pages)))
+            if not all(0 <= page < len(pages) for page in requested):
+                raise ValueError(f"no such page of {len(pages)}")
+        except ValueError as e:
+            print(f"  Rejected stats request: {e}")
+            self._count_drop("invalid-stats")
+            return
+        for page in requested:
+            self._send_message(Message(MessageType.STATS, now, str(page), str(len(pages)), *pages[page]), endpoint)
+
+    def _process_shards(self: Publisher, shards_message: Message, endpoint: Endpoint) -> Message:
+        """
+        Process a shards request, of the form `shards,<TIMESTAMP>[,<SHARDS>]`. Given a number of shards, the
+        publications are rebalanced across that many. The number of shards is echoed back, followed by the number of
+        publications moved if rebalanced; the payload is empty if sharding is disabled or the request is invalid
+        """
+        shards_message.timestamp = datetime.now()
+        request: List[str] = shards_message.payload
+        shards_message.payload = []
+        if self._shard_workers is None:
+            print("  Rejected shards request: sharding is disabled")
+            return shards_message
+        if not request:
+            shards_message.payload = [str(self._shard_workers.shard_count)]
+            return shards_message
+        try:
+            moved: int = self.rebalance(int(request[0]))
+        except ValueError as e:
+            print(f"  Rejected shards request: {e}")
+            return shards_message
+        shards_message.payload = [str(self._shard_workers.shard_count), str(moved)]
+        return shards_message
+
+    def rebalance(self: Publisher, shard_count: int) -> int:
+        """
+        Change the number of shards while running, and return the number of publications moved to another shard. The
+        shard workers finish what is queued and are restarted for the new shards; messages received meanwhile wait in
+        the transports. Raise `ValueError` if sharding is disabled or the number of shards is invalid
+        """
+        if self._shard_workers is None:
+            raise ValueError("Sharding is disabled")
+        if not 0 < shard_count <= PublisherConfiguration.LIMITS[MAX][SHARDS]:
+            raise ValueError(f"Invalid number of shards: {shard_count}")
+        running: bool = self._shard_workers.is_running
+        if running:
+            self._shard_workers.stop()
+        moved: int = self.subscriptions.rebalance(shard_count)
+        self._shard_workers.shard_count = shard_count
+        if running:
+            self._shard_workers.start()
+        print(f"Rebalanced publications across {shard_count} shard(s), moving {moved}")
+        return moved
+
+    def _stats(self: Publisher) -> Dict[str, StatValue]:
+        """
+        Get the Publisher's stats by name. Every stat is read from a counter kept up to date as messages are processed,
+        or from the rates sampled on a timer, so serving them adds nothing to the cost of routing
+        """
+        stats: Dict[str, StatValue] = {
+            "uptime-s": self.clock.monotonic() - self._started_s,
+            "publications": len(self.subscriptions.publications()),
+            "subscriptions": len(self.subscriptions),
+            "leases.expired": self._leases_expired_count,
+            "leases.backlog": self._lease_backlog,
+            "queue.received": len(self._received),
+            "queue.conflated": len(self._conflated)
+        }
+        stats.update(self._traffic_counts())
+        stats.update({f"{name}-per-s": rate for name, rate in self._rates.rates.items()})
+        drop_counts: Dict[str, int] = dict(self._drop_counts)
+        if self._shard_workers is not None:
+            for reason, count in self._shard_workers.totals().drop_counts.items():
+                drop_counts[reason] = drop_counts.get(reason, 0) + count
+        stats.update({f"dropped.{reason}": count for reason, count in drop_counts.items()})
+        stats.update({
+            f"subscribers.{publication}": count for publication, count in self.subscriptions.counts().items()
+        })
+        for publication in self.subscriptions.counts():
+            for queue_group in self.subscriptions.queue_groups(publication):
+                stats[f"queue-group.{publication}.{queue_group.name}"] = len(queue_group)
+        if self._pipeline is not None:
+            for name, metrics in self._pipeline.metrics().items():
+                stats.update({f"queue.{name}.{metric}": value for metric, value in metrics.items()})
+        stats.update({
+            "memory.charged-b": self._memory.charged_b,
+            "memory.transient-b": self._transient_memory_b(),
+            "memory.budget-b": self._memory.max_b,
+            "memory.evicted": self._memory_evicted_count,
+            "memory.rejected": self._memory_rejected_count
+        })
+        stats.update({
+            f"memory.publication-b.{publication}": charged_b
+            for publication, charged_b in self._memory.publication_charged_b.items()
+        })
+        for name, durable in list(self._durables.items()):
+            stats[f"spool.{name}.messages"] = len(durable.spool)
+            stats[f"spool.{name}.bytes"] = durable.spool.size_b
+        if self._quarantine is not None:
+            stats["quarantine.sources"] = len(self._quarantine)
+            stats["quarantine.quarantined"] = self._quarantine.quarantined_count
+        if self._capture is not None:
+            stats["capture.datagrams"] = self._capture.datagram_count
+        if self._reply_transports is not None:
+            stats["listeners"] = 1 + len(self.listener_endpoints)
+            stats["listeners.reply-routes"] = len(self._reply_transports)
+        if self._ingress_limiter is not None:
+            stats["ingress.buckets"] = self._ingress_limiter.bucket_count()
+        if self._shard_workers is not None:
+            stats["shards"] = self._shard_workers.shard_count
+            for name, metrics in self._shard_workers.metrics().items():
+                stats.update({f"queue.{name}.{metric}": value for metric, value in metrics.items()})
+        for transport in self._transports:
+            for name, value in transport.metrics().items():
+                stats[f"transport.{name}"] = stats.get(f"transport.{name}", 0) + value
+        return stats
+
+    def _traffic_counts(self: Publisher) -> Dict[str, int]:
+        """
+        Get the counts of messages and bytes sent and received, including those sent by the shard workers
+        """
+        counts: Dict[str, int] = {
+            "messages-received": self._messages_received_count,
+            "messages-sent": self._messages_sent_count,
+            "bytes-received": self._bytes_received_count,
+            "bytes-sent": self._bytes_sent_count
+        }
+        if self._shard_workers is not None:
+            totals: ShardCounts = self._shard_workers.totals()
+            counts["messages-sent"] += totals.messages_sent_count
+            counts["bytes-sent"] += totals.bytes_sent_count
+        return counts
+
+    def _count_sent(self: Publisher, size_b: int) -> None:
+        """
+        Count a message of a size (in bytes) sent, in the counts of the shard worker sending it, if any
+        """
+        counts: Optional[ShardCounts] = self._shard_workers.current_counts() if self._shard_workers else None
+        if counts is None:
+            super()._count_sent(size_b)
+            return
+        counts.messages_sent_count += 1
+        counts.bytes_sent_count += size_b
+
+    def _count_drop(self: Publisher, reason: str) -> None:
+        """
+        Count a message dropped for a reason, in the counts of the shard worker dropping it, if any
+        """
+        counts: Optional[ShardCounts] = self._shard_workers.current_counts() if self._shard_workers else None
+        if counts is None:
+            super()._count_drop(reason)
+            return
+        counts.drop_counts[reason] = counts.drop_counts.get(reason, 0) + 1
+
+    def _start_profile(self: Publisher, mode: str, duration_s: float) -> Path:
+        """
+        Start a profile capture. Raise `ValueError` if profiling is disabled or the request is invalid.
+        """
+        if self.profiler is None:
+            raise ValueError("Profiling is disabled")
+        if not 0 < duration_s <= PublisherConfiguration.LIMITS[MAX][PROFILE_DURATION_S]:
+            raise ValueError(f"Invalid profile duration: {duration_s} s")
+        return self.profiler.start(duration_s, mode)
+
+    def _install_profile_signal_handlers(self: Publisher) -> None:
+        """
+        Start a capture with `cProfile` on `SIGUSR1`, and by stack sampling on `SIGUSR2`, where supported
+        """
+        if threading.current_thread() is not threading.main_thread():
+            return
+        for signal_name, mode in [("SIGUSR1", MODE_CPROFILE), ("SIGUSR2", MODE_SAMPLE)]:
+            if hasattr(signal, signal_name):
+                signal.signal(getattr(signal, signal_name), lambda *args, mode=mode: self._on_profile_signal(mode))
+
+    def _on_profile_signal(self: Publisher, mode: str) -> None:
+        """
+        Start a profile capture of the default duration in response to a signal
+        """
+        try:
+            self._start_profile(mode, self.profile_duration_s)
+        except ValueError as e:
+            print(f"Ignored profile signal: {e}")
+
+    def _flush_conflated(self: Publisher) -> None:
+        """
+        Send the latest pending message of each conflated subscription whose interval has elapsed
+        """
+        if not self._conflated:
+            return
+        now_s: float = self.clock.monotonic()
+        for subscription, pending in [(s, m) for s, m in list(self._conflated.items()) if now_s >= s.next_send_s]:
+            with self._shard_lock(pending.payload[0]):
+                if self._conflated.get(subscription) is not pending:
+                    continue
+                del self._conflated[subscription]
+                self._send_publish(pending, subscription.endpoint)
+                subscription.next_send_s = now_s + subscription.interval_s
+
+    def _drain_spools(self: Publisher) -> None:
+        """
+        Send the next of the spooled messages of each durable subscription that a subscriber holds, up to the number
+        the drain rate allows per drain interval, and resume live delivery to those whose spool has drained
+        """
+        for durable in list(self._durables.values()):
+            with self._shard_lock(durable.publication):
+                subscription: Optional[Subscription] = durable.subscription
+                if subscription is None or not len(durable.spool):
+                    continue
+                for binary_message in durable.spool.read(self._spool_drain_count):
+                    if self._send_binary_message(binary_message, subscription.endpoint):
+                        self._count_sent(len(binary_message))
+                if not len(durable.spool):
+                    subscription.spool = None
+                    print(f"Drained the spool of durable subscription {durable.name}")
+
+    def _sync_spools(self: Publisher) -> None:
+        """
+        Sync the messages appended to each spool since the last sync to disk
+        """
+        for durable in list(self._durables.values()):
+            try:
+                durable.spool.sync()
+            except OSError as e:
+                print(f"Failed to sync spool {durable.spool.path}: {e}")
+
+    def _close_spools(self: Publisher) -> None:
+        """
+        Close every spool, keeping the messages in it
+        """
+        for durable in self._durables.values():
+            try:
+                durable.spool.close()
+            except OSError as e:
+                print(f"Failed to close spool {durable.spool.path}: {e}")
+
+    def _write_snapshot(self: Publisher) -> None:
+        """
+        Write a snapshot of the subscriptions and their leases, and of their pending conflated messages if enabled.
+        Subscriptions over stream connections are left out, as their connections do not survive a restart
+        """
+        entries: List[SnapshotEntry] = []
+        for publication, subscription in self.subscriptions.items():
+            if type(subscription.endpoint) not in ENDPOINT_KINDS:
+                continue
+            pending: Optional[Message] = self._conflated.get(subscription) if self.snapshot_conflated else None
+            entries.append((
+                SubscriptionRequest.from_subscription(publication, subscription),
+                subscription.endpoint,
+                subscription.timestamp,
+                bytes(pending) if pending is not None else None
+            ))
+        try:
+            write_snapshot(self.snapshot_path, entries)
+        except OSError as e:
+            print(f"Failed to write snapshot {self.snapshot_path}: {e}")
+
+    def _restore_snapshot(self: Publisher) -> None:
+        """
+        Restore the subscriptions, and any pending conflated messages, from the last snapshot, if there is one. Leases
+        keep the times they were last renewed, so subscriptions that lapsed while the publisher was down are removed as
+        usual
+        """
+        if not self.snapshot_path.is_file():
+            return
+        try:
+            taken, entries = read_snapshot(self.snapshot_path)
+        except (OSError, ValueError) as e:
+            print(f"Ignoring snapshot {self.snapshot_path}: {e}")
+            return
+        for request, endpoint, timestamp, pending in entries:
+            try:
+                subscription: Subscription = self._add_subscription(request, endpoint, timestamp)
+                if pending is not None:
+                    self._conflated[subscription] = (
+                        self.schemas.decode(pending) if pending[:1] == BINARY_MARKER else Message.from_bytes(pending)
+                    )
+            except ValueError as e:
+                print(f"  Ignoring snapshot subscription to {request}: {e}")
+        print(f"Restored {len(self.subscriptions)} subscription(s) from snapshot taken at {taken}")
+
+    def _prune_reply_transports(self: Publisher) -> None:
+        """
+        Forget the sockets to reply to endpoints through once there are too many, except those of subscribed endpoints,
+        which keep being published to through the socket they subscribed on
+        """
+        if len(self._reply_transports) <= self.MAX_REPLY_ROUTES:
+            return
+        subscribed = {subscription.endpoint for _, subscription in self.subscriptions.items()}
+        self._reply_transports = {
+            endpoint: transport for endpoint, transport in self._reply_transports.items() if endpoint in subscribed
+        }
+
+    def _remove_timed_out_subscribers(self) -> None:
+        """
+        Check for and remove any timed-out subscribers
+        """
+        removed: List[Tuple[str, Subscription]] = self.subscriptions.remove_timed_out(
+            self.clock.now(), self.subscriber_timeout_s
+        )
+        for publication, subscription in removed:
+            self._forget_subscription(publication, subscription)
+            self._leave_durable(subscription)
+        self._leases_expired_count += len(removed)
+        self._lease_backlog = len(removed)
@@ -0,0 +1,162 @@
+"""
+Rate limit module
+"""
+from __future__ import annotations
+from typing import Dict, Hashable, Optional
+
+from src.endpoint import Endpoint
+from src.message import MessageType
+from src.schema import BINARY_MARKER, HEADER, Schema, SchemaRegistry
+
+
+SUBMIT_PREFIX: bytes = f"{MessageType.SUBMIT},".encode("utf-8")
+
+ENDPOINT_LIMIT: str = "ingress-endpoint-limit"
+PUBLICATION_LIMIT: str = "ingress-publication-limit"
+
+
+class TokenBucket(object):
+    """
+    Token bucket class
+
+    A bucket is created for every key a rate limiter sees, so buckets keep their attributes in slots rather than an
+    instance dictionary.
+    """
+
+    __slots__ = ("tokens", "updated_s")
+
+    def __init__(self: TokenBucket, tokens: float, updated_s: float) -> None:
+        """
+        Initialize a `TokenBucket` object with a number of tokens and the time (in seconds) it was last updated.
+        """
+        self.tokens: float = tokens
+        self.updated_s: float = updated_s
+
+
+class RateLimiter(object):
+    """
+    Rate limiter class
+
+    Limits the rate of events of each of any number of keys with a token bucket per key. A bucket holds up to a burst
+    of tokens and is refilled at the rate; each event takes a token, and is refused if there is none. Buckets are only
+    created for keys as they are seen, and are evicted once full, as a full bucket behaves exactly like a new one.
+    """
+
+    MAX_BUCKETS: int = 65536
+
+    def __init__(self: RateLimiter, rate_per_s: float, burst: int) -> None:
+        """
+        Initialize a `RateLimiter` object with a rate (in events per second) and a burst (in events).
+        """
+        self.rate_per_s: float = rate_per_s
+        self.burst: int = burst
+        self._buckets: Dict[Hashable, TokenBucket] = {}
+
+    def __len__(self: RateLimiter) -> int:
+        """
+        Get the number of buckets.
+        """
+        return len(self._buckets)
+
+    def allow(self: RateLimiter, key: Hashable, now_s: float) -> bool:
+        """
+        Take a token from the bucket of a key as of a time (in seconds), and return whether there was one.
+        """
+        bucket: Optional[TokenBucket] = self._buckets.get(key)
+        if bucket is None:
+            if len(self._buckets) >= self.MAX_BUCKETS:
+                self.evict(now_s)
+            bucket = self._buckets[key] = TokenBucket(self.burst, now_s)
+        else:
+            bucket.tokens = min(self.burst, bucket.tokens + (now_s - bucket.updated_s) * self.rate_per_s)
+            bucket.updated_s = now_s
+        if bucket.tokens < 1:
+            return False
+        bucket.tokens -= 1
+        return True
+
+    def evict(self: RateLimiter, now_s: float) -> int:
+        """
+        Remove the buckets that have refilled as of a time (in seconds), and return how many were removed.
+        """
+        full = [
+            key for key, bucket in self._buckets.items()
+            if bucket.tokens + (now_s - bucket.updated_s) * self.rate_per_s >= self.burst
+        ]
+        for key in full:
+            del self._buckets[key]
+        return len(full)
+
+
+class IngressLimiter(object):
+    """
+    Ingress limiter class
+
+    Applies a publisher's ingress rate limits to binary messages as they are received, before they are decoded: one per
+    source endpoint, to every message, and one per publication, to submitted messages. The publication of a submitted
+    message is read from the text message up to its first data field, or from the schema ID in the header of a binary
+    message, without decoding the rest.
+    """
+
+    def __init__(
+        self: IngressLimiter,
+        schemas: SchemaRegistry,
+        endpoint_rate_per_s: float,
+        publication_rate_per_s: float,
+        burst: int
+    ) -> None:
+        """
+        Initialize an `IngressLimiter` object with the schema registry, the rate limits (in messages per second) of each
+        source endpoint and each publication, either of which may be zero to disable it, and the burst (in messages),
+        which is one second's worth of the limit if zero.
+        """
+        self._schemas: SchemaRegistry = schemas
+        self.endpoint_limiter: Optional[RateLimiter] = None
+        if endpoint_rate_per_s:
+            self.endpoint_limiter = RateLimiter(endpoint_rate_per_s, burst or max(1, int(endpoint_rate_per_s)))
+        self.publication_limiter: Optional[RateLimiter] = None
+        if publication_rate_per_s:
+            self.publication_limiter = RateLimiter(publication_rate_per_s, burst or max(1, int(publication_rate_per_s)))
+
+    def check(self: IngressLimiter, binary_message: bytes, endpoint: Endpoint, now_s: float) -> Optional[str]:
+        """
+        Check a binary message from a source endpoint against the limits as of a time (in seconds), and return the
+        limit it is over, if any.
+        """
+        if self.endpoint_limiter is not None and not self.endpoint_limiter.allow(endpoint, now_s):
+            return ENDPOINT_LIMIT
+        if self.publication_limiter is not None:
+            publication: Optional[str] = self._submitted_publication(binary_message)
+            if publication is not None and not self.publication_limiter.allow(publication, now_s):
+                return PUBLICATION_LIMIT
+        return None
+
+    def evict(self: IngressLimiter, now_s: float) -> None:
+        """
+        Remove the buckets that have refilled as of a time (in seconds).
+        """
+        for limiter in (self.endpoint_limiter, self.publication_limiter):
+            if limiter is not None:
+                limiter.evict(now_s)
+
+    def bucket_count(self: IngressLimiter) -> int:
+        """
+        Get the number of buckets across the limits.
+        """
+        return sum(len(limiter) for limiter in (self.endpoint_limiter, self.publication_limiter) if limiter is not None)
+
+    def _submitted_publication(self: IngressLimiter, binary_message: bytes) -> Optional[str]:
+        """
+        Get the publication of a submitted binary message, or `None` if it is not a submitted message or its
+        publication cannot be told.
+        """
+        if binary_message[:1] == BINARY_MARKER:
+            if len(binary_message) < HEADER.size:
+                return None
+            _, message_type, _, _, schema_id = HEADER.unpack_from(binary_message)
+            schema: Optional[Schema] = self._schemas.for_id(schema_id)
+            return schema.publication if message_type == MessageType.SUBMIT and schema is not None else None
+        if binary_message[:len(SUBMIT_PREFIX)].lower() != SUBMIT_PREFIX:
+            return None
+        fields = binary_message.split(b",", 3)
+        return fields[2].decode("utf-8", "replace") if len(fields) > 2 else None
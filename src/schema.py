@@ -0,0 +1,345 @@
+"""
+Schema module
+"""
+from __future__ import annotations
+from datetime import datetime, timedelta
+import re
+import struct
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import zlib
+
+from src.message import Message, MessagePool, MessageType, Trace
+
+
+BINARY_MARKER: bytes = b"\x00"
+FLAG_TRACE: int = 0x01
+FLAG_BATCH: int = 0x02
+
+HEADER = struct.Struct("!cBBqI")
+TRACE = struct.Struct("!qqq")
+BATCH = struct.Struct("!H")
+MAX_BATCH_RECORDS: int = 65535
+FIELD_NAME_SEPARATOR: str = ":"
+
+EPOCH: datetime = datetime(1970, 1, 1)
+ONE_MICROSECOND: timedelta = timedelta(microseconds=1)
+
+FIELD_FORMATS: Dict[str, str] = {
+    "bool": "?",
+    "int32": "i",
+    "int64": "q",
+    "float32": "f",
+    "float64": "d"
+}
+WIRE_DTYPES: Dict[str, str] = {
+    "bool": "?",
+    "int32": ">i4",
+    "int64": ">i8",
+    "float32": ">f4",
+    "float64": ">f8"
+}
+INT_RANGES: Dict[str, Tuple[int, int]] = {
+    "int32": (-2 ** 31, 2 ** 31 - 1),
+    "int64": (-2 ** 63, 2 ** 63 - 1)
+}
+FLOAT32 = struct.Struct("!f")
+STRING_FIELD_PATTERN = re.compile(r"^str(\d+)$")
+MAX_STRING_LENGTH_B: int = 255
+
+
+def to_microseconds(timestamp: datetime) -> int:
+    """
+    Convert a timestamp to microseconds since the epoch.
+    """
+    return (timestamp - EPOCH) // ONE_MICROSECOND
+
+
+def from_microseconds(microseconds: int) -> datetime:
+    """
+    Convert microseconds since the epoch to a timestamp.
+    """
+    return EPOCH + timedelta(microseconds=microseconds)
+
+
+class Schema(object):
+    """
+    Schema class
+
+    The typed fields of a publication's message data. Each field type is one of `bool`, `int32`, `int64`, `float32`,
+    `float64`, or `str<N>`, a UTF-8 string of at most N bytes (1 to 255), padded to N bytes on the wire.
+
+    A schema's ID is a checksum of its publication and field types, so processes configured with the same schema agree
+    on its ID without any coordination, and a mismatched schema is detected when subscribing.
+
+    Messages of a publication with a schema can be sent in a binary form instead of text: a header, with the message
+    type, flags, timestamp, and schema ID, then the trace timestamps if the message is traced, then the data fields
+    packed by a precompiled `struct.Struct`.
+
+    A binary message can also be a columnar batch of records, with a record count after the header and trace, then
+    each field's values for every record packed together. The payload of a batch message is its publication followed by
+    a column per field, and its `records` is the record count. Columns may be sequences or NumPy arrays, which are
+    converted in a single vectorized operation.
+
+    Each field may be given a name, as `<NAME>:<TYPE>`, for the field names of NumPy structured arrays. Names default
+    to NumPy's `f0`, `f1`, and so on, and are not part of the schema ID.
+    """
+
+    def __init__(self: Schema, publication: str, field_types: Sequence[str]) -> None:
+        """
+        Initialize a `Schema` object with a publication and its field types, each optionally preceded by a name. Raise
+        `ValueError` if there are no field types or any of them is invalid.
+        """
+        if not field_types:
+            raise ValueError(f"Schema for {publication} has no fields")
+        self.publication: str = publication
+        self.field_names: List[str] = []
+        self.field_types: List[str] = []
+        self.wire_dtypes: List[str] = []
+        self._formats: List[str] = []
+        self._string_fields: List[int] = []
+        for i, field_spec in enumerate(field_types):
+            name, _, field_type = str(field_spec).rpartition(FIELD_NAME_SEPARATOR)
+            self.field_names.append(name or f"f{i}")
+            self.field_types.append(field_type)
+            if field_type in FIELD_FORMATS:
+                self._formats.append(FIELD_FORMATS[field_type])
+                self.wire_dtypes.append(WIRE_DTYPES[field_type])
+                continue
+            match = STRING_FIELD_PATTERN.match(field_type)
+            if not match or not 0 < int(match.group(1)) <= MAX_STRING_LENGTH_B:
+                raise ValueError(f"Invalid field type for {publication}: {field_type}")
+            self._formats.append(f"{match.group(1)}s")
+            self.wire_dtypes.append(f"S{match.group(1)}")
+            self._string_fields.append(i)
+        self._struct = struct.Struct("!" + "".join(self._formats))
+        self.id: int = zlib.crc32(f"{publication}:{','.join(self.field_types)}".encode("utf-8"))
+
+    def __repr__(self: Schema) -> str:
+        """
+        Generate a representational string for a `Schema` object.
+        """
+        return f"{self.__class__.__name__}({self.publication}, {self.field_types})"
+
+    @property
+    def size_b(self: Schema) -> int:
+        """
+        Get the size in bytes of the packed data fields.
+        """
+        return self._struct.size
+
+    def max_batch_records(self: Schema, max_size_b: int) -> int:
+        """
+        Get the most records a batch message can hold without exceeding a size in bytes, even if traced.
+        """
+        return min(MAX_BATCH_RECORDS, (max_size_b - HEADER.size - TRACE.size - BATCH.size) // self._struct.size)
+
+    def coerce(self: Schema, data: Sequence[Any]) -> List[Any]:
+        """
+        Convert data fields, such as those of a text message, to the schema's field types. Raise `ValueError` if there
+        are the wrong number of fields, or any cannot be converted or is out of range of its field type, so that data
+        which cannot be encoded is rejected here rather than when it is sent.
+        """
+        if len(data) != len(self.field_types):
+            raise ValueError(f"Expected {len(self.field_types)} fields for {self.publication}, got {len(data)}")
+        values: List[Any] = []
+        for field_type, value in zip(self.field_types, data):
+            if field_type == "bool":
+                values.append(value if isinstance(value, bool) else str(value).lower() in ("1", "true"))
+            elif field_type.startswith("int"):
+                value = int(value)
+                minimum, maximum = INT_RANGES[field_type]
+                if not minimum <= value <= maximum:
+                    raise ValueError(f"Value out of range for {field_type} field of {self.publication}: {value}")
+                values.append(value)
+            elif field_type.startswith("float"):
+                value = float(value)
+                if field_type == "float32":
+                    try:
+                        FLOAT32.pack(value)
+                    except OverflowError:
+                        raise ValueError(f"Value out of range for {field_type} field of {self.publication}: {value}")
+                values.append(value)
+            else:
+                value = str(value)
+                if len(value.encode("utf-8")) > int(field_type[len("str"):]):
+                    raise ValueError(f"String too long for {field_type} field of {self.publication}: {value}")
+                values.append(value)
+        return values
+
+    def encode(self: Schema, message: Message) -> bytes:
+        """
+        Convert a message of the schema's publication, whose data fields are of the schema's types, to binary.
+        """
+        flags: int = FLAG_TRACE if message.trace is not None else 0
+        if message.records is None:
+            values: List[Any] = message.payload[1:]
+            if self._string_fields:
+                values = list(values)
+                for i in self._string_fields:
+                    values[i] = values[i].encode("utf-8")
+            data: bytes = self._struct.pack(*values)
+        else:
+            flags |= FLAG_BATCH
+            data = BATCH.pack(message.records) + self._encode_columns(message.payload[1:], message.records)
+        header: bytes = HEADER.pack(
+            BINARY_MARKER, message.message_type, flags, to_microseconds(message.timestamp), self.id
+        )
+        if message.trace is None:
+            return header + data
+        trace: bytes = TRACE.pack(*(to_microseconds(t) for t in message.trace.timestamps()))
+        return header + trace + data
+
+    def decode(self: Schema, message_bytes: bytes, offset: int) -> List[Any]:
+        """
+        Unpack the data fields of a binary message starting at an offset. Raise `ValueError` if they are the wrong
+        size.
+        """
+        if len(message_bytes) - offset != self._struct.size:
+            raise ValueError(f"Expected {self._struct.size} bytes of data for {self.publication}")
+        values: List[Any] = list(self._struct.unpack_from(message_bytes, offset))
+        for i in self._string_fields:
+            values[i] = values[i].rstrip(b"\x00").decode("utf-8")
+        return values
+
+    def decode_columns(self: Schema, message_bytes: bytes, offset: int, records: int) -> List[Sequence[Any]]:
+        """
+        Unpack the columns of a batch message of a number of records starting at an offset. Raise `ValueError` if
+        they are the wrong size.
+        """
+        if len(message_bytes) - offset != records * self._struct.size:
+            raise ValueError(f"Expected {records * self._struct.size} bytes of batch data for {self.publication}")
+        columns: List[Sequence[Any]] = []
+        for i, field_format in enumerate(self._formats):
+            if i in self._string_fields:
+                size_b: int = struct.calcsize(f"!{field_format}")
+                columns.append([
+                    message_bytes[offset + j * size_b:offset + (j + 1) * size_b].rstrip(b"\x00").decode("utf-8")
+                    for j in range(records)
+                ])
+            else:
+                column_format: str = f"!{records}{field_format}"
+                columns.append(struct.unpack_from(column_format, message_bytes, offset))
+            offset += records * struct.calcsize(f"!{field_format}")
+        return columns
+
+    def _encode_columns(self: Schema, columns: Sequence[Sequence[Any]], records: int) -> bytes:
+        """
+        Pack the columns of a batch message, converting NumPy arrays to the wire format in one operation.
+        """
+        packed: List[bytes] = []
+        for i, column in enumerate(columns):
+            if hasattr(column, "astype"):
+                packed.append(column.astype(self.wire_dtypes[i], copy=False).tobytes())
+            elif i in self._string_fields:
+                packed.append(struct.pack("!" + self._formats[i] * records, *(v.encode("utf-8") for v in column)))
+            else:
+                packed.append(struct.pack(f"!{records}{self._formats[i]}", *column))
+        return b"".join(packed)
+
+
+class SchemaRegistry(object):
+    """
+    Schema registry class
+
+    Holds the schemas of the typed publications, by publication and by ID. Publications without a schema are untyped
+    and are always sent as text.
+    """
+
+    @classmethod
+    def from_definitions(cls: SchemaRegistry, definitions: Dict[str, Sequence[str]]) -> SchemaRegistry:
+        """
+        Create a `SchemaRegistry` object from a mapping of publications to their field types.
+        """
+        registry = cls()
+        for publication, field_types in definitions.items():
+            registry.add(Schema(publication, field_types))
+        return registry
+
+    def __init__(self: SchemaRegistry) -> None:
+        """
+        Initialize an empty `SchemaRegistry` object.
+        """
+        self._by_publication: Dict[str, Schema] = {}
+        self._by_id: Dict[int, Schema] = {}
+
+    def __len__(self: SchemaRegistry) -> int:
+        """
+        Get the number of schemas.
+        """
+        return len(self._by_id)
+
+    def add(self: SchemaRegistry, schema: Schema) -> None:
+        """
+        Add a schema, replacing any existing schema of its publication. Raise `ValueError` if its ID clashes with the
+        schema of another publication.
+        """
+        existing: Optional[Schema] = self._by_id.get(schema.id)
+        if existing is not None and existing.publication != schema.publication:
+            raise ValueError(f"Schema ID of {schema.publication} clashes with that of {existing.publication}")
+        previous: Optional[Schema] = self._by_publication.pop(schema.publication, None)
+        if previous is not None:
+            del self._by_id[previous.id]
+        self._by_publication[schema.publication] = schema
+        self._by_id[schema.id] = schema
+
+    def for_publication(self: SchemaRegistry, publication: str) -> Optional[Schema]:
+        """
+        Get the schema of a publication, if it is typed.
+        """
+        return self._by_publication.get(publication)
+
+    def for_id(self: SchemaRegistry, schema_id: int) -> Optional[Schema]:
+        """
+        Get the schema with an ID, if there is one.
+        """
+        return self._by_id.get(schema_id)
+
+    def decode(self: SchemaRegistry, message_bytes: bytes, pool: Optional[MessagePool] = None) -> Message:
+        """
+        Create a `Message` object from a binary message, reusing one from a pool if given. Raise `ValueError` if it is
+        malformed or its schema is unknown.
+        """
+        try:
+            return self._decode(message_bytes, pool)
+        except struct.error as e:
+            raise ValueError(f"Malformed binary message: {e}") from e
+
+    def _decode(self: SchemaRegistry, message_bytes: bytes, pool: Optional[MessagePool]) -> Message:
+        """
+        Create a `Message` object from a binary message, reusing one from a pool if given.
+        """
+        if len(message_bytes) < HEADER.size:
+            raise ValueError("Truncated binary message header")
+        _, message_type, flags, timestamp_us, schema_id = HEADER.unpack_from(message_bytes)
+        schema: Optional[Schema] = self._by_id.get(schema_id)
+        if schema is None:
+            raise ValueError(f"Unknown schema ID: {schema_id:08x}")
+        offset: int = HEADER.size
+        trace: Optional[Trace] = None
+        if flags & FLAG_TRACE:
+            if len(message_bytes) < offset + TRACE.size:
+                raise ValueError("Truncated binary message trace")
+            trace = Trace(*(from_microseconds(t) for t in TRACE.unpack_from(message_bytes, offset)))
+            offset += TRACE.size
+        create = Message if pool is None else pool.acquire
+        if not flags & FLAG_BATCH:
+            return create(
+                MessageType(message_type),
+                from_microseconds(timestamp_us),
+                schema.publication,
+                *schema.decode(message_bytes, offset),
+                trace=trace,
+                schema=schema
+            )
+        if len(message_bytes) < offset + BATCH.size:
+            raise ValueError("Truncated binary message record count")
+        records: int = BATCH.unpack_from(message_bytes, offset)[0]
+        return create(
+            MessageType(message_type),
+            from_microseconds(timestamp_us),
+            schema.publication,
+            *schema.decode_columns(message_bytes, offset + BATCH.size, records),
+            trace=trace,
+            schema=schema,
+            records=records
+        )
@@ -0,0 +1,383 @@
+"""
+Sharding module
+"""
+from __future__ import annotations
+import bisect
+from datetime import datetime
+import hashlib
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+from src.endpoint import Endpoint
+from src.message import Message
+from src.pipeline import StageQueue
+from src.subscription import FilterGroup, QueueGroup, Subscription, SubscriptionRegistry, SubscriptionRequest
+
+
+ShardProcessor = Callable[[Message, Endpoint], None]
+
+
+def _hash(key: str) -> int:
+    """
+    Hash a string to 32 bits, the same way in every process.
+    """
+    return int.from_bytes(hashlib.md5(key.encode("utf-8"), usedforsecurity=False).digest()[:4], "big")
+
+
+class HashRing(object):
+    """
+    Hash ring class
+
+    Assigns keys to shards by consistent hashing. Each shard is placed at many points on a ring of 32-bit hashes, and a
+    key belongs to the shard of the first point at or after its own hash. Changing the number of shards only moves the
+    keys that fall next to the points added or removed, about one in the new number of shards, where `hash(key) % N`
+    would move almost all of them. Lookups are cached, since the same few keys are looked up for every message.
+    """
+
+    REPLICAS: int = 64
+    CACHE_SIZE: int = 4096
+
+    def __init__(self: HashRing, shard_count: int, replicas: int = REPLICAS) -> None:
+        """
+        Initialize a `HashRing` object with a number of shards and the number of points of each on the ring.
+        """
+        points: List[Tuple[int, int]] = sorted(
+            (_hash(f"{shard}:{replica}"), shard) for shard in range(shard_count) for replica in range(replicas)
+        )
+        self.shard_count: int = shard_count
+        self._hashes: List[int] = [point_hash for point_hash, _ in points]
+        self._shards: List[int] = [shard for _, shard in points]
+        self._cache: Dict[str, int] = {}
+
+    def shard(self: HashRing, key: str) -> int:
+        """
+        Get the shard a key belongs to.
+        """
+        shard: Optional[int] = self._cache.get(key)
+        if shard is None:
+            if len(self._cache) >= self.CACHE_SIZE:
+                self._cache.clear()
+            shard = self._shards[bisect.bisect_left(self._hashes, _hash(key)) % len(self._hashes)]
+            self._cache[key] = shard
+        return shard
+
+
+class ShardedSubscriptionRegistry(object):
+    """
+    Sharded subscription registry class
+
+    Splits subscriptions across a registry per shard, by consistent hashing of their publications, with a lock per
+    shard. Threads fanning out publications of different shards never wait on each other, and only wait on the thread
+    adding or removing subscriptions for as long as it takes to change one shard. It has the same interface as
+    `SubscriptionRegistry`, so the publisher uses either in the same way, along with the lock of each publication's
+    shard, which also guards the state the publisher keeps for its subscriptions. The locks are reentrant, so that a
+    thread holding one can still use the registry.
+    """
+
+    def __init__(self: ShardedSubscriptionRegistry, shard_count: int) -> None:
+        """
+        Initialize an empty `ShardedSubscriptionRegistry` object with a number of shards.
+        """
+        self.ring = HashRing(shard_count)
+        self.shards: List[SubscriptionRegistry] = [SubscriptionRegistry() for _ in range(shard_count)]
+        self._locks: List[threading.RLock] = [threading.RLock() for _ in range(shard_count)]
+
+    def __contains__(self: ShardedSubscriptionRegistry, publication: str) -> bool:
+        """
+        Check whether a publication has any subscriptions.
+        """
+        shard: int = self.ring.shard(publication)
+        with self._locks[shard]:
+            return publication in self.shards[shard]
+
+    def __len__(self: ShardedSubscriptionRegistry) -> int:
+        """
+        Get the total number of subscriptions.
+        """
+        return sum(len(registry) for registry in self.shards)
+
+    def lock(self: ShardedSubscriptionRegistry, publication: str) -> threading.RLock:
+        """
+        Get the lock of the shard of a publication.
+        """
+        return self._locks[self.ring.shard(publication)]
+
+    def add(
+        self: ShardedSubscriptionRegistry,
+        request: SubscriptionRequest,
+        endpoint: Endpoint,
+        timestamp: datetime
+    ) -> Subscription:
+        """
+        Add a subscription from a subscription request to the shard of its publication. Raise `ValueError` if any of
+        the request options are invalid.
+        """
+        shard: int = self.ring.shard(request.publication)
+        with self._locks[shard]:
+            return self.shards[shard].add(request, endpoint, timestamp)
+
+    def remove(self: ShardedSubscriptionRegistry, publication: str, endpoint: Endpoint) -> Optional[Subscription]:
+        """
+        Remove the subscription of an endpoint to a publication, if there is one.
+        """
+        shard: int = self.ring.shard(publication)
+        with self._locks[shard]:
+            return self.shards[shard].remove(publication, endpoint)
+
+    def remove_endpoint(self: ShardedSubscriptionRegistry, endpoint: Endpoint) -> List[Tuple[str, Subscription]]:
+        """
+        Remove every subscription of an endpoint, from every shard, and return them with their publications.
+        """
+        removed: List[Tuple[str, Subscription]] = []
+        for lock, registry in zip(self._locks, self.shards):
+            with lock:
+                removed.extend(registry.remove_endpoint(endpoint))
+        return removed
+
+    def renew(self: ShardedSubscriptionRegistry, endpoint: Endpoint, timestamp: datetime) -> int:
+        """
+        Renew the lease of every subscription of an endpoint, in every shard, and return how many were renewed.
+        """
+        renewed: int = 0
+        for lock, registry in zip(self._locks, self.shards):
+            with lock:
+                renewed += registry.renew(endpoint, timestamp)
+        return renewed
+
+    def get(self: ShardedSubscriptionRegistry, publication: str, endpoint: Endpoint) -> Optional[Subscription]:
+        """
+        Get the subscription of an endpoint to a publication, if there is one.
+        """
+        shard: int = self.ring.shard(publication)
+        with self._locks[shard]:
+            return self.shards[shard].get(publication, endpoint)
+
+    def subscriptions(self: ShardedSubscriptionRegistry, publication: str) -> List[Subscription]:
+        """
+        Get the subscriptions to a publication.
+        """
+        shard: int = self.ring.shard(publication)
+        with self._locks[shard]:
+            return self.shards[shard].subscriptions(publication)
+
+    def items(self: ShardedSubscriptionRegistry) -> List[Tuple[str, Subscription]]:
+        """
+        Get every subscription with its publication.
+        """
+        items: List[Tuple[str, Subscription]] = []
+        for lock, registry in zip(self._locks, self.shards):
+            with lock:
+                items.extend(registry.items())
+        return items
+
+    def publications(self: ShardedSubscriptionRegistry) -> List[str]:
+        """
+        Get the publications that have subscriptions.
+        """
+        return list(self.counts())
+
+    def counts(self: ShardedSubscriptionRegistry) -> Dict[str, int]:
+        """
+        Get the number of subscriptions to each publication that has any.
+        """
+        counts: Dict[str, int] = {}
+        for lock, registry in zip(self._locks, self.shards):
+            with lock:
+                counts.update(registry.counts())
+        return counts
+
+    def queue_groups(self: ShardedSubscriptionRegistry, publication: str) -> List[QueueGroup]:
+        """
+        Get the queue groups of a publication.
+        """
+        shard: int = self.ring.shard(publication)
+        with self._locks[shard]:
+            return self.shards[shard].queue_groups(publication)
+
+    def filter_groups(self: ShardedSubscriptionRegistry, publication: str) -> List[FilterGroup]:
+        """
+        Get the subscriptions to a publication grouped by filter, as `(predicate, subscriptions, queue_groups)`
+        triples. The groups are rebuilt rather than changed when subscriptions change, and queue groups replace their
+        members rather than change them, so they can be used once the shard is unlocked.
+        """
+        shard: int = self.ring.shard(publication)
+        with self._locks[shard]:
+            return self.shards[shard].filter_groups(publication)
+
+    def remove_timed_out(
+        self: ShardedSubscriptionRegistry,
+        now: datetime,
+        timeout_s: float
+    ) -> List[Tuple[str, Subscription]]:
+        """
+        Remove every subscription made at least the timeout (in seconds) before now, from every shard, and return them
+        with their publications.
+        """
+        removed: List[Tuple[str, Subscription]] = []
+        for lock, registry in zip(self._locks, self.shards):
+            with lock:
+                removed.extend(registry.remove_timed_out(now, timeout_s))
+        return removed
+
+    def rebalance(self: ShardedSubscriptionRegistry, shard_count: int) -> int:
+        """
+        Change the number of shards, moving the subscriptions of each publication whose shard changes to its new
+        shard, and return the number of publications moved. Subscriptions are moved rather than recreated, so they keep
+        their leases and any pending conflated messages. Threads using the shards must be stopped first.
+        """
+        ring = HashRing(shard_count)
+        shards: List[SubscriptionRegistry] = self.shards[:shard_count]
+        shards.extend(SubscriptionRegistry() for _ in range(len(shards), shard_count))
+        moved: int = 0
+        for shard, registry in enumerate(self.shards):
+            for publication in registry.publications():
+                target: int = ring.shard(publication)
+                if target == shard:
+                    continue
+                for subscription in registry.subscriptions(publication):
+                    registry.remove(publication, subscription.endpoint)
+                    shards[target].insert(publication, subscription)
+                moved += 1
+        self.ring = ring
+        self.shards = shards
+        self._locks = [threading.RLock() for _ in range(shard_count)]
+        return moved
+
+
+class ShardCounts(object):
+    """
+    Shard counts class
+
+    The messages and bytes sent, the messages dropped by reason, and the errors of a shard worker thread. Each worker
+    has counts of its own that only it updates, so they need no lock, and they are added up when read.
+    """
+
+    __slots__ = ("messages_sent_count", "bytes_sent_count", "drop_counts", "error_count")
+
+    def __init__(self: ShardCounts) -> None:
+        """
+        Initialize a `ShardCounts` object with every count at zero.
+        """
+        self.messages_sent_count: int = 0
+        self.bytes_sent_count: int = 0
+        self.drop_counts: Dict[str, int] = {}
+        self.error_count: int = 0
+
+    def add(self: ShardCounts, other: ShardCounts) -> None:
+        """
+        Add the counts of another `ShardCounts` object to these.
+        """
+        self.messages_sent_count += other.messages_sent_count
+        self.bytes_sent_count += other.bytes_sent_count
+        for reason, count in dict(other.drop_counts).items():
+            self.drop_counts[reason] = self.drop_counts.get(reason, 0) + count
+        self.error_count += other.error_count
+
+
+class ShardWorkers(object):
+    """
+    Shard workers class
+
+    Runs a worker thread per shard, each processing the messages queued for its shard in the order they were queued.
+    Every message of a publication is queued for the same shard, so each publication is processed in order, while the
+    fan-out of a publication with many subscribers holds up only the publications of its own shard. Queues are bounded,
+    so a shard that falls behind pushes back on the thread queueing messages for it. Each worker keeps counts of its
+    own, which the function processing messages can get with `current_counts`.
+    """
+
+    def __init__(self: ShardWorkers, process: ShardProcessor, shard_count: int, max_queue_depth: int) -> None:
+        """
+        Initialize a `ShardWorkers` object with the function the workers call to process a message, the number of
+        shards, and the maximum depth of each shard's queue.
+        """
+        self._process: ShardProcessor = process
+        self.shard_count: int = shard_count
+        self._max_queue_depth: int = max_queue_depth
+        self.queues: List[StageQueue] = []
+        self._threads: List[threading.Thread] = []
+        self._counts: List[ShardCounts] = []
+        self._stopped_counts = ShardCounts()
+        self._local = threading.local()
+
+    @property
+    def error_count(self: ShardWorkers) -> int:
+        """
+        Get the number of messages that failed to be processed.
+        """
+        return self.totals().error_count
+
+    @property
+    def is_running(self: ShardWorkers) -> bool:
+        """
+        Check whether the worker threads are running.
+        """
+        return bool(self._threads)
+
+    def start(self: ShardWorkers) -> None:
+        """
+        Start a worker thread for each shard.
+        """
+        self.queues = [StageQueue(f"shard-{i}", self._max_queue_depth) for i in range(self.shard_count)]
+        self._counts = [ShardCounts() for _ in range(self.shard_count)]
+        self._threads = [
+            threading.Thread(target=self._run, args=(shard_queue, counts), daemon=True)
+            for shard_queue, counts in zip(self.queues, self._counts)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self: ShardWorkers) -> None:
+        """
+        Stop the worker threads, letting them finish what is queued.
+        """
+        for shard_queue in self.queues:
+            shard_queue.put(None)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+        for counts in self._counts:
+            self._stopped_counts.add(counts)
+        self._counts = []
+
+    def current_counts(self: ShardWorkers) -> Optional[ShardCounts]:
+        """
+        Get the counts of the worker running the calling thread, or `None` if it is not a worker.
+        """
+        return getattr(self._local, "counts", None)
+
+    def totals(self: ShardWorkers) -> ShardCounts:
+        """
+        Get the counts of every worker added up, including those of workers since stopped.
+        """
+        totals = ShardCounts()
+        for counts in [self._stopped_counts, *self._counts]:
+            totals.add(counts)
+        return totals
+
+    def put(self: ShardWorkers, shard: int, message: Message, endpoint: Endpoint) -> None:
+        """
+        Queue a message for the worker of a shard, blocking while its queue is full.
+        """
+        self.queues[shard].put((message, endpoint))
+
+    def metrics(self: ShardWorkers) -> Dict[str, Dict[str, int]]:
+        """
+        Get the depth and backpressure counters of every shard's queue.
+        """
+        return {shard_queue.name: shard_queue.metrics() for shard_queue in self.queues}
+
+    def _run(self: ShardWorkers, shard_queue: StageQueue, counts: ShardCounts) -> None:
+        """
+        Process messages from a shard's queue until stopped, keeping the worker's counts.
+        """
+        self._local.counts = counts
+        while True:
+            item = shard_queue.get()
+            if item is None:
+                return
+            message, endpoint = item
+            try:
+                self._process(message, endpoint)
+            except Exception as e:
+                counts.error_count += 1
+                print(f"Failed to process message from {endpoint}: {e}")
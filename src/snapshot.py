@@ -0,0 +1,117 @@
+"""
+Snapshot module
+"""
+from __future__ import annotations
+from datetime import datetime
+import os
+from pathlib import Path
+import struct
+from typing import Dict, List, Optional, Tuple
+import zlib
+
+from src.endpoint import Endpoint, UnixEndpoint
+from src.ipendpoint import IPEndpoint
+from src.schema import from_microseconds, to_microseconds
+from src.subscription import SubscriptionRequest
+
+
+SNAPSHOT_MAGIC: bytes = b"PSSN"
+SNAPSHOT_VERSION: int = 1
+
+HEADER = struct.Struct("!4sBqI")
+ENTRY = struct.Struct("!BqHHHI")
+CHECKSUM = struct.Struct("!I")
+
+ENDPOINT_IP: int = 1
+ENDPOINT_UNIX: int = 2
+ENDPOINT_KINDS: Dict[type, int] = {IPEndpoint: ENDPOINT_IP, UnixEndpoint: ENDPOINT_UNIX}
+
+SnapshotEntry = Tuple[SubscriptionRequest, Endpoint, datetime, Optional[bytes]]
+
+
+def write_snapshot(path: Path, entries: List[SnapshotEntry]) -> None:
+    """
+    Write a snapshot of subscriptions to a file, each as the request that would make it, its subscriber endpoint, the
+    time its lease was last renewed, and optionally the binary message pending for it.
+
+    The snapshot is written to a temporary file beside the target, synced to disk, and renamed over the target, so a
+    crash at any point leaves either the previous snapshot or the new one, never a partial one. Only IP datagram and
+    Unix datagram endpoints can be snapshotted; raise `ValueError` for any other.
+
+    The format is a header, with a magic number, a version, the time of the snapshot, and the number of entries,
+    followed by each entry's fixed-size fields and then its variable-length ones, and a CRC-32 of everything before it.
+    """
+    taken_us: int = to_microseconds(datetime.now())
+    chunks: List[bytes] = [HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, taken_us, len(entries))]
+    for request, endpoint, timestamp, pending in entries:
+        kind: Optional[int] = ENDPOINT_KINDS.get(type(endpoint))
+        if kind == ENDPOINT_IP:
+            address, port = endpoint.ip_address.encode("utf-8"), endpoint.port
+        elif kind == ENDPOINT_UNIX:
+            address, port = endpoint.path.encode("utf-8"), 0
+        else:
+            raise ValueError(f"Cannot snapshot a subscription of {endpoint!r}")
+        request_bytes: bytes = str(request).encode("utf-8")
+        pending = pending or b""
+        chunks.append(
+            ENTRY.pack(kind, to_microseconds(timestamp), port, len(address), len(request_bytes), len(pending))
+        )
+        chunks.extend([address, request_bytes, pending])
+    data: bytes = b"".join(chunks)
+    data += CHECKSUM.pack(zlib.crc32(data))
+
+    temporary_path: Path = path.with_name(f"{path.name}.tmp")
+    with temporary_path.open("wb") as snapshot_file:
+        snapshot_file.write(data)
+        snapshot_file.flush()
+        os.fsync(snapshot_file.fileno())
+    os.replace(temporary_path, path)
+    if hasattr(os, "O_DIRECTORY"):
+        directory_fd: int = os.open(path.parent, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(directory_fd)
+        finally:
+            os.close(directory_fd)
+
+
+def read_snapshot(path: Path) -> Tuple[datetime, List[SnapshotEntry]]:
+    """
+    Read a snapshot of subscriptions from a file, and return the time it was taken and its entries. Raise `ValueError`
+    if the file is not a snapshot, is of an unsupported version, or is corrupt.
+    """
+    data: bytes = path.read_bytes()
+    if len(data) < HEADER.size + CHECKSUM.size:
+        raise ValueError(f"Truncated snapshot: {path}")
+    body: bytes = data[:-CHECKSUM.size]
+    if CHECKSUM.unpack_from(data, len(body))[0] != zlib.crc32(body):
+        raise ValueError(f"Corrupt snapshot: {path}")
+    magic, version, taken_us, count = HEADER.unpack_from(body)
+    if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+        raise ValueError(f"Unsupported snapshot: {path}")
+    entries: List[SnapshotEntry] = []
+    offset: int = HEADER.size
+    try:
+        for _ in range(count):
+            kind, timestamp_us, port, address_length, request_length, pending_length = ENTRY.unpack_from(body, offset)
+            offset += ENTRY.size
+            address: str = body[offset:offset + address_length].decode("utf-8")
+            offset += address_length
+            request_string: str = body[offset:offset + request_length].decode("utf-8")
+            offset += request_length
+            pending: Optional[bytes] = body[offset:offset + pending_length] or None
+            offset += pending_length
+            endpoint: Endpoint
+            if kind == ENDPOINT_IP:
+                endpoint = IPEndpoint(address, port)
+            elif kind == ENDPOINT_UNIX:
+                endpoint = UnixEndpoint(address)
+            else:
+                raise ValueError(f"Invalid endpoint kind in snapshot: {kind}")
+            entries.append(
+                (SubscriptionRequest.from_string(request_string), endpoint, from_microseconds(timestamp_us), pending)
+            )
+    except struct.error as e:
+        raise ValueError(f"Truncated snapshot: {path}") from e
+    if offset != len(body):
+        raise ValueError(f"Corrupt snapshot: {path}")
+    return from_microseconds(taken_us), entries
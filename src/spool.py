@@ -0,0 +1,252 @@
+"""
+Spool module
+"""
+from __future__ import annotations
+import os
+from pathlib import Path
+import re
+import struct
+import threading
+from typing import BinaryIO, List, Optional
+
+from src.filter import compile_filter, Predicate
+from src.subscription import Subscription, SubscriptionRequest
+
+
+RECORD_HEADER = struct.Struct("!I")
+
+DURABLE_NAME_PATTERN = re.compile(r"^[A-Za-z0-9_.-]{1,64}$")
+SPOOL_SUFFIX: str = ".spool"
+COMPACT_SUFFIX: str = ".compact"
+COMPACT_CHUNK_B: int = 65536
+
+
+class Spool(object):
+    """
+    Spool class
+
+    A bounded first-in, first-out queue of binary messages in a file. Messages are appended to the end of the file as
+    length-prefixed records and read from a position that only moves forward, so both only ever do sequential I/O, and
+    memory use stays the same however many messages are queued. Appends are buffered, and only synced to disk when
+    asked, so that syncing can be batched. The spool's size bounds the messages waiting to be read, not the file. The
+    file is emptied once every message in it has been read, and compacted once more of it has been read than is left
+    to read, so that it stays within twice the spool's size even if it is never read to the end.
+
+    A write that fails, such as when the disk is full, discards whatever had not yet been written, back to the last
+    complete record in the file, so that the file never holds a partial record that later appends would follow.
+
+    Messages are appended and read from different threads when the publisher is sharded, so every operation holds the
+    spool's lock.
+    """
+
+    def __init__(self: Spool, path: Path, max_size_b: int) -> None:
+        """
+        Initialize a `Spool` object with the path of its file and the most bytes of messages it may hold waiting to be
+        read. Any messages already in the file, left by an earlier publisher, are kept, to be read first.
+        """
+        self.path: Path = path
+        self.max_size_b: int = max_size_b
+        self._lock = threading.Lock()
+        self._writer: BinaryIO = path.open("ab")
+        self._reader: BinaryIO = path.open("rb")
+        self._size_b: int = self._writer.tell()
+        self._read_b: int = 0
+        self._is_dirty: bool = False
+        self.count: int = self._count_records()
+
+    def __len__(self: Spool) -> int:
+        """
+        Get the number of messages waiting to be read.
+        """
+        return self.count
+
+    @property
+    def size_b(self: Spool) -> int:
+        """
+        Get the number of bytes of messages waiting to be read.
+        """
+        return self._size_b - self._read_b
+
+    def append(self: Spool, data: bytes) -> bool:
+        """
+        Append a binary message, and return whether there was room for it. Raise `OSError` if it cannot be written, in
+        which case it is not spooled.
+        """
+        with self._lock:
+            if self.size_b + RECORD_HEADER.size + len(data) > self.max_size_b:
+                return False
+            try:
+                self._writer.write(RECORD_HEADER.pack(len(data)))
+                self._writer.write(data)
+            except OSError:
+                self._recover()
+                raise
+            self._size_b += RECORD_HEADER.size + len(data)
+            self.count += 1
+            self._is_dirty = True
+            return True
+
+    def read(self: Spool, max_count: int) -> List[bytes]:
+        """
+        Read up to a number of the oldest binary messages, emptying the file if none are left, or compacting it if
+        more of it has been read than is left to read.
+        """
+        with self._lock:
+            try:
+                self._writer.flush()
+            except OSError:
+                self._recover()
+            messages: List[bytes] = []
+            while len(messages) < max_count and self._read_b < self._size_b:
+                (length,) = RECORD_HEADER.unpack(self._reader.read(RECORD_HEADER.size))
+                messages.append(self._reader.read(length))
+                self._read_b += RECORD_HEADER.size + length
+            self.count -= len(messages)
+            if self._read_b >= self._size_b:
+                self._writer.truncate(0)
+                self._reader.seek(0)
+                self._size_b = self._read_b = 0
+                self.count = 0
+            elif self._read_b > self.size_b:
+                self._compact()
+            return messages
+
+    def sync(self: Spool) -> None:
+        """
+        Flush any appended messages and sync them to disk, if there are any since the last sync.
+        """
+        with self._lock:
+            if not self._is_dirty:
+                return
+            try:
+                self._writer.flush()
+                os.fsync(self._writer.fileno())
+            except OSError:
+                self._recover()
+                raise
+            self._is_dirty = False
+
+    def close(self: Spool) -> None:
+        """
+        Sync and close the file, keeping any messages in it.
+        """
+        self.sync()
+        self._writer.close()
+        self._reader.close()
+
+    def remove(self: Spool) -> None:
+        """
+        Close and delete the file, discarding any messages in it.
+        """
+        self._writer.close()
+        self._reader.close()
+        self.path.unlink(missing_ok=True)
+
+    def _compact(self: Spool) -> None:
+        """
+        Copy the messages waiting to be read to a new file, synced to disk, that then replaces the spool's file, so
+        that a crash leaves one or the other. A compaction that fails, such as when the disk is full, leaves the file
+        as it was, to be compacted at a later read.
+        """
+        compacted_path: Path = self.path.with_name(self.path.name + COMPACT_SUFFIX)
+        try:
+            with compacted_path.open("wb") as compacted:
+                chunk: bytes = self._reader.read(COMPACT_CHUNK_B)
+                while chunk:
+                    compacted.write(chunk)
+                    chunk = self._reader.read(COMPACT_CHUNK_B)
+                compacted.flush()
+                os.fsync(compacted.fileno())
+            os.replace(compacted_path, self.path)
+        except OSError:
+            compacted_path.unlink(missing_ok=True)
+            self._reader.seek(self._read_b)
+            return
+        self._writer.close()
+        self._reader.close()
+        self._writer = self.path.open("ab")
+        self._reader = self.path.open("rb")
+        self._size_b -= self._read_b
+        self._read_b = 0
+        self._is_dirty = False
+
+    def _recover(self: Spool) -> None:
+        """
+        Reopen the file after a write failed, discarding whatever appended messages had not been written, along with
+        any partial record they left at the end of the file.
+        """
+        for handle in [self._writer, self._reader]:
+            try:
+                handle.close()
+            except OSError:
+                pass
+        self._writer = self.path.open("ab")
+        self._reader = self.path.open("rb")
+        self._size_b = self._writer.tell()
+        self.count = self._count_records(self._read_b)
+
+    def _count_records(self: Spool, position_b: int = 0) -> int:
+        """
+        Count the records in the file from a position, dropping a partial record left at its end by a crash or a
+        failed write.
+        """
+        start_b: int = position_b
+        count: int = 0
+        while position_b + RECORD_HEADER.size <= self._size_b:
+            self._reader.seek(position_b)
+            (length,) = RECORD_HEADER.unpack(self._reader.read(RECORD_HEADER.size))
+            if position_b + RECORD_HEADER.size + length > self._size_b:
+                break
+            position_b += RECORD_HEADER.size + length
+            count += 1
+        if position_b < self._size_b:
+            self._writer.truncate(position_b)
+            self._size_b = position_b
+        self._reader.seek(start_b)
+        return count
+
+
+class Durable(object):
+    """
+    Durable subscription class
+
+    A named subscription to a publication that outlives the leases of the subscribers that take it up. While no
+    subscriber holds it, the messages it would have been sent are appended to its spool. A subscriber that takes it
+    up is sent the spooled messages first, at a paced rate, and the messages published meanwhile are appended to the
+    spool behind them, so that it receives every message in order before switching back to live delivery.
+    """
+
+    def __init__(
+        self: Durable,
+        name: str,
+        request: SubscriptionRequest,
+        spool_directory: Path,
+        spool_max_b: int
+    ) -> None:
+        """
+        Initialize a `Durable` object with its name, the subscription request that made it, and the directory and most
+        bytes of its spool. Raise `ValueError` if the name is not valid in a file name or the request's filter is
+        invalid, and `OSError` if the spool cannot be opened.
+        """
+        if not DURABLE_NAME_PATTERN.match(name):
+            raise ValueError(f"Invalid durable subscription name: {name}")
+        self.name: str = name
+        self.publication: str = request.publication
+        self.filter_expression: Optional[str] = request.filter_expression
+        self.predicate: Optional[Predicate] = (
+            compile_filter(self.filter_expression) if self.filter_expression is not None else None
+        )
+        self.schema_id: Optional[int] = request.schema_id
+        self.spool: Spool = Spool(spool_directory / f"{name}{SPOOL_SUFFIX}", spool_max_b)
+        self.subscription: Optional[Subscription] = None
+
+    def matches(self: Durable, request: SubscriptionRequest) -> bool:
+        """
+        Check whether a subscription request is for the same publication, filter, and schema, so that what was spooled
+        is what it would have been sent.
+        """
+        return (
+            request.publication == self.publication
+            and request.filter_expression == self.filter_expression
+            and request.schema_id == self.schema_id
+        )
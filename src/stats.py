@@ -0,0 +1,83 @@
+"""
+Stats module
+"""
+from __future__ import annotations
+import time
+from typing import Dict, Iterable, List, Union
+
+
+STAT_SEPARATOR: str = "="
+
+StatValue = Union[int, float]
+
+
+class RateMeter(object):
+    """
+    Rate meter class
+
+    Turns counters that only ever increase into per-second rates by sampling them. Sampling is meant to be done on a
+    timer rather than per message, so the rates cost nothing to keep up to date on the hot path, and reading them costs
+    nothing at all.
+    """
+
+    def __init__(self: RateMeter) -> None:
+        """
+        Initialize a `RateMeter` object with no rates.
+        """
+        self.rates: Dict[str, float] = {}
+        self._counts: Dict[str, int] = {}
+        self._sampled_s: float = time.monotonic()
+
+    def sample(self: RateMeter, counts: Dict[str, int]) -> None:
+        """
+        Sample the current values of counters, and update their rates to the average since the last sample.
+        """
+        now_s: float = time.monotonic()
+        elapsed_s: float = now_s - self._sampled_s
+        if elapsed_s <= 0:
+            return
+        self.rates = {name: (count - self._counts.get(name, 0)) / elapsed_s for name, count in counts.items()}
+        self._counts = dict(counts)
+        self._sampled_s = now_s
+
+
+def format_stats(stats: Dict[str, StatValue]) -> List[str]:
+    """
+    Format stats as `<NAME>=<VALUE>` tokens, sorted by name, with rates and other fractional values to one decimal
+    place.
+    """
+    return [
+        f"{name}{STAT_SEPARATOR}{value:.1f}" if isinstance(value, float) else f"{name}{STAT_SEPARATOR}{value}"
+        for name, value in sorted(stats.items())
+    ]
+
+
+def parse_stats(tokens: Iterable[str]) -> Dict[str, str]:
+    """
+    Parse `<NAME>=<VALUE>` tokens into stats by name. Raise `ValueError` if a token has no value.
+    """
+    stats: Dict[str, str] = {}
+    for token in tokens:
+        name, separator, value = token.rpartition(STAT_SEPARATOR)
+        if not separator or not name:
+            raise ValueError(f"Invalid stat: {token}")
+        stats[name] = value
+    return stats
+
+
+def paginate(tokens: List[str], max_page_b: int) -> List[List[str]]:
+    """
+    Split tokens into pages, in order, each holding as many as fit in a number of bytes once joined with commas and
+    appended to a message. A token too long to fit in any page is given a page of its own. There is always at least
+    one page.
+    """
+    pages: List[List[str]] = [[]]
+    page_b: int = 0
+    for token in tokens:
+        token_b: int = len(token.encode("utf-8")) + 1
+        if pages[-1] and page_b + token_b > max_page_b:
+            pages.append([])
+            page_b = 0
+        pages[-1].append(token)
+        page_b += token_b
+    return pages
@@ -0,0 +1,224 @@
+"""
+Submitter module
+"""
+from __future__ import annotations
+from datetime import datetime
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from src.message import MessageType, Message
+from src.schema import Schema, SchemaRegistry
+
+
+Record = Sequence[Any]
+
+
+def submit_messages(
+    schemas: SchemaRegistry,
+    publication: str,
+    records: Sequence[Record],
+    timestamp: datetime,
+    max_size_b: int
+) -> List[Message]:
+    """
+    Pack records of a publication, whose fields have already been converted to its schema's types if it is typed, into
+    submit messages. The records of a typed publication are packed column-wise into batches as large as fit in a
+    datagram of a size in bytes; those of an untyped publication, which has no batch format, are one per message.
+    """
+    schema: Optional[Schema] = schemas.for_publication(publication)
+    if schema is None:
+        return [Message(MessageType.SUBMIT, timestamp, publication, *record) for record in records]
+    max_records: int = schema.max_batch_records(max_size_b)
+    if max_records < 2:
+        return [Message(MessageType.SUBMIT, timestamp, publication, *record, schema=schema) for record in records]
+    return [
+        Message(
+            MessageType.SUBMIT,
+            timestamp,
+            publication,
+            *(list(column) for column in zip(*records[start:start + max_records])),
+            schema=schema,
+            records=len(records[start:start + max_records])
+        )
+        for start in range(0, len(records), max_records)
+    ]
+
+
+class Submitter(object):
+    """
+    Submitter class
+
+    Decouples submitting records from sending them. Records are put on a bounded queue without blocking, and a flusher
+    thread takes whatever has queued up since it last sent, packs the records of each publication into as few
+    datagrams as it can, and sends them. The busier the producer, the fuller each datagram, so the number of sends per
+    record falls as the rate rises, without holding back a record when the producer is idle. A send that would block,
+    because the receiver's socket buffer is full, is retried until it goes through, so the queue fills up behind it. A
+    full queue refuses further records rather than blocking, so that the producer sees the back-pressure and can
+    decide what to do.
+
+    Untyped publications have no batch format, so their records are still sent one per message, and each costs a
+    datagram of its own. Over a stream transport, which buffers writes until it is flushed, the messages sent for what
+    was taken off the queue together are written out at once, as the flusher thread flushes after each batch.
+    """
+
+    MAX_DRAIN_RECORDS: int = 65536
+    POLL_INTERVAL_S: float = 0.1
+    RETRY_INTERVAL_S: float = 0.001
+
+    def __init__(
+        self: Submitter,
+        send: Callable[[Message], None],
+        schemas: SchemaRegistry,
+        max_size_b: int,
+        max_queue_depth: int,
+        flush_sent: Optional[Callable[[], None]] = None
+    ) -> None:
+        """
+        Initialize a `Submitter` object with the function that sends a message, the schemas of typed publications, the
+        most bytes a datagram may hold, the most records that may be queued, and optionally a function that writes out
+        whatever the sends have buffered, called after each batch.
+        """
+        self._send = send
+        self._flush_sent: Optional[Callable[[], None]] = flush_sent
+        self._schemas: SchemaRegistry = schemas
+        self._max_size_b: int = max_size_b
+        self.max_queue_depth: int = max_queue_depth
+        self._queue: queue.Queue = queue.Queue(max_queue_depth)
+        self._pending: int = 0
+        self._pending_changed = threading.Condition()
+        self._running = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.put_count: int = 0
+        self.refused_count: int = 0
+        self.sent_count: int = 0
+        self.blocked_count: int = 0
+        self.failed_count: int = 0
+
+    def __len__(self: Submitter) -> int:
+        """
+        Get the number of records queued or being sent.
+        """
+        return self._pending
+
+    @property
+    def is_running(self: Submitter) -> bool:
+        """
+        Check whether the flusher thread is running.
+        """
+        return self._running.is_set()
+
+    def start(self: Submitter) -> None:
+        """
+        Start the flusher thread.
+        """
+        self._running.set()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self: Submitter, timeout_s: Optional[float] = None) -> bool:
+        """
+        Send what is queued, waiting up to the timeout (in seconds), then stop the flusher thread. Return whether
+        everything queued was sent.
+        """
+        flushed: bool = self.flush(timeout_s)
+        self._running.clear()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        return flushed
+
+    def put(self: Submitter, publication: str, record: Record) -> bool:
+        """
+        Queue a record of a publication for sending, without blocking. Return whether there was room for it.
+        """
+        with self._pending_changed:
+            try:
+                self._queue.put_nowait((publication, record))
+            except queue.Full:
+                self.refused_count += 1
+                return False
+            self._pending += 1
+        self.put_count += 1
+        return True
+
+    def flush(self: Submitter, timeout_s: Optional[float] = None) -> bool:
+        """
+        Wait until every queued record has been sent, or the timeout (in seconds) expires. Return whether they were.
+        Records queued while the flusher thread is not running are not waited for.
+        """
+        with self._pending_changed:
+            if not self.is_running:
+                return not self._pending
+            return self._pending_changed.wait_for(lambda: not self._pending, timeout_s)
+
+    def metrics(self: Submitter) -> Dict[str, int]:
+        """
+        Get the depth of the queue and the counters of records and messages.
+        """
+        return {
+            "depth": self._queue.qsize(),
+            "max-depth": self.max_queue_depth,
+            "put": self.put_count,
+            "refused": self.refused_count,
+            "sent": self.sent_count,
+            "blocked": self.blocked_count,
+            "failed": self.failed_count
+        }
+
+    def _run(self: Submitter) -> None:
+        """
+        Send queued records until stopped.
+        """
+        while self._running.is_set():
+            try:
+                first: Tuple[str, Record] = self._queue.get(timeout=self.POLL_INTERVAL_S)
+            except queue.Empty:
+                continue
+            drained: List[Tuple[str, Record]] = [first]
+            while len(drained) < self.MAX_DRAIN_RECORDS:
+                try:
+                    drained.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            self._send_drained(drained)
+            with self._pending_changed:
+                self._pending -= len(drained)
+                self._pending_changed.notify_all()
+
+    def _send_drained(self: Submitter, drained: List[Tuple[str, Record]]) -> None:
+        """
+        Send records taken off the queue, packed by publication, in the order each publication's were queued, then
+        write out whatever the sends have buffered.
+        """
+        by_publication: Dict[str, List[Record]] = {}
+        for publication, record in drained:
+            by_publication.setdefault(publication, []).append(record)
+        timestamp: datetime = datetime.now()
+        for publication, records in by_publication.items():
+            for message in submit_messages(self._schemas, publication, records, timestamp, self._max_size_b):
+                self._send_retrying(message)
+        if self._flush_sent is not None:
+            self._flush_sent()
+
+    def _send_retrying(self: Submitter, message: Message) -> None:
+        """
+        Send a message, retrying while the send would block, unless the flusher thread is stopped meanwhile.
+        """
+        while True:
+            try:
+                self._send(message)
+                self.sent_count += 1
+                return
+            except BlockingIOError as e:
+                if not self._running.is_set():
+                    self.failed_count += 1
+                    print(f"Failed to send submitted records of {message.payload[0]}: {e}")
+                    return
+                self.blocked_count += 1
+                time.sleep(self.RETRY_INTERVAL_S)
+            except (OSError, ValueError) as e:
+                self.failed_count += 1
+                print(f"Failed to send submitted records of {message.payload[0]}: {e}")
+                return
@@ -1,102 +1,478 @@
-"""
-Subscriber module
-"""
-from __future__ import annotations
-import asyncio
-from datetime import datetime
-from random import randint, random
-import socket
-import time
-from typing import Callable, List, Optional
-
-from src.configuration import SubscriberConfiguration
-from src.ipendpoint import IPEndpoint
-from src.message import MessageType, Message
-from src.messager import MessageProcessor, Messager
-
-
-class Subscriber(Messager):
-    """
-    Subscriber class
-    """
-
-    def __init__(self: Subscriber, configuration: SubscriberConfiguration) -> None:
-        """
-        Initialize a Subscriber object
-        """
-        super().__init__(configuration)
-        self._publisher_endpoint = configuration.publisher_endpoint
-        self._subscriptions: List[str] = configuration.subscriptions
-        self._publications: List[str] = configuration.publications
-        self._is_subscribed: bool = False
-        self._responses_received_count: int = 0
-        self._publications_received_count: int = 0
-        self._requests_sent_count: int = 0
-        self._submissions_sent_count: int = 0
-        self._message_dispatcher: Dict[str, MessageProcessor] = {
-            MessageType.SUBSCRIBE: self._process_subscribe,
-            MessageType.PUBLISH: self._process_publish
-        }
-        print("Initialized a Subscriber object")
-        print(f"  Publisher endpoint: {self._publisher_endpoint}")
-        print(f"  Subscriptions:      {self._subscriptions}")
-        print(f"  Publications:       {self._publications}")
-
-    def run(self: Subscriber) -> None:
-        """
-        Run the Subscriber
-        """
-        if not self._is_subscribed:
-            while True:
-                try:
-                    if self.subscribe():
-                        break
-                except ConnectionResetError:
-                    continue
-        super().run()
-
-    def subscribe(self: Subscriber) -> bool:
-        """
-        Subscribe to publications from the Publisher
-        """
-        subscribe_message = Message(MessageType.SUBSCRIBE, datetime.now(), *self._subscriptions)
-        self._send_message(subscribe_message, self._publisher_endpoint)
-        self._requests_sent_count += 1
-        message, remote_endpoint = self._receive_message()
-        self._process_message(message, remote_endpoint)
-        return self._is_subscribed
-
-    def submit(self: Subscriber, publication: str, *data: str) -> None:
-        """
-        Submit data to the Publisher
-        """
-        submit_message = Message(MessageType.SUBMIT, datetime.now(), publication, *data)
-        self._send_message(submit_message, self._publisher_endpoint)
-        self._submissions_sent_count += 1
-
-    def _execute(self: Subscriber) -> None:
-        """
-        Main client code
-        """
-        if self._subscriptions:
-            message, remote_endpoint = self._receive_message()
-            self._process_message(message, remote_endpoint)
-        elif self._publications:
-            for publication in self._publications:
-                self.submit(publication, f"{random():.6f}", f"{random():.6f}", f"{random():.6f}")
-                time.sleep(randint(0, 10))
-        else:
-            print("Nothing to do")
-
-    def _process_subscribe(self: Subscriber, subscribe_message: Message, endpoint: IPEndpoint) -> None:
-        """
-        Process a subscription response
-        """
-        self._is_subscribed = True
-        self._responses_received_count += 1
-
-    def _process_publish(self: Subscriber, publish_message: Message, endpoint: IPEndpoint) -> None:
-        """
-        Process a publish message
-        """
-        self._publications_received_count += 1
+"""
+Subscriber module
+"""
+from __future__ import annotations
+import asyncio
+from datetime import datetime
+from random import randint, random
+import socket
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from src import columnar
+from src.clock import Clock
+from src.configuration import SubscriberConfiguration
+from src.endpoint import Endpoint
+from src.latency import LatencyTracker
+from src.message import MessageType, Message
+from src.messager import Messager
+from src.profiling import STAGE_DECODE, STAGE_RECEIVE
+from src.schema import Schema
+from src.stats import parse_stats
+from src.submitter import Record, submit_messages, Submitter
+from src.subscription import SCHEMA, SubscriptionRequest
+from src.transport import Transport
+
+
+class PublisherSession(object):
+    """
+    Publisher session class
+
+    A Subscriber's subscriptions to one publisher, and whether the publisher has accepted them. Each session renews its
+    leases on its own interval, and sends its subscription requests again in place of heartbeats until they are
+    accepted, so that a publisher that is down or slow to respond does not hold up the others.
+    """
+
+    def __init__(
+        self: PublisherSession,
+        endpoint: Endpoint,
+        subscriptions: List[str],
+        heartbeat_interval_s: float
+    ) -> None:
+        """
+        Initialize a `PublisherSession` object with the publisher endpoint, the subscriptions to it, and the interval
+        between heartbeats (in seconds).
+        """
+        self.endpoint: Endpoint = endpoint
+        self.subscriptions: List[str] = subscriptions
+        self.heartbeat_interval_s: float = heartbeat_interval_s
+        self.is_subscribed: bool = False
+
+
+class Subscriber(Messager):
+    """
+    Subscriber class
+
+    A Subscriber can subscribe to publications of several publishers at once, through a single transport. Responses are
+    told apart by the endpoint they come from, so publishers should be given by the addresses they reply from.
+    """
+
+    def __init__(
+        self: Subscriber,
+        configuration: SubscriberConfiguration,
+        transport: Optional[Transport] = None,
+        clock: Optional[Clock] = None
+    ) -> None:
+        """
+        Initialize a Subscriber object, optionally with a transport and a clock in place of the configured transport
+        and the system clocks
+        """
+        super().__init__(configuration, configuration.publisher_endpoint, transport, clock)
+        self._publisher_endpoint = configuration.publisher_endpoint
+        self._endpoint: Optional[Endpoint] = configuration.endpoint
+        self._subscriptions: List[str] = configuration.subscriptions
+        self._publications: List[str] = configuration.publications
+        self._sessions: Dict[Endpoint, PublisherSession] = {
+            endpoint: PublisherSession(endpoint, subscriptions, heartbeat_interval_s)
+            for endpoint, subscriptions, heartbeat_interval_s in configuration.publishers
+            if subscriptions
+        }
+        self._stats_pages: Dict[int, List[str]] = {}
+        self._stats_page_count: Optional[int] = None
+        self._responses_received_count: int = 0
+        self._publications_received_count: int = 0
+        self._requests_sent_count: int = 0
+        self._submissions_sent_count: int = 0
+        self._heartbeats_sent_count: int = 0
+        self.latency = LatencyTracker()
+        self._arrays: Dict[str, Any] = {}
+        self._submitter = Submitter(
+            self._send_submission,
+            self.schemas,
+            self._buffer_size_b,
+            configuration.submit_queue_depth,
+            self._flush_transports
+        )
+        self._add_handlers({
+            MessageType.SUBSCRIBE: self._process_subscribe,
+            MessageType.UNSUBSCRIBE: self._process_unsubscribe,
+            MessageType.PUBLISH: self._process_publish,
+            MessageType.STATS: self._process_stats
+        })
+        for session in self._sessions.values():
+            self._add_timer(session.heartbeat_interval_s, lambda session=session: self._renew(session))
+        print("Initialized a Subscriber object")
+        print(f"  Publisher endpoint: {self._publisher_endpoint}")
+        print(f"  Subscriptions:      {self._subscriptions}")
+        print(f"  Publications:       {self._publications}")
+        for endpoint, subscriptions, _ in configuration.publishers[1:]:
+            print(f"  Also subscribing:   {subscriptions} from {endpoint}")
+
+    def run(self: Subscriber) -> None:
+        """
+        Run the Subscriber
+        """
+        self.bind()
+        self.subscribe()
+        try:
+            super().run()
+        finally:
+            if any(session.is_subscribed for session in self._sessions.values()):
+                try:
+                    self.unsubscribe()
+                except OSError:
+                    pass
+            if self.latency.histograms:
+                print(self.latency.summary())
+
+    def bind(self: Subscriber) -> None:
+        """
+        Bind to the Subscriber's own endpoint, if it has one, so that the Publisher can send to it
+        """
+        if self._endpoint is not None:
+            self._transport.bind(self._endpoint)
+
+    def subscribe(self: Subscriber) -> bool:
+        """
+        Subscribe to publications from every publisher that has not yet accepted them, wait up to the socket timeout
+        for their responses, and return whether every publisher has accepted them. Publishers that have not are sent
+        the requests again in place of their next heartbeat
+        """
+        pending: List[PublisherSession] = [s for s in self._sessions.values() if not s.is_subscribed]
+        for session in pending:
+            self._send_subscribe(session)
+        return self._process_until(lambda: all(s.is_subscribed for s in pending), self._socket_timeout_s)
+
+    def unsubscribe(self: Subscriber, *publications: str) -> None:
+        """
+        Unsubscribe from publications from every publisher subscribed to, or from all of them if none are given. The
+        publishers stop sending to this Subscriber immediately instead of when its leases expire. A publisher that
+        cannot be reached is skipped; its leases expire instead.
+        """
+        for session in self._sessions.values():
+            if not session.is_subscribed:
+                continue
+            unsubscribe_message = Message(MessageType.UNSUBSCRIBE, datetime.now(), *publications)
+            try:
+                self._send_message(unsubscribe_message, session.endpoint)
+                self._requests_sent_count += 1
+            except OSError as e:
+                print(f"Failed to unsubscribe from {session.endpoint}: {e}")
+            if not publications:
+                session.is_subscribed = False
+        self._flush_transports()
+
+    def heartbeat(self: Subscriber) -> None:
+        """
+        Renew the leases of all subscriptions with every publisher subscribed to
+        """
+        for session in self._sessions.values():
+            if session.is_subscribed:
+                self._send_heartbeat(session)
+
+    def stats(self: Subscriber, retries: int = 3) -> Dict[str, str]:
+        """
+        Request the Publisher's stats and return them by name. Every page is requested at once; any that have not
+        arrived within the socket timeout are then requested again one by one, up to a number of retries. Raise
+        `TimeoutError` if pages are still missing. Other messages received in the meantime are processed as usual
+        """
+        self._stats_pages = {}
+        self._stats_page_count = None
+        requested: List[Optional[int]] = [None]
+        for _ in range(1 + retries):
+            for page in requested:
+                stats_message = Message(MessageType.STATS, datetime.now(), *([] if page is None else [str(page)]))
+                self._send_message(stats_message, self._publisher_endpoint)
+                self._requests_sent_count += 1
+            if self._process_until(self._has_all_stats_pages, self._socket_timeout_s):
+                pages: Dict[int, List[str]] = self._stats_pages
+                return parse_stats(token for page in range(self._stats_page_count) for token in pages[page])
+            requested = [None] if self._stats_page_count is None else [
+                page for page in range(self._stats_page_count) if page not in self._stats_pages
+            ]
+        raise TimeoutError(f"No complete stats from {self._publisher_endpoint}")
+
+    def submit(self: Subscriber, publication: str, *data: Any) -> None:
+        """
+        Submit data to the Publisher, in binary if the publication is typed
+        """
+        schema: Optional[Schema] = self.schemas.for_publication(publication)
+        if schema is None:
+            submit_message = Message(MessageType.SUBMIT, datetime.now(), publication, *data)
+        else:
+            submit_message = Message(
+                MessageType.SUBMIT, datetime.now(), publication, *schema.coerce(data), schema=schema
+            )
+        self._send_submission(submit_message)
+
+    def submit_many(self: Subscriber, publication: str, records: Iterable[Record]) -> int:
+        """
+        Submit records to the Publisher, packed column-wise into as few messages as the buffer size allows if the
+        publication is typed, and return the number of messages sent. Raise `ValueError` if any record does not fit the
+        publication's schema, before anything is sent
+        """
+        records = self._coerce_records(publication, records)
+        messages: List[Message] = submit_messages(
+            self.schemas, publication, records, datetime.now(), self._buffer_size_b
+        )
+        for message in messages:
+            self._send_submission(message)
+        return len(messages)
+
+    def submit_nowait(self: Subscriber, publication: str, *data: Any) -> bool:
+        """
+        Queue data for a background thread to submit to the Publisher, packed together with whatever else is queued
+        for the publication, without blocking. Return whether there was room in the queue; when there is not, the data
+        is not submitted, and the caller should back off or call `flush`. Raise `ValueError` if the data does not fit
+        the publication's schema.
+
+        Only the records of a typed publication are packed into batches. Those of an untyped publication, which has no
+        batch format, are still sent one per message, so each costs a datagram of its own; over a stream transport they
+        are written out together with the rest of what was queued
+        """
+        record: Record = self._coerce_records(publication, [data])[0]
+        if not self._submitter.is_running:
+            self._submitter.start()
+        return self._submitter.put(publication, record)
+
+    def flush(self: Subscriber, timeout_s: Optional[float] = None) -> bool:
+        """
+        Wait until everything queued by `submit_nowait` has been sent, or the timeout (in seconds) expires, and return
+        whether it was
+        """
+        return self._submitter.flush(timeout_s)
+
+    def close(self: Subscriber) -> None:
+        """
+        Send anything queued by `submit_nowait`, waiting up to the socket timeout, then close every transport
+        """
+        if self._submitter.is_running:
+            self._submitter.stop(self._socket_timeout_s)
+        super().close()
+
+    def submit_array(self: Subscriber, publication: str, array: Any) -> int:
+        """
+        Submit the records of a NumPy structured array to the Publisher, packed column-wise into as few messages as the
+        buffer size allows, and return the number of messages sent. The publication must be typed, and the array's
+        fields are matched to its schema's by position
+        """
+        schema: Optional[Schema] = self.schemas.for_publication(publication)
+        if schema is None:
+            raise ValueError(f"Cannot submit an array to untyped publication {publication}")
+        messages_sent_count: int = 0
+        max_records: int = schema.max_batch_records(self._buffer_size_b)
+        for batch_message in columnar.batches(schema, array, datetime.now(), max_records):
+            self._send_submission(batch_message)
+            messages_sent_count += 1
+        return messages_sent_count
+
+    def receive_array(self: Subscriber, publication: str) -> Any:
+        """
+        Receive the next records of a typed publication as a NumPy structured array. A columnar batch is decoded
+        straight into an array preallocated for the publication, and a single record becomes an array of one; other
+        messages are processed as usual while waiting, and malformed ones are dropped as `receive` drops them. The array
+        returned is a view that is overwritten by the next call for the publication, so copy it to keep it
+        """
+        schema: Optional[Schema] = self.schemas.for_publication(publication)
+        if schema is None:
+            raise ValueError(f"Cannot receive an array from untyped publication {publication}")
+        out = self._arrays.get(publication)
+        if out is None:
+            record_dtype = columnar.dtype(schema)
+            out = self._arrays[publication] = columnar.numpy.empty(
+                max(1, schema.max_batch_records(self._buffer_size_b)), dtype=record_dtype
+            )
+
+        def decode(binary_message: bytes) -> Any:
+            if columnar.is_batch(binary_message, schema):
+                return columnar.decode_into(schema, binary_message, out)
+            return self._decode_message(binary_message)
+
+        while True:
+            binary_message, remote_endpoint = self._run_stage(STAGE_RECEIVE, self._receive_binary_message)
+            decoded: Any = self._run_stage(
+                STAGE_DECODE, self._decode_received_with, decode, binary_message, remote_endpoint
+            )
+            if decoded is None:
+                continue
+            self._messages_received_count += 1
+            self._bytes_received_count += len(binary_message)
+            if isinstance(decoded, int):
+                self._publications_received_count += 1
+                return out[:decoded]
+            if decoded.message_type == MessageType.PUBLISH and decoded.payload[:1] == [publication]:
+                self._publications_received_count += 1
+                out[0] = tuple(schema.coerce(decoded.payload[1:]))
+                self._message_pool.release(decoded)
+                return out[:1]
+            self._process_message(decoded, remote_endpoint)
+            self._message_pool.release(decoded)
+
+    def _coerce_records(self: Subscriber, publication: str, records: Iterable[Record]) -> List[Record]:
+        """
+        Convert the fields of records to the publication's schema's types, if it is typed. Raise `ValueError` if any
+        cannot be
+        """
+        schema: Optional[Schema] = self.schemas.for_publication(publication)
+        if schema is None:
+            return list(records)
+        return [schema.coerce(record) for record in records]
+
+    def _send_submission(self: Subscriber, submit_message: Message) -> None:
+        """
+        Send a submit message to the Publisher
+        """
+        self._send_message(submit_message, self._publisher_endpoint)
+        self._submissions_sent_count += 1
+
+    def _renew(self: Subscriber, session: PublisherSession) -> None:
+        """
+        Renew the leases of a session's subscriptions, or send its subscription requests again if they have not yet
+        been accepted. If the heartbeat cannot be sent the leases may lapse, so the subscription requests are sent
+        again at the next renewal
+        """
+        if not session.is_subscribed:
+            self._send_subscribe(session)
+        elif not self._send_heartbeat(session):
+            session.is_subscribed = False
+
+    def _send_subscribe(self: Subscriber, session: PublisherSession) -> None:
+        """
+        Send a session's subscription requests to its publisher. A publisher that cannot be reached is tried again at
+        the session's next renewal
+        """
+        subscribe_message = Message(MessageType.SUBSCRIBE, datetime.now(), *self._subscription_requests(session))
+        try:
+            self._send_message(subscribe_message, session.endpoint)
+        except OSError as e:
+            print(f"Failed to subscribe to {session.endpoint}: {e}")
+            return
+        self._requests_sent_count += 1
+
+    def _send_heartbeat(self: Subscriber, session: PublisherSession) -> bool:
+        """
+        Send a heartbeat to a session's publisher and return whether it was sent. A publisher that cannot be reached
+        is skipped, so that the other sessions are still renewed
+        """
+        heartbeat_message = Message(MessageType.HEARTBEAT, datetime.now())
+        try:
+            self._send_message(heartbeat_message, session.endpoint)
+        except OSError as e:
+            print(f"Failed to renew leases with {session.endpoint}: {e}")
+            return False
+        self._heartbeats_sent_count += 1
+        return True
+
+    def _process_until(self: Subscriber, is_done: Callable[[], bool], timeout_s: float) -> bool:
+        """
+        Receive and process messages, running any timers that fall due, until a condition holds or the timeout (in
+        seconds) passes, and return whether the condition holds
+        """
+        deadline_s: float = time.monotonic() + timeout_s
+        while not is_done():
+            remaining_s: float = deadline_s - time.monotonic()
+            if remaining_s <= 0:
+                return False
+            if not self._received:
+                self._received.extend(self._poll_transports(min(remaining_s, self._select_timeout_s())))
+                self._run_timers()
+                continue
+            binary_message, remote_endpoint = self._received.popleft()
+            message: Optional[Message] = self._decode_received(binary_message, remote_endpoint)
+            if message is None:
+                continue
+            self._messages_received_count += 1
+            self._bytes_received_count += len(binary_message)
+            self._process_message(message, remote_endpoint)
+            self._message_pool.release(message)
+        return True
+
+    def _has_all_stats_pages(self: Subscriber) -> bool:
+        """
+        Check whether every page of the stats requested has been received
+        """
+        if self._stats_page_count is None:
+            return False
+        return all(page in self._stats_pages for page in range(self._stats_page_count))
+
+    def _subscription_requests(self: Subscriber, session: PublisherSession) -> List[str]:
+        """
+        Get the subscription requests to send to a session's publisher, asking for typed publications in binary with
+        the expected schema
+        """
+        requests: List[str] = []
+        for request_string in session.subscriptions:
+            request = SubscriptionRequest.from_string(request_string)
+            schema: Optional[Schema] = self.schemas.for_publication(request.publication)
+            if schema is not None:
+                request.options[SCHEMA] = f"{schema.id:08x}"
+            requests.append(str(request))
+        return requests
+
+    def _execute(self: Subscriber) -> None:
+        """
+        Main client code
+        """
+        if self._sessions:
+            message, remote_endpoint = self._receive_message()
+            self._process_message(message, remote_endpoint)
+            self._message_pool.release(message)
+        elif self._publications:
+            for publication in self._publications:
+                self.submit(publication, f"{random():.6f}", f"{random():.6f}", f"{random():.6f}")
+                time.sleep(randint(0, 10))
+        else:
+            print("Nothing to do")
+
+    def _process_subscribe(self: Subscriber, subscribe_message: Message, endpoint: Endpoint) -> None:
+        """
+        Process a subscription response from the publisher of a session, which echoes back the subscription requests
+        it accepted. The session is only subscribed if at least one was; otherwise its requests are sent again in place
+        of its next heartbeat
+        """
+        session: Optional[PublisherSession] = self._sessions.get(endpoint)
+        if session is None:
+            print(f"  Subscription response from unknown publisher {endpoint}")
+            return
+        self._responses_received_count += 1
+        rejected: List[str] = [r for r in self._subscription_requests(session) if r not in subscribe_message.payload]
+        if rejected:
+            print(f"  Subscription requests rejected by {endpoint}: {rejected}")
+        if len(rejected) < len(session.subscriptions):
+            session.is_subscribed = True
+
+    def _process_unsubscribe(self: Subscriber, unsubscribe_message: Message, endpoint: Endpoint) -> None:
+        """
+        Process an unsubscription response
+        """
+        self._responses_received_count += 1
+
+    def _process_stats(self: Subscriber, stats_message: Message, endpoint: Endpoint) -> None:
+        """
+        Process a page of stats, of the form `stats,<TIMESTAMP>,<PAGE>,<PAGES>,<STATS>`. A page that is malformed, or
+        whose number of pages differs from that of the pages already received, is dropped
+        """
+        self._responses_received_count += 1
+        try:
+            if len(stats_message.payload) < 2:
+                raise ValueError("no page number")
+            page, page_count = int(stats_message.payload[0]), int(stats_message.payload[1])
+            if not 0 <= page < page_count:
+                raise ValueError(f"no such page {page} of {page_count}")
+            if self._stats_page_count is not None and page_count != self._stats_page_count:
+                raise ValueError(f"expected {self._stats_page_count} pages, not {page_count}")
+            parse_stats(stats_message.payload[2:])
+        except ValueError as e:
+            print(f"  Dropped stats page from {endpoint}: {e}")
+            self._count_drop("invalid-stats")
+            return
+        self._stats_page_count = page_count
+        self._stats_pages[page] = stats_message.payload[2:]
+
+    def _process_publish(self: Subscriber, publish_message: Message, endpoint: Endpoint) -> None:
+        """
+        Process a publish message, recording its latencies if it carries a trace
+        """
+        if publish_message.trace is not None and publish_message.payload:
+            self.latency.record(publish_message.payload[0], publish_message.trace, datetime.now())
+        self._publications_received_count += 1
@@ -0,0 +1,507 @@
+"""
+Subscription module
+"""
+from __future__ import annotations
+from datetime import datetime
+from typing import Dict, List, Optional, Set, Tuple, TYPE_CHECKING
+
+from src.endpoint import Endpoint
+from src.filter import compile_filter, Predicate
+
+if TYPE_CHECKING:
+    from src.spool import Spool
+
+
+OPTION_SEPARATOR: str = ";"
+OPTION_ASSIGNMENT: str = "="
+
+FILTER: str = "filter"
+INTERVAL_MS: str = "interval-ms"
+TRACE: str = "trace"
+SCHEMA: str = "schema"
+GROUP: str = "group"
+DURABLE: str = "durable"
+
+TRACE_VALUES: Dict[str, bool] = {"0": False, "false": False, "1": True, "true": True}
+
+MIN_INTERVAL_MS: int = 1
+MAX_INTERVAL_MS: int = 60000
+
+
+class SubscriptionRequest(object):
+    """
+    Subscription request class
+
+    One token of a subscribe message payload: a publication, optionally followed by `;`-separated `<OPTION>=<VALUE>`
+    options, e.g. `publication;filter=2>30.5`.
+    """
+
+    @classmethod
+    def from_string(cls: SubscriptionRequest, request_string: str) -> SubscriptionRequest:
+        """
+        Create a `SubscriptionRequest` object from a subscribe message payload token. Raise `ValueError` if the token
+        is malformed.
+        """
+        publication, *option_strings = request_string.split(OPTION_SEPARATOR)
+        options: Dict[str, str] = {}
+        for option_string in option_strings:
+            name, assignment, value = option_string.partition(OPTION_ASSIGNMENT)
+            if not assignment:
+                raise ValueError(f"Invalid subscription option: {option_string}")
+            options[name.strip().lower()] = value.strip()
+        return cls(publication, **options)
+
+    @classmethod
+    def from_subscription(
+        cls: SubscriptionRequest,
+        publication: str,
+        subscription: Subscription
+    ) -> SubscriptionRequest:
+        """
+        Create the `SubscriptionRequest` object that would make a subscription to a publication.
+        """
+        options: Dict[str, str] = {}
+        if subscription.filter_expression is not None:
+            options[FILTER] = subscription.filter_expression
+        if subscription.interval_s is not None:
+            options[INTERVAL_MS] = str(round(subscription.interval_s * 1000))
+        if subscription.trace:
+            options[TRACE] = "1"
+        if subscription.schema_id is not None:
+            options[SCHEMA] = f"{subscription.schema_id:08x}"
+        if subscription.group is not None:
+            options[GROUP] = subscription.group
+        if subscription.durable is not None:
+            options[DURABLE] = subscription.durable
+        return cls(publication, **options)
+
+    def __init__(self: SubscriptionRequest, publication: str, **options: str) -> None:
+        """
+        Initialize a `SubscriptionRequest` object with a publication and any options. Raise `ValueError` if the
+        publication is empty.
+        """
+        if not publication:
+            raise ValueError("Subscription request has no publication")
+        self.publication: str = publication
+        self.options: Dict[str, str] = options
+
+    def __str__(self: SubscriptionRequest) -> str:
+        """
+        Format a `SubscriptionRequest` object as a subscribe message payload token.
+        """
+        return OPTION_SEPARATOR.join(
+            [self.publication, *(f"{name}{OPTION_ASSIGNMENT}{value}" for name, value in self.options.items())]
+        )
+
+    @property
+    def filter_expression(self: SubscriptionRequest) -> Optional[str]:
+        """
+        Get the filter expression, if any.
+        """
+        return self.options.get(FILTER) or None
+
+    @property
+    def interval_s(self: SubscriptionRequest) -> Optional[float]:
+        """
+        Get the conflation interval in seconds, if any. Raise `ValueError` if it is invalid.
+        """
+        if INTERVAL_MS not in self.options:
+            return None
+        interval_ms: int = int(self.options[INTERVAL_MS])
+        if MIN_INTERVAL_MS <= interval_ms <= MAX_INTERVAL_MS:
+            return interval_ms / 1000
+        raise ValueError(f"Invalid conflation interval: {interval_ms} ms")
+
+    @property
+    def trace(self: SubscriptionRequest) -> bool:
+        """
+        Check whether published messages should carry a trace. Raise `ValueError` if the option is invalid.
+        """
+        if TRACE not in self.options:
+            return False
+        trace: Optional[bool] = TRACE_VALUES.get(self.options[TRACE].lower())
+        if trace is None:
+            raise ValueError(f"Invalid trace option: {self.options[TRACE]}")
+        return trace
+
+    @property
+    def schema_id(self: SubscriptionRequest) -> Optional[int]:
+        """
+        Get the ID of the schema the subscriber expects, if any. Raise `ValueError` if it is invalid.
+        """
+        if SCHEMA not in self.options:
+            return None
+        return int(self.options[SCHEMA], 16)
+
+    @property
+    def group(self: SubscriptionRequest) -> Optional[str]:
+        """
+        Get the name of the queue group to join, if any.
+        """
+        return self.options.get(GROUP) or None
+
+    @property
+    def durable(self: SubscriptionRequest) -> Optional[str]:
+        """
+        Get the name of the durable subscription to take up, if any.
+        """
+        return self.options.get(DURABLE) or None
+
+
+class Subscription(object):
+    """
+    Subscription class
+
+    A subscriber's subscription to one publication, as held by a publisher.
+
+    A subscription with a conflation interval is sent at most one message per interval. Messages that arrive sooner
+    replace each other, so that only the latest is pending when the interval elapses.
+
+    A traced subscription is sent messages that carry a trace of when they were submitted, received by the publisher,
+    and sent on by it. A subscription with a schema ID is sent messages in binary.
+
+    A subscription in a queue group shares the messages of its publication with the other members of the group, each
+    message going to only one of them.
+
+    A subscription that takes up a durable subscription is sent what was spooled for it while no subscriber held it
+    before any live message. Live messages are appended to the spool behind the spooled ones until it has drained.
+    """
+
+    def __init__(
+        self: Subscription,
+        endpoint: Endpoint,
+        timestamp: datetime,
+        filter_expression: Optional[str] = None,
+        interval_s: Optional[float] = None,
+        trace: bool = False,
+        schema_id: Optional[int] = None,
+        group: Optional[str] = None,
+        durable: Optional[str] = None
+    ) -> None:
+        """
+        Initialize a `Subscription` object with the subscriber endpoint, the time the subscription was made, an
+        optional filter expression, an optional conflation interval (in seconds), whether it is traced, an optional
+        schema ID, an optional queue group, and the optional name of a durable subscription.
+        """
+        self.endpoint: Endpoint = endpoint
+        self.timestamp: datetime = timestamp
+        self.filter_expression: Optional[str] = filter_expression
+        self.interval_s: Optional[float] = interval_s
+        self.trace: bool = trace
+        self.schema_id: Optional[int] = schema_id
+        self.group: Optional[str] = group
+        self.durable: Optional[str] = durable
+        self.next_send_s: float = 0.0
+        self.spool: Optional[Spool] = None
+
+
+class QueueGroup(object):
+    """
+    Queue group class
+
+    The subscriptions to a publication that compete for its messages, each message going to the next member in turn.
+    Picking a member takes constant time however many there are. Members are removed by replacing the list of members
+    rather than changing it, so a member can be picked without holding the lock of the registry the group belongs to.
+    """
+
+    def __init__(self: QueueGroup, name: str, filter_expression: Optional[str]) -> None:
+        """
+        Initialize an empty `QueueGroup` object with a name and the filter expression its members share, if any.
+        """
+        self.name: str = name
+        self.filter_expression: Optional[str] = filter_expression
+        self.members: List[Subscription] = []
+        self._cursor: int = 0
+
+    def __len__(self: QueueGroup) -> int:
+        """
+        Get the number of members.
+        """
+        return len(self.members)
+
+    def add(self: QueueGroup, subscription: Subscription) -> None:
+        """
+        Add a member.
+        """
+        self.members = [*self.members, subscription]
+
+    def remove(self: QueueGroup, subscription: Subscription) -> None:
+        """
+        Remove a member, if it is one.
+        """
+        self.members = [member for member in self.members if member is not subscription]
+
+    def next(self: QueueGroup) -> Optional[Subscription]:
+        """
+        Get the member to send the next message to, round-robin, or `None` if there are no members.
+        """
+        members: List[Subscription] = self.members
+        if not members:
+            return None
+        self._cursor = (self._cursor + 1) % len(members)
+        return members[self._cursor]
+
+
+FilterGroup = Tuple[Optional[Predicate], List[Subscription], List[QueueGroup]]
+
+
+class SubscriptionRegistry(object):
+    """
+    Subscription registry class
+
+    Holds every subscription of a publisher, keyed by publication and subscriber endpoint. For fan-out, the
+    subscriptions to a publication are grouped by filter expression, so that each distinct filter is compiled once and
+    evaluated once per message no matter how many subscribers share it. Subscriptions in a queue group are held in the
+    group rather than the list of subscriptions of their filter, and all members of a group share one filter, so that
+    the group is sent each message its filter matches exactly once. The publications of each endpoint are also indexed,
+    so that all of a subscriber's leases can be renewed or dropped without scanning every publication. Compiled filters
+    are counted by the subscriptions that use them, and dropped with the last of them.
+    """
+
+    def __init__(self: SubscriptionRegistry) -> None:
+        """
+        Initialize an empty `SubscriptionRegistry` object.
+        """
+        self._subscriptions: Dict[str, Dict[Endpoint, Subscription]] = {}
+        self._endpoint_publications: Dict[Endpoint, Set[str]] = {}
+        self._filter_groups: Dict[str, List[FilterGroup]] = {}
+        self._queue_groups: Dict[str, Dict[str, QueueGroup]] = {}
+        self._predicates: Dict[str, Predicate] = {}
+        self._predicate_counts: Dict[str, int] = {}
+
+    def __contains__(self: SubscriptionRegistry, publication: str) -> bool:
+        """
+        Check whether a publication has any subscriptions.
+        """
+        return bool(self._subscriptions.get(publication))
+
+    def __len__(self: SubscriptionRegistry) -> int:
+        """
+        Get the total number of subscriptions.
+        """
+        return sum(len(subscriptions) for subscriptions in self._subscriptions.values())
+
+    def add(
+        self: SubscriptionRegistry,
+        request: SubscriptionRequest,
+        endpoint: Endpoint,
+        timestamp: datetime
+    ) -> Subscription:
+        """
+        Add a subscription from a subscription request, replacing any existing subscription of the endpoint to the
+        publication. Raise `ValueError` if any of the request options are invalid.
+        """
+        subscription = Subscription(
+            endpoint,
+            timestamp,
+            request.filter_expression,
+            request.interval_s,
+            request.trace,
+            request.schema_id,
+            request.group,
+            request.durable
+        )
+        return self.insert(request.publication, subscription)
+
+    def insert(self: SubscriptionRegistry, publication: str, subscription: Subscription) -> Subscription:
+        """
+        Add an existing subscription to a publication, such as one moved from another registry, replacing any existing
+        subscription of its endpoint to the publication. Raise `ValueError` if its filter is invalid, or differs from
+        that of the other members of its queue group.
+        """
+        filter_expression: Optional[str] = subscription.filter_expression
+        previous: Optional[Subscription] = self.get(publication, subscription.endpoint)
+        queue_group: Optional[QueueGroup] = self._queue_groups.get(publication, {}).get(subscription.group)
+        if (
+            queue_group is not None
+            and queue_group.filter_expression != filter_expression
+            and any(member is not previous for member in queue_group.members)
+        ):
+            raise ValueError(
+                f"Queue group {subscription.group} of {publication} has filter {queue_group.filter_expression}"
+            )
+        self._use_predicate(filter_expression)
+        if previous is not None:
+            self._leave_queue_group(publication, previous)
+            self._release_predicate(previous.filter_expression)
+        if subscription.group is not None:
+            queue_groups: Dict[str, QueueGroup] = self._queue_groups.setdefault(publication, {})
+            if subscription.group not in queue_groups:
+                queue_groups[subscription.group] = QueueGroup(subscription.group, filter_expression)
+            queue_groups[subscription.group].add(subscription)
+        self._subscriptions.setdefault(publication, {})[subscription.endpoint] = subscription
+        self._endpoint_publications.setdefault(subscription.endpoint, set()).add(publication)
+        self._filter_groups.pop(publication, None)
+        return subscription
+
+    def remove(self: SubscriptionRegistry, publication: str, endpoint: Endpoint) -> Optional[Subscription]:
+        """
+        Remove the subscription of an endpoint to a publication, if there is one.
+        """
+        subscription: Optional[Subscription] = self._subscriptions.get(publication, {}).pop(endpoint, None)
+        if subscription is not None:
+            self._leave_queue_group(publication, subscription)
+            self._release_predicate(subscription.filter_expression)
+            self._forget_endpoint_publication(endpoint, publication)
+            self._forget_if_empty(publication)
+        return subscription
+
+    def remove_endpoint(self: SubscriptionRegistry, endpoint: Endpoint) -> List[Tuple[str, Subscription]]:
+        """
+        Remove every subscription of an endpoint, and return them with their publications.
+        """
+        return [
+            (publication, self.remove(publication, endpoint))
+            for publication in list(self._endpoint_publications.get(endpoint, ()))
+        ]
+
+    def renew(self: SubscriptionRegistry, endpoint: Endpoint, timestamp: datetime) -> int:
+        """
+        Renew the lease of every subscription of an endpoint as of a timestamp, and return how many were renewed.
+        """
+        publications: Set[str] = self._endpoint_publications.get(endpoint, set())
+        for publication in publications:
+            self._subscriptions[publication][endpoint].timestamp = timestamp
+        return len(publications)
+
+    def get(self: SubscriptionRegistry, publication: str, endpoint: Endpoint) -> Optional[Subscription]:
+        """
+        Get the subscription of an endpoint to a publication, if there is one.
+        """
+        return self._subscriptions.get(publication, {}).get(endpoint)
+
+    def subscriptions(self: SubscriptionRegistry, publication: str) -> List[Subscription]:
+        """
+        Get the subscriptions to a publication.
+        """
+        return list(self._subscriptions.get(publication, {}).values())
+
+    def items(self: SubscriptionRegistry) -> List[Tuple[str, Subscription]]:
+        """
+        Get every subscription with its publication.
+        """
+        return [
+            (publication, subscription)
+            for publication, subscriptions in self._subscriptions.items()
+            for subscription in subscriptions.values()
+        ]
+
+    def publications(self: SubscriptionRegistry) -> List[str]:
+        """
+        Get the publications that have subscriptions.
+        """
+        return list(self._subscriptions)
+
+    def counts(self: SubscriptionRegistry) -> Dict[str, int]:
+        """
+        Get the number of subscriptions to each publication that has any.
+        """
+        return {publication: len(subscriptions) for publication, subscriptions in self._subscriptions.items()}
+
+    def queue_groups(self: SubscriptionRegistry, publication: str) -> List[QueueGroup]:
+        """
+        Get the queue groups of a publication.
+        """
+        return list(self._queue_groups.get(publication, {}).values())
+
+    def filter_groups(self: SubscriptionRegistry, publication: str) -> List[FilterGroup]:
+        """
+        Get the subscriptions to a publication grouped by filter, as `(predicate, subscriptions, queue_groups)`
+        triples, where the subscriptions are those in no queue group. Unfiltered subscriptions have a predicate of
+        `None`. The grouping is cached until the subscriptions to the publication change.
+        """
+        filter_groups = self._filter_groups.get(publication)
+        if filter_groups is None:
+            groups: Dict[Optional[str], Tuple[List[Subscription], List[QueueGroup]]] = {}
+            for subscription in self._subscriptions.get(publication, {}).values():
+                if subscription.group is None:
+                    groups.setdefault(subscription.filter_expression, ([], []))[0].append(subscription)
+            for queue_group in self.queue_groups(publication):
+                groups.setdefault(queue_group.filter_expression, ([], []))[1].append(queue_group)
+            filter_groups = [
+                (self._predicates[expression] if expression is not None else None, subscriptions, queue_groups)
+                for expression, (subscriptions, queue_groups) in groups.items()
+            ]
+            self._filter_groups[publication] = filter_groups
+        return filter_groups
+
+    def remove_timed_out(
+        self: SubscriptionRegistry,
+        now: datetime,
+        timeout_s: float
+    ) -> List[Tuple[str, Subscription]]:
+        """
+        Remove every subscription made at least the timeout (in seconds) before now, and return them with their
+        publications.
+        """
+        removed: List[Tuple[str, Subscription]] = []
+        for publication, subscriptions in list(self._subscriptions.items()):
+            timed_out = [
+                endpoint for endpoint, s in subscriptions.items() if (now - s.timestamp).total_seconds() >= timeout_s
+            ]
+            for endpoint in timed_out:
+                subscription: Subscription = subscriptions.pop(endpoint)
+                self._leave_queue_group(publication, subscription)
+                self._release_predicate(subscription.filter_expression)
+                self._forget_endpoint_publication(endpoint, publication)
+                removed.append((publication, subscription))
+            if timed_out:
+                self._forget_if_empty(publication)
+        return removed
+
+    def _leave_queue_group(self: SubscriptionRegistry, publication: str, subscription: Subscription) -> None:
+        """
+        Remove a subscription from its queue group, if it is in one, and drop the group if it has no members left.
+        """
+        if subscription.group is None:
+            return
+        queue_groups: Dict[str, QueueGroup] = self._queue_groups.get(publication, {})
+        queue_group: Optional[QueueGroup] = queue_groups.get(subscription.group)
+        if queue_group is None:
+            return
+        queue_group.remove(subscription)
+        if not queue_group:
+            del queue_groups[subscription.group]
+            if not queue_groups:
+                del self._queue_groups[publication]
+
+    def _forget_endpoint_publication(self: SubscriptionRegistry, endpoint: Endpoint, publication: str) -> None:
+        """
+        Remove a publication from the index of an endpoint's publications.
+        """
+        publications: Set[str] = self._endpoint_publications.get(endpoint, set())
+        publications.discard(publication)
+        if not publications:
+            self._endpoint_publications.pop(endpoint, None)
+
+    def _use_predicate(self: SubscriptionRegistry, filter_expression: Optional[str]) -> None:
+        """
+        Count a subscription using a filter expression, compiling it if it is the first. Raise `ValueError` if the
+        expression is invalid.
+        """
+        if filter_expression is None:
+            return
+        if filter_expression not in self._predicates:
+            self._predicates[filter_expression] = compile_filter(filter_expression)
+        self._predicate_counts[filter_expression] = self._predicate_counts.get(filter_expression, 0) + 1
+
+    def _release_predicate(self: SubscriptionRegistry, filter_expression: Optional[str]) -> None:
+        """
+        Stop counting a subscription using a filter expression, and drop its predicate if it was the last.
+        """
+        if filter_expression is None:
+            return
+        count: int = self._predicate_counts[filter_expression] - 1
+        if count:
+            self._predicate_counts[filter_expression] = count
+            return
+        del self._predicate_counts[filter_expression]
+        del self._predicates[filter_expression]
+
+    def _forget_if_empty(self: SubscriptionRegistry, publication: str) -> None:
+        """
+        Invalidate the cached filter groups of a publication, and drop the publication if it has no subscriptions left.
+        """
+        self._filter_groups.pop(publication, None)
+        if not self._subscriptions.get(publication):
+            self._subscriptions.pop(publication, None)
@@ -0,0 +1,97 @@
+"""
+Unit tests for the `budget` module
+"""
+import unittest
+
+from src.budget import CONFLATED_MESSAGE_B, MemoryBudget, SUBSCRIPTION_B, subscription_size_b
+from src.subscription import SubscriptionRequest
+
+
+class TestMemoryBudget(unittest.TestCase):
+    """
+    Unit tests for the `budget.MemoryBudget` class
+    """
+
+    def test_global_and_publication_budgets(self) -> None:
+        """
+        Purpose:
+        Ensure that charges count towards both the global budget and that of their publication, that short-lived
+        state only counts towards the global budget, and that released bytes make room again.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - A charge that would take a publication over its budget is over, while one to another publication is not
+        - Short-lived state can take a charge over the global budget
+        - Releasing every charge of a publication forgets it
+        """
+        # Arrange
+        budget = MemoryBudget(1000, 600)
+
+        # Act
+        budget.charge("publication-1", 500)
+        over_publication: bool = budget.is_over_publication("publication-1", 200)
+        under_other_publication: bool = budget.is_over_publication("publication-2", 200)
+        under_global: bool = budget.is_over(400)
+        over_with_transient: bool = budget.is_over(400, 200)
+        budget.release("publication-1", 500)
+
+        # Assert
+        self.assertTrue(over_publication)
+        self.assertFalse(under_other_publication)
+        self.assertFalse(under_global)
+        self.assertTrue(over_with_transient)
+        self.assertEqual(budget.charged_b, 0)
+        self.assertEqual(budget.publication_charged_b, {})
+
+    def test_could_fit_once_freed(self) -> None:
+        """
+        Purpose:
+        Ensure that a charge is only said to fit once bytes are freed if it would stay within both the budget of its
+        publication and the global budget.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - A charge fits once enough of its publication's bytes are freed, and not otherwise
+        - A charge that fits its publication's budget does not fit if the global budget would still be exceeded
+        - Releasing bytes always fits
+        """
+        # Arrange
+        budget = MemoryBudget(1000, 600)
+        budget.charge("publication-1", 500)
+        budget.charge("publication-2", 400)
+
+        # Act / Assert
+        self.assertTrue(budget.could_fit("publication-1", 300, 200, 200))
+        self.assertFalse(budget.could_fit("publication-1", 300, 100, 100))
+        self.assertFalse(budget.could_fit("publication-1", 300, 200, 200, 200))
+        self.assertTrue(budget.could_fit("publication-1", -100, 0, 0))
+
+    def test_subscription_size_estimate(self) -> None:
+        """
+        Purpose:
+        Ensure that a subscription is estimated to take up more for a filter, and for the pending message of a
+        conflated subscription.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - The estimates grow with the filter and with conflation
+        """
+        # Act
+        plain: int = subscription_size_b("p", SubscriptionRequest.from_string("p"))
+        filtered: int = subscription_size_b("p", SubscriptionRequest.from_string("p;filter=1==north"))
+        conflated: int = subscription_size_b("p", SubscriptionRequest.from_string("p;interval-ms=100"))
+
+        # Assert
+        self.assertEqual(plain, SUBSCRIPTION_B + 1)
+        self.assertEqual(filtered, plain + 2 * len("1==north"))
+        self.assertEqual(conflated, plain + CONFLATED_MESSAGE_B)
+
+
+if __name__ == "__main__":
+    unittest.main()
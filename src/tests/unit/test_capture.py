@@ -0,0 +1,111 @@
+"""
+Unit tests for the `capture` module
+"""
+from pathlib import Path
+import tempfile
+import unittest
+
+from src.capture import CAPTURE_HEADER, CaptureWriter, read_capture, replay
+from src.clock import VirtualClock
+from src.endpoint import UnixEndpoint
+from src.ipendpoint import IPEndpoint
+
+
+class TestCapture(unittest.TestCase):
+    """
+    Unit tests for the `capture` module classes and functions
+    """
+
+    def setUp(self) -> None:
+        """
+        Create a temporary directory for capture files, and a virtual clock to time datagrams by.
+        """
+        self._directory = tempfile.TemporaryDirectory()
+        self.path = Path(self._directory.name) / "traffic.cap"
+        self.clock = VirtualClock()
+
+    def tearDown(self) -> None:
+        """
+        Remove the temporary directory.
+        """
+        self._directory.cleanup()
+
+    def test_datagrams_round_trip(self) -> None:
+        """
+        Purpose:
+        Ensure that datagrams written to a capture file are read back in order, with their offsets and sources, and
+        that a record cut short at the end of the file is ignored.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - Every datagram is read back with its offset from the start of the capture and its source
+        - Each source is written once, however many datagrams come from it
+        - A truncated final record is ignored, and a file that is not a capture raises a `ValueError`
+        """
+        # Arrange
+        north, south = IPEndpoint("127.0.0.1", 5001), UnixEndpoint("/tmp/south.sock")
+        writer = CaptureWriter(self.path, self.clock)
+
+        # Act
+        writer.write([(b"subscribe,20211017150434567854,publication", north)])
+        self.clock.advance(0.25)
+        writer.write([(b"submit,20211017150434567854,publication,1", south), (b"", north)])
+        writer.close()
+        captured = list(read_capture(self.path))
+        with self.path.open("ab") as capture_file:
+            capture_file.write(b"\x02\x00\x00")
+        truncated = list(read_capture(self.path))
+        invalid_path = Path(self._directory.name) / "invalid.cap"
+        invalid_path.write_bytes(b"\x00" * CAPTURE_HEADER.size)
+
+        # Assert
+        self.assertEqual(captured, [
+            (0.0, str(north), b"subscribe,20211017150434567854,publication"),
+            (0.25, str(south), b"submit,20211017150434567854,publication,1"),
+            (0.25, str(north), b"")
+        ])
+        self.assertEqual(writer.datagram_count, 3)
+        self.assertEqual(self.path.read_bytes().count(str(north).encode("utf-8")), 1)
+        self.assertEqual(truncated, captured)
+        with self.assertRaises(ValueError):
+            list(read_capture(invalid_path))
+
+    def test_replay_keeps_relative_timing(self) -> None:
+        """
+        Purpose:
+        Ensure that a replay waits between datagrams for the captured time divided by the speed, and does not wait at
+        all at maximum speed.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - At double speed, each datagram is sent at half its offset from the first
+        - At maximum speed, every datagram is sent without waiting
+        """
+        # Arrange
+        captured = [(10.0, "a", b"1"), (11.0, "b", b"2"), (11.0, "a", b"3"), (14.0, "a", b"4")]
+        sent = []
+
+        def send(source: str, data: bytes) -> None:
+            sent.append((self.clock.monotonic(), source, data))
+
+        # Act
+        started_s: float = self.clock.monotonic()
+        sent_count: int = replay(iter(captured), send, 2.0, self.clock, self.clock.advance)
+        timed = [(sent_s - started_s, source, data) for sent_s, source, data in sent]
+        sent.clear()
+        started_s = self.clock.monotonic()
+        max_speed_count: int = replay(iter(captured), send, None, self.clock, self.clock.advance)
+
+        # Assert
+        self.assertEqual(sent_count, 4)
+        self.assertEqual(timed, [(0.0, "a", b"1"), (0.5, "b", b"2"), (0.5, "a", b"3"), (2.0, "a", b"4")])
+        self.assertEqual(max_speed_count, 4)
+        self.assertEqual([sent_s - started_s for sent_s, _, _ in sent], [0.0] * 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
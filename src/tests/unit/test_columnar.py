@@ -0,0 +1,93 @@
+"""
+Unit tests for the `columnar` module
+"""
+from datetime import datetime
+import unittest
+
+from src import columnar
+from src.message import Message, MessageType
+from src.schema import HEADER, SchemaRegistry
+
+
+@unittest.skipIf(columnar.numpy is None, "NumPy is not installed")
+class TestColumnar(unittest.TestCase):
+    """
+    Unit tests for the `columnar` module functions
+    """
+
+    def setUp(self) -> None:
+        """
+        Create a registry with a typed publication, and a structured array of its records.
+        """
+        self.registry = SchemaRegistry.from_definitions(
+            {"sensor": ["temperature:float64", "reading:int32", "site:str8"]}
+        )
+        self.schema = self.registry.for_publication("sensor")
+        self.array = columnar.numpy.zeros(10, dtype=columnar.dtype(self.schema))
+        self.array["temperature"] = columnar.numpy.linspace(0.0, 4.5, 10)
+        self.array["reading"] = columnar.numpy.arange(10)
+        self.array["site"] = b"north"
+
+    def test_batches_round_trip(self) -> None:
+        """
+        Purpose:
+        Ensure that a structured array is split into batches of at most the maximum number of records, which decode
+        both into sequences and straight into a preallocated array.
+
+        Prerequisites:
+        NumPy
+
+        Pass condition(s):
+        - Ten records in batches of at most four make three batches
+        - Each batch decodes into the same columns with the schema registry
+        - The batches decode into a preallocated array equal to the original
+        """
+        # Arrange
+        out = columnar.numpy.empty(4, dtype=columnar.dtype(self.schema))
+        received = []
+
+        # Act
+        messages = list(columnar.batches(self.schema, self.array, datetime.now(), 4))
+        for message in messages:
+            message_bytes = bytes(message)
+            decoded = self.registry.decode(message_bytes)
+            self.assertEqual(list(decoded.payload[2]), list(message.payload[2]))
+            self.assertTrue(columnar.is_batch(message_bytes, self.schema))
+            received.append(out[:columnar.decode_into(self.schema, message_bytes, out)].copy())
+
+        # Assert
+        self.assertEqual([message.records for message in messages], [4, 4, 2])
+        self.assertTrue((columnar.numpy.concatenate(received) == self.array).all())
+
+    def test_decode_into_rejects_overflow_and_non_batches(self) -> None:
+        """
+        Purpose:
+        Ensure that a batch too large for the preallocated array or cut short is rejected, and that single records
+        and text messages are not taken for batches.
+
+        Prerequisites:
+        NumPy
+
+        Pass condition(s):
+        - A `ValueError` is raised for the oversized batch, and for batches cut short in the header or record count
+        - `is_batch` is false for a single binary record and a text message
+        """
+        # Arrange
+        message = next(columnar.batches(self.schema, self.array, datetime.now(), 10))
+        single = Message(MessageType.PUBLISH, datetime.now(), "sensor", 1.0, 1, "north", schema=self.schema)
+        out = columnar.numpy.empty(5, dtype=columnar.dtype(self.schema))
+
+        # Act / Assert
+        with self.assertRaises(ValueError):
+            columnar.decode_into(self.schema, bytes(message), out)
+        for length in [HEADER.size - 1, HEADER.size + 1]:
+            with self.assertRaises(ValueError):
+                columnar.decode_into(self.schema, bytes(message)[:length], out)
+            with self.assertRaises(ValueError):
+                self.registry.decode(bytes(message)[:length])
+        self.assertFalse(columnar.is_batch(bytes(single), self.schema))
+        self.assertFalse(columnar.is_batch(b"publish,20211017151756123456,sensor,1.0,1,north", self.schema))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,235 +1,784 @@
-"""
-Unit tests for the `configuration` module
-"""
-from pathlib import Path
-import unittest
-
-import yaml
-
-from src.configuration import (
-    BUFFER_SIZE_B,
-    Configuration,
-    PublisherConfiguration,
-    SOCKET_TIMEOUT_S,
-    SUBSCRIBER_TIMEOUT_S,
-    SubscriberConfiguration
-)
-
-
-UNIT_TEST_CONFIGURATIONS_PATH = Path(__file__).resolve().parent / "configurations"
-
-
-class TestConfiguration(unittest.TestCase):
-    """
-    Unit tests for the `configuration.Configuration` class
-    """
-    pass
-
-
-
-class TestPublisherConfiguration(unittest.TestCase):
-    """
-    Unit tests for the `configuration.PublisherConfiguration` class
-    """
-
-    def test_read_basic_publisher_configuration_from_yaml(self) -> None:
-        """
-        Purpose:
-        Ensure that a basic publisher configuration read from a YAML file produces the expected configuration.
-
-        Prerequisites:
-        - `src/tests/unit/configurations/test_publisher.yml`
-
-        Pass condition(s):
-        - The YAML file is found, read, and parsed successfully with no exceptions raised
-        - Settings in `PublisherConfiguration` object agree with those in the YAML file
-
-        Notes:
-        - The `src/tests/unit/configurations/test_publisher.yml` file has the following contents:
-
-        ```
-        ---
-        ip-address: 192.168.0.19
-        port: 1337
-        ```
-        """
-        # Arrange
-        ip_address: str = "192.168.0.19"
-        port: int = 1337
-        socket_timeout_s: float = Configuration.DEFAULTS[SOCKET_TIMEOUT_S]
-        buffer_size_b: int = Configuration.DEFAULTS[BUFFER_SIZE_B]
-        subscriber_timeout_s: float = PublisherConfiguration.DEFAULTS[SUBSCRIBER_TIMEOUT_S]
-
-        # Act
-        config = PublisherConfiguration.from_yaml(UNIT_TEST_CONFIGURATIONS_PATH / "test_publisher.yml")
-
-        # Assert
-        self.assertEqual(config.endpoint.ip_address, ip_address)
-        self.assertEqual(config.endpoint.port, port)
-        self.assertEqual(config.socket_timeout_s, socket_timeout_s)
-        self.assertEqual(config.buffer_size_b, buffer_size_b)
-        self.assertEqual(config.subscriber_timeout_s, subscriber_timeout_s)
-
-    def test_read_full_publisher_configuration_from_yaml(self) -> None:
-        """
-        Purpose:
-        Ensure that a full publisher configuration read from a YAML file produces the expected configuration.
-
-        Prerequisites:
-        - `src/tests/unit/configurations/test_publisher_full.yml`
-
-        Pass condition(s):
-        - The YAML file is found, read, and parsed successfully with no exceptions raised
-        - Settings in `PublisherConfiguration` object agree with those in the YAML file
-
-        Notes:
-        - The `src/tests/unit/configurations/test_publisher_full.yml` file has the following contents:
-
-        ```
-        ---
-        ip-address: 192.168.0.19
-        port: 1337
-        socket-timeout-s: 0.5
-        buffer-size-b: 2048
-        subscriber-timeout-s: 3.0
-        ```
-        """
-        # Arrange
-        ip_address: str = "192.168.0.19"
-        port: int = 1337
-        socket_timeout_s: float = 0.5
-        buffer_size_b: int = 2048
-        subscriber_timeout_s: float = 3.0
-
-        # Act
-        config = PublisherConfiguration.from_yaml(UNIT_TEST_CONFIGURATIONS_PATH / "test_publisher_full.yml")
-
-        # Assert
-        self.assertEqual(config.endpoint.ip_address, ip_address)
-        self.assertEqual(config.endpoint.port, port)
-        self.assertEqual(config.socket_timeout_s, socket_timeout_s)
-        self.assertEqual(config.buffer_size_b, buffer_size_b)
-        self.assertEqual(config.subscriber_timeout_s, subscriber_timeout_s)
-
-
-class TestSubscriberConfiguration(unittest.TestCase):
-    """
-    Unit tests for the `configuration.SubscriberConfiguration` class
-    """
-
-    def test_read_basic_subscriber_configuration_with_subscriptions_from_yaml(self) -> None:
-        """
-        Purpose:
-        Ensure that a basic subscriber configuration with subscriptions read from a YAML file produces the expected
-        configuration.
-
-        Prerequisites:
-        - `src/tests/unit/configurations/test_subscriber_receiver.yml`
-
-        Pass condition(s):
-        - The YAML file is found, read, and parsed successfully with no exceptions raised
-        - Settings in `SubscriberConfiguration` object agree with those in the YAML file
-
-        Notes:
-        - The `src/tests/unit/configurations/test_subscriber_receiver.yml` file has the following contents:
-
-        ```
-        ---
-        publisher-ip-address: 192.168.0.19
-        publisher-port: 1337
-        subscriptions:
-        - publication
-        ```
-        """
-        # Arrange
-        publisher_ip_address: str = "192.168.0.19"
-        publisher_port: int = 1337
-        subscriptions = ["publication"]
-        socket_timeout_s: float = Configuration.DEFAULTS[SOCKET_TIMEOUT_S]
-        buffer_size_b: int = Configuration.DEFAULTS[BUFFER_SIZE_B]
-
-        # Act
-        config = SubscriberConfiguration.from_yaml(UNIT_TEST_CONFIGURATIONS_PATH / "test_subscriber_receiver.yml")
-
-        # Assert
-        self.assertEqual(config.publisher_endpoint.ip_address, publisher_ip_address)
-        self.assertEqual(config.publisher_endpoint.port, publisher_port)
-        self.assertEqual(config.subscriptions, subscriptions)
-        self.assertEqual(config.publications, [])
-        self.assertEqual(config.socket_timeout_s, socket_timeout_s)
-        self.assertEqual(config.buffer_size_b, buffer_size_b)
-
-    def test_read_basic_subscriber_configuration_with_publications_from_yaml(self) -> None:
-        """
-        Purpose:
-        Ensure that a basic subscriber configuration with publications read from a YAML file produces the expected
-        configuration.
-
-        Prerequisites:
-        - `src/tests/unit/configurations/test_subscriber_transmitter.yml`
-
-        Pass condition(s):
-        - The YAML file is found, read, and parsed successfully with no exceptions raised
-        - Settings in `SubscriberConfiguration` object agree with those in the YAML file
-
-        Notes:
-        - The `src/tests/unit/configurations/test_subscriber_transmitter.yml` file has the following contents:
-
-        ```
-        ---
-        publisher-ip-address: 192.168.0.19
-        publisher-port: 1337
-        publications:
-        - publication
-        ```
-        """
-        # Arrange
-        publisher_ip_address: str = "192.168.0.19"
-        publisher_port: int = 1337
-        publications = ["publication"]
-        socket_timeout_s: float = Configuration.DEFAULTS[SOCKET_TIMEOUT_S]
-        buffer_size_b: int = Configuration.DEFAULTS[BUFFER_SIZE_B]
-
-        # Act
-        config = SubscriberConfiguration.from_yaml(UNIT_TEST_CONFIGURATIONS_PATH / "test_subscriber_transmitter.yml")
-
-        # Assert
-        self.assertEqual(config.publisher_endpoint.ip_address, publisher_ip_address)
-        self.assertEqual(config.publisher_endpoint.port, publisher_port)
-        self.assertEqual(config.subscriptions, [])
-        self.assertEqual(config.publications, publications)
-        self.assertEqual(config.socket_timeout_s, socket_timeout_s)
-        self.assertEqual(config.buffer_size_b, buffer_size_b)
-
-    def test_read_basic_subscriber_configuration_with_publications_and_subscriptions_from_yaml(self) -> None:
-        """
-        Purpose:
-        Ensure that attempting to generate a subscriber configuration with both publications and subscriptions read
-        from a YAML file raises an exception.
-
-        Prerequisites:
-        - `src/tests/unit/configurations/test_subscriber_transceiver.yml`
-
-        Pass condition(s):
-        - The YAML file is found, read, and parsed successfully with no exceptions raised
-        - Attempting to create a `SubscriberConfiguration` object from the parsed settings raises a `ValueError`
-
-        Notes:
-        - The `src/tests/unit/configurations/test_subscriber_transceiver.yml` file has the following contents:
-
-        ```
-        ---
-        publisher-ip-address: 192.168.0.19
-        publisher-port: 1337
-        subscriptions:
-        - publication-1
-        publications:
-        - publication-2
-        ```
-        """
-        with self.assertRaises(ValueError):
-            SubscriberConfiguration.from_yaml(UNIT_TEST_CONFIGURATIONS_PATH / "test_subscriber_transceiver.yml")
-
-
-if __name__ == "__main__":
-    unittest.main()
+"""
+Unit tests for the `configuration` module
+"""
+from pathlib import Path
+import unittest
+
+import yaml
+
+from src.configuration import (
+    BUFFER_SIZE_B,
+    Configuration,
+    PublisherConfiguration,
+    SOCKET_TIMEOUT_S,
+    SUBSCRIBER_TIMEOUT_S,
+    SubscriberConfiguration,
+    TRANSPORT_TCP,
+    TRANSPORT_UNIX
+)
+from src.endpoint import UnixEndpoint
+from src.ipendpoint import IPEndpoint, StreamEndpoint
+
+
+UNIT_TEST_CONFIGURATIONS_PATH = Path(__file__).resolve().parent / "configurations"
+
+
+class TestConfiguration(unittest.TestCase):
+    """
+    Unit tests for the `configuration.Configuration` class
+    """
+    pass
+
+
+
+class TestPublisherConfiguration(unittest.TestCase):
+    """
+    Unit tests for the `configuration.PublisherConfiguration` class
+    """
+
+    def test_read_basic_publisher_configuration_from_yaml(self) -> None:
+        """
+        Purpose:
+        Ensure that a basic publisher configuration read from a YAML file produces the expected configuration.
+
+        Prerequisites:
+        - `src/tests/unit/configurations/test_publisher.yml`
+
+        Pass condition(s):
+        - The YAML file is found, read, and parsed successfully with no exceptions raised
+        - Settings in `PublisherConfiguration` object agree with those in the YAML file
+
+        Notes:
+        - The `src/tests/unit/configurations/test_publisher.yml` file has the following contents:
+
+        ```
+        ---
+        ip-address: 192.168.0.19
+        port: 1337
+        ```
+        """
+        # Arrange
+        ip_address: str = "192.168.0.19"
+        port: int = 1337
+        socket_timeout_s: float = Configuration.DEFAULTS[SOCKET_TIMEOUT_S]
+        buffer_size_b: int = Configuration.DEFAULTS[BUFFER_SIZE_B]
+        subscriber_timeout_s: float = PublisherConfiguration.DEFAULTS[SUBSCRIBER_TIMEOUT_S]
+
+        # Act
+        config = PublisherConfiguration.from_yaml(UNIT_TEST_CONFIGURATIONS_PATH / "test_publisher.yml")
+
+        # Assert
+        self.assertEqual(config.endpoint.ip_address, ip_address)
+        self.assertEqual(config.endpoint.port, port)
+        self.assertEqual(config.socket_timeout_s, socket_timeout_s)
+        self.assertEqual(config.buffer_size_b, buffer_size_b)
+        self.assertEqual(config.subscriber_timeout_s, subscriber_timeout_s)
+
+    def test_read_full_publisher_configuration_from_yaml(self) -> None:
+        """
+        Purpose:
+        Ensure that a full publisher configuration read from a YAML file produces the expected configuration.
+
+        Prerequisites:
+        - `src/tests/unit/configurations/test_publisher_full.yml`
+
+        Pass condition(s):
+        - The YAML file is found, read, and parsed successfully with no exceptions raised
+        - Settings in `PublisherConfiguration` object agree with those in the YAML file
+
+        Notes:
+        - The `src/tests/unit/configurations/test_publisher_full.yml` file has the following contents:
+
+        ```
+        ---
+        ip-address: 192.168.0.19
+        port: 1337
+        socket-timeout-s: 0.5
+        buffer-size-b: 2048
+        subscriber-timeout-s: 3.0
+        ```
+        """
+        # Arrange
+        ip_address: str = "192.168.0.19"
+        port: int = 1337
+        socket_timeout_s: float = 0.5
+        buffer_size_b: int = 2048
+        subscriber_timeout_s: float = 3.0
+
+        # Act
+        config = PublisherConfiguration.from_yaml(UNIT_TEST_CONFIGURATIONS_PATH / "test_publisher_full.yml")
+
+        # Assert
+        self.assertEqual(config.endpoint.ip_address, ip_address)
+        self.assertEqual(config.endpoint.port, port)
+        self.assertEqual(config.socket_timeout_s, socket_timeout_s)
+        self.assertEqual(config.buffer_size_b, buffer_size_b)
+        self.assertEqual(config.subscriber_timeout_s, subscriber_timeout_s)
+
+    def test_read_unix_publisher_configuration_from_yaml(self) -> None:
+        """
+        Purpose:
+        Ensure that a publisher configuration using the Unix datagram transport read from a YAML file produces a Unix
+        socket endpoint.
+
+        Prerequisites:
+        - `src/tests/unit/configurations/test_publisher_unix.yml`
+
+        Pass condition(s):
+        - The YAML file is found, read, and parsed successfully with no exceptions raised
+        - The transport is `unix` and the endpoint is a `UnixEndpoint` with the configured socket path
+
+        Notes:
+        - The `src/tests/unit/configurations/test_publisher_unix.yml` file has the following contents:
+
+        ```
+        ---
+        transport: unix
+        socket-path: /tmp/pubsub-publisher.sock
+        ```
+        """
+        # Act
+        config = PublisherConfiguration.from_yaml(UNIT_TEST_CONFIGURATIONS_PATH / "test_publisher_unix.yml")
+
+        # Assert
+        self.assertEqual(config.transport, TRANSPORT_UNIX)
+        self.assertEqual(config.endpoint, UnixEndpoint("/tmp/pubsub-publisher.sock"))
+
+    def test_unix_publisher_configuration_without_socket_path(self) -> None:
+        """
+        Purpose:
+        Ensure that a publisher configuration using the Unix datagram transport without a socket path raises an
+        exception.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - A `ValueError` is raised
+        """
+        with self.assertRaises(ValueError):
+            PublisherConfiguration("127.0.0.1", 5005, 0.1, 1024, 5, TRANSPORT_UNIX)
+
+    def test_read_publisher_configuration_with_stream_port_from_yaml(self) -> None:
+        """
+        Purpose:
+        Ensure that a publisher configuration with a stream port read from a YAML file produces a stream endpoint
+        alongside the datagram endpoint.
+
+        Prerequisites:
+        - `src/tests/unit/configurations/test_publisher_stream.yml`
+
+        Pass condition(s):
+        - The YAML file is found, read, and parsed successfully with no exceptions raised
+        - The endpoint is an `IPEndpoint` and the stream endpoint is a `StreamEndpoint` on the stream port
+        - The stream watermarks agree with those in the YAML file
+
+        Notes:
+        - The `src/tests/unit/configurations/test_publisher_stream.yml` file has the following contents:
+
+        ```
+        ---
+        ip-address: 192.168.0.19
+        port: 1337
+        stream-port: 1338
+        stream-high-watermark-b: 65536
+        stream-low-watermark-b: 16384
+        ```
+        """
+        # Act
+        config = PublisherConfiguration.from_yaml(UNIT_TEST_CONFIGURATIONS_PATH / "test_publisher_stream.yml")
+
+        # Assert
+        self.assertEqual(config.endpoint, IPEndpoint("192.168.0.19", 1337))
+        self.assertEqual(config.stream_endpoint, StreamEndpoint("192.168.0.19", 1338))
+        self.assertEqual(config.stream_high_watermark_b, 65536)
+        self.assertEqual(config.stream_low_watermark_b, 16384)
+
+    def test_publisher_configuration_with_low_watermark_above_high_watermark(self) -> None:
+        """
+        Purpose:
+        Ensure that a publisher configuration whose stream low watermark exceeds its high watermark raises an
+        exception.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - A `ValueError` is raised
+        """
+        with self.assertRaises(ValueError):
+            PublisherConfiguration("127.0.0.1", 5005, 0.1, 1024, 5, TRANSPORT_TCP, None, None, 1024, 2048)
+
+    def test_publisher_configuration_with_invalid_transport(self) -> None:
+        """
+        Purpose:
+        Ensure that a publisher configuration with an unknown transport raises an exception.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - A `ValueError` is raised
+        """
+        with self.assertRaises(ValueError):
+            PublisherConfiguration("127.0.0.1", 5005, 0.1, 1024, 5, "carrier-pigeon")
+
+    def test_publisher_configuration_with_profiling(self) -> None:
+        """
+        Purpose:
+        Ensure that profiling is disabled unless a profile directory is given, and that the profile duration is
+        validated.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - Without a profile directory, there is none
+        - With a profile directory, it is a `Path`
+        - A profile duration above the limit raises a `ValueError`
+        """
+        # Act
+        disabled = PublisherConfiguration("127.0.0.1", 5005, 0.1, 1024, 5)
+        enabled = PublisherConfiguration(
+            "127.0.0.1", 5005, 0.1, 1024, 5, profile_directory="/tmp/pubsub-profiles", profile_duration_s=30
+        )
+
+        # Assert
+        self.assertIsNone(disabled.profile_directory)
+        self.assertEqual(enabled.profile_directory, Path("/tmp/pubsub-profiles"))
+        self.assertEqual(enabled.profile_duration_s, 30)
+        with self.assertRaises(ValueError):
+            PublisherConfiguration("127.0.0.1", 5005, 0.1, 1024, 5, profile_duration_s=3600)
+
+    def test_publisher_configuration_with_schemas(self) -> None:
+        """
+        Purpose:
+        Ensure that the schemas of typed publications are compiled into a schema registry, and that invalid schemas
+        raise an exception.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - The typed publication has a schema and other publications do not
+        - A `ValueError` is raised for a schema with an invalid field type, or schemas that are not a mapping
+        """
+        # Act
+        config = PublisherConfiguration("127.0.0.1", 5005, 0.1, 1024, 5, schemas={"publication": ["float64", "str8"]})
+
+        # Assert
+        self.assertEqual(config.schemas.for_publication("publication").field_types, ["float64", "str8"])
+        self.assertIsNone(config.schemas.for_publication("other"))
+        for schemas in [{"publication": ["decimal"]}, ["float64"]]:
+            with self.assertRaises(ValueError):
+                PublisherConfiguration("127.0.0.1", 5005, 0.1, 1024, 5, schemas=schemas)
+
+    def test_publisher_configuration_with_snapshots(self) -> None:
+        """
+        Purpose:
+        Ensure that snapshots are disabled unless a snapshot path is given, and that the snapshot settings are
+        validated.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - Without a snapshot path, there is none, and pending conflated messages are not included
+        - With a snapshot path, it is a `Path`, with the given interval and conflated setting
+        - A `ValueError` is raised for an interval above the limit or a conflated setting that is not a `bool`
+        """
+        # Act
+        disabled = PublisherConfiguration("127.0.0.1", 5005, 0.1, 1024, 5)
+        enabled = PublisherConfiguration(
+            "127.0.0.1", 5005, 0.1, 1024, 5, snapshot_path="/tmp/pubsub.snapshot", snapshot_interval_s=0.5,
+            snapshot_conflated=True
+        )
+
+        # Assert
+        self.assertIsNone(disabled.snapshot_path)
+        self.assertFalse(disabled.snapshot_conflated)
+        self.assertEqual(enabled.snapshot_path, Path("/tmp/pubsub.snapshot"))
+        self.assertEqual(enabled.snapshot_interval_s, 0.5)
+        self.assertTrue(enabled.snapshot_conflated)
+        for options in [{"snapshot_interval_s": 7200}, {"snapshot_conflated": "yes"}]:
+            with self.assertRaises(ValueError):
+                PublisherConfiguration("127.0.0.1", 5005, 0.1, 1024, 5, **options)
+
+    def test_publisher_configuration_with_shards(self) -> None:
+        """
+        Purpose:
+        Ensure that sharding is disabled by default, and that the number of shards is validated.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - By default there are no shards
+        - The given number of shards is kept
+        - A `ValueError` is raised for a number of shards out of range, or with a stream transport
+        """
+        # Act
+        disabled = PublisherConfiguration("127.0.0.1", 5005, 0.1, 1024, 5)
+        enabled = PublisherConfiguration("127.0.0.1", 5005, 0.1, 1024, 5, shards=4)
+
+        # Assert
+        self.assertEqual(disabled.shards, 0)
+        self.assertEqual(enabled.shards, 4)
+        for options in [{"shards": -1}, {"shards": 65}, {"shards": 2, "transport": TRANSPORT_TCP}]:
+            with self.assertRaises(ValueError):
+                PublisherConfiguration("127.0.0.1", 5005, 0.1, 1024, 5, **options)
+
+
+    def test_publisher_configuration_with_ingress_limits(self) -> None:
+        """
+        Purpose:
+        Ensure that ingress rate limits are disabled by default, and that the limits and burst are validated.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - By default there are no ingress limits
+        - The given limits and burst are kept
+        - A `ValueError` is raised for a negative or excessive limit or burst
+        """
+        # Act
+        disabled = PublisherConfiguration("127.0.0.1", 5005, 0.1, 1024, 5)
+        enabled = PublisherConfiguration(
+            "127.0.0.1", 5005, 0.1, 1024, 5, ingress_rate_per_s=100, publication_ingress_rate_per_s=50, ingress_burst=20
+        )
+
+        # Assert
+        self.assertEqual(
+            (disabled.ingress_rate_per_s, disabled.publication_ingress_rate_per_s, disabled.ingress_burst), (0, 0, 0)
+        )
+        self.assertEqual(
+            (enabled.ingress_rate_per_s, enabled.publication_ingress_rate_per_s, enabled.ingress_burst), (100, 50, 20)
+        )
+        for options in [
+            {"ingress_rate_per_s": -1},
+            {"publication_ingress_rate_per_s": 1000001},
+            {"ingress_burst": -5}
+        ]:
+            with self.assertRaises(ValueError):
+                PublisherConfiguration("127.0.0.1", 5005, 0.1, 1024, 5, **options)
+
+    def test_publisher_configuration_with_spools(self) -> None:
+        """
+        Purpose:
+        Ensure that durable subscriptions are disabled by default, and that the spool size, drain rate, and sync
+        interval are validated.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - By default there is no spool directory, and the spool settings have their defaults
+        - The given spool directory and settings are kept
+        - A `ValueError` is raised for a spool size, drain rate, or sync interval that is zero or excessive
+        """
+        # Act
+        disabled = PublisherConfiguration("127.0.0.1", 5005, 0.1, 1024, 5)
+        enabled = PublisherConfiguration(
+            "127.0.0.1", 5005, 0.1, 1024, 5, spool_directory="/tmp/spools", spool_max_b=1048576,
+            spool_drain_rate_per_s=50, spool_sync_interval_s=0.5
+        )
+
+        # Assert
+        self.assertIsNone(disabled.spool_directory)
+        self.assertEqual(
+            (disabled.spool_max_b, disabled.spool_drain_rate_per_s, disabled.spool_sync_interval_s),
+            (67108864, 1000, 1.0)
+        )
+        self.assertEqual(enabled.spool_directory, Path("/tmp/spools"))
+        self.assertEqual(
+            (enabled.spool_max_b, enabled.spool_drain_rate_per_s, enabled.spool_sync_interval_s), (1048576, 50, 0.5)
+        )
+        for options in [
+            {"spool_max_b": 0},
+            {"spool_drain_rate_per_s": 0},
+            {"spool_drain_rate_per_s": 1000001},
+            {"spool_sync_interval_s": 61}
+        ]:
+            with self.assertRaises(ValueError):
+                PublisherConfiguration("127.0.0.1", 5005, 0.1, 1024, 5, **options)
+
+    def test_publisher_configuration_with_memory_budgets(self) -> None:
+        """
+        Purpose:
+        Ensure that memory budgets are unlimited by default, and that the budgets and policy are validated.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - By default the budgets are unlimited and subscriptions over them are rejected
+        - The given budgets and policy are kept
+        - A `ValueError` is raised for a negative budget or an unknown policy
+        """
+        # Act
+        unlimited = PublisherConfiguration("127.0.0.1", 5005, 0.1, 1024, 5)
+        limited = PublisherConfiguration(
+            "127.0.0.1", 5005, 0.1, 1024, 5, memory_budget_b=1048576, publication_memory_budget_b=65536,
+            memory_policy="evict"
+        )
+
+        # Assert
+        self.assertEqual(
+            (unlimited.memory_budget_b, unlimited.publication_memory_budget_b, unlimited.memory_policy),
+            (0, 0, "reject")
+        )
+        self.assertEqual(
+            (limited.memory_budget_b, limited.publication_memory_budget_b, limited.memory_policy),
+            (1048576, 65536, "evict")
+        )
+        for options in [{"memory_budget_b": -1}, {"publication_memory_budget_b": -1}, {"memory_policy": "drop"}]:
+            with self.assertRaises(ValueError):
+                PublisherConfiguration("127.0.0.1", 5005, 0.1, 1024, 5, **options)
+
+
+    def test_configurations_with_capture_path(self) -> None:
+        """
+        Purpose:
+        Ensure that capturing is disabled unless a capture path is given, to a publisher or a subscriber.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - Without a capture path, there is none
+        - With a capture path, it is a `Path`
+        """
+        # Act
+        disabled = PublisherConfiguration("127.0.0.1", 5005, 0.1, 1024, 5)
+        publisher = PublisherConfiguration("127.0.0.1", 5005, 0.1, 1024, 5, capture_path="/tmp/publisher.cap")
+        subscriber = SubscriberConfiguration(
+            "127.0.0.1", 5005, 0.1, 1024, ["publication"], [], capture_path="/tmp/subscriber.cap"
+        )
+
+        # Assert
+        self.assertIsNone(disabled.capture_path)
+        self.assertEqual(publisher.capture_path, Path("/tmp/publisher.cap"))
+        self.assertEqual(subscriber.capture_path, Path("/tmp/subscriber.cap"))
+
+    def test_publisher_configuration_with_quarantine(self) -> None:
+        """
+        Purpose:
+        Ensure that quarantine is enabled by default, and that its threshold and duration are validated.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - By default a source is quarantined for 10 seconds after 10 rejected messages
+        - The given threshold and duration are kept, and a threshold of zero is allowed
+        - A `ValueError` is raised for a negative threshold or a duration that is zero or excessive
+        """
+        # Act
+        default = PublisherConfiguration("127.0.0.1", 5005, 0.1, 1024, 5)
+        disabled = PublisherConfiguration("127.0.0.1", 5005, 0.1, 1024, 5, quarantine_threshold=0, quarantine_s=1.5)
+
+        # Assert
+        self.assertEqual((default.quarantine_threshold, default.quarantine_s), (10, 10.0))
+        self.assertEqual((disabled.quarantine_threshold, disabled.quarantine_s), (0, 1.5))
+        for options in [{"quarantine_threshold": -1}, {"quarantine_s": 0}, {"quarantine_s": 3601}]:
+            with self.assertRaises(ValueError):
+                PublisherConfiguration("127.0.0.1", 5005, 0.1, 1024, 5, **options)
+
+    def test_publisher_configuration_with_listeners(self) -> None:
+        """
+        Purpose:
+        Ensure that further listeners are read as endpoints of the configured transport, and that invalid or repeated
+        listeners are rejected.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - Without listeners, there are none
+        - IPv4 and IPv6 listeners are UDP endpoints, and a Unix listener is a socket path
+        - A `ValueError` is raised for listeners that are not a list of mappings, or that repeat an endpoint
+        """
+        # Act
+        default = PublisherConfiguration("127.0.0.1", 5005, 0.1, 1024, 5)
+        dual_stack = PublisherConfiguration(
+            "127.0.0.1", 5005, 0.1, 1024, 5, listeners=[{"ip-address": "::1"}, {"ip-address": "10.0.0.1", "port": 5006}]
+        )
+        unix = PublisherConfiguration(
+            "127.0.0.1", 5005, 0.1, 1024, 5, transport="unix", socket_path="/tmp/p.sock",
+            listeners=[{"socket-path": "/tmp/l.sock"}]
+        )
+
+        # Assert
+        self.assertEqual(default.listener_endpoints, [])
+        self.assertEqual(dual_stack.listener_endpoints, [IPEndpoint("::1", 5005), IPEndpoint("10.0.0.1", 5006)])
+        self.assertEqual(unix.listener_endpoints, [UnixEndpoint("/tmp/l.sock")])
+        for listeners in [{"ip-address": "::1"}, ["::1"], [{"port": 5005}], [{"port": 5006}, {"port": 5006}]]:
+            with self.assertRaises(ValueError):
+                PublisherConfiguration("127.0.0.1", 5005, 0.1, 1024, 5, listeners=listeners)
+
+
+class TestSubscriberConfiguration(unittest.TestCase):
+    """
+    Unit tests for the `configuration.SubscriberConfiguration` class
+    """
+
+    def test_read_basic_subscriber_configuration_with_subscriptions_from_yaml(self) -> None:
+        """
+        Purpose:
+        Ensure that a basic subscriber configuration with subscriptions read from a YAML file produces the expected
+        configuration.
+
+        Prerequisites:
+        - `src/tests/unit/configurations/test_subscriber_receiver.yml`
+
+        Pass condition(s):
+        - The YAML file is found, read, and parsed successfully with no exceptions raised
+        - Settings in `SubscriberConfiguration` object agree with those in the YAML file
+
+        Notes:
+        - The `src/tests/unit/configurations/test_subscriber_receiver.yml` file has the following contents:
+
+        ```
+        ---
+        publisher-ip-address: 192.168.0.19
+        publisher-port: 1337
+        subscriptions:
+        - publication
+        ```
+        """
+        # Arrange
+        publisher_ip_address: str = "192.168.0.19"
+        publisher_port: int = 1337
+        subscriptions = ["publication"]
+        socket_timeout_s: float = Configuration.DEFAULTS[SOCKET_TIMEOUT_S]
+        buffer_size_b: int = Configuration.DEFAULTS[BUFFER_SIZE_B]
+
+        # Act
+        config = SubscriberConfiguration.from_yaml(UNIT_TEST_CONFIGURATIONS_PATH / "test_subscriber_receiver.yml")
+
+        # Assert
+        self.assertEqual(config.publisher_endpoint.ip_address, publisher_ip_address)
+        self.assertEqual(config.publisher_endpoint.port, publisher_port)
+        self.assertEqual(config.subscriptions, subscriptions)
+        self.assertEqual(config.publications, [])
+        self.assertEqual(config.socket_timeout_s, socket_timeout_s)
+        self.assertEqual(config.buffer_size_b, buffer_size_b)
+
+    def test_read_basic_subscriber_configuration_with_publications_from_yaml(self) -> None:
+        """
+        Purpose:
+        Ensure that a basic subscriber configuration with publications read from a YAML file produces the expected
+        configuration.
+
+        Prerequisites:
+        - `src/tests/unit/configurations/test_subscriber_transmitter.yml`
+
+        Pass condition(s):
+        - The YAML file is found, read, and parsed successfully with no exceptions raised
+        - Settings in `SubscriberConfiguration` object agree with those in the YAML file
+
+        Notes:
+        - The `src/tests/unit/configurations/test_subscriber_transmitter.yml` file has the following contents:
+
+        ```
+        ---
+        publisher-ip-address: 192.168.0.19
+        publisher-port: 1337
+        publications:
+        - publication
+        ```
+        """
+        # Arrange
+        publisher_ip_address: str = "192.168.0.19"
+        publisher_port: int = 1337
+        publications = ["publication"]
+        socket_timeout_s: float = Configuration.DEFAULTS[SOCKET_TIMEOUT_S]
+        buffer_size_b: int = Configuration.DEFAULTS[BUFFER_SIZE_B]
+
+        # Act
+        config = SubscriberConfiguration.from_yaml(UNIT_TEST_CONFIGURATIONS_PATH / "test_subscriber_transmitter.yml")
+
+        # Assert
+        self.assertEqual(config.publisher_endpoint.ip_address, publisher_ip_address)
+        self.assertEqual(config.publisher_endpoint.port, publisher_port)
+        self.assertEqual(config.subscriptions, [])
+        self.assertEqual(config.publications, publications)
+        self.assertEqual(config.socket_timeout_s, socket_timeout_s)
+        self.assertEqual(config.buffer_size_b, buffer_size_b)
+
+    def test_read_basic_subscriber_configuration_with_publications_and_subscriptions_from_yaml(self) -> None:
+        """
+        Purpose:
+        Ensure that attempting to generate a subscriber configuration with both publications and subscriptions read
+        from a YAML file raises an exception.
+
+        Prerequisites:
+        - `src/tests/unit/configurations/test_subscriber_transceiver.yml`
+
+        Pass condition(s):
+        - The YAML file is found, read, and parsed successfully with no exceptions raised
+        - Attempting to create a `SubscriberConfiguration` object from the parsed settings raises a `ValueError`
+
+        Notes:
+        - The `src/tests/unit/configurations/test_subscriber_transceiver.yml` file has the following contents:
+
+        ```
+        ---
+        publisher-ip-address: 192.168.0.19
+        publisher-port: 1337
+        subscriptions:
+        - publication-1
+        publications:
+        - publication-2
+        ```
+        """
+        with self.assertRaises(ValueError):
+            SubscriberConfiguration.from_yaml(UNIT_TEST_CONFIGURATIONS_PATH / "test_subscriber_transceiver.yml")
+
+    def test_read_unix_subscriber_configuration_from_yaml(self) -> None:
+        """
+        Purpose:
+        Ensure that a subscriber configuration using the Unix datagram transport read from a YAML file produces Unix
+        socket endpoints for both the publisher and the subscriber.
+
+        Prerequisites:
+        - `src/tests/unit/configurations/test_subscriber_unix.yml`
+
+        Pass condition(s):
+        - The YAML file is found, read, and parsed successfully with no exceptions raised
+        - The publisher endpoint and subscriber endpoint are `UnixEndpoint` objects with the configured socket paths
+
+        Notes:
+        - The `src/tests/unit/configurations/test_subscriber_unix.yml` file has the following contents:
+
+        ```
+        ---
+        transport: unix
+        publisher-socket-path: /tmp/pubsub-publisher.sock
+        socket-path: /tmp/pubsub-subscriber.sock
+        subscriptions:
+          - publication
+        ```
+        """
+        # Act
+        config = SubscriberConfiguration.from_yaml(UNIT_TEST_CONFIGURATIONS_PATH / "test_subscriber_unix.yml")
+
+        # Assert
+        self.assertEqual(config.transport, TRANSPORT_UNIX)
+        self.assertEqual(config.publisher_endpoint, UnixEndpoint("/tmp/pubsub-publisher.sock"))
+        self.assertEqual(config.endpoint, UnixEndpoint("/tmp/pubsub-subscriber.sock"))
+        self.assertEqual(config.subscriptions, ["publication"])
+
+    def test_unix_subscriber_configuration_without_socket_path(self) -> None:
+        """
+        Purpose:
+        Ensure that a subscriber configuration using the Unix datagram transport without its own socket path is given
+        a default one, since the publisher can only reply to a bound socket.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - The subscriber endpoint is a `UnixEndpoint`
+        """
+        # Act
+        config = SubscriberConfiguration(
+            "127.0.0.1", 5005, 0.1, 1024, ["publication"], [], TRANSPORT_UNIX, "/tmp/pubsub-publisher.sock"
+        )
+
+        # Assert
+        self.assertIsInstance(config.endpoint, UnixEndpoint)
+
+    def test_tcp_subscriber_configuration(self) -> None:
+        """
+        Purpose:
+        Ensure that a subscriber configuration using the stream transport connects to a stream endpoint.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - The publisher endpoint is a `StreamEndpoint` with the configured IP address and port
+        """
+        # Act
+        config = SubscriberConfiguration("127.0.0.1", 5006, 0.1, 1024, ["publication"], [], TRANSPORT_TCP)
+
+        # Assert
+        self.assertEqual(config.publisher_endpoint, StreamEndpoint("127.0.0.1", 5006))
+
+
+    def test_read_subscriber_configuration_with_several_publishers_from_yaml(self) -> None:
+        """
+        Purpose:
+        Ensure that a subscriber configuration with further publishers read from a YAML file lists every publisher with
+        its own subscriptions and heartbeat interval, starting with the first.
+
+        Prerequisites:
+        - `src/tests/unit/configurations/test_subscriber_publishers.yml`
+
+        Pass condition(s):
+        - The YAML file is found, read, and parsed successfully with no exceptions raised
+        - Both publishers are listed, in order, with their endpoints, subscriptions, and heartbeat intervals
+
+        Notes:
+        - The `src/tests/unit/configurations/test_subscriber_publishers.yml` file has the following contents:
+
+        ```
+        ---
+        transport: unix
+        publisher-socket-path: /tmp/pubsub-publisher-1.sock
+        socket-path: /tmp/pubsub-subscriber.sock
+        subscriber-timeout-s: 5.0
+        subscriptions:
+          - publication-1
+        publishers:
+          - publisher-socket-path: /tmp/pubsub-publisher-2.sock
+            subscriber-timeout-s: 10.0
+            subscriptions:
+              - publication-2
+              - publication-3
+        ```
+        """
+        # Act
+        config = SubscriberConfiguration.from_yaml(UNIT_TEST_CONFIGURATIONS_PATH / "test_subscriber_publishers.yml")
+
+        # Assert
+        first_endpoint, first_subscriptions, first_interval_s = config.publishers[0]
+        second_endpoint, second_subscriptions, second_interval_s = config.publishers[1]
+        self.assertEqual(len(config.publishers), 2)
+        self.assertEqual(first_endpoint, UnixEndpoint("/tmp/pubsub-publisher-1.sock"))
+        self.assertEqual(first_subscriptions, ["publication-1"])
+        self.assertEqual(second_endpoint, UnixEndpoint("/tmp/pubsub-publisher-2.sock"))
+        self.assertEqual(second_subscriptions, ["publication-2", "publication-3"])
+        self.assertAlmostEqual(second_interval_s, 2 * first_interval_s)
+
+    def test_invalid_subscriber_publishers(self) -> None:
+        """
+        Purpose:
+        Ensure that further publishers without subscriptions, with an invalid timeout, repeating a publisher, or given
+        alongside publications are rejected.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - A `ValueError` is raised for each invalid list of publishers
+        """
+        for publications, publishers in [
+            ([], [{"publisher-port": 5006}]),
+            ([], [{"publisher-port": 5006, "subscriptions": "publication"}]),
+            ([], [{"publisher-port": 5006, "subscriptions": ["publication"], "subscriber-timeout-s": 0}]),
+            ([], [{"publisher-port": 5005, "subscriptions": ["publication"]}]),
+            (["publication"], [{"publisher-port": 5006, "subscriptions": ["publication"]}]),
+            ([], ["localhost:5006"])
+        ]:
+            with self.assertRaises(ValueError):
+                SubscriberConfiguration(
+                    "127.0.0.1", 5005, 0.1, 1024, [] if publications else ["publication"], publications,
+                    publishers=publishers
+                )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+"""
+Unit tests for the `endpoint` module
+"""
+import socket
+import unittest
+
+from src.endpoint import UnixEndpoint
+from src.ipendpoint import IPEndpoint
+
+
+class TestUnixEndpoint(unittest.TestCase):
+    """
+    Unit tests for the `endpoint.UnixEndpoint` class
+    """
+
+    def test_construct_using_valid_path(self) -> None:
+        """
+        Purpose:
+        Ensure that construction of a `UnixEndpoint` object using a valid path produces a valid `UnixEndpoint` object.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - There should be no exceptions raised.
+        - The `path` and `address` properties should match the path used to construct the object.
+        - The `family` property should be `socket.AF_UNIX`.
+        """
+        # Arrange
+        path: str = "/tmp/publisher.sock"
+
+        # Act
+        endpoint = UnixEndpoint(path)
+
+        # Assert
+        self.assertEqual(endpoint.path, path)
+        self.assertEqual(endpoint.address, path)
+        self.assertEqual(endpoint.family, socket.AF_UNIX)
+
+    def test_construct_using_invalid_path(self) -> None:
+        """
+        Purpose:
+        Ensure that construction of a `UnixEndpoint` object using an empty or overlong path raises an exception.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - A ValueError is raised for each invalid path.
+        """
+        # Arrange
+        invalid_paths = ["", "/tmp/" + "x" * 200, None]
+
+        # Act/assert
+        for path in invalid_paths:
+            with self.assertRaises(ValueError):
+                UnixEndpoint(path)
+
+    def test_equality_and_hash_of_equal_endpoints(self) -> None:
+        """
+        Purpose:
+        Ensure that two endpoints constructed from the same path are equal and hash equally.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - The two endpoints are equal
+        - The two endpoints have the same hash
+        """
+        # Arrange
+        endpoint1 = UnixEndpoint("/tmp/publisher.sock")
+        endpoint2 = UnixEndpoint("/tmp/publisher.sock")
+
+        # Act/assert
+        self.assertEqual(endpoint1, endpoint2)
+        self.assertEqual(hash(endpoint1), hash(endpoint2))
+
+    def test_inequality_of_unix_and_ip_endpoints(self) -> None:
+        """
+        Purpose:
+        Ensure that endpoints of different types are never equal.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - A `UnixEndpoint` and an `IPEndpoint` are not equal
+        """
+        # Arrange
+        unix_endpoint = UnixEndpoint("/tmp/publisher.sock")
+        ip_endpoint = IPEndpoint("127.0.0.1", 5005)
+
+        # Act/assert
+        self.assertNotEqual(unix_endpoint, ip_endpoint)
+        self.assertNotEqual(ip_endpoint, unix_endpoint)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,118 @@
+"""
+Unit tests for the `filter` module
+"""
+import unittest
+
+from src.filter import compile_filter
+
+
+class TestCompileFilter(unittest.TestCase):
+    """
+    Unit tests for the `filter.compile_filter` function
+    """
+
+    def test_numeric_comparison(self) -> None:
+        """
+        Purpose:
+        Ensure that a numeric condition compares the field numerically.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - Payloads whose field exceeds the threshold match
+        - Payloads whose field does not exceed the threshold do not match
+        """
+        # Arrange
+        predicate = compile_filter("2>30.5")
+
+        # Act/assert
+        self.assertTrue(predicate(["publication", "north", "31.0"]))
+        self.assertFalse(predicate(["publication", "north", "30.5"]))
+        self.assertFalse(predicate(["publication", "north", "4"]))
+
+    def test_string_comparison(self) -> None:
+        """
+        Purpose:
+        Ensure that a non-numeric condition compares the field as a string.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - Payloads whose field equals the value match
+        - Payloads whose field differs from the value do not match
+        """
+        # Arrange
+        predicate = compile_filter("1==north")
+
+        # Act/assert
+        self.assertTrue(predicate(["publication", "north", "31.0"]))
+        self.assertFalse(predicate(["publication", "south", "31.0"]))
+
+    def test_conjunctions_and_alternatives(self) -> None:
+        """
+        Purpose:
+        Ensure that `&` binds conditions together and `|` separates alternatives.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - A payload matches if all conditions of any alternative hold
+        """
+        # Arrange
+        predicate = compile_filter("1==north&2>30|1==south")
+
+        # Act/assert
+        self.assertTrue(predicate(["publication", "north", "31"]))
+        self.assertFalse(predicate(["publication", "north", "29"]))
+        self.assertTrue(predicate(["publication", "south", "29"]))
+        self.assertFalse(predicate(["publication", "east", "31"]))
+
+    def test_short_or_non_numeric_payloads_do_not_match(self) -> None:
+        """
+        Purpose:
+        Ensure that payloads missing the field, or with a non-numeric field where a number is expected, do not match
+        rather than raising.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - The predicate returns `False` with no exceptions raised
+        """
+        # Arrange
+        predicate = compile_filter("2>=0")
+
+        # Act/assert
+        self.assertFalse(predicate(["publication", "north"]))
+        self.assertFalse(predicate(["publication", "north", "warm"]))
+        self.assertFalse(predicate(["publication", "north", None]))
+        self.assertFalse(compile_filter("1==north")(["publication", 0.5]))
+
+    def test_invalid_expressions(self) -> None:
+        """
+        Purpose:
+        Ensure that compiling an invalid expression raises an exception, including one comparing an infinite, NaN, or
+        non-numeric value with an ordering operator.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - A `ValueError` is raised for each invalid expression
+        """
+        # Arrange
+        invalid_expressions = [
+            "", "2", "x>1", "0==publication", "2=>1", "1==a&", "2>inf", "2<-inf", "2>=nan", "1>north"
+        ]
+
+        # Act/assert
+        for expression in invalid_expressions:
+            with self.assertRaises(ValueError):
+                compile_filter(expression)
+
+
+if __name__ == "__main__":
+    unittest.main()
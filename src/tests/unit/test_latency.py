@@ -0,0 +1,112 @@
+"""
+Unit tests for the `latency` module
+"""
+from datetime import datetime, timedelta
+import unittest
+
+from src.latency import (
+    LatencyHistogram,
+    LatencyTracker,
+    LEG_PRODUCER_TO_PUBLISHER,
+    LEG_PUBLISHER_TO_CONSUMER,
+    LEG_QUEUEING
+)
+from src.message import Trace
+
+
+class TestLatencyHistogram(unittest.TestCase):
+    """
+    Unit tests for the `latency.LatencyHistogram` class
+    """
+
+    def test_percentiles(self) -> None:
+        """
+        Purpose:
+        Ensure that percentiles are reported to within a factor of two, and never above the maximum.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - The median of 99 latencies of 100 us and one of 10 ms lies between 100 us and 200 us
+        - The 100th percentile is the maximum
+        - The mean is exact
+        """
+        # Arrange
+        histogram = LatencyHistogram()
+
+        # Act
+        for _ in range(99):
+            histogram.record(0.0001)
+        histogram.record(0.01)
+
+        # Assert
+        self.assertEqual(histogram.count, 100)
+        self.assertTrue(0.0001 <= histogram.percentile_s(0.5) <= 0.0002)
+        self.assertEqual(histogram.percentile_s(1.0), 0.01)
+        self.assertAlmostEqual(histogram.mean_s, 0.000199)
+
+    def test_negative_latency(self) -> None:
+        """
+        Purpose:
+        Ensure that a negative latency, from clock skew, is counted separately and as zero.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - The negative latency is counted, and recorded in the first bucket
+        """
+        # Arrange
+        histogram = LatencyHistogram()
+
+        # Act
+        histogram.record(-0.5)
+
+        # Assert
+        self.assertEqual(histogram.negative_count, 1)
+        self.assertEqual(histogram.buckets[0], 1)
+        self.assertEqual(histogram.max_s, 0.0)
+
+
+class TestLatencyTracker(unittest.TestCase):
+    """
+    Unit tests for the `latency.LatencyTracker` class
+    """
+
+    def test_record_splits_latency_into_legs(self) -> None:
+        """
+        Purpose:
+        Ensure that a trace is split into its producer to publisher, queueing, and publisher to consumer latencies, per
+        publication.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - Each leg records the time between its two hops
+        - Publications are tracked separately
+        """
+        # Arrange
+        tracker = LatencyTracker()
+        submitted = datetime(2021, 10, 17, 15, 17, 56)
+        trace = Trace(
+            submitted,
+            submitted + timedelta(milliseconds=1),
+            submitted + timedelta(milliseconds=3)
+        )
+
+        # Act
+        tracker.record("publication", trace, submitted + timedelta(milliseconds=7))
+
+        # Assert
+        histograms = tracker.histograms["publication"]
+        self.assertAlmostEqual(histograms[LEG_PRODUCER_TO_PUBLISHER].max_s, 0.001)
+        self.assertAlmostEqual(histograms[LEG_QUEUEING].max_s, 0.002)
+        self.assertAlmostEqual(histograms[LEG_PUBLISHER_TO_CONSUMER].max_s, 0.004)
+        self.assertNotIn("other", tracker.histograms)
+        self.assertEqual(len(tracker.summary().splitlines()), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
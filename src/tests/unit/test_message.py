@@ -1,307 +1,483 @@
-"""
-Unit tests for the `message` module
-"""
-from datetime import datetime
-import unittest
-
-from src.message import MessageType, Message
-
-
-class TestMessageType(unittest.TestCase):
-    """
-    Unit tests for the `message.MessageType` class
-    """
-
-    def test_convert_subscribe_from_string(self) -> None:
-        """
-        Purpose:
-        Ensure that converting to MessageType.SUBSCRIBE from string works as expected.
-
-        Prerequisites:
-        N/A
-
-        Pass condition(s):
-        - Converting a lowercase string works
-        - Converting a mixed case string works
-        - Converting an uppercase string works
-        """
-        # Arrange
-        subscribe_lowercase_string: str = "subscribe"
-        subscribe_mixedcase_string: str = "Subscribe"
-        subscribe_uppercase_string: str = "SUBSCRIBE"
-
-        # Act
-        subscribe_from_lowercase: MessageType = MessageType.from_string(subscribe_lowercase_string)
-        subscribe_from_mixedcase: MessageType = MessageType.from_string(subscribe_mixedcase_string)
-        subscribe_from_uppercase: MessageType = MessageType.from_string(subscribe_uppercase_string)
-
-        # Assert
-        self.assertEqual(subscribe_from_lowercase, MessageType.SUBSCRIBE)
-        self.assertEqual(subscribe_from_mixedcase, MessageType.SUBSCRIBE)
-        self.assertEqual(subscribe_from_uppercase, MessageType.SUBSCRIBE)
-
-    def test_convert_submit_from_string(self) -> None:
-        """
-        Purpose:
-        Ensure that converting to MessageType.SUBMIT from string works as expected.
-
-        Prerequisites:
-        N/A
-
-        Pass condition(s):
-        - Converting a lowercase string works
-        - Converting a mixed case string works
-        - Converting an uppercase string works
-        """
-        # Arrange
-        submit_lowercase_string: str = "submit"
-        submit_mixedcase_string: str = "Submit"
-        submit_uppercase_string: str = "SUBMIT"
-
-        # Act
-        submit_from_lowercase: MessageType = MessageType.from_string(submit_lowercase_string)
-        submit_from_mixedcase: MessageType = MessageType.from_string(submit_mixedcase_string)
-        submit_from_uppercase: MessageType = MessageType.from_string(submit_uppercase_string)
-
-        # Assert
-        self.assertEqual(submit_from_lowercase, MessageType.SUBMIT)
-        self.assertEqual(submit_from_mixedcase, MessageType.SUBMIT)
-        self.assertEqual(submit_from_uppercase, MessageType.SUBMIT)
-
-    def test_convert_publish_from_string(self) -> None:
-        """
-        Purpose:
-        Ensure that converting to MessageType.PUBLISH from string works as expected.
-
-        Prerequisites:
-        N/A
-
-        Pass condition(s):
-        - Converting a lowercase string works
-        - Converting a mixed case string works
-        - Converting an uppercase string works
-        """
-        # Arrange
-        publish_lowercase_string: str = "publish"
-        publish_mixedcase_string: str = "Publish"
-        publish_uppercase_string: str = "PUBLISH"
-
-        # Act
-        publish_from_lowercase: MessageType = MessageType.from_string(publish_lowercase_string)
-        publish_from_mixedcase: MessageType = MessageType.from_string(publish_mixedcase_string)
-        publish_from_uppercase: MessageType = MessageType.from_string(publish_uppercase_string)
-
-        # Assert
-        self.assertEqual(publish_from_lowercase, MessageType.PUBLISH)
-        self.assertEqual(publish_from_mixedcase, MessageType.PUBLISH)
-        self.assertEqual(publish_from_uppercase, MessageType.PUBLISH)
-
-    def test_convert_subscribe_to_string(self) -> None:
-        """
-        Purpose:
-        Ensure that converting to MessageType.SUBSCRIBE to string works as expected.
-
-        Prerequisites:
-        N/A
-
-        Pass condition(s):
-        - Conversion produces the expected string
-        """
-        # Arrange/act
-        subscribe_string_expected: str = "subscribe"
-        subscribe_string_created: MessageType = str(MessageType.SUBSCRIBE)
-
-        # Assert
-        self.assertEqual(subscribe_string_expected, subscribe_string_created)
-
-    def test_convert_submit_to_string(self) -> None:
-        """
-        Purpose:
-        Ensure that converting to MessageType.SUBMIT to string works as expected.
-
-        Prerequisites:
-        N/A
-
-        Pass condition(s):
-        - Conversion produces the expected string
-        """
-        # Arrange/act
-        submit_string_expected: str = "submit"
-        submit_string_created: MessageType = str(MessageType.SUBMIT)
-
-        # Assert
-        self.assertEqual(submit_string_expected, submit_string_created)
-
-    def test_convert_publish_to_string(self) -> None:
-        """
-        Purpose:
-        Ensure that converting to MessageType.PUBLISH to string works as expected.
-
-        Prerequisites:
-        N/A
-
-        Pass condition(s):
-        - Conversion produces the expected string
-        """
-        # Arrange/act
-        publish_string_expected: str = "publish"
-        publish_string_created: MessageType = str(MessageType.PUBLISH)
-
-        # Assert
-        self.assertEqual(publish_string_expected, publish_string_created)
-
-
-class TestMessage(unittest.TestCase):
-    """
-    Unit tests for the `message.Message` class
-    """
-
-    def test_subscribe_message_from_string(self) -> None:
-        """
-        Purpose:
-        Ensure that converting a subscribe message from string works as expected.
-
-        Prerequisites:
-        N/A
-
-        Pass condition(s):
-        - Converting a subscribe message string produces a `Message` object with the correct type, timestamp, and
-          payload
-        """
-        # Arrange
-        subscribe_message_string: str = "subscribe,20211017150434567854,publication"
-
-        # Act
-        subscribe_message: Message = Message.from_string(subscribe_message_string)
-
-        # Assert
-        self.assertEqual(subscribe_message.message_type, MessageType.SUBSCRIBE)
-        self.assertEqual(subscribe_message.timestamp, datetime(2021, 10, 17, 15, 4, 34, 567854))
-        self.assertEqual(subscribe_message.payload, ["publication"])
-
-    def test_submit_message_from_string(self) -> None:
-        """
-        Purpose:
-        Ensure that converting a submit message from string works as expected.
-
-        Prerequisites:
-        N/A
-
-        Pass condition(s):
-        - Converting a submit message string produces a `Message` object with the correct type, timestamp, and
-          payload
-        """
-        # Arrange
-        submit_message_string: str = "submit,20211017151511745976,publication,field1,field2"
-
-        # Act
-        submit_message: Message = Message.from_string(submit_message_string)
-
-        # Assert
-        self.assertEqual(submit_message.message_type, MessageType.SUBMIT)
-        self.assertEqual(submit_message.timestamp, datetime(2021, 10, 17, 15, 15, 11, 745976))
-        self.assertEqual(submit_message.payload, ["publication", "field1", "field2"])
-
-    def test_publish_message_from_string(self) -> None:
-        """
-        Purpose:
-        Ensure that converting a publish message from string works as expected.
-
-        Prerequisites:
-        N/A
-
-        Pass condition(s):
-        - Converting a publish message string produces a `Message` object with the correct type, timestamp, and
-          payload
-        """
-        # Arrange
-        publish_message_string: str = "publish,20211017151756123456,publication,field1,field2,field3,field4"
-
-        # Act
-        publish_message: Message = Message.from_string(publish_message_string)
-
-        # Assert
-        self.assertEqual(publish_message.message_type, MessageType.PUBLISH)
-        self.assertEqual(publish_message.timestamp, datetime(2021, 10, 17, 15, 17, 56, 123456))
-        self.assertEqual(publish_message.payload, ["publication", "field1", "field2", "field3", "field4"])
-
-    def test_subscribe_message_to_string(self) -> None:
-        """
-        Purpose:
-        Ensure that converting a subscribe message to a string works as expected.
-
-        Prerequisites:
-        N/A
-
-        Pass condition(s):
-        - Converting a subscribe message produces the expected string representation
-        """
-        # Arrange
-        subscribe_message: Message = Message(
-            MessageType.SUBSCRIBE,
-            datetime(2021, 10, 17, 15, 4, 34, 567854),
-            "publication1", "publication2"
-        )
-        subscribe_message_string_expected: str = "subscribe,20211017150434567854,publication1,publication2"
-
-        # Act
-        subscribe_message_string_created: str = str(subscribe_message)
-
-        # Assert
-        self.assertEqual(subscribe_message_string_created, subscribe_message_string_expected)
-
-    def test_submit_message_to_string(self) -> None:
-        """
-        Purpose:
-        Ensure that converting a submit message to a string works as expected.
-
-        Prerequisites:
-        N/A
-
-        Pass condition(s):
-        - Converting a submit message produces the expected string representation
-        """
-        # Arrange
-        submit_message: Message = Message(
-            MessageType.SUBMIT,
-            datetime(2021, 10, 17, 15, 15, 11, 745976),
-            "publication",
-            "field1", "field2", "field3"
-        )
-        submit_message_string_expected: str = "submit,20211017151511745976,publication,field1,field2,field3"
-
-        # Act
-        submit_message_string_created: str = str(submit_message)
-
-        # Assert
-        self.assertEqual(submit_message_string_created, submit_message_string_expected)
-
-    def test_publish_message_to_string(self) -> None:
-        """
-        Purpose:
-        Ensure that converting a publish message to a string works as expected.
-
-        Prerequisites:
-        N/A
-
-        Pass condition(s):
-        - Converting a publish message produces the expected string representation
-        """
-        # Arrange
-        publish_message: Message = Message(
-            MessageType.PUBLISH,
-            datetime(2021, 10, 17, 15, 17, 56, 123456),
-            "publication",
-            "field1", "field2", "field3", "field4"
-        )
-        publish_message_string_expected: str = "publish,20211017151756123456,publication,field1,field2,field3,field4"
-
-        # Act
-        publish_message_string_created: str = str(publish_message)
-
-        # Assert
-        self.assertEqual(publish_message_string_created, publish_message_string_expected)
-
-
-if __name__ == "__main__":
-    unittest.main()
+"""
+Unit tests for the `message` module
+"""
+from datetime import datetime
+import unittest
+
+from src.message import MessagePool, MessageType, Message, Trace
+
+
+class TestMessageType(unittest.TestCase):
+    """
+    Unit tests for the `message.MessageType` class
+    """
+
+    def test_convert_subscribe_from_string(self) -> None:
+        """
+        Purpose:
+        Ensure that converting to MessageType.SUBSCRIBE from string works as expected.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - Converting a lowercase string works
+        - Converting a mixed case string works
+        - Converting an uppercase string works
+        """
+        # Arrange
+        subscribe_lowercase_string: str = "subscribe"
+        subscribe_mixedcase_string: str = "Subscribe"
+        subscribe_uppercase_string: str = "SUBSCRIBE"
+
+        # Act
+        subscribe_from_lowercase: MessageType = MessageType.from_string(subscribe_lowercase_string)
+        subscribe_from_mixedcase: MessageType = MessageType.from_string(subscribe_mixedcase_string)
+        subscribe_from_uppercase: MessageType = MessageType.from_string(subscribe_uppercase_string)
+
+        # Assert
+        self.assertEqual(subscribe_from_lowercase, MessageType.SUBSCRIBE)
+        self.assertEqual(subscribe_from_mixedcase, MessageType.SUBSCRIBE)
+        self.assertEqual(subscribe_from_uppercase, MessageType.SUBSCRIBE)
+
+    def test_convert_submit_from_string(self) -> None:
+        """
+        Purpose:
+        Ensure that converting to MessageType.SUBMIT from string works as expected.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - Converting a lowercase string works
+        - Converting a mixed case string works
+        - Converting an uppercase string works
+        """
+        # Arrange
+        submit_lowercase_string: str = "submit"
+        submit_mixedcase_string: str = "Submit"
+        submit_uppercase_string: str = "SUBMIT"
+
+        # Act
+        submit_from_lowercase: MessageType = MessageType.from_string(submit_lowercase_string)
+        submit_from_mixedcase: MessageType = MessageType.from_string(submit_mixedcase_string)
+        submit_from_uppercase: MessageType = MessageType.from_string(submit_uppercase_string)
+
+        # Assert
+        self.assertEqual(submit_from_lowercase, MessageType.SUBMIT)
+        self.assertEqual(submit_from_mixedcase, MessageType.SUBMIT)
+        self.assertEqual(submit_from_uppercase, MessageType.SUBMIT)
+
+    def test_convert_publish_from_string(self) -> None:
+        """
+        Purpose:
+        Ensure that converting to MessageType.PUBLISH from string works as expected.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - Converting a lowercase string works
+        - Converting a mixed case string works
+        - Converting an uppercase string works
+        """
+        # Arrange
+        publish_lowercase_string: str = "publish"
+        publish_mixedcase_string: str = "Publish"
+        publish_uppercase_string: str = "PUBLISH"
+
+        # Act
+        publish_from_lowercase: MessageType = MessageType.from_string(publish_lowercase_string)
+        publish_from_mixedcase: MessageType = MessageType.from_string(publish_mixedcase_string)
+        publish_from_uppercase: MessageType = MessageType.from_string(publish_uppercase_string)
+
+        # Assert
+        self.assertEqual(publish_from_lowercase, MessageType.PUBLISH)
+        self.assertEqual(publish_from_mixedcase, MessageType.PUBLISH)
+        self.assertEqual(publish_from_uppercase, MessageType.PUBLISH)
+
+    def test_convert_admin_message_types_from_string(self) -> None:
+        """
+        Purpose:
+        Ensure that converting to MessageType.HEARTBEAT, MessageType.UNSUBSCRIBE, MessageType.PROFILE,
+        MessageType.STATS, and MessageType.SHARDS from string works as expected.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - Converting lowercase and uppercase strings works
+        - Converting back to a string produces the lowercase string
+        """
+        # Act/assert
+        for message_type_string, message_type in [
+            ("heartbeat", MessageType.HEARTBEAT),
+            ("unsubscribe", MessageType.UNSUBSCRIBE),
+            ("profile", MessageType.PROFILE),
+            ("stats", MessageType.STATS),
+            ("shards", MessageType.SHARDS)
+        ]:
+            self.assertEqual(MessageType.from_string(message_type_string), message_type)
+            self.assertEqual(MessageType.from_string(message_type_string.upper()), message_type)
+            self.assertEqual(str(message_type), message_type_string)
+
+    def test_convert_subscribe_to_string(self) -> None:
+        """
+        Purpose:
+        Ensure that converting to MessageType.SUBSCRIBE to string works as expected.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - Conversion produces the expected string
+        """
+        # Arrange/act
+        subscribe_string_expected: str = "subscribe"
+        subscribe_string_created: MessageType = str(MessageType.SUBSCRIBE)
+
+        # Assert
+        self.assertEqual(subscribe_string_expected, subscribe_string_created)
+
+    def test_convert_submit_to_string(self) -> None:
+        """
+        Purpose:
+        Ensure that converting to MessageType.SUBMIT to string works as expected.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - Conversion produces the expected string
+        """
+        # Arrange/act
+        submit_string_expected: str = "submit"
+        submit_string_created: MessageType = str(MessageType.SUBMIT)
+
+        # Assert
+        self.assertEqual(submit_string_expected, submit_string_created)
+
+    def test_convert_publish_to_string(self) -> None:
+        """
+        Purpose:
+        Ensure that converting to MessageType.PUBLISH to string works as expected.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - Conversion produces the expected string
+        """
+        # Arrange/act
+        publish_string_expected: str = "publish"
+        publish_string_created: MessageType = str(MessageType.PUBLISH)
+
+        # Assert
+        self.assertEqual(publish_string_expected, publish_string_created)
+
+
+class TestMessage(unittest.TestCase):
+    """
+    Unit tests for the `message.Message` class
+    """
+
+    def test_subscribe_message_from_string(self) -> None:
+        """
+        Purpose:
+        Ensure that converting a subscribe message from string works as expected.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - Converting a subscribe message string produces a `Message` object with the correct type, timestamp, and
+          payload
+        """
+        # Arrange
+        subscribe_message_string: str = "subscribe,20211017150434567854,publication"
+
+        # Act
+        subscribe_message: Message = Message.from_string(subscribe_message_string)
+
+        # Assert
+        self.assertEqual(subscribe_message.message_type, MessageType.SUBSCRIBE)
+        self.assertEqual(subscribe_message.timestamp, datetime(2021, 10, 17, 15, 4, 34, 567854))
+        self.assertEqual(subscribe_message.payload, ["publication"])
+
+    def test_submit_message_from_string(self) -> None:
+        """
+        Purpose:
+        Ensure that converting a submit message from string works as expected.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - Converting a submit message string produces a `Message` object with the correct type, timestamp, and
+          payload
+        """
+        # Arrange
+        submit_message_string: str = "submit,20211017151511745976,publication,field1,field2"
+
+        # Act
+        submit_message: Message = Message.from_string(submit_message_string)
+
+        # Assert
+        self.assertEqual(submit_message.message_type, MessageType.SUBMIT)
+        self.assertEqual(submit_message.timestamp, datetime(2021, 10, 17, 15, 15, 11, 745976))
+        self.assertEqual(submit_message.payload, ["publication", "field1", "field2"])
+
+    def test_publish_message_from_string(self) -> None:
+        """
+        Purpose:
+        Ensure that converting a publish message from string works as expected.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - Converting a publish message string produces a `Message` object with the correct type, timestamp, and
+          payload
+        """
+        # Arrange
+        publish_message_string: str = "publish,20211017151756123456,publication,field1,field2,field3,field4"
+
+        # Act
+        publish_message: Message = Message.from_string(publish_message_string)
+
+        # Assert
+        self.assertEqual(publish_message.message_type, MessageType.PUBLISH)
+        self.assertEqual(publish_message.timestamp, datetime(2021, 10, 17, 15, 17, 56, 123456))
+        self.assertEqual(publish_message.payload, ["publication", "field1", "field2", "field3", "field4"])
+
+    def test_heartbeat_message_from_string(self) -> None:
+        """
+        Purpose:
+        Ensure that converting a heartbeat message, which has no payload, from string works as expected.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - Converting a heartbeat message string produces a `Message` object with the correct type and timestamp, and
+          an empty payload
+        - Converting it back produces the original string
+        """
+        # Arrange
+        heartbeat_message_string: str = "heartbeat,20211017150434567854"
+
+        # Act
+        heartbeat_message: Message = Message.from_string(heartbeat_message_string)
+
+        # Assert
+        self.assertEqual(heartbeat_message.message_type, MessageType.HEARTBEAT)
+        self.assertEqual(heartbeat_message.timestamp, datetime(2021, 10, 17, 15, 4, 34, 567854))
+        self.assertEqual(heartbeat_message.payload, [])
+        self.assertEqual(str(heartbeat_message), heartbeat_message_string)
+
+    def test_subscribe_message_to_string(self) -> None:
+        """
+        Purpose:
+        Ensure that converting a subscribe message to a string works as expected.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - Converting a subscribe message produces the expected string representation
+        """
+        # Arrange
+        subscribe_message: Message = Message(
+            MessageType.SUBSCRIBE,
+            datetime(2021, 10, 17, 15, 4, 34, 567854),
+            "publication1", "publication2"
+        )
+        subscribe_message_string_expected: str = "subscribe,20211017150434567854,publication1,publication2"
+
+        # Act
+        subscribe_message_string_created: str = str(subscribe_message)
+
+        # Assert
+        self.assertEqual(subscribe_message_string_created, subscribe_message_string_expected)
+
+    def test_submit_message_to_string(self) -> None:
+        """
+        Purpose:
+        Ensure that converting a submit message to a string works as expected.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - Converting a submit message produces the expected string representation
+        """
+        # Arrange
+        submit_message: Message = Message(
+            MessageType.SUBMIT,
+            datetime(2021, 10, 17, 15, 15, 11, 745976),
+            "publication",
+            "field1", "field2", "field3"
+        )
+        submit_message_string_expected: str = "submit,20211017151511745976,publication,field1,field2,field3"
+
+        # Act
+        submit_message_string_created: str = str(submit_message)
+
+        # Assert
+        self.assertEqual(submit_message_string_created, submit_message_string_expected)
+
+    def test_publish_message_to_string(self) -> None:
+        """
+        Purpose:
+        Ensure that converting a publish message to a string works as expected.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - Converting a publish message produces the expected string representation
+        """
+        # Arrange
+        publish_message: Message = Message(
+            MessageType.PUBLISH,
+            datetime(2021, 10, 17, 15, 17, 56, 123456),
+            "publication",
+            "field1", "field2", "field3", "field4"
+        )
+        publish_message_string_expected: str = "publish,20211017151756123456,publication,field1,field2,field3,field4"
+
+        # Act
+        publish_message_string_created: str = str(publish_message)
+
+        # Assert
+        self.assertEqual(publish_message_string_created, publish_message_string_expected)
+
+
+    def test_traced_publish_message_round_trip(self) -> None:
+        """
+        Purpose:
+        Ensure that a publish message with a trace converts to a string with the trace timestamps after its timestamp,
+        and back.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - The string has the expected representation
+        - Converting the string back produces the same timestamp, trace, and payload
+        - A trace not yet stamped with its egress time has its ingress time in its place
+        """
+        # Arrange
+        publish_message: Message = Message(
+            MessageType.PUBLISH,
+            datetime(2021, 10, 17, 15, 17, 56, 123456),
+            "publication",
+            "field1",
+            trace=Trace(
+                datetime(2021, 10, 17, 15, 17, 56, 100000),
+                datetime(2021, 10, 17, 15, 17, 56, 110000),
+                datetime(2021, 10, 17, 15, 17, 56, 120000)
+            )
+        )
+        publish_message_string_expected: str = (
+            "publish,20211017151756123456;20211017151756100000;20211017151756110000;20211017151756120000,"
+            "publication,field1"
+        )
+
+        # Act
+        publish_message_string_created: str = str(publish_message)
+        parsed_message: Message = Message.from_string(publish_message_string_created)
+
+        # Assert
+        self.assertEqual(publish_message_string_created, publish_message_string_expected)
+        self.assertEqual(parsed_message.timestamp, publish_message.timestamp)
+        self.assertEqual(parsed_message.trace.submitted, publish_message.trace.submitted)
+        self.assertEqual(parsed_message.trace.ingress, publish_message.trace.ingress)
+        self.assertEqual(parsed_message.trace.egress, publish_message.trace.egress)
+        self.assertEqual(parsed_message.payload, ["publication", "field1"])
+        self.assertIsNone(Message.from_string("publish,20211017151756123456,publication").trace)
+        self.assertEqual(
+            str(Trace(publish_message.trace.submitted, publish_message.trace.ingress)),
+            "20211017151756100000;20211017151756110000;20211017151756110000"
+        )
+
+    def test_message_with_incomplete_trace_from_string(self) -> None:
+        """
+        Purpose:
+        Ensure that a message whose trace does not have three timestamps is rejected.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - A `ValueError` is raised
+        """
+        with self.assertRaises(ValueError):
+            Message.from_string("publish,20211017151756123456;20211017151756100000,publication")
+
+    def test_message_with_short_timestamp_from_string(self) -> None:
+        """
+        Purpose:
+        Ensure that timestamps with fewer microsecond digits than usual are still parsed, and that invalid timestamps
+        are rejected.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - The short timestamp is parsed as `datetime.strptime` parses it
+        - A `ValueError` is raised for each invalid timestamp
+        """
+        # Act
+        message = Message.from_string("heartbeat,2021101715175612")
+
+        # Assert
+        self.assertEqual(message.timestamp, datetime(2021, 10, 17, 15, 17, 56, 120000))
+        for timestamp_string in ["20211317151756123456", "2021101715175612345x", "2021101715"]:
+            with self.assertRaises(ValueError):
+                Message.from_string(f"heartbeat,{timestamp_string}")
+
+
+class TestMessagePool(unittest.TestCase):
+    """
+    Unit tests for the `message.MessagePool` class
+    """
+
+    def test_released_messages_are_reused(self) -> None:
+        """
+        Purpose:
+        Ensure that messages decoded from a pool reuse the messages released to it, up to its capacity, and that
+        messages have no instance dictionary.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - A message decoded after one is released is the same object, holding only the new message's fields
+        - Messages released beyond the pool's capacity are not kept
+        - Messages have no `__dict__`
+        """
+        # Arrange
+        pool = MessagePool(capacity=1)
+        trace = "20211017151756100000;20211017151756110000;20211017151756120000"
+        first = Message.from_string(f"publish,20211017151756123456;{trace},a,1,2", pool)
+
+        # Act
+        pool.release(first)
+        second = Message.from_string("publish,20211017151757000000,b", pool)
+        second_fields = (second.message_type, second.payload[:], second.trace)
+        third = Message.from_string("heartbeat,20211017151757000000", pool)
+        pool.release(second)
+        pool.release(third)
+        fourth = Message.from_string("heartbeat,20211017151758000000", pool)
+
+        # Assert
+        self.assertIs(second, first)
+        self.assertEqual(second_fields, (MessageType.PUBLISH, ["b"], None))
+        self.assertIs(fourth, second)
+        self.assertEqual(pool.created_count, 2)
+        self.assertFalse(hasattr(fourth, "__dict__"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,140 @@
+"""
+Unit tests for the `pipeline` module
+"""
+import threading
+import unittest
+
+from src.ipendpoint import IPEndpoint
+from src.pipeline import Pipeline, StageQueue
+
+
+class RecordingTransport(object):
+    """
+    Stand-in transport that records what it is asked to send
+    """
+
+    def __init__(self) -> None:
+        """
+        Initialize an empty record of sent messages.
+        """
+        self.sent = []
+        self._lock = threading.Lock()
+
+    def send(self, data: bytes, endpoint: IPEndpoint) -> None:
+        """
+        Record a sent message.
+        """
+        with self._lock:
+            self.sent.append((data, endpoint))
+
+
+class TestStageQueue(unittest.TestCase):
+    """
+    Unit tests for the `pipeline.StageQueue` class
+    """
+
+    def test_depth_and_backpressure_metrics(self) -> None:
+        """
+        Purpose:
+        Ensure that a producer blocked by a full queue is counted, and resumes once the consumer makes room.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - The peak depth is the maximum depth
+        - The blocked put is counted and completes once an item is taken
+        """
+        # Arrange
+        stage_queue = StageQueue("test", 2)
+        stage_queue.put(1)
+        stage_queue.put(2)
+        producer = threading.Thread(target=stage_queue.put, args=(3,))
+
+        # Act
+        producer.start()
+        while not stage_queue.blocked_count:
+            pass
+        first = stage_queue.get(1.0)
+        producer.join(1.0)
+
+        # Assert
+        self.assertEqual(first, 1)
+        self.assertFalse(producer.is_alive())
+        self.assertEqual(stage_queue.metrics()["blocked"], 1)
+        self.assertEqual(stage_queue.metrics()["put"], 3)
+        self.assertEqual(stage_queue.metrics()["peak-depth"], 2)
+        self.assertEqual(len(stage_queue), 2)
+
+
+class TestPipeline(unittest.TestCase):
+    """
+    Unit tests for the `pipeline.Pipeline` class
+    """
+
+    def test_messages_to_each_endpoint_stay_in_order(self) -> None:
+        """
+        Purpose:
+        Ensure that messages sent through a pipeline with several sender threads all arrive, and that the messages to
+        each endpoint are sent in the order they were queued.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - Every message is sent
+        - For each endpoint, the messages are sent in order
+        """
+        # Arrange
+        transport = RecordingTransport()
+        pipeline = Pipeline(lambda: [], 4, 16)
+        endpoints = [IPEndpoint("127.0.0.1", port) for port in range(5001, 5009)]
+
+        # Act
+        pipeline.start()
+        for i in range(100):
+            for endpoint in endpoints:
+                pipeline.send(str(i).encode(), endpoint, transport)
+        pipeline.stop()
+
+        # Assert
+        self.assertEqual(len(transport.sent), 100 * len(endpoints))
+        for endpoint in endpoints:
+            sent = [int(data) for data, e in transport.sent if e == endpoint]
+            self.assertEqual(sent, list(range(100)))
+
+
+    def test_stop_with_full_ingress_queue(self) -> None:
+        """
+        Purpose:
+        Ensure that a pipeline whose ingress queue is full, so that its receiver thread is blocked, can still be
+        stopped, and that received messages are queued with the transport they arrived on.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - The first message queued is the first received, with its endpoint and transport
+        - Stopping the pipeline returns while the ingress queue is still full
+        """
+        # Arrange
+        transport = RecordingTransport()
+        endpoint = IPEndpoint("127.0.0.1", 5001)
+        pipeline = Pipeline(lambda: [(transport, [(b"0", endpoint), (b"1", endpoint), (b"2", endpoint)])], 1, 2)
+        stopper = threading.Thread(target=pipeline.stop)
+
+        # Act
+        pipeline.start()
+        first = pipeline.get(1.0)
+        while not pipeline.ingress.blocked_count:
+            pass
+        stopper.start()
+        stopper.join(5.0)
+
+        # Assert
+        self.assertEqual(first, (b"0", endpoint, transport))
+        self.assertFalse(stopper.is_alive())
+        self.assertEqual(len(pipeline.ingress), 2)
+
+if __name__ == "__main__":
+    unittest.main()
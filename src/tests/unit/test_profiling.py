@@ -0,0 +1,143 @@
+"""
+Unit tests for the `profiling` module
+"""
+from pathlib import Path
+import pstats
+import tempfile
+import time
+import unittest
+
+from src.profiling import MODE_CPROFILE, MODE_SAMPLE, Profiler, STAGE_DISPATCH, STAGE_FAN_OUT, StageTimer
+
+
+def busy(duration_s: float) -> None:
+    """
+    Keep the calling thread busy for a duration (in seconds).
+    """
+    deadline_s: float = time.monotonic() + duration_s
+    while time.monotonic() < deadline_s:
+        pass
+
+
+class TestStageTimer(unittest.TestCase):
+    """
+    Unit tests for the `profiling.StageTimer` class
+    """
+
+    def test_stage_timings_are_accumulated(self) -> None:
+        """
+        Purpose:
+        Ensure that a stage timer counts each stage and accumulates its total and longest time.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - The counts, totals, and maxima of each stage are as recorded
+        - The summary has a line per stage
+        """
+        # Arrange
+        stage_timer = StageTimer()
+
+        # Act
+        stage_timer.exit(STAGE_DISPATCH, 0.25)
+        stage_timer.exit(STAGE_DISPATCH, 0.5)
+        stage_timer.exit(STAGE_FAN_OUT, 0.125)
+
+        # Assert
+        self.assertEqual(stage_timer.counts, {STAGE_DISPATCH: 2, STAGE_FAN_OUT: 1})
+        self.assertEqual(stage_timer.totals_s, {STAGE_DISPATCH: 0.75, STAGE_FAN_OUT: 0.125})
+        self.assertEqual(stage_timer.maxima_s, {STAGE_DISPATCH: 0.5, STAGE_FAN_OUT: 0.125})
+        self.assertEqual(len(stage_timer.summary().splitlines()), 3)
+
+
+class TestProfiler(unittest.TestCase):
+    """
+    Unit tests for the `profiling.Profiler` class
+    """
+
+    def test_cprofile_capture(self) -> None:
+        """
+        Purpose:
+        Ensure that a `cProfile` capture is written once its duration has elapsed, with the stage timings alongside.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - The capture does not finish before its duration has elapsed
+        - The profile can be loaded by `pstats` and includes the profiled function
+        - The stage timings include the stage that ran during the capture
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            # Arrange
+            profiler = Profiler(Path(directory))
+            path = profiler.start(0.05, MODE_CPROFILE)
+
+            # Act
+            early = profiler.poll()
+            profiler.enter(STAGE_DISPATCH)
+            busy(0.05)
+            profiler.exit(STAGE_DISPATCH, 0.05)
+            written = profiler.poll()
+
+            # Assert
+            self.assertIsNone(early)
+            self.assertEqual(written, path)
+            self.assertFalse(profiler.is_capturing)
+            functions = {function for _, _, function in pstats.Stats(str(path)).stats}
+            self.assertIn("busy", functions)
+            self.assertIn(STAGE_DISPATCH, path.with_suffix(".stages").read_text())
+
+    def test_sample_capture(self) -> None:
+        """
+        Purpose:
+        Ensure that a stack sampling capture writes collapsed stacks prefixed with the running stage.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - Some samples are attributed to the running stage and include the function running in it
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            # Arrange
+            profiler = Profiler(Path(directory))
+            path = profiler.start(60, MODE_SAMPLE)
+
+            # Act
+            profiler.enter(STAGE_FAN_OUT)
+            busy(0.1)
+            profiler.exit(STAGE_FAN_OUT, 0.1)
+            profiler.stop()
+
+            # Assert
+            stacks = [line.rsplit(" ", 1)[0] for line in path.read_text().splitlines()]
+            self.assertTrue(any(s.startswith(STAGE_FAN_OUT) and "busy" in s for s in stacks))
+
+    def test_invalid_capture_requests(self) -> None:
+        """
+        Purpose:
+        Ensure that a capture cannot be started in an unknown mode or while another is in progress.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - Both requests raise `ValueError`
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            # Arrange
+            profiler = Profiler(Path(directory))
+
+            # Act / Assert
+            with self.assertRaises(ValueError):
+                profiler.start(1, "invalid")
+            profiler.start(60, MODE_SAMPLE)
+            with self.assertRaises(ValueError):
+                profiler.start(1, MODE_CPROFILE)
+            profiler.stop()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,1061 @@
+"""
+Unit tests for the `publisher` module
+"""
+import contextlib
+from datetime import datetime
+import os
+from pathlib import Path
+import socket
+import tempfile
+import threading
+import time
+import tracemalloc
+from typing import List
+import unittest
+
+from src.capture import read_capture, replay
+from src.clock import VirtualClock
+from src.configuration import PublisherConfiguration
+from src.endpoint import Endpoint, UnixEndpoint
+from src.ipendpoint import IPEndpoint, StreamEndpoint
+from src.message import Message, MessageType
+from src.publisher import Publisher
+from src.schema import HEADER
+from src.stats import parse_stats
+from src.transport import (
+    FRAME_HEADER,
+    LoopbackNetwork,
+    LoopbackTransport,
+    StreamTransport,
+    UDPTransport,
+    UnixDatagramTransport
+)
+
+
+class TestPublisher(unittest.TestCase):
+    """
+    Unit tests for the `publisher.Publisher` class
+    """
+
+    WARM_UP_MESSAGES: int = 100
+    MEASURED_MESSAGES: int = 1000
+    MAX_RETAINED_B_PER_MESSAGE: int = 16
+    MAX_PEAK_B_PER_MESSAGE: int = 16384
+
+    def setUp(self) -> None:
+        """
+        Create a publisher and a subscribed client on Unix datagram sockets in a temporary directory, with the
+        publisher's output discarded.
+        """
+        self._directory = tempfile.TemporaryDirectory()
+        self._devnull = open(os.devnull, "w")
+        self._stdout = contextlib.redirect_stdout(self._devnull)
+        self._stdout.__enter__()
+        self.client = UnixDatagramTransport(0.5, 1024)
+        self.client.bind(UnixEndpoint(str(Path(self._directory.name) / "c.sock")))
+        self.publisher = self._start_publisher()
+        self._subscribe("publication")
+
+    def tearDown(self) -> None:
+        """
+        Close the sockets and restore the output.
+        """
+        self.client.close()
+        self.publisher._transport.close()
+        self._stdout.__exit__(None, None, None)
+        self._devnull.close()
+        self._directory.cleanup()
+
+    def _start_publisher(self, **options) -> Publisher:
+        """
+        Create a publisher with any configuration options and bind it to its socket.
+        """
+        configuration = PublisherConfiguration(
+            "127.0.0.1",
+            1337,
+            0.5,
+            1024,
+            10.0,
+            transport="unix",
+            socket_path=str(Path(self._directory.name) / "p.sock"),
+            **options
+        )
+        publisher = Publisher(configuration)
+        publisher._transport.bind(publisher.endpoint)
+        return publisher
+
+    def _subscribe(self, request_string: str) -> None:
+        """
+        Subscribe the client to the publisher with a subscription request.
+        """
+        self.client.send(f"subscribe,20211017150434567854,{request_string}".encode("utf-8"), self.publisher.endpoint)
+        self.publisher._execute()
+        self.client.receive()
+
+    def _route(self) -> bytes:
+        """
+        Submit a message from the client, have the publisher route it, and receive it back.
+        """
+        self.client.send(b"submit,20211017150434567854,publication,0.5,north", self.publisher.endpoint)
+        self.publisher._execute()
+        return self.client.receive()[0]
+
+    def test_routing_allocations_are_bounded_in_steady_state(self) -> None:
+        """
+        Purpose:
+        Ensure that, once warmed up, routing a submitted message to a subscriber reuses pooled messages, retains no
+        memory, and allocates no more than a bounded amount of memory at a time.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - The message is published to the subscriber
+        - No new message objects are created
+        - The memory retained per routed message is within the bound
+        - The peak memory allocated while routing each message is within the bound
+        """
+        # Arrange
+        for _ in range(self.WARM_UP_MESSAGES):
+            self._route()
+        created_count: int = self.publisher._message_pool.created_count
+        peak_b: int = 0
+
+        # Act
+        tracemalloc.start()
+        try:
+            start_b: int = tracemalloc.get_traced_memory()[0]
+            for _ in range(self.MEASURED_MESSAGES):
+                tracemalloc.reset_peak()
+                before_b, _ = tracemalloc.get_traced_memory()
+                published: bytes = self._route()
+                peak_b = max(peak_b, tracemalloc.get_traced_memory()[1] - before_b)
+            retained_b: int = tracemalloc.get_traced_memory()[0] - start_b
+        finally:
+            tracemalloc.stop()
+
+        # Assert
+        self.assertTrue(published.startswith(b"publish,"))
+        self.assertTrue(published.endswith(b",publication,0.5,north"))
+        self.assertEqual(self.publisher._message_pool.created_count, created_count)
+        self.assertLessEqual(retained_b, self.MAX_RETAINED_B_PER_MESSAGE * self.MEASURED_MESSAGES)
+        self.assertLessEqual(peak_b, self.MAX_PEAK_B_PER_MESSAGE)
+
+    def test_warm_restart_from_snapshot(self) -> None:
+        """
+        Purpose:
+        Ensure that a publisher restarted with the snapshot written by its predecessor keeps publishing to existing
+        subscribers, including the traced message pending for a conflated subscription, which has not been stamped
+        with its egress time yet, without them resubscribing.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - The restarted publisher has both subscriptions
+        - The pending conflated message is sent by the restarted publisher, with its trace
+        - A message submitted to the restarted publisher is published to the subscriber
+        """
+        # Arrange
+        snapshot_path = str(Path(self._directory.name) / "subscriptions.snapshot")
+        self.publisher._transport.close()
+        self.publisher = self._start_publisher(snapshot_path=snapshot_path, snapshot_conflated=True)
+        self._subscribe("publication,conflated;interval-ms=200;trace=1")
+        for data in [b"1.0,north", b"2.0,south"]:
+            self.client.send(b"submit,20211017150434567854,conflated," + data, self.publisher.endpoint)
+            self.publisher._execute()
+        self.client.receive()
+        self.publisher._write_snapshot()
+        self.publisher._transport.close()
+
+        # Act
+        self.publisher = self._start_publisher(snapshot_path=snapshot_path)
+        self.publisher._restore_snapshot()
+        self.publisher._flush_conflated()
+        pending: bytes = self.client.receive()[0]
+        published: bytes = self._route()
+
+        # Assert
+        self.assertEqual(len(self.publisher.subscriptions), 2)
+        self.assertTrue(pending.endswith(b",conflated,2.0,south"))
+        self.assertEqual(pending.split(b",")[1].count(b";"), 3)
+        self.assertTrue(published.endswith(b",publication,0.5,north"))
+
+    def test_stats_are_paginated(self) -> None:
+        """
+        Purpose:
+        Ensure that a stats request is answered with every page of stats, each fitting in a datagram, and that a single
+        page can be requested again on its own.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - The stats span several pages, each numbered and within the buffer size
+        - The stats include the subscribers of each publication, the messages routed, and the messages dropped
+        - Requesting a single page returns only that page
+        """
+        # Arrange
+        self._subscribe(",".join(f"publication-{i:02d}" for i in range(40)))
+        self._route()
+        self.client.send(b"submit,20211017150434567854", self.publisher.endpoint)
+        self.publisher._execute()
+
+        # Act
+        self.client.send(b"stats,20211017150434567854", self.publisher.endpoint)
+        self.publisher._execute()
+        responses = [self.client.receive()[0]]
+        page_count = int(responses[0].decode("utf-8").split(",")[3])
+        responses.extend(self.client.receive()[0] for _ in range(page_count - 1))
+        self.client.send(b"stats,20211017150434567854,1", self.publisher.endpoint)
+        self.publisher._execute()
+        repeated: bytes = self.client.receive()[0]
+
+        # Assert
+        pages = [response.decode("utf-8").split(",") for response in responses]
+        stats = parse_stats(token for page in pages for token in page[4:])
+        self.assertGreater(page_count, 1)
+        self.assertEqual([page[2] for page in pages], [str(i) for i in range(page_count)])
+        self.assertTrue(all(len(response) <= 1024 for response in responses))
+        self.assertEqual(stats["subscribers.publication"], "1")
+        self.assertEqual(stats["subscribers.publication-39"], "1")
+        self.assertEqual(stats["subscriptions"], "41")
+        self.assertEqual(stats["dropped.invalid-submit"], "1")
+        self.assertEqual(repeated.split(b",")[2:5], responses[1].split(b",")[2:5])
+
+    def test_middleware_wraps_processing_in_order(self) -> None:
+        """
+        Purpose:
+        Ensure that middleware added for every message type, and for a single one, wraps the processing of messages in
+        the order it was added, and that middleware can drop a message.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - Middleware for every type sees every message, outside middleware added later
+        - Middleware for submit messages sees only submit messages
+        - A submit message dropped by middleware is not published
+        """
+        # Arrange
+        calls = []
+
+        def record(message, endpoint, processor):
+            calls.append(("record", message.message_type))
+            return processor(message, endpoint)
+
+        def reject_private(message, endpoint, processor):
+            calls.append(("reject-private", message.message_type))
+            if message.payload[0] != "private":
+                return processor(message, endpoint)
+            return None
+
+        self.publisher.add_middleware(record)
+        self.publisher.add_middleware(reject_private, MessageType.SUBMIT)
+        sent_count: int = self.publisher._messages_sent_count
+
+        # Act
+        published: bytes = self._route()
+        self.client.send(b"submit,20211017150434567854,private,0.5,north", self.publisher.endpoint)
+        self.publisher._execute()
+        self.client.send(b"heartbeat,20211017150434567854", self.publisher.endpoint)
+        self.publisher._execute()
+
+        # Assert
+        self.assertTrue(published.endswith(b",publication,0.5,north"))
+        self.assertEqual(self.publisher._messages_sent_count, sent_count + 1)
+        self.assertEqual(calls, [
+            ("record", MessageType.SUBMIT),
+            ("reject-private", MessageType.SUBMIT),
+            ("record", MessageType.SUBMIT),
+            ("reject-private", MessageType.SUBMIT),
+            ("record", MessageType.HEARTBEAT)
+        ])
+
+    def test_send_to_departed_subscriber_is_dropped(self) -> None:
+        """
+        Purpose:
+        Ensure that a message that cannot be sent to a subscriber whose socket has gone away is dropped and counted,
+        and that the other subscribers are still sent it.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - The remaining subscriber is sent the message
+        - The failed send is counted as dropped, and not as sent
+        """
+        # Arrange
+        departed = UnixDatagramTransport(0.5, 1024)
+        departed.bind(UnixEndpoint(str(Path(self._directory.name) / "d.sock")))
+        departed.send(b"subscribe,20211017150434567854,publication", self.publisher.endpoint)
+        self.publisher._execute()
+        departed.close()
+        sent_count: int = self.publisher._messages_sent_count
+
+        # Act
+        published: bytes = self._route()
+        stats = self.publisher._stats()
+
+        # Assert
+        self.assertTrue(published.endswith(b",publication,0.5,north"))
+        self.assertEqual(stats["dropped.send-failed"], 1)
+        self.assertEqual(self.publisher._messages_sent_count, sent_count + 1)
+
+    def test_invalid_filters_are_rejected(self) -> None:
+        """
+        Purpose:
+        Ensure that subscription requests with filters comparing infinite, NaN, or non-numeric values are rejected
+        when they are received, rather than failing when a message is later routed through them.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - None of the requests is accepted, and each is counted as a rejected subscription
+        - A submitted message is still published to the existing subscription
+        """
+        # Arrange
+        requests = ["publication;filter=1>inf", "publication;filter=1<nan", "publication;filter=2>north"]
+
+        # Act
+        subscribe: bytes = f"subscribe,20211017150434567854,{','.join(requests)}".encode("utf-8")
+        self.client.send(subscribe, self.publisher.endpoint)
+        self.publisher._execute()
+        reply: bytes = self.client.receive()[0]
+        published: bytes = self._route()
+        stats = self.publisher._stats()
+
+        # Assert
+        self.assertEqual(reply.count(b","), 1)
+        self.assertEqual(stats["dropped.rejected-subscription"], 3)
+        self.assertTrue(published.endswith(b",publication,0.5,north"))
+
+    def test_sharded_routing_and_rebalance(self) -> None:
+        """
+        Purpose:
+        Ensure that a sharded publisher routes submitted messages through its shard workers, and keeps routing them
+        after its shards are rebalanced by a shards request.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - A message is published to the subscriber before and after the rebalance
+        - The shards request is answered with the new number of shards and the number of publications moved
+        - The subscription is kept across the rebalance
+        """
+        # Arrange
+        self.publisher._transport.close()
+        self.publisher = self._start_publisher(shards=2)
+        self._subscribe("publication")
+        self.publisher._shard_workers.start()
+
+        try:
+            # Act
+            before: bytes = self._route()
+            self.client.send(b"shards,20211017150434567854,3", self.publisher.endpoint)
+            self.publisher._execute()
+            response: bytes = self.client.receive()[0]
+            after: bytes = self._route()
+        finally:
+            self.publisher._shard_workers.stop()
+
+        # Assert
+        self.assertTrue(before.endswith(b",publication,0.5,north"))
+        self.assertTrue(after.endswith(b",publication,0.5,north"))
+        self.assertEqual(response.split(b",")[2], b"3")
+        self.assertIn(response.split(b",")[3], [b"0", b"1"])
+        self.assertEqual(len(self.publisher.subscriptions), 1)
+
+    def test_shard_workers_count_and_deliver_concurrently(self) -> None:
+        """
+        Purpose:
+        Ensure that the shard workers of a sharded publisher fan out while holding their shard's lock, count the
+        messages they send in counts of their own, and send each message of a queue group to one member only.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - No other thread can take the lock of a shard while its worker sends a message
+        - Every message of each publication is published to each subscriber once
+        - Each message of the queue group is published to exactly one of its members
+        - The messages sent by the workers are counted by the workers, and included in the count of messages sent
+        """
+        # Arrange
+        network = LoopbackNetwork()
+        configuration = PublisherConfiguration("127.0.0.1", 1337, 0.5, 1024, 10.0, shards=4)
+        publisher = Publisher(configuration, LoopbackTransport(0.5, 1024, network))
+        publisher._transport.bind(publisher.endpoint)
+        clients = [LoopbackTransport(0.5, 1024, network) for _ in range(4)]
+        publications = [f"publication{i}" for i in range(8)]
+        requests = [(client, request_string) for client in clients for request_string in publications]
+        requests += [(client, "grouped;group=workers") for client in clients]
+        for client, request_string in requests:
+            client.send(f"subscribe,20211017150434567854,{request_string}".encode("utf-8"), publisher.endpoint)
+            publisher._execute()
+        for i in range(100):
+            for publication in publications + ["grouped"]:
+                clients[0].send(f"submit,20211017150434567854,{publication},{i}".encode("utf-8"), publisher.endpoint)
+        send_publish = publisher._send_publish
+        unlocked_sends: List[str] = []
+
+        def try_lock(publication: str) -> None:
+            lock = publisher.subscriptions.lock(publication)
+            if lock.acquire(blocking=False):
+                lock.release()
+                unlocked_sends.append(publication)
+
+        def send_publish_checking_lock(publish_message: Message, endpoint: Endpoint) -> None:
+            if publish_message.payload[0] == "grouped":
+                checker = threading.Thread(target=try_lock, args=(publish_message.payload[0],))
+                checker.start()
+                checker.join()
+            send_publish(publish_message, endpoint)
+
+        publisher._send_publish = send_publish_checking_lock
+        publisher._shard_workers.start()
+
+        try:
+            # Act
+            for _ in range(100 * (len(publications) + 1)):
+                publisher._execute()
+        finally:
+            publisher._shard_workers.stop()
+        received = [[] for _ in clients]
+        while any(len(client._queue) for client in clients):
+            for client, messages in zip(clients, received):
+                messages.extend(data.split(b",") for data, _ in client.receive_waiting())
+        received = [[fields for fields in messages if fields[0] == b"publish"] for messages in received]
+        published = [fields for messages in received for fields in messages]
+
+        # Assert
+        self.assertEqual(unlocked_sends, [])
+        for messages in received:
+            for publication in publications:
+                self.assertEqual(
+                    sorted(int(fields[-1]) for fields in messages if fields[2] == publication.encode("utf-8")),
+                    list(range(100))
+                )
+        self.assertEqual(sorted(int(fields[-1]) for fields in published if fields[2] == b"grouped"), list(range(100)))
+        self.assertEqual(publisher._shard_workers.totals().messages_sent_count, len(published))
+        self.assertEqual(publisher._traffic_counts()["messages-sent"], len(requests) + len(published))
+        self.assertEqual(publisher._shard_workers.error_count, 0)
+
+    def test_shard_workers_share_a_stream_connection(self) -> None:
+        """
+        Purpose:
+        Ensure that the shard workers of a sharded publisher given a stream transport can fan out to the same stream
+        connection at once without corrupting it, and that what they send goes out without waiting for the main loop.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - The subscriber receives every message of every publication exactly once, each frame whole, without the main
+        loop running after the last message is queued
+        """
+        # Arrange
+        with socket.create_server(("127.0.0.1", 0)) as probe:
+            port: int = probe.getsockname()[1]
+        configuration = PublisherConfiguration("127.0.0.1", port, 0.5, 1024, 10.0, shards=4)
+        publisher = Publisher(configuration, StreamTransport(0.5, 1024, socket.AF_INET, 1 << 30, 1 << 20))
+        publisher._transport.bind(StreamEndpoint("127.0.0.1", port))
+        client = socket.create_connection(("127.0.0.1", port))
+        client.settimeout(1.0)
+        publications = [f"publication{i}" for i in range(8)]
+
+        def send(data: bytes) -> None:
+            client.sendall(FRAME_HEADER.pack(len(data)) + data)
+
+        def receive() -> List[bytes]:
+            received = bytearray()
+            while True:
+                try:
+                    chunk: bytes = client.recv(65536)
+                except socket.timeout:
+                    break
+                if not chunk:
+                    break
+                received.extend(chunk)
+            messages: List[bytes] = []
+            offset: int = 0
+            while offset < len(received):
+                (length,) = FRAME_HEADER.unpack_from(received, offset)
+                messages.append(bytes(received[offset + FRAME_HEADER.size:offset + FRAME_HEADER.size + length]))
+                offset += FRAME_HEADER.size + length
+            return messages
+
+        for publication in publications:
+            send(f"subscribe,20211017150434567854,{publication}".encode("utf-8"))
+        while len(publisher.subscriptions) < len(publications):
+            publisher._execute()
+        for i in range(200):
+            for publication in publications:
+                send(f"submit,20211017150434567854,{publication},{i}".encode("utf-8"))
+        publisher._shard_workers.start()
+
+        try:
+            # Act
+            for _ in range(200 * len(publications)):
+                publisher._execute()
+            while any(len(shard_queue) for shard_queue in publisher._shard_workers.queues):
+                time.sleep(0.01)
+            messages = receive()
+        finally:
+            publisher._shard_workers.stop()
+            client.close()
+            publisher.close()
+        published = [message.split(b",") for message in messages if message.startswith(b"publish,")]
+
+        # Assert
+        for publication in publications:
+            self.assertEqual(
+                sorted(int(fields[-1]) for fields in published if fields[2] == publication.encode("utf-8")),
+                list(range(200))
+            )
+        self.assertEqual(len(published), 200 * len(publications))
+
+    def test_queue_group_members_share_messages(self) -> None:
+        """
+        Purpose:
+        Ensure that the members of a queue group are each sent every other message of the publication, so that each
+        message is sent to the group once.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - Each member of the group receives two of the four messages, and together they receive all four
+        - The stats list the number of members of the group
+        """
+        # Arrange
+        member = UnixDatagramTransport(0.5, 1024)
+        member.bind(UnixEndpoint(str(Path(self._directory.name) / "m.sock")))
+        self._subscribe("grouped;group=workers")
+        member.send(b"subscribe,20211017150434567854,grouped;group=workers", self.publisher.endpoint)
+        self.publisher._execute()
+        member.receive()
+
+        try:
+            # Act
+            for i in range(4):
+                self.client.send(f"submit,20211017150434567854,grouped,{i}".encode("utf-8"), self.publisher.endpoint)
+                self.publisher._execute()
+            received = [self.client.receive()[0] for _ in range(2)]
+            received_by_member = [member.receive()[0] for _ in range(2)]
+            stats = self.publisher._stats()
+        finally:
+            member.close()
+
+        # Assert
+        self.assertEqual(
+            sorted(message.split(b",")[-1] for message in received + received_by_member), [b"0", b"1", b"2", b"3"]
+        )
+        self.assertEqual(stats["queue-group.grouped.workers"], 2)
+
+    def test_leases_expire_by_virtual_clock_over_loopback(self) -> None:
+        """
+        Purpose:
+        Ensure that a publisher on a loopback network routes messages without sockets, and that leases expire as its
+        virtual clock is advanced, not as real time passes.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - The subscription is accepted and a submitted message is published to the subscriber
+        - The subscription survives a sweep before its lease runs out, and is removed by a sweep after
+        """
+        # Arrange
+        network = LoopbackNetwork()
+        clock = VirtualClock()
+        configuration = PublisherConfiguration("127.0.0.1", 1337, 0.5, 1024, 10.0)
+        publisher = Publisher(configuration, LoopbackTransport(0.5, 1024, network), clock)
+        publisher._transport.bind(publisher.endpoint)
+        client = LoopbackTransport(0.5, 1024, network)
+
+        # Act
+        client.send(b"subscribe,20211017150434567854,publication", publisher.endpoint)
+        publisher._execute()
+        client.send(b"submit,20211017150434567854,publication,0.5,north", publisher.endpoint)
+        publisher._execute()
+        received = client.receive_waiting()
+        clock.advance(9.0)
+        publisher._remove_timed_out_subscribers()
+        subscriptions_before_expiry: int = len(publisher.subscriptions)
+        clock.advance(1.0)
+        publisher._remove_timed_out_subscribers()
+
+        # Assert
+        self.assertEqual(client.endpoint, IPEndpoint("127.0.0.1", LoopbackNetwork.FIRST_EPHEMERAL_PORT))
+        self.assertTrue(received[0][0].startswith(b"subscribe,"))
+        self.assertTrue(received[1][0].endswith(b",publication,0.5,north"))
+        self.assertEqual(subscriptions_before_expiry, 1)
+        self.assertEqual(len(publisher.subscriptions), 0)
+
+    def test_flooding_producer_is_rate_limited(self) -> None:
+        """
+        Purpose:
+        Ensure that a publisher with an ingress rate limit drops the messages of a producer over the limit, before they
+        are decoded, while another producer's messages still get through, and that the producer is let through again
+        once its bucket has refilled.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - Only the burst of the flooding producer's messages, and the other producer's message, are published
+        - The dropped messages are counted and never reach the message pool
+        - A message from the flooding producer is published once the virtual clock has moved on
+        """
+        # Arrange
+        network = LoopbackNetwork()
+        clock = VirtualClock()
+        configuration = PublisherConfiguration(
+            "127.0.0.1", 1337, 0.5, 1024, 10.0, ingress_rate_per_s=5, ingress_burst=3
+        )
+        publisher = Publisher(configuration, LoopbackTransport(0.5, 1024, network), clock)
+        publisher._transport.bind(publisher.endpoint)
+        subscriber, flooder, producer = (LoopbackTransport(0.5, 1024, network) for _ in range(3))
+        subscriber.send(b"subscribe,20211017150434567854,publication", publisher.endpoint)
+        publisher._execute()
+        subscriber.receive_waiting()
+
+        # Act
+        for _ in range(10):
+            flooder.send(b"submit,20211017150434567854,publication,flood", publisher.endpoint)
+        producer.send(b"submit,20211017150434567854,publication,steady", publisher.endpoint)
+        for _ in range(4):
+            publisher._execute()
+        published = [data for data, _ in subscriber.receive_waiting()]
+        decoded_count: int = publisher._messages_received_count
+        clock.advance(0.2)
+        flooder.send(b"submit,20211017150434567854,publication,again", publisher.endpoint)
+        publisher._execute()
+        published_later = [data for data, _ in subscriber.receive_waiting()]
+
+        # Assert
+        self.assertEqual([data.split(b",")[-1] for data in published], [b"flood"] * 3 + [b"steady"])
+        self.assertEqual(publisher._drop_counts["ingress-endpoint-limit"], 7)
+        self.assertEqual(decoded_count, 1 + 4)
+        self.assertEqual([data.split(b",")[-1] for data in published_later], [b"again"])
+
+    def test_durable_subscription_is_spooled_and_drained(self) -> None:
+        """
+        Purpose:
+        Ensure that the messages of a durable subscription are spooled while no subscriber holds it, and that a
+        returning subscriber is sent them at the drain rate, followed by those published while it drained, before live
+        delivery resumes.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - Nothing is sent while the lease has lapsed, and the messages are spooled instead
+        - The spooled messages, then the message published while draining, are sent one per drain interval
+        - The spool is empty once drained, and the next message is sent live
+        """
+        # Arrange
+        network = LoopbackNetwork()
+        clock = VirtualClock()
+        with tempfile.TemporaryDirectory() as directory:
+            configuration = PublisherConfiguration(
+                "127.0.0.1", 1337, 0.5, 1024, 10.0, spool_directory=directory, spool_drain_rate_per_s=100
+            )
+            publisher = Publisher(configuration, LoopbackTransport(0.5, 1024, network), clock)
+            publisher._transport.bind(publisher.endpoint)
+            subscriber, producer = (LoopbackTransport(0.5, 1024, network) for _ in range(2))
+            subscribe: bytes = b"subscribe,20211017150434567854,publication;durable=audit"
+            subscriber.send(subscribe, publisher.endpoint)
+            publisher._execute()
+            subscriber.receive_waiting()
+
+            # Act
+            clock.advance(10.0)
+            publisher._remove_timed_out_subscribers()
+            for value in [b"1", b"2", b"3"]:
+                producer.send(b"submit,20211017150434567854,publication," + value, publisher.endpoint)
+                publisher._execute()
+            sent_while_absent = subscriber.receive_waiting()
+            spooled: int = publisher._stats()["spool.audit.messages"]
+            subscriber.send(subscribe, publisher.endpoint)
+            publisher._execute()
+            producer.send(b"submit,20211017150434567854,publication,4", publisher.endpoint)
+            publisher._execute()
+            acknowledgement = subscriber.receive_waiting()
+            drained = []
+            for _ in range(4):
+                publisher._drain_spools()
+                drained.extend(data for data, _ in subscriber.receive_waiting())
+            producer.send(b"submit,20211017150434567854,publication,5", publisher.endpoint)
+            publisher._execute()
+            live = subscriber.receive_waiting()
+            spool_size_b: int = (Path(directory) / "audit.spool").stat().st_size
+            publisher._close_spools()
+
+        # Assert
+        self.assertEqual(sent_while_absent, [])
+        self.assertEqual(spooled, 3)
+        self.assertEqual(len(acknowledgement), 1)
+        self.assertTrue(acknowledgement[0][0].startswith(b"subscribe,"))
+        self.assertEqual([data.split(b",")[-1] for data in drained], [b"1", b"2", b"3", b"4"])
+        self.assertEqual(spool_size_b, 0)
+        self.assertEqual([data.split(b",")[-1] for data, _ in live], [b"5"])
+
+    def test_memory_budget_rejects_or_evicts(self) -> None:
+        """
+        Purpose:
+        Ensure that a subscription that would take a publication over its memory budget is rejected with the reject
+        policy, and evicts the subscription least recently renewed with the evict policy, and that the memory charged
+        is released when subscriptions are removed.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - With the reject policy, the third subscription to a publication is rejected while another publication's is
+        accepted
+        - With the evict policy, the third subscription is accepted in place of the least recently renewed one
+        - Nothing is left charged once every subscription has been removed
+        """
+        # Arrange
+        results = {}
+        for policy in ["reject", "evict"]:
+            network = LoopbackNetwork()
+            clock = VirtualClock()
+            configuration = PublisherConfiguration(
+                "127.0.0.1", 1337, 0.5, 1024, 10.0, publication_memory_budget_b=1100, memory_policy=policy
+            )
+            publisher = Publisher(configuration, LoopbackTransport(0.5, 1024, network), clock)
+            publisher._transport.bind(publisher.endpoint)
+            subscribers = [LoopbackTransport(0.5, 1024, network) for _ in range(4)]
+
+            # Act
+            for subscriber, publication in zip(subscribers, [b"p", b"p", b"p", b"q"]):
+                subscriber.send(b"subscribe,20211017150434567854," + publication, publisher.endpoint)
+                publisher._execute()
+                clock.advance(1.0)
+            accepted = [len(subscriber.receive_waiting()[0][0].split(b",")) > 2 for subscriber in subscribers]
+            stats = publisher._stats()
+            remaining = [subscription.endpoint for subscription in publisher.subscriptions.subscriptions("p")]
+            clock.advance(10.0)
+            publisher._remove_timed_out_subscribers()
+            results[policy] = (accepted, stats, remaining, publisher._memory.charged_b)
+
+        # Assert
+        accepted, stats, remaining, charged_b = results["reject"]
+        self.assertEqual(accepted, [True, True, False, True])
+        self.assertEqual((stats["memory.rejected"], stats["memory.evicted"]), (1, 0))
+        self.assertEqual(stats["memory.publication-b.p"], 2 * 513)
+        self.assertEqual(charged_b, 0)
+        accepted, stats, remaining, charged_b = results["evict"]
+        self.assertEqual(accepted, [True, True, True, True])
+        self.assertEqual((stats["memory.rejected"], stats["memory.evicted"]), (0, 1))
+        self.assertNotIn(subscribers[0].endpoint, remaining)
+        self.assertEqual(len(remaining), 2)
+        self.assertEqual(charged_b, 0)
+
+    def test_memory_budget_rejection_leaves_state_unchanged(self) -> None:
+        """
+        Purpose:
+        Ensure that a subscription too large for its publication's memory budget, however much is evicted, is rejected
+        without evicting anything, and that a rejected durable subscription releases the durable subscription it
+        created.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - The oversized subscription is rejected, and the subscriptions already made are kept
+        - The durable subscription with an invalid filter is rejected, leaving no durable subscription, no spool, and
+        nothing more charged
+        """
+        # Arrange
+        network = LoopbackNetwork()
+        with tempfile.TemporaryDirectory() as directory:
+            configuration = PublisherConfiguration(
+                "127.0.0.1",
+                1337,
+                0.5,
+                1024,
+                10.0,
+                publication_memory_budget_b=1100,
+                memory_policy="evict",
+                spool_directory=directory
+            )
+            publisher = Publisher(configuration, LoopbackTransport(0.5, 1024, network))
+            publisher._transport.bind(publisher.endpoint)
+            subscribers = [LoopbackTransport(0.5, 1024, network) for _ in range(3)]
+            for subscriber in subscribers[:2]:
+                subscriber.send(b"subscribe,20211017150434567854,p", publisher.endpoint)
+                publisher._execute()
+            charged_b: int = publisher._memory.charged_b
+
+            # Act
+            oversized: bytes = b"subscribe,20211017150434567854,p;filter=1==" + b"x" * 300
+            subscribers[2].send(oversized, publisher.endpoint)
+            publisher._execute()
+            subscribers[2].send(b"subscribe,20211017150434567854,q;durable=audit;filter=2>north", publisher.endpoint)
+            publisher._execute()
+            replies = [data.split(b",") for data, _ in subscribers[2].receive_waiting()]
+            spooled = list(Path(directory).iterdir())
+
+        # Assert
+        self.assertEqual([len(reply) for reply in replies], [2, 2])
+        self.assertEqual(len(publisher.subscriptions.subscriptions("p")), 2)
+        self.assertEqual(publisher._memory_evicted_count, 0)
+        self.assertEqual(publisher._memory.charged_b, charged_b)
+        self.assertEqual(publisher._durables, {})
+        self.assertEqual(publisher._absent_durables, {})
+        self.assertEqual(spooled, [])
+
+    def test_captured_traffic_replays_against_another_publisher(self) -> None:
+        """
+        Purpose:
+        Ensure that a publisher with a capture path records the datagrams it receives, with their sources, and that
+        replaying the capture against a fresh publisher, from a stand-in for each source, routes the same messages.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - Every datagram received is captured, from as many sources as sent them
+        - The replayed subscriber receives what the original subscriber received
+        """
+        # Arrange
+        capture_path = Path(self._directory.name) / "traffic.cap"
+        network = LoopbackNetwork()
+        clock = VirtualClock()
+        configuration = PublisherConfiguration("127.0.0.1", 1337, 0.5, 1024, 10.0, capture_path=str(capture_path))
+        publisher = Publisher(configuration, LoopbackTransport(0.5, 1024, network), clock)
+        publisher._transport.bind(publisher.endpoint)
+        subscriber, producer = (LoopbackTransport(0.5, 1024, network) for _ in range(2))
+
+        # Act
+        subscriber.send(b"subscribe,20211017150434567854,publication", publisher.endpoint)
+        publisher._execute()
+        for value in range(3):
+            clock.advance(0.1)
+            producer.send(f"submit,20211017150434567854,publication,{value}".encode("utf-8"), publisher.endpoint)
+            publisher._execute()
+        received = [data for data, _ in subscriber.receive_waiting()]
+        captured_count: int = publisher._stats()["capture.datagrams"]
+        publisher.stop_capture()
+        replay_network = LoopbackNetwork()
+        replay_publisher = Publisher(
+            PublisherConfiguration("127.0.0.1", 1337, 0.5, 1024, 10.0), LoopbackTransport(0.5, 1024, replay_network)
+        )
+        replay_publisher._transport.bind(replay_publisher.endpoint)
+        sources = {}
+
+        def send(source: str, data: bytes) -> None:
+            transport = sources.setdefault(source, LoopbackTransport(0.5, 1024, replay_network))
+            transport.send(data, replay_publisher.endpoint)
+            replay_publisher._execute()
+
+        replayed_count: int = replay(read_capture(capture_path), send, None)
+        replayed = [data for data, _ in next(iter(sources.values())).receive_waiting()]
+
+        # Assert
+        self.assertEqual(captured_count, 4)
+        self.assertEqual(replayed_count, 4)
+        self.assertEqual(len(sources), 2)
+        self.assertEqual(len(replayed), 4)
+        self.assertEqual([data.split(b",")[-1] for data in replayed], [data.split(b",")[-1] for data in received])
+
+    def test_malformed_datagrams_are_rejected_and_their_source_quarantined(self) -> None:
+        """
+        Purpose:
+        Ensure that malformed datagrams, including one truncated for being larger than the buffer size, are dropped
+        and counted by reason without stopping the publisher, and that their source is quarantined once it has sent too
+        many, while other sources are still served.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - Each malformed datagram is counted under its reason, and the source's next, valid, message as quarantined
+        - A valid message from another source is still published
+        """
+        # Arrange
+        self.publisher._transport.close()
+        self.publisher = self._start_publisher(quarantine_threshold=3)
+        self._subscribe("publication")
+        garbage = UnixDatagramTransport(0.5, 1024)
+        garbage.bind(UnixEndpoint(str(Path(self._directory.name) / "g.sock")))
+
+        # Act
+        for data in [
+            b"submit,20211017150434567854,publication," + b"x" * 2048,
+            b"\xde\xad\xbe\xef",
+            b"submit,yesterday,publication,0.5",
+            b"submit,20211017150434567854,publication,sneaky"
+        ]:
+            garbage.send(data, self.publisher.endpoint)
+        published: bytes = self._route()
+        stats = self.publisher._stats()
+        garbage.close()
+
+        # Assert
+        self.assertTrue(published.endswith(b",publication,0.5,north"))
+        reasons = ["oversized", "invalid-type", "invalid-timestamp", "quarantined"]
+        self.assertEqual([stats[f"dropped.{reason}"] for reason in reasons], [1, 1, 1, 1])
+        self.assertEqual((stats["quarantine.sources"], stats["quarantine.quarantined"]), (1, 1))
+
+    def test_out_of_range_binary_timestamp_is_malformed(self) -> None:
+        """
+        Purpose:
+        Ensure that a binary message whose header is valid but whose timestamp is out of the range of dates is dropped
+        as malformed, and counted against its source, without stopping the publisher.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - The message is counted as malformed, and as a strike against its source
+        - A valid message is still published
+        """
+        # Arrange
+        self.publisher._transport.close()
+        self.publisher = self._start_publisher(schemas={"sensor": ["temperature:float64"]})
+        self._subscribe("publication")
+        schema = self.publisher.schemas.for_publication("sensor")
+        binary = bytes(Message(MessageType.SUBMIT, datetime.now(), "sensor", 0.5, schema=schema))
+        marker, message_type, flags, _, schema_id = HEADER.unpack_from(binary)
+        far_future = HEADER.pack(marker, message_type, flags, 2 ** 62, schema_id) + binary[HEADER.size:]
+
+        # Act
+        self.client.send(far_future, self.publisher.endpoint)
+        published: bytes = self._route()
+        stats = self.publisher._stats()
+
+        # Assert
+        self.assertEqual(stats["dropped.malformed"], 1)
+        self.assertEqual(len(self.publisher._quarantine._strikes), 1)
+        self.assertTrue(published.endswith(b",publication,0.5,north"))
+
+    def test_out_of_range_typed_field_is_rejected(self) -> None:
+        """
+        Purpose:
+        Ensure that a text message submitted to a typed publication with a value out of range of its field type is
+        rejected as an invalid submit, rather than failing to be encoded during fan-out and stopping the publisher.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - The message is counted as an invalid submit, and nothing is published for it
+        - A valid message is still published
+        """
+        # Arrange
+        self.publisher._transport.close()
+        self.publisher = self._start_publisher(schemas={"sensor": ["count:int32"]})
+        self._subscribe("sensor")
+        self._subscribe("publication")
+
+        # Act
+        self.client.send(b"submit,20211017150434567854,sensor,99999999999", self.publisher.endpoint)
+        self.publisher._execute()
+        published: bytes = self._route()
+        stats = self.publisher._stats()
+
+        # Assert
+        self.assertEqual(stats["dropped.invalid-submit"], 1)
+        self.assertTrue(published.endswith(b",publication,0.5,north"))
+
+    def test_listeners_share_subscriptions_and_reply_on_arrival_socket(self) -> None:
+        """
+        Purpose:
+        Ensure that a publisher with a further listener accepts subscriptions on both its sockets into the same
+        registry, and replies and publishes to each subscriber through the socket it subscribed on.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - The subscription made on the listener is acknowledged from the listener's socket
+        - A message submitted to the main socket is published to both subscribers, each from the socket it subscribed on
+        """
+        # Arrange
+        self.publisher._transport.close()
+        listener_path = str(Path(self._directory.name) / "l.sock")
+        self.publisher = self._start_publisher(listeners=[{"socket-path": listener_path}])
+        self.publisher._listener_transports[0].bind(self.publisher.listener_endpoints[0])
+        self._subscribe("publication")
+        other = UnixDatagramTransport(0.5, 1024)
+        other.bind(UnixEndpoint(str(Path(self._directory.name) / "o.sock")))
+
+        # Act
+        other.send(b"subscribe,20211017150434567854,publication", UnixEndpoint(listener_path))
+        self.publisher._execute()
+        acknowledgement, acknowledged_from = other.receive()
+        self.client.send(b"submit,20211017150434567854,publication,0.5,north", self.publisher.endpoint)
+        self.publisher._execute()
+        published, published_from = self.client.receive()
+        other_published, other_published_from = other.receive()
+        stats = self.publisher._stats()
+        other.close()
+        self.publisher._listener_transports[0].close()
+
+        # Assert
+        self.assertTrue(acknowledgement.endswith(b",publication"))
+        self.assertEqual(acknowledged_from, UnixEndpoint(listener_path))
+        self.assertEqual(len(self.publisher.subscriptions.subscriptions("publication")), 2)
+        self.assertEqual(published, other_published)
+        self.assertEqual(published_from, self.publisher.endpoint)
+        self.assertEqual(other_published_from, UnixEndpoint(listener_path))
+        self.assertEqual((stats["listeners"], stats["listeners.reply-routes"]), (2, 2))
+
+    @unittest.skipUnless(socket.has_ipv6, "IPv6 is not supported")
+    def test_dual_stack_listeners(self) -> None:
+        """
+        Purpose:
+        Ensure that a UDP publisher listening on IPv4 and IPv6 loopback addresses routes a message submitted over one
+        to a subscriber on the other.
+
+        Prerequisites:
+        IPv6 loopback
+
+        Pass condition(s):
+        - The IPv6 subscriber's subscription is acknowledged from the IPv6 listener
+        - A message submitted over IPv4 is published to the IPv6 subscriber
+        """
+        # Arrange
+        ports = []
+        for family, ip_address in [(socket.AF_INET, "127.0.0.1"), (socket.AF_INET6, "::1")]:
+            with socket.socket(family, socket.SOCK_DGRAM) as probe:
+                try:
+                    probe.bind((ip_address, 0))
+                except OSError:
+                    self.skipTest(f"Cannot bind to {ip_address}")
+                ports.append(probe.getsockname()[1])
+        configuration = PublisherConfiguration(
+            "127.0.0.1", ports[0], 0.5, 1024, 10.0, listeners=[{"ip-address": "::1", "port": ports[1]}]
+        )
+        publisher = Publisher(configuration)
+        publisher._transport.bind(publisher.endpoint)
+        publisher._listener_transports[0].bind(publisher.listener_endpoints[0])
+        producer = UDPTransport(0.5, 1024)
+        subscriber = UDPTransport(0.5, 1024, socket.AF_INET6)
+
+        # Act
+        try:
+            subscriber.send(b"subscribe,20211017150434567854,publication", IPEndpoint("::1", ports[1]))
+            publisher._execute()
+            _, acknowledged_from = subscriber.receive()
+            producer.send(b"submit,20211017150434567854,publication,0.5,north", publisher.endpoint)
+            publisher._execute()
+            published, _ = subscriber.receive()
+        finally:
+            producer.close()
+            subscriber.close()
+            publisher.close()
+
+        # Assert
+        self.assertEqual(acknowledged_from, IPEndpoint("::1", ports[1]))
+        self.assertTrue(published.endswith(b",publication,0.5,north"))
+
+if __name__ == "__main__":
+    unittest.main()
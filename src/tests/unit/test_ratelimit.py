@@ -0,0 +1,100 @@
+"""
+Unit tests for the `ratelimit` module
+"""
+from datetime import datetime
+import unittest
+
+from src.ipendpoint import IPEndpoint
+from src.message import Message, MessageType
+from src.ratelimit import ENDPOINT_LIMIT, IngressLimiter, PUBLICATION_LIMIT, RateLimiter
+from src.schema import SchemaRegistry
+
+
+class TestRateLimiter(unittest.TestCase):
+    """
+    Unit tests for the `ratelimit.RateLimiter` class
+    """
+
+    def test_bursts_refill_and_eviction(self) -> None:
+        """
+        Purpose:
+        Ensure that a key is allowed up to the burst at once and then the rate, independently of other keys, and that
+        its bucket is evicted only once it has refilled.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - The burst is allowed and the next event refused
+        - Another key is allowed while the first is refused
+        - One more event is allowed once a token has been refilled
+        - The bucket of the first key is kept while it refills, and evicted once full, after that of the other key
+        """
+        # Arrange
+        limiter = RateLimiter(10, 3)
+
+        # Act
+        burst = [limiter.allow("producer", 0.0) for _ in range(4)]
+        other: bool = limiter.allow("other", 0.0)
+        refilled = [limiter.allow("producer", 0.1) for _ in range(2)]
+        evicted_while_refilling: int = limiter.evict(0.2)
+        evicted_when_full: int = limiter.evict(0.5)
+
+        # Assert
+        self.assertEqual(burst, [True, True, True, False])
+        self.assertTrue(other)
+        self.assertEqual(refilled, [True, False])
+        self.assertEqual(evicted_while_refilling, 1)
+        self.assertEqual(evicted_when_full, 1)
+        self.assertEqual(len(limiter), 0)
+
+
+class TestIngressLimiter(unittest.TestCase):
+    """
+    Unit tests for the `ratelimit.IngressLimiter` class
+    """
+
+    def test_limits_by_endpoint_and_publication(self) -> None:
+        """
+        Purpose:
+        Ensure that messages are limited by source endpoint, and submitted messages, text or binary, by publication,
+        without being decoded.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - An endpoint over its limit is reported as over the endpoint limit
+        - A second submission of a publication from another endpoint, in text or in binary, is reported as over the
+        publication limit
+        - Messages that are not submissions are not limited by publication
+        """
+        # Arrange
+        schemas = SchemaRegistry.from_definitions({"typed": ["float64"]})
+        limiter = IngressLimiter(schemas, 2, 1, 0)
+        typed = bytes(
+            Message(MessageType.SUBMIT, datetime.now(), "typed", 0.5, schema=schemas.for_publication("typed"))
+        )
+        endpoints = [IPEndpoint("127.0.0.1", port) for port in range(5001, 5007)]
+
+        # Act
+        results = [
+            limiter.check(b"heartbeat,20211017150434567854", endpoints[0], 0.0),
+            limiter.check(b"heartbeat,20211017150434567854", endpoints[0], 0.0),
+            limiter.check(b"heartbeat,20211017150434567854", endpoints[0], 0.0),
+            limiter.check(b"submit,20211017150434567854,publication,0.5", endpoints[1], 0.0),
+            limiter.check(b"SUBMIT,20211017150434567854,publication,0.5", endpoints[2], 0.0),
+            limiter.check(typed, endpoints[3], 0.0),
+            limiter.check(typed, endpoints[4], 0.0),
+            limiter.check(b"subscribe,20211017150434567854,publication", endpoints[5], 0.0)
+        ]
+
+        # Assert
+        self.assertEqual(results, [
+            None, None, ENDPOINT_LIMIT, None, PUBLICATION_LIMIT, None, PUBLICATION_LIMIT, None
+        ])
+        self.assertEqual(limiter.bucket_count(), 6 + 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
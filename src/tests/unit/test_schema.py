@@ -0,0 +1,185 @@
+"""
+Unit tests for the `schema` module
+"""
+from datetime import datetime
+import unittest
+
+from src.message import Message, MessageType, Trace
+from src.schema import Schema, SchemaRegistry
+
+
+class TestSchema(unittest.TestCase):
+    """
+    Unit tests for the `schema.Schema` class
+    """
+
+    def test_invalid_field_types(self) -> None:
+        """
+        Purpose:
+        Ensure that a schema with no fields or an unknown field type cannot be created.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - A `ValueError` is raised for each invalid schema
+        """
+        for field_types in [[], ["float128"], ["str0"], ["str256"]]:
+            with self.assertRaises(ValueError):
+                Schema("publication", field_types)
+
+    def test_schema_ids(self) -> None:
+        """
+        Purpose:
+        Ensure that schemas agree on their ID if and only if their publications and field types are the same.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - Identical schemas have the same ID
+        - Schemas of different publications or field types have different IDs
+        """
+        # Arrange
+        schema = Schema("publication", ["float64", "int32"])
+
+        # Act / Assert
+        self.assertEqual(schema.id, Schema("publication", ["float64", "int32"]).id)
+        self.assertNotEqual(schema.id, Schema("other", ["float64", "int32"]).id)
+        self.assertNotEqual(schema.id, Schema("publication", ["float64", "int64"]).id)
+
+    def test_coerce_text_fields(self) -> None:
+        """
+        Purpose:
+        Ensure that text data fields are converted to the schema's field types, and that invalid data is rejected.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - Valid fields are converted to `float`, `int`, `bool`, and `str`
+        - A `ValueError` is raised for the wrong number of fields, an unconvertible field, or an overlong string
+        - A `ValueError` is raised for a value out of range of its integer or `float32` field, while the extreme values
+        of each are accepted
+        """
+        # Arrange
+        schema = Schema("publication", ["float64", "int32", "bool", "str5"])
+        ranged = Schema("ranged", ["int32", "int64", "float32"])
+
+        # Act
+        values = schema.coerce(["0.5", "7", "true", "north"])
+        extremes = ranged.coerce([str(-2 ** 31), str(2 ** 63 - 1), "3.4e38"])
+
+        # Assert
+        self.assertEqual(values, [0.5, 7, True, "north"])
+        self.assertEqual(extremes, [-2 ** 31, 2 ** 63 - 1, 3.4e38])
+        for data in [["0.5", "7", "true"], ["fast", "7", "true", "north"], ["0.5", "7", "true", "northeast"]]:
+            with self.assertRaises(ValueError):
+                schema.coerce(data)
+        for data in [["99999999999", "0", "0"], ["0", str(2 ** 63), "0"], ["0", "0", "1e39"]]:
+            with self.assertRaises(ValueError):
+                ranged.coerce(data)
+
+
+class TestSchemaRegistry(unittest.TestCase):
+    """
+    Unit tests for the `schema.SchemaRegistry` class
+    """
+
+    def test_binary_message_round_trip(self) -> None:
+        """
+        Purpose:
+        Ensure that a typed message, with and without a trace, converts to binary and back.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - The binary message is smaller than the text message
+        - Converting back produces the same type, timestamp, trace, and payload, with the schema attached
+        """
+        # Arrange
+        registry = SchemaRegistry.from_definitions({"publication": ["float64", "int32", "str8"]})
+        schema = registry.for_publication("publication")
+        timestamp = datetime(2021, 10, 17, 15, 17, 56, 123456)
+        trace = Trace(timestamp, datetime(2021, 10, 17, 15, 17, 56, 200000), datetime(2021, 10, 17, 15, 17, 57))
+
+        for message_trace in [None, trace]:
+            message = Message(
+                MessageType.PUBLISH, timestamp, "publication", 0.123456, 42, "north", trace=message_trace, schema=schema
+            )
+
+            # Act
+            message_bytes = bytes(message)
+            decoded = registry.decode(message_bytes)
+
+            # Assert
+            self.assertLess(len(message_bytes), len(str(message)))
+            self.assertEqual(decoded.message_type, MessageType.PUBLISH)
+            self.assertEqual(decoded.timestamp, timestamp)
+            self.assertEqual(decoded.payload, ["publication", 0.123456, 42, "north"])
+            self.assertIs(decoded.schema, schema)
+            if message_trace is None:
+                self.assertIsNone(decoded.trace)
+            else:
+                self.assertEqual(decoded.trace.ingress, trace.ingress)
+                self.assertEqual(decoded.trace.egress, trace.egress)
+
+    def test_batch_message_round_trip(self) -> None:
+        """
+        Purpose:
+        Ensure that a columnar batch message converts to binary and back, column by column.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - The batch is a single message holding every record
+        - Converting back produces the same columns and record count
+        """
+        # Arrange
+        registry = SchemaRegistry.from_definitions({"publication": ["value:float64", "count:int32", "site:str8"]})
+        schema = registry.for_publication("publication")
+        columns = [(0.5, 1.5, 2.5), (1, 2, 3), ("north", "south", "east")]
+        message = Message(MessageType.SUBMIT, datetime.now(), "publication", *columns, schema=schema, records=3)
+
+        # Act
+        message_bytes = bytes(message)
+        decoded = registry.decode(message_bytes)
+
+        # Assert
+        self.assertEqual(schema.field_names, ["value", "count", "site"])
+        self.assertEqual(decoded.records, 3)
+        self.assertEqual([list(column) for column in decoded.payload[1:]], [list(column) for column in columns])
+        self.assertLessEqual(schema.max_batch_records(len(message_bytes) + 24), 3)
+
+    def test_decode_malformed_binary_messages(self) -> None:
+        """
+        Purpose:
+        Ensure that binary messages of an unknown schema, or whose data is the wrong size, are rejected.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - A `ValueError` is raised for each malformed message
+        """
+        # Arrange
+        registry = SchemaRegistry.from_definitions({"publication": ["float64"]})
+        schema = registry.for_publication("publication")
+        message_bytes = bytes(Message(MessageType.SUBMIT, datetime.now(), "publication", 1.0, schema=schema))
+        other_registry = SchemaRegistry.from_definitions({"publication": ["float32"]})
+
+        # Act / Assert
+        for malformed_bytes, decoding_registry in [
+            (message_bytes, other_registry),
+            (message_bytes[:-1], registry),
+            (message_bytes + b"\x00", registry),
+            (message_bytes[:5], registry)
+        ]:
+            with self.assertRaises(ValueError):
+                decoding_registry.decode(malformed_bytes)
+
+
+if __name__ == "__main__":
+    unittest.main()
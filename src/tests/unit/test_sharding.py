@@ -0,0 +1,166 @@
+"""
+Unit tests for the `sharding` module
+"""
+from datetime import datetime
+import threading
+import unittest
+
+from src.endpoint import UnixEndpoint
+from src.message import Message, MessageType
+from src.sharding import HashRing, ShardedSubscriptionRegistry, ShardWorkers
+from src.subscription import SubscriptionRequest
+
+
+class TestHashRing(unittest.TestCase):
+    """
+    Unit tests for the `sharding.HashRing` class
+    """
+
+    def test_keys_are_spread_and_mostly_stay_put_when_shards_are_added(self) -> None:
+        """
+        Purpose:
+        Ensure that keys are spread across every shard, always to the same shard, and that adding a shard only moves
+        the keys it takes over.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - Every shard is assigned some keys, and a ring with the same shards assigns every key the same way
+        - Every key that moves when a shard is added moves to the new shard
+        - Fewer than a third of the keys move
+        """
+        # Arrange
+        keys = [f"publication-{i}" for i in range(1000)]
+        ring, same_ring, grown_ring = HashRing(4), HashRing(4), HashRing(5)
+
+        # Act
+        shards = [ring.shard(key) for key in keys]
+        grown = [grown_ring.shard(key) for key in keys]
+
+        # Assert
+        self.assertEqual(set(shards), {0, 1, 2, 3})
+        self.assertEqual([same_ring.shard(key) for key in keys], shards)
+        moved = [new for old, new in zip(shards, grown) if old != new]
+        self.assertEqual(set(moved), {4})
+        self.assertLess(len(moved), len(keys) / 3)
+
+
+class TestShardedSubscriptionRegistry(unittest.TestCase):
+    """
+    Unit tests for the `sharding.ShardedSubscriptionRegistry` class
+    """
+
+    def test_subscriptions_across_shards(self) -> None:
+        """
+        Purpose:
+        Ensure that subscriptions are held by the shards of their publications, and that operations on an endpoint's
+        subscriptions reach every shard.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - Each subscription is held by the shard of its publication only
+        - Renewing and removing an endpoint's subscriptions covers every shard
+        """
+        # Arrange
+        registry = ShardedSubscriptionRegistry(4)
+        endpoint = UnixEndpoint("/tmp/subscriber.sock")
+        publications = [f"publication-{i}" for i in range(20)]
+
+        # Act
+        for publication in publications:
+            registry.add(SubscriptionRequest(publication), endpoint, datetime(2021, 10, 17))
+
+        # Assert
+        self.assertEqual(len(registry), 20)
+        for publication in publications:
+            shard = registry.ring.shard(publication)
+            self.assertIsNotNone(registry.shards[shard].get(publication, endpoint))
+            self.assertEqual(sum(publication in r for r in registry.shards), 1)
+        self.assertEqual(registry.renew(endpoint, datetime(2021, 10, 18)), 20)
+        self.assertEqual(len(registry.remove_endpoint(endpoint)), 20)
+        self.assertEqual(len(registry), 0)
+
+    def test_rebalance_moves_subscriptions(self) -> None:
+        """
+        Purpose:
+        Ensure that rebalancing moves the subscriptions of publications whose shard changes, keeping the same
+        subscription objects, and no others.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - The number of publications moved is reported, and is less than the total
+        - Every subscription is held by its new shard, as the same object as before
+        """
+        # Arrange
+        registry = ShardedSubscriptionRegistry(2)
+        endpoint = UnixEndpoint("/tmp/subscriber.sock")
+        subscriptions = {
+            f"publication-{i}": registry.add(
+                SubscriptionRequest(f"publication-{i}", filter="1>0.5"), endpoint, datetime(2021, 10, 17)
+            )
+            for i in range(50)
+        }
+
+        # Act
+        moved = registry.rebalance(3)
+
+        # Assert
+        self.assertGreater(moved, 0)
+        self.assertLess(moved, 50)
+        self.assertEqual(len(registry.shards), 3)
+        for publication, subscription in subscriptions.items():
+            self.assertIs(registry.shards[registry.ring.shard(publication)].get(publication, endpoint), subscription)
+            self.assertEqual(len(registry.filter_groups(publication)), 1)
+
+
+class TestShardWorkers(unittest.TestCase):
+    """
+    Unit tests for the `sharding.ShardWorkers` class
+    """
+
+    def test_messages_are_processed_in_order_per_shard(self) -> None:
+        """
+        Purpose:
+        Ensure that the messages queued for each shard are processed by its worker in the order they were queued, and
+        that stopping the workers finishes what is queued.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - Every message is processed, in order within its shard
+        - Messages are processed on more than one thread
+        """
+        # Arrange
+        processed = {}
+        threads = set()
+        lock = threading.Lock()
+
+        def process(message, endpoint):
+            with lock:
+                processed.setdefault(message.payload[0], []).append(int(message.payload[1]))
+                threads.add(threading.get_ident())
+
+        workers = ShardWorkers(process, 2, 16)
+        endpoint = UnixEndpoint("/tmp/producer.sock")
+
+        # Act
+        workers.start()
+        for i in range(100):
+            workers.put(i % 2, Message(MessageType.SUBMIT, datetime.now(), f"shard-{i % 2}", str(i)), endpoint)
+        workers.stop()
+
+        # Assert
+        self.assertFalse(workers.is_running)
+        self.assertEqual(processed["shard-0"], list(range(0, 100, 2)))
+        self.assertEqual(processed["shard-1"], list(range(1, 100, 2)))
+        self.assertEqual(len(threads), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+"""
+Unit tests for the `snapshot` module
+"""
+from datetime import datetime
+from pathlib import Path
+import tempfile
+import unittest
+
+from src.endpoint import UnixEndpoint
+from src.ipendpoint import IPEndpoint, StreamEndpoint
+from src.snapshot import read_snapshot, write_snapshot
+from src.subscription import SubscriptionRequest
+
+
+class TestSnapshot(unittest.TestCase):
+    """
+    Unit tests for the `snapshot` module functions
+    """
+
+    def setUp(self) -> None:
+        """
+        Create a temporary directory for snapshots.
+        """
+        self._directory = tempfile.TemporaryDirectory()
+        self.path = Path(self._directory.name) / "subscriptions.snapshot"
+
+    def tearDown(self) -> None:
+        """
+        Remove the temporary directory.
+        """
+        self._directory.cleanup()
+
+    def test_snapshot_round_trip(self) -> None:
+        """
+        Purpose:
+        Ensure that subscriptions of IP and Unix endpoints, with their leases and pending messages, are read back from
+        a snapshot as they were written, and that rewriting a snapshot replaces it without leaving a temporary file.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - Each entry's request, endpoint, lease time, and pending message are read back unchanged
+        - Only the snapshot file is left in its directory
+        """
+        # Arrange
+        lease = datetime(2021, 10, 17, 15, 17, 56, 123456)
+        entries = [
+            (SubscriptionRequest.from_string("publication;filter=2>30.5"), IPEndpoint("127.0.0.1", 5001), lease, None),
+            (
+                SubscriptionRequest.from_string("publication;interval-ms=100"),
+                UnixEndpoint("/tmp/pubsub-subscriber.sock"),
+                lease,
+                b"publish,20211017151756123456,publication,1.0"
+            )
+        ]
+
+        # Act
+        write_snapshot(self.path, entries[:1])
+        write_snapshot(self.path, entries)
+        taken, read_entries = read_snapshot(self.path)
+
+        # Assert
+        self.assertLessEqual(taken, datetime.now())
+        self.assertEqual(
+            [(str(request), endpoint, timestamp, pending) for request, endpoint, timestamp, pending in read_entries],
+            [(str(request), endpoint, timestamp, pending) for request, endpoint, timestamp, pending in entries]
+        )
+        self.assertEqual(list(Path(self._directory.name).iterdir()), [self.path])
+
+    def test_invalid_snapshots(self) -> None:
+        """
+        Purpose:
+        Ensure that a corrupt or truncated snapshot is rejected, and that subscriptions over stream connections cannot
+        be snapshotted.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - A `ValueError` is raised for a snapshot with a flipped byte, a truncated snapshot, and another file
+        - A `ValueError` is raised for a stream endpoint
+        """
+        # Arrange
+        request = SubscriptionRequest("publication")
+        write_snapshot(self.path, [(request, IPEndpoint("127.0.0.1", 5001), datetime.now(), None)])
+        data = self.path.read_bytes()
+
+        # Act / Assert
+        for invalid_data in [data[:10] + bytes([data[10] ^ 0xff]) + data[11:], data[:-5], b"publication"]:
+            self.path.write_bytes(invalid_data)
+            with self.assertRaises(ValueError):
+                read_snapshot(self.path)
+        with self.assertRaises(ValueError):
+            write_snapshot(self.path, [(request, StreamEndpoint("127.0.0.1", 5001), datetime.now(), None)])
+
+
+if __name__ == "__main__":
+    unittest.main()
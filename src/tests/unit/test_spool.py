@@ -0,0 +1,219 @@
+"""
+Unit tests for the `spool` module
+"""
+import errno
+from pathlib import Path
+import tempfile
+from typing import Any, BinaryIO
+import unittest
+
+from src.spool import Durable, RECORD_HEADER, Spool
+from src.subscription import SubscriptionRequest
+
+
+class TestSpool(unittest.TestCase):
+    """
+    Unit tests for the `spool.Spool` class
+    """
+
+    def setUp(self) -> None:
+        """
+        Create a temporary directory for spool files.
+        """
+        self._directory = tempfile.TemporaryDirectory()
+        self.path = Path(self._directory.name) / "durable.spool"
+
+    def tearDown(self) -> None:
+        """
+        Remove the temporary directory.
+        """
+        self._directory.cleanup()
+
+    def test_messages_are_read_in_order_and_bounded(self) -> None:
+        """
+        Purpose:
+        Ensure that spooled messages are read back oldest first, that a message that would take the spool over its
+        size is refused, and that the file is emptied once every message has been read.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - The messages that fit are accepted, and the one that does not is refused
+        - The messages are read back in the order they were appended, a limited number at a time
+        - The file is empty once they have all been read, and takes new messages again
+        """
+        # Arrange
+        spool = Spool(self.path, 3 * (RECORD_HEADER.size + 5))
+
+        # Act
+        appended = [spool.append(f"msg-{i}".encode("utf-8")) for i in range(4)]
+        spool.sync()
+        first = spool.read(2)
+        rest = spool.read(10)
+        size_when_drained: int = self.path.stat().st_size
+        appended_after: bool = spool.append(b"later")
+        later = spool.read(10)
+        spool.close()
+
+        # Assert
+        self.assertEqual(appended, [True, True, True, False])
+        self.assertEqual(first, [b"msg-0", b"msg-1"])
+        self.assertEqual(rest, [b"msg-2"])
+        self.assertEqual(size_when_drained, 0)
+        self.assertTrue(appended_after)
+        self.assertEqual(later, [b"later"])
+        self.assertEqual(len(spool), 0)
+
+    def test_reopened_spool_keeps_complete_records(self) -> None:
+        """
+        Purpose:
+        Ensure that a spool reopened after it was closed, or after a crash left a partial record at the end of its
+        file, keeps the complete records and drops the partial one.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - The reopened spool holds the complete records, which are read back in order
+        """
+        # Arrange
+        spool = Spool(self.path, 1024)
+        for data in [b"first", b"second"]:
+            spool.append(data)
+        spool.close()
+        with self.path.open("ab") as spool_file:
+            spool_file.write(RECORD_HEADER.pack(100) + b"partial")
+
+        # Act
+        reopened = Spool(self.path, 1024)
+        count: int = len(reopened)
+        messages = reopened.read(10)
+        reopened.remove()
+
+        # Assert
+        self.assertEqual(count, 2)
+        self.assertEqual(messages, [b"first", b"second"])
+        self.assertFalse(self.path.exists())
+
+    def test_file_is_compacted_and_bounded_by_unread_messages(self) -> None:
+        """
+        Purpose:
+        Ensure that a spool that is read from but never read to the end takes messages while those waiting to be read
+        fit, and that its file is compacted rather than growing.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - Once more of the file has been read than is left to read, it holds only the messages left to read
+        - Messages are accepted again as soon as those waiting to be read leave room for them
+        - Every message is read back in order
+        """
+        # Arrange
+        record_size_b: int = RECORD_HEADER.size + 5
+        spool = Spool(self.path, 3 * record_size_b)
+        for i in range(3):
+            spool.append(f"msg-{i}".encode("utf-8"))
+
+        # Act
+        first = spool.read(2)
+        compacted_size_b: int = self.path.stat().st_size
+        appended = [spool.append(f"msg-{i}".encode("utf-8")) for i in range(3, 6)]
+        rest = spool.read(10)
+        spool.close()
+
+        # Assert
+        self.assertEqual(first, [b"msg-0", b"msg-1"])
+        self.assertEqual(compacted_size_b, record_size_b)
+        self.assertEqual(appended, [True, True, False])
+        self.assertEqual(rest, [b"msg-2", b"msg-3", b"msg-4"])
+
+    def test_failed_write_is_not_spooled(self) -> None:
+        """
+        Purpose:
+        Ensure that a message that fails to be written, as when the disk is full, is reported as not spooled, and that
+        what it left in the file does not corrupt the messages appended after it.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - The failed append raises `OSError`, and is not counted
+        - The messages appended before and after it are read back whole, in order
+        """
+        # Arrange
+        spool = Spool(self.path, 1024)
+        spool.append(b"before")
+        spool.sync()
+
+        class FullDisk(object):
+            def __init__(self, writer: BinaryIO) -> None:
+                self._writer = writer
+
+            def write(self, data: bytes) -> int:
+                self._writer.write(data[:2])
+                self._writer.flush()
+                raise OSError(errno.ENOSPC, "No space left on device")
+
+            def __getattr__(self, name: str) -> Any:
+                return getattr(self._writer, name)
+
+        spool._writer = FullDisk(spool._writer)
+
+        # Act
+        with self.assertRaises(OSError):
+            spool.append(b"failed")
+        count: int = len(spool)
+        appended: bool = spool.append(b"after")
+        messages = spool.read(10)
+        spool.close()
+
+        # Assert
+        self.assertEqual(count, 1)
+        self.assertTrue(appended)
+        self.assertEqual(messages, [b"before", b"after"])
+
+
+class TestDurable(unittest.TestCase):
+    """
+    Unit tests for the `spool.Durable` class
+    """
+
+    def test_names_and_matching_requests(self) -> None:
+        """
+        Purpose:
+        Ensure that a durable subscription's name must be valid in a file name, and that only a request for the same
+        publication, filter, and schema matches it.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - A `ValueError` is raised for a name with a path separator
+        - A request with the same options matches, and requests for another publication or filter do not
+        """
+        # Arrange
+        with tempfile.TemporaryDirectory() as directory:
+            request = SubscriptionRequest.from_string("publication;filter=2>30.5;durable=audit")
+
+            # Act
+            durable = Durable("audit", request, Path(directory), 1024)
+            matches = [
+                durable.matches(SubscriptionRequest.from_string(request_string))
+                for request_string in [
+                    "publication;durable=audit;filter=2>30.5",
+                    "other;filter=2>30.5;durable=audit",
+                    "publication;durable=audit"
+                ]
+            ]
+            durable.spool.remove()
+
+            # Assert
+            with self.assertRaises(ValueError):
+                Durable("../audit", request, Path(directory), 1024)
+            self.assertEqual(matches, [True, False, False])
+
+
+if __name__ == "__main__":
+    unittest.main()
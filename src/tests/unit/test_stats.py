@@ -0,0 +1,105 @@
+"""
+Unit tests for the `stats` module
+"""
+import time
+import unittest
+
+from src.stats import format_stats, paginate, parse_stats, RateMeter
+
+
+class TestStats(unittest.TestCase):
+    """
+    Unit tests for the `stats` module functions
+    """
+
+    def test_stats_round_trip(self) -> None:
+        """
+        Purpose:
+        Ensure that stats formatted as tokens parse back to the same names and values.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - The tokens are sorted by name, with fractional values to one decimal place
+        - Parsing the tokens produces every stat
+        - A `ValueError` is raised for a token with no value
+        """
+        # Arrange
+        stats = {"subscribers.publication": 2, "bytes-sent-per-s": 1234.56, "dropped.invalid-submit": 0}
+
+        # Act
+        tokens = format_stats(stats)
+        parsed = parse_stats(tokens)
+
+        # Assert
+        self.assertEqual(tokens, ["bytes-sent-per-s=1234.6", "dropped.invalid-submit=0", "subscribers.publication=2"])
+        self.assertEqual(
+            parsed, {"bytes-sent-per-s": "1234.6", "dropped.invalid-submit": "0", "subscribers.publication": "2"}
+        )
+        for token in ["subscribers", "=2"]:
+            with self.assertRaises(ValueError):
+                parse_stats([token])
+
+    def test_paginate(self) -> None:
+        """
+        Purpose:
+        Ensure that tokens are split, in order, into pages that each fit in the given size.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - Every page fits once its tokens are joined with commas, except for a token too long for any page
+        - Joining the pages produces the tokens in their original order
+        - There is a single empty page when there are no tokens
+        """
+        # Arrange
+        tokens = [f"subscribers.publication-{i}={i}" for i in range(40)] + ["x" * 100]
+
+        # Act
+        pages = paginate(tokens, 64)
+
+        # Assert
+        self.assertGreater(len(pages), 1)
+        for page in pages[:-1]:
+            self.assertLessEqual(len(",".join(page)) + 1, 64)
+        self.assertEqual(pages[-1], ["x" * 100])
+        self.assertEqual([token for page in pages for token in page], tokens)
+        self.assertEqual(paginate([], 64), [[]])
+
+
+class TestRateMeter(unittest.TestCase):
+    """
+    Unit tests for the `stats.RateMeter` class
+    """
+
+    def test_rates_since_last_sample(self) -> None:
+        """
+        Purpose:
+        Ensure that rates are the increase in each counter since the last sample over the time elapsed.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - There are no rates before the first sample
+        - The rates of counters that increased are positive, and of those that did not are zero
+        """
+        # Arrange
+        meter = RateMeter()
+        meter.sample({"messages-sent": 10, "messages-received": 5})
+        time.sleep(0.01)
+
+        # Act
+        meter.sample({"messages-sent": 20, "messages-received": 5})
+
+        # Assert
+        self.assertEqual(RateMeter().rates, {})
+        self.assertGreater(meter.rates["messages-sent"], 0.0)
+        self.assertLessEqual(meter.rates["messages-sent"], 10 / 0.01)
+        self.assertEqual(meter.rates["messages-received"], 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
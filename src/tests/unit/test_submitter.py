@@ -0,0 +1,101 @@
+"""
+Unit tests for the `submitter` module
+"""
+from datetime import datetime
+import threading
+import unittest
+
+from src.message import Message
+from src.schema import SchemaRegistry
+from src.submitter import submit_messages, Submitter
+
+
+class TestSubmitMessages(unittest.TestCase):
+    """
+    Unit tests for the `submitter.submit_messages` function
+    """
+
+    def test_typed_records_are_batched_and_untyped_are_not(self) -> None:
+        """
+        Purpose:
+        Ensure that the records of a typed publication are packed into batches that fit in a datagram, and that those
+        of an untyped publication are one per message.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - Every typed record is in a batch, in order, and every batch fits in the buffer size
+        - Each untyped record is a message of its own
+        """
+        # Arrange
+        schemas = SchemaRegistry.from_definitions({"sensor": ["temperature:float64", "reading:int32"]})
+        records = [[i / 2, i] for i in range(100)]
+        max_records: int = schemas.for_publication("sensor").max_batch_records(256)
+
+        # Act
+        typed = submit_messages(schemas, "sensor", records, datetime.now(), 256)
+        untyped = submit_messages(schemas, "untyped", records[:3], datetime.now(), 256)
+
+        # Assert
+        self.assertEqual([message.records for message in typed][:-1], [max_records] * (len(typed) - 1))
+        self.assertEqual(sum(message.records for message in typed), 100)
+        self.assertTrue(all(len(bytes(message)) <= 256 for message in typed))
+        self.assertEqual([value for message in typed for value in message.payload[2]], list(range(100)))
+        self.assertEqual(
+            [message.payload for message in untyped], [["untyped", 0.0, 0], ["untyped", 0.5, 1], ["untyped", 1.0, 2]]
+        )
+
+
+class TestSubmitter(unittest.TestCase):
+    """
+    Unit tests for the `submitter.Submitter` class
+    """
+
+    def test_queued_records_are_coalesced_and_bounded(self) -> None:
+        """
+        Purpose:
+        Ensure that records queued while the flusher thread is busy are sent together in as few messages as fit, and
+        that a full queue refuses records rather than blocking.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - Records beyond the queue depth are refused
+        - The queued records are sent in order, in fewer messages than records
+        - Flushing waits until everything queued has been sent
+        """
+        # Arrange
+        schemas = SchemaRegistry.from_definitions({"sensor": ["temperature:float64", "reading:int32"]})
+        sent = []
+        release = threading.Event()
+
+        def send(message: Message) -> None:
+            release.wait()
+            sent.append(message)
+
+        submitter = Submitter(send, schemas, 1024, 50)
+        submitter.start()
+
+        # Act
+        submitter.put("sensor", [0.0, 0])
+        accepted = [submitter.put("sensor", [i / 2, i]) for i in range(1, 60)]
+        release.set()
+        flushed: bool = submitter.flush(5.0)
+        submitter.stop()
+
+        # Assert
+        self.assertTrue(flushed)
+        self.assertIn(False, accepted)
+        self.assertEqual(submitter.refused_count, accepted.count(False))
+        readings = [
+            value for message in sent for value in (message.payload[2] if message.records else [message.payload[2]])
+        ]
+        self.assertEqual(readings, [0] + [i for i, is_accepted in zip(range(1, 60), accepted) if is_accepted])
+        self.assertLess(len(sent), len(readings))
+        self.assertEqual(len(submitter), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
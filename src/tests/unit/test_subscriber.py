@@ -0,0 +1,362 @@
+"""
+Unit tests for the `subscriber` module
+"""
+import contextlib
+import os
+from pathlib import Path
+import socket
+import tempfile
+import threading
+import unittest
+
+from src import columnar
+from src.configuration import SubscriberConfiguration, TRANSPORT_TCP, TRANSPORT_UNIX
+from src.endpoint import UnixEndpoint
+from src.schema import HEADER, Schema
+from src.subscriber import Subscriber
+from src.transport import FRAME_HEADER, UnixDatagramTransport
+
+
+class TestSubscriber(unittest.TestCase):
+    """
+    Unit tests for the `subscriber.Subscriber` class
+    """
+
+    def setUp(self) -> None:
+        """
+        Create a subscriber of two publishers, and a client standing in for each publisher, on Unix datagram sockets
+        in a temporary directory, with the subscriber's output discarded.
+        """
+        self._directory = tempfile.TemporaryDirectory()
+        self._devnull = open(os.devnull, "w")
+        self._stdout = contextlib.redirect_stdout(self._devnull)
+        self._stdout.__enter__()
+        self.publishers = []
+        for name in ["p1.sock", "p2.sock"]:
+            publisher = UnixDatagramTransport(0.5, 1024)
+            publisher.bind(UnixEndpoint(str(Path(self._directory.name) / name)))
+            self.publishers.append(publisher)
+        configuration = SubscriberConfiguration(
+            "127.0.0.1",
+            1337,
+            0.2,
+            1024,
+            ["publication-1"],
+            [],
+            TRANSPORT_UNIX,
+            str(Path(self._directory.name) / "p1.sock"),
+            str(Path(self._directory.name) / "s.sock"),
+            publishers=[{
+                "publisher-socket-path": str(Path(self._directory.name) / "p2.sock"),
+                "subscriptions": ["publication-2"]
+            }]
+        )
+        self.subscriber = Subscriber(configuration)
+        self.subscriber.bind()
+
+    def tearDown(self) -> None:
+        """
+        Close the sockets and restore the output.
+        """
+        self.subscriber.close()
+        for publisher in self.publishers:
+            publisher.close()
+        self._stdout.__exit__(None, None, None)
+        self._devnull.close()
+        self._directory.cleanup()
+
+    def test_leases_are_managed_per_publisher(self) -> None:
+        """
+        Purpose:
+        Ensure that a subscriber of two publishers sends each its own subscriptions, tells their responses apart by
+        the endpoint they come from, and renews the leases with a publisher that has responded while asking the other
+        again.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - Each publisher is sent only its own subscriptions
+        - Only the publisher that responded is subscribed to, and subscribing reports that not every publisher has
+        - A heartbeat is sent to the publisher that responded, and the subscriptions are sent again to the other
+        """
+        # Arrange
+        first, second = self.publishers
+        first_session, second_session = self.subscriber._sessions.values()
+
+        # Act
+        for session in [first_session, second_session]:
+            self.subscriber._send_subscribe(session)
+        first_request, endpoint = first.receive()
+        second_request, _ = second.receive()
+        first.send(b"subscribe,20211017150434567854,publication-1", endpoint)
+        self.subscriber._process_until(lambda: first_session.is_subscribed, 0.5)
+        is_subscribed: bool = self.subscriber.subscribe()
+        resent_request, _ = second.receive()
+        for session in [first_session, second_session]:
+            self.subscriber._renew(session)
+        heartbeat, _ = first.receive()
+        renewal, _ = second.receive()
+
+        # Assert
+        self.assertTrue(first_request.endswith(b",publication-1"))
+        self.assertTrue(second_request.endswith(b",publication-2"))
+        self.assertFalse(is_subscribed)
+        self.assertTrue(first_session.is_subscribed)
+        self.assertFalse(second_session.is_subscribed)
+        self.assertTrue(resent_request.startswith(b"subscribe,"))
+        self.assertTrue(heartbeat.startswith(b"heartbeat,"))
+        self.assertTrue(renewal.startswith(b"subscribe,"))
+
+    def test_rejected_subscriptions_are_not_subscribed(self) -> None:
+        """
+        Purpose:
+        Ensure that a publisher whose response accepts none of the subscription requests is not subscribed to, while
+        one that accepts any of them is.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - Only the publisher that accepted a request is subscribed to, and subscribing reports that not every publisher
+        has accepted
+        """
+        # Arrange
+        first, second = self.publishers
+        first_session, second_session = self.subscriber._sessions.values()
+        for session in [first_session, second_session]:
+            self.subscriber._send_subscribe(session)
+        _, endpoint = first.receive()
+        second.receive()
+
+        # Act
+        first.send(b"subscribe,20211017150434567854", endpoint)
+        second.send(b"subscribe,20211017150434567854,publication-2", endpoint)
+        is_subscribed: bool = self.subscriber.subscribe()
+
+        # Assert
+        self.assertFalse(is_subscribed)
+        self.assertFalse(first_session.is_subscribed)
+        self.assertTrue(second_session.is_subscribed)
+
+    def test_unreachable_publisher_is_skipped(self) -> None:
+        """
+        Purpose:
+        Ensure that a subscriber of two publishers, one of which has gone away, still renews its leases with and
+        unsubscribes from the other.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - Neither renewing nor unsubscribing raises
+        - The publisher still there is sent a heartbeat and an unsubscribe request, and only those are counted
+        """
+        # Arrange
+        first, second = self.publishers
+        first_session, second_session = self.subscriber._sessions.values()
+        first_session.is_subscribed = True
+        second_session.is_subscribed = True
+        second.close()
+
+        # Act
+        self.subscriber.heartbeat()
+        heartbeat, _ = first.receive()
+        self.subscriber.unsubscribe()
+        unsubscribe, _ = first.receive()
+
+        # Assert
+        self.assertTrue(heartbeat.startswith(b"heartbeat,"))
+        self.assertTrue(unsubscribe.startswith(b"unsubscribe,"))
+        self.assertEqual(self.subscriber._heartbeats_sent_count, 1)
+        self.assertEqual(self.subscriber._requests_sent_count, 1)
+        self.assertFalse(second_session.is_subscribed)
+
+    def test_failed_renewal_is_retried(self) -> None:
+        """
+        Purpose:
+        Ensure that a lease renewal that cannot be sent does not raise, and that the subscription requests are sent
+        again at the next renewal, once the publisher can be reached.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - The failed renewal does not raise, and the session is no longer subscribed
+        - The next renewal sends the subscription requests to the publisher
+        """
+        # Arrange
+        _, second = self.publishers
+        _, second_session = self.subscriber._sessions.values()
+        second_session.is_subscribed = True
+        second.close()
+
+        # Act
+        self.subscriber._renew(second_session)
+        is_subscribed: bool = second_session.is_subscribed
+        second = UnixDatagramTransport(0.5, 1024)
+        second.bind(UnixEndpoint(str(Path(self._directory.name) / "p2.sock")))
+        self.publishers[1] = second
+        self.subscriber._renew(second_session)
+        request, _ = second.receive()
+
+        # Assert
+        self.assertFalse(is_subscribed)
+        self.assertTrue(request.startswith(b"subscribe,"))
+        self.assertTrue(request.endswith(b",publication-2"))
+
+    def test_malformed_stats_pages_are_dropped(self) -> None:
+        """
+        Purpose:
+        Ensure that malformed or inconsistent pages of stats are dropped rather than raising, and that the stats are
+        assembled from the valid pages.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - The stats are those of the valid pages
+        - Each invalid page is counted as dropped
+        """
+        # Arrange
+        subscriber_endpoint = UnixEndpoint(str(Path(self._directory.name) / "s.sock"))
+        pages = [b"", b",x,2", b",3,2", b",0,2,broken", b",0,2,a=1", b",1,3,b=2", b",1,2,b=2"]
+
+        # Act
+        for page in pages:
+            self.publishers[0].send(b"stats,20211017150434567854" + page, subscriber_endpoint)
+        stats = self.subscriber.stats(retries=0)
+
+        # Assert
+        self.assertEqual(stats, {"a": "1", "b": "2"})
+        self.assertEqual(self.subscriber._drop_counts, {"invalid-stats": 5})
+
+    def test_records_are_submitted_in_bulk_and_without_blocking(self) -> None:
+        """
+        Purpose:
+        Ensure that records submitted together, or queued without blocking, all reach the publisher in order, even
+        when there are more than the publisher's socket can hold at once, and that the queue is then flushed.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - Every record submitted in bulk is received, one per message as the publication is untyped
+        - Every queued record is accepted and received in order once flushed
+        """
+        # Arrange
+        publisher = self.publishers[0]
+
+        # Act
+        sent_count: int = self.subscriber.submit_many("publication-1", [[i, "north"] for i in range(3)])
+        bulk = [publisher.receive()[0] for _ in range(sent_count)]
+        accepted = [self.subscriber.submit_nowait("publication-1", i, "south") for i in range(20)]
+        queued = [publisher.receive()[0] for _ in range(20)]
+        flushed: bool = self.subscriber.flush(5.0)
+
+        # Assert
+        self.assertEqual(sent_count, 3)
+        self.assertEqual([message.split(b",")[-2:] for message in bulk], [[b"%d" % i, b"north"] for i in range(3)])
+        self.assertTrue(all(accepted))
+        self.assertTrue(flushed)
+        self.assertEqual([message.split(b",")[-2:] for message in queued], [[b"%d" % i, b"south"] for i in range(20)])
+
+    def test_queued_records_share_a_stream_connection_with_the_main_loop(self) -> None:
+        """
+        Purpose:
+        Ensure that records queued without blocking by a subscriber on the stream transport are sent intact while the
+        main loop flushes the same connection, and are written out without waiting for the main loop.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - Every queued record is received exactly once and in order, each frame whole, once the queue is flushed
+        """
+        # Arrange
+        server = socket.create_server(("127.0.0.1", 0))
+        configuration = SubscriberConfiguration(
+            "127.0.0.1", server.getsockname()[1], 0.5, 1024, ["publication-1"], [], TRANSPORT_TCP
+        )
+        subscriber = Subscriber(configuration)
+        subscriber.submit("publication-1", -1, "north")
+        connection, _ = server.accept()
+        connection.settimeout(0.5)
+        producing = threading.Event()
+        producing.set()
+
+        def flush_transports() -> None:
+            while producing.is_set():
+                subscriber._flush_transports()
+
+        # Act
+        main_loop = threading.Thread(target=flush_transports)
+        main_loop.start()
+        try:
+            accepted = [subscriber.submit_nowait("publication-1", i, "south") for i in range(2000)]
+        finally:
+            producing.clear()
+            main_loop.join()
+        flushed: bool = subscriber.flush(5.0)
+        received = bytearray()
+        try:
+            while True:
+                chunk: bytes = connection.recv(65536)
+                if not chunk:
+                    break
+                received.extend(chunk)
+        except socket.timeout:
+            pass
+        finally:
+            subscriber.close()
+            connection.close()
+            server.close()
+        messages = []
+        offset = 0
+        while offset < len(received):
+            (length,) = FRAME_HEADER.unpack_from(received, offset)
+            messages.append(bytes(received[offset + FRAME_HEADER.size:offset + FRAME_HEADER.size + length]))
+            offset += FRAME_HEADER.size + length
+
+        # Assert
+        self.assertTrue(all(accepted))
+        self.assertTrue(flushed)
+        self.assertEqual([message.split(b",")[-2:] for message in messages[1:]], [
+            [b"%d" % i, b"south"] for i in range(2000)
+        ])
+
+    @unittest.skipIf(columnar.numpy is None, "NumPy is not installed")
+    def test_arrays_go_through_the_common_send_and_receive_paths(self) -> None:
+        """
+        Purpose:
+        Ensure that submitted arrays are counted as submissions, and that a truncated batch received while waiting for
+        an array is dropped as malformed rather than raising.
+
+        Prerequisites:
+        NumPy
+
+        Pass condition(s):
+        - The array is sent in one batch message, counted as a submission
+        - The truncated batch is counted as malformed, and the next, whole, batch is received as an array
+        """
+        # Arrange
+        self.subscriber.schemas.add(Schema("sensor", ["temperature:float64", "reading:int32"]))
+        publisher = self.publishers[0]
+        array = columnar.numpy.zeros(3, dtype=columnar.dtype(self.subscriber.schemas.for_publication("sensor")))
+        array["reading"] = [1, 2, 3]
+
+        # Act
+        sent_count: int = self.subscriber.submit_array("sensor", array)
+        batch, endpoint = publisher.receive()
+        publisher.send(batch[:HEADER.size], endpoint)
+        publisher.send(batch, endpoint)
+        received = self.subscriber.receive_array("sensor")
+
+        # Assert
+        self.assertEqual(sent_count, 1)
+        self.assertEqual(self.subscriber._submissions_sent_count, 1)
+        self.assertEqual(self.subscriber._drop_counts, {"malformed": 1})
+        self.assertEqual(list(received["reading"]), [1, 2, 3])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,413 @@
+"""
+Unit tests for the `subscription` module
+"""
+from datetime import datetime, timedelta
+import unittest
+
+from src.ipendpoint import IPEndpoint
+from src.subscription import SubscriptionRegistry, SubscriptionRequest
+
+
+class TestSubscriptionRequest(unittest.TestCase):
+    """
+    Unit tests for the `subscription.SubscriptionRequest` class
+    """
+
+    def test_request_without_options_from_string(self) -> None:
+        """
+        Purpose:
+        Ensure that a plain publication token produces a request with no options.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - The publication is parsed and there is no filter expression
+        """
+        # Act
+        request = SubscriptionRequest.from_string("publication")
+
+        # Assert
+        self.assertEqual(request.publication, "publication")
+        self.assertIsNone(request.filter_expression)
+        self.assertEqual(str(request), "publication")
+
+    def test_request_with_filter_from_string(self) -> None:
+        """
+        Purpose:
+        Ensure that a token with a filter option produces a request with that filter expression.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - The publication and filter expression are parsed
+        - Formatting the request reproduces the token
+        """
+        # Act
+        request = SubscriptionRequest.from_string("publication;filter=2>30.5")
+
+        # Assert
+        self.assertEqual(request.publication, "publication")
+        self.assertEqual(request.filter_expression, "2>30.5")
+        self.assertEqual(str(request), "publication;filter=2>30.5")
+
+    def test_malformed_requests(self) -> None:
+        """
+        Purpose:
+        Ensure that malformed tokens raise an exception.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - A `ValueError` is raised for each malformed token
+        """
+        for request_string in ["", ";filter=1>0", "publication;filter"]:
+            with self.assertRaises(ValueError):
+                SubscriptionRequest.from_string(request_string)
+
+    def test_request_with_conflation_interval_from_string(self) -> None:
+        """
+        Purpose:
+        Ensure that a token with a conflation interval option produces a request with that interval in seconds, and
+        that out-of-range intervals are rejected.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - The interval is converted from milliseconds to seconds
+        - A `ValueError` is raised for invalid intervals
+        """
+        # Act
+        request = SubscriptionRequest.from_string("publication;interval-ms=100")
+
+        # Assert
+        self.assertEqual(request.interval_s, 0.1)
+        self.assertIsNone(SubscriptionRequest.from_string("publication").interval_s)
+        for request_string in ["publication;interval-ms=0", "publication;interval-ms=fast"]:
+            with self.assertRaises(ValueError):
+                SubscriptionRequest.from_string(request_string).interval_s
+
+    def test_request_with_trace_from_string(self) -> None:
+        """
+        Purpose:
+        Ensure that a token with a trace option produces a traced request, and that invalid values are rejected.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - Requests are only traced if the option is true
+        - A `ValueError` is raised for an invalid value
+        """
+        # Act / Assert
+        self.assertTrue(SubscriptionRequest.from_string("publication;trace=1").trace)
+        self.assertTrue(SubscriptionRequest.from_string("publication;trace=True").trace)
+        self.assertFalse(SubscriptionRequest.from_string("publication;trace=0").trace)
+        self.assertFalse(SubscriptionRequest.from_string("publication").trace)
+        with self.assertRaises(ValueError):
+            SubscriptionRequest.from_string("publication;trace=maybe").trace
+
+    def test_request_with_schema_from_string(self) -> None:
+        """
+        Purpose:
+        Ensure that a token with a schema option produces a request with that schema ID, and that an invalid ID is
+        rejected.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - The schema ID is parsed from hexadecimal
+        - A `ValueError` is raised for an invalid ID
+        """
+        # Act / Assert
+        self.assertEqual(SubscriptionRequest.from_string("publication;schema=0000002a").schema_id, 42)
+        self.assertIsNone(SubscriptionRequest.from_string("publication").schema_id)
+        with self.assertRaises(ValueError):
+            SubscriptionRequest.from_string("publication;schema=xyz").schema_id
+
+
+class TestSubscriptionRegistry(unittest.TestCase):
+    """
+    Unit tests for the `subscription.SubscriptionRegistry` class
+    """
+
+    def test_subscribers_with_identical_filters_share_a_group(self) -> None:
+        """
+        Purpose:
+        Ensure that subscriptions with the same filter expression are grouped together behind one predicate, and
+        unfiltered subscriptions are grouped separately.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - There is one group per distinct filter expression
+        - The filtered group holds both filtered subscribers
+        """
+        # Arrange
+        registry = SubscriptionRegistry()
+        now = datetime.now()
+        registry.add(SubscriptionRequest("publication", filter="2>30"), IPEndpoint("127.0.0.1", 5001), now)
+        registry.add(SubscriptionRequest("publication", filter="2>30"), IPEndpoint("127.0.0.1", 5002), now)
+        registry.add(SubscriptionRequest("publication"), IPEndpoint("127.0.0.1", 5003), now)
+
+        # Act
+        groups = registry.filter_groups("publication")
+
+        # Assert
+        self.assertEqual(len(groups), 2)
+        filtered = [subscriptions for predicate, subscriptions, _ in groups if predicate is not None]
+        unfiltered = [subscriptions for predicate, subscriptions, _ in groups if predicate is None]
+        self.assertEqual(len(filtered[0]), 2)
+        self.assertEqual(len(unfiltered[0]), 1)
+
+    def test_resubscribing_replaces_subscription(self) -> None:
+        """
+        Purpose:
+        Ensure that an endpoint subscribing again to a publication replaces its previous subscription instead of being
+        added twice.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - The registry holds a single subscription with the newer filter
+        """
+        # Arrange
+        registry = SubscriptionRegistry()
+        endpoint = IPEndpoint("127.0.0.1", 5001)
+        now = datetime.now()
+
+        # Act
+        registry.add(SubscriptionRequest("publication", filter="2>30"), endpoint, now)
+        registry.add(SubscriptionRequest("publication", filter="2>40"), endpoint, now)
+
+        # Assert
+        self.assertEqual(len(registry), 1)
+        self.assertEqual(registry.subscriptions("publication")[0].filter_expression, "2>40")
+
+    def test_predicates_are_dropped_with_their_last_subscription(self) -> None:
+        """
+        Purpose:
+        Ensure that a compiled filter is kept while any subscription uses it, and dropped once the last one is replaced,
+        removed, or times out, even though the publication still has other subscriptions.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - A filter shared by two subscriptions is kept until both have gone
+        - The filter of a replaced subscription is dropped
+        - Only the filters in use remain
+        """
+        # Arrange
+        registry = SubscriptionRegistry()
+        now = datetime.now()
+        endpoints = [IPEndpoint("127.0.0.1", port) for port in [5001, 5002, 5003]]
+        registry.add(SubscriptionRequest("publication"), endpoints[0], now)
+        registry.add(SubscriptionRequest("publication", filter="2>30"), endpoints[1], now - timedelta(seconds=10))
+        registry.add(SubscriptionRequest("publication", filter="2>30"), endpoints[2], now)
+
+        # Act
+        registry.remove_timed_out(now, 5)
+        shared = set(registry._predicates)
+        registry.add(SubscriptionRequest("publication", filter="2>40"), endpoints[2], now)
+        replaced = set(registry._predicates)
+        registry.remove("publication", endpoints[2])
+
+        # Assert
+        self.assertEqual(shared, {"2>30"})
+        self.assertEqual(replaced, {"2>40"})
+        self.assertEqual(registry._predicates, {})
+        self.assertEqual(registry._predicate_counts, {})
+        self.assertEqual(len(registry), 1)
+
+    def test_remove_timed_out_subscriptions(self) -> None:
+        """
+        Purpose:
+        Ensure that only subscriptions older than the timeout are removed.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - The old subscription is removed and returned
+        - The recent subscription remains
+        """
+        # Arrange
+        registry = SubscriptionRegistry()
+        now = datetime.now()
+        registry.add(SubscriptionRequest("publication"), IPEndpoint("127.0.0.1", 5001), now - timedelta(seconds=10))
+        registry.add(SubscriptionRequest("publication"), IPEndpoint("127.0.0.1", 5002), now)
+
+        # Act
+        removed = registry.remove_timed_out(now, 5)
+
+        # Assert
+        self.assertEqual([s.endpoint for _, s in removed], [IPEndpoint("127.0.0.1", 5001)])
+        self.assertEqual([s.endpoint for s in registry.subscriptions("publication")], [IPEndpoint("127.0.0.1", 5002)])
+
+    def test_queue_group_members_take_turns(self) -> None:
+        """
+        Purpose:
+        Ensure that the members of a queue group are held apart from the other subscriptions of their filter and are
+        picked in turn, and that a member whose lease expires leaves the group.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - The filter group holds the ungrouped subscription and the queue group separately
+        - Each member is picked once in every two picks
+        - Once one member times out, the other is always picked
+        - Once both members are removed, the queue group is dropped
+        """
+        # Arrange
+        registry = SubscriptionRegistry()
+        now = datetime.now()
+        first = IPEndpoint("127.0.0.1", 5001)
+        second = IPEndpoint("127.0.0.1", 5002)
+        registry.add(SubscriptionRequest("publication", group="workers"), first, now - timedelta(seconds=10))
+        registry.add(SubscriptionRequest("publication", group="workers"), second, now)
+        registry.add(SubscriptionRequest("publication"), IPEndpoint("127.0.0.1", 5003), now)
+
+        # Act
+        [(predicate, subscriptions, queue_groups)] = registry.filter_groups("publication")
+        picked = [queue_groups[0].next().endpoint for _ in range(4)]
+        registry.remove_timed_out(now, 5)
+        picked_after_timeout = [queue_groups[0].next().endpoint for _ in range(2)]
+        registry.remove("publication", second)
+
+        # Assert
+        self.assertIsNone(predicate)
+        self.assertEqual([s.endpoint for s in subscriptions], [IPEndpoint("127.0.0.1", 5003)])
+        self.assertEqual(sorted(picked[:2], key=str), [first, second])
+        self.assertEqual(picked[2:], picked[:2])
+        self.assertEqual(picked_after_timeout, [second, second])
+        self.assertEqual(registry.queue_groups("publication"), [])
+
+    def test_queue_group_members_share_a_filter(self) -> None:
+        """
+        Purpose:
+        Ensure that a subscription cannot join a queue group whose members have a different filter, unless it is the
+        group's only member resubscribing.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - A `ValueError` is raised for a second member with a different filter
+        - The only member can change the group's filter by resubscribing
+        """
+        # Arrange
+        registry = SubscriptionRegistry()
+        now = datetime.now()
+        endpoint = IPEndpoint("127.0.0.1", 5001)
+        registry.add(SubscriptionRequest("publication", group="workers", filter="1==north"), endpoint, now)
+
+        # Act / Assert
+        with self.assertRaises(ValueError):
+            registry.add(
+                SubscriptionRequest("publication", group="workers", filter="1==south"),
+                IPEndpoint("127.0.0.1", 5002),
+                now
+            )
+        registry.add(SubscriptionRequest("publication", group="workers", filter="1==south"), endpoint, now)
+        self.assertEqual(registry.queue_groups("publication")[0].filter_expression, "1==south")
+
+    def test_renew_all_leases_of_an_endpoint(self) -> None:
+        """
+        Purpose:
+        Ensure that renewing an endpoint renews every one of its subscriptions, and only its subscriptions.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - The number of renewed subscriptions is returned
+        - The renewed subscriptions survive a sweep that removes the other endpoint's subscription
+        """
+        # Arrange
+        registry = SubscriptionRegistry()
+        endpoint = IPEndpoint("127.0.0.1", 5001)
+        other_endpoint = IPEndpoint("127.0.0.1", 5002)
+        then = datetime.now() - timedelta(seconds=10)
+        now = datetime.now()
+        registry.add(SubscriptionRequest("publication-1"), endpoint, then)
+        registry.add(SubscriptionRequest("publication-2"), endpoint, then)
+        registry.add(SubscriptionRequest("publication-1"), other_endpoint, then)
+
+        # Act
+        renewed = registry.renew(endpoint, now)
+        removed = registry.remove_timed_out(now, 5)
+
+        # Assert
+        self.assertEqual(renewed, 2)
+        self.assertEqual([s.endpoint for _, s in removed], [other_endpoint])
+        self.assertEqual(sorted(registry.publications()), ["publication-1", "publication-2"])
+
+    def test_remove_endpoint(self) -> None:
+        """
+        Purpose:
+        Ensure that removing an endpoint removes all of its subscriptions and leaves nothing to renew.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - Both subscriptions of the endpoint are removed and returned
+        - The registry is empty and renewing the endpoint renews nothing
+        """
+        # Arrange
+        registry = SubscriptionRegistry()
+        endpoint = IPEndpoint("127.0.0.1", 5001)
+        now = datetime.now()
+        registry.add(SubscriptionRequest("publication-1"), endpoint, now)
+        registry.add(SubscriptionRequest("publication-2"), endpoint, now)
+
+        # Act
+        removed = registry.remove_endpoint(endpoint)
+
+        # Assert
+        self.assertEqual(sorted(publication for publication, _ in removed), ["publication-1", "publication-2"])
+        self.assertEqual(len(registry), 0)
+        self.assertEqual(registry.renew(endpoint, now), 0)
+
+    def test_requests_rebuilt_from_subscriptions(self) -> None:
+        """
+        Purpose:
+        Ensure that the request rebuilt from each subscription in the registry makes an identical subscription.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - Every subscription is listed with its publication
+        - Each rebuilt request has the options of the original request
+        """
+        # Arrange
+        registry = SubscriptionRegistry()
+        endpoint = IPEndpoint("127.0.0.1", 5001)
+        request_strings = [
+            "publication-1",
+            "publication-2;filter=1==north;interval-ms=250;trace=1;schema=0000002a;group=workers"
+        ]
+        for request_string in request_strings:
+            registry.add(SubscriptionRequest.from_string(request_string), endpoint, datetime.now())
+
+        # Act
+        rebuilt = [
+            SubscriptionRequest.from_subscription(publication, subscription)
+            for publication, subscription in registry.items()
+        ]
+
+        # Assert
+        self.assertEqual(sorted(str(request) for request in rebuilt), request_strings)
+
+
+if __name__ == "__main__":
+    unittest.main()
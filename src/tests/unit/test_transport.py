@@ -0,0 +1,412 @@
+"""
+Unit tests for the `transport` module
+"""
+from pathlib import Path
+import select
+import selectors
+import socket
+import struct
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+from src.endpoint import UnixEndpoint
+from src.ipendpoint import IPEndpoint, StreamEndpoint
+from src.transport import (
+    FRAME_HEADER,
+    LoopbackNetwork,
+    LoopbackTransport,
+    StreamConnection,
+    StreamTransport,
+    UnixDatagramTransport
+)
+
+
+class TestUnixDatagramTransport(unittest.TestCase):
+    """
+    Unit tests for the `transport.UnixDatagramTransport` class
+    """
+
+    def test_send_and_receive_between_bound_sockets(self) -> None:
+        """
+        Purpose:
+        Ensure that a datagram sent between two bound Unix datagram transports is received intact along with the
+        endpoint of its sender, and that closing a transport removes its socket file.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - The received data equals the sent data
+        - The reported remote endpoint is the sender's endpoint
+        - The socket files are removed when the transports are closed
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            # Arrange
+            server_endpoint = UnixEndpoint(str(Path(directory) / "server.sock"))
+            client_endpoint = UnixEndpoint(str(Path(directory) / "client.sock"))
+            server = UnixDatagramTransport(0.5, 1024)
+            client = UnixDatagramTransport(0.5, 1024)
+            server.bind(server_endpoint)
+            client.bind(client_endpoint)
+
+            # Act
+            client.send(b"subscribe,20211017150434567854,publication", server_endpoint)
+            data, remote_endpoint = server.receive()
+            server.close()
+            client.close()
+
+            # Assert
+            self.assertEqual(data, b"subscribe,20211017150434567854,publication")
+            self.assertEqual(remote_endpoint, client_endpoint)
+            self.assertFalse(Path(server_endpoint.path).exists())
+            self.assertFalse(Path(client_endpoint.path).exists())
+
+    def test_datagrams_from_the_same_peer_share_an_endpoint(self) -> None:
+        """
+        Purpose:
+        Ensure that datagrams received from the same peer are reported with the same endpoint object rather than a new
+        one each.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - Both datagrams are reported with the identical endpoint object
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            # Arrange
+            server_endpoint = UnixEndpoint(str(Path(directory) / "server.sock"))
+            server = UnixDatagramTransport(0.5, 1024)
+            client = UnixDatagramTransport(0.5, 1024)
+            server.bind(server_endpoint)
+            client.bind(UnixEndpoint(str(Path(directory) / "client.sock")))
+
+            # Act
+            client.send(b"heartbeat,20211017150434567854", server_endpoint)
+            client.send(b"heartbeat,20211017150435567854", server_endpoint)
+            _, first_endpoint = server.receive()
+            _, second_endpoint = server.receive()
+            server.close()
+            client.close()
+
+            # Assert
+            self.assertIs(first_endpoint, second_endpoint)
+
+
+
+class TestStreamConnection(unittest.TestCase):
+    """
+    Unit tests for the `transport.StreamConnection` class
+    """
+
+    def setUp(self) -> None:
+        """
+        Create a connected pair of loopback TCP sockets wrapped in `StreamConnection` objects.
+        """
+        with socket.create_server(("127.0.0.1", 0)) as listener:
+            sock1 = socket.create_connection(listener.getsockname())
+            sock2, _ = listener.accept()
+        endpoint = StreamEndpoint("127.0.0.1", 5005)
+        self.writer = StreamConnection(sock1, endpoint, 64, 16)
+        self.reader = StreamConnection(sock2, endpoint, 64, 16)
+
+    def tearDown(self) -> None:
+        """
+        Close both connections.
+        """
+        self.writer.close()
+        self.reader.close()
+
+    def test_coalesced_messages_are_read_back_whole_and_in_order(self) -> None:
+        """
+        Purpose:
+        Ensure that several messages queued before a single flush are framed so that the reader gets back exactly the
+        messages that were written, in order.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - A single flush empties the write buffer
+        - The messages read back equal the messages written
+        """
+        # Arrange
+        messages = [b"publish,20211017151756123456,publication,1", b"", b"publish,20211017151756123457,publication,2"]
+        for message in messages:
+            self.writer.write(message)
+
+        # Act
+        flushed: bool = self.writer.flush()
+        received = self._read()
+
+        # Assert
+        self.assertTrue(flushed)
+        self.assertEqual(received, messages)
+
+    def test_partial_message_is_held_until_complete(self) -> None:
+        """
+        Purpose:
+        Ensure that a message split across reads is only returned once all of it has arrived.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - Reading a partial message returns nothing
+        - Reading the rest of the message returns the whole message
+        """
+        # Arrange
+        message: bytes = b"publish,20211017151756123456,publication,1"
+        frame: bytes = FRAME_HEADER.pack(len(message)) + message
+
+        # Act
+        self.writer.socket.sendall(frame[:7])
+        first = self._read()
+        self.writer.socket.sendall(frame[7:])
+        second = self._read()
+
+        # Assert
+        self.assertEqual(first, [])
+        self.assertEqual(second, [message])
+
+    def test_connection_pauses_above_high_watermark_and_resumes_at_low_watermark(self) -> None:
+        """
+        Purpose:
+        Ensure that the connection is paused once its write buffer exceeds the high watermark and resumed once it has
+        been written down to the low watermark.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - The connection is not paused below the high watermark
+        - The connection is paused above the high watermark
+        - The connection is resumed after flushing
+        """
+        # Act/assert
+        self.writer.write(b"x" * 32)
+        self.assertFalse(self.writer.paused)
+        self.writer.write(b"x" * 32)
+        self.assertTrue(self.writer.paused)
+        self.assertTrue(self.writer.drain(1.0))
+        self.assertFalse(self.writer.paused)
+        self.assertEqual(self.writer.buffered_b, 0)
+
+    def test_read_from_closed_connection(self) -> None:
+        """
+        Purpose:
+        Ensure that reading from a connection closed by its peer raises an exception.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - A `ConnectionResetError` is raised
+        """
+        # Arrange
+        self.writer.socket.close()
+
+        # Act/assert
+        with self.assertRaises(ConnectionResetError):
+            self._read()
+
+    def _read(self) -> list:
+        """
+        Wait for the reader to become readable, then read from it.
+        """
+        select.select([self.reader.socket], [], [], 1.0)
+        return self.reader.read()
+
+
+class TestStreamTransport(unittest.TestCase):
+    """
+    Unit tests for the `transport.StreamTransport` class
+    """
+
+    def setUp(self) -> None:
+        """
+        Create a listening stream transport with small watermarks, and have a client connect to it.
+        """
+        with socket.create_server(("127.0.0.1", 0)) as probe:
+            port: int = probe.getsockname()[1]
+        self.transport = StreamTransport(0.2, 1024, socket.AF_INET, 64, 16)
+        self.transport.bind(StreamEndpoint("127.0.0.1", port))
+        self.client = socket.create_connection(("127.0.0.1", port))
+        select.select([self.transport._listener], [], [], 1.0)
+        self.transport.poll(self.transport._listener, selectors.EVENT_READ)
+        self.endpoint = StreamEndpoint(*self.client.getsockname())
+
+    def tearDown(self) -> None:
+        """
+        Close the client and the transport.
+        """
+        self.client.close()
+        self.transport.close()
+
+    def test_slow_consumer_is_dropped_without_blocking(self) -> None:
+        """
+        Purpose:
+        Ensure that messages to a consumer that is not reading are dropped without blocking the sender, and that the
+        connection is closed once it has been paused for longer than the socket timeout.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - Sending more than the consumer takes, and then to the paused connection, returns at once, and the second
+        message is counted as dropped while the connection is kept
+        - Sending after the socket timeout closes the connection as a slow consumer
+        """
+        # Act
+        started_s: float = time.monotonic()
+        self.transport.send(b"x" * 8388608, self.endpoint)
+        self.transport.send(b"y", self.endpoint)
+        elapsed_s: float = time.monotonic() - started_s
+        metrics = self.transport.metrics()
+        time.sleep(0.3)
+        self.transport.send(b"z", self.endpoint)
+
+        # Assert
+        self.assertLess(elapsed_s, 0.1)
+        self.assertEqual((metrics["stream-dropped"], metrics["stream-connections"]), (1, 1))
+        self.assertEqual(self.transport.metrics()["stream-slow-consumers"], 1)
+        self.assertEqual(self.transport.metrics()["stream-connections"], 0)
+
+    def test_disconnected_consumer_is_closed(self) -> None:
+        """
+        Purpose:
+        Ensure that a consumer that has reset its connection is closed and its messages dropped, rather than the error
+        reaching the sender.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - No exception is raised, the message is counted as dropped, and the connection is closed
+        """
+        # Arrange
+        self.client.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack("ii", 1, 0))
+        self.client.close()
+        time.sleep(0.05)
+
+        # Act
+        self.transport.send(b"x" * 128, self.endpoint)
+        self.transport.send(b"y", self.endpoint)
+
+        # Assert
+        self.assertEqual(self.transport.metrics()["stream-dropped"], 1)
+        self.assertEqual(self.transport.metrics()["stream-connections"], 0)
+
+    def test_concurrent_senders_keep_the_framing(self) -> None:
+        """
+        Purpose:
+        Ensure that several threads sending through the transport while another flushes it, as pipeline senders and
+        the main loop do, neither interleave nor repeat the frames of their messages.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - The consumer receives every message exactly once, each whole
+        """
+        # Arrange
+        self.transport._connections[self.endpoint]._high_watermark_b = 1 << 30
+        received = bytearray()
+        self.client.settimeout(1.0)
+        sender_count, message_count = 4, 2000
+        switch_interval_s: float = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+
+        def send(sender: int) -> None:
+            for i in range(message_count):
+                self.transport.send(f"{sender}:{i}".encode(), self.endpoint)
+                self.transport.flush()
+
+        def receive() -> None:
+            while True:
+                try:
+                    chunk: bytes = self.client.recv(65536)
+                except socket.timeout:
+                    return
+                if not chunk:
+                    return
+                received.extend(chunk)
+
+        # Act
+        receiver = threading.Thread(target=receive)
+        receiver.start()
+        senders = [threading.Thread(target=send, args=(sender,)) for sender in range(sender_count)]
+        try:
+            for thread in senders:
+                thread.start()
+            while any(thread.is_alive() for thread in senders):
+                self.transport.flush()
+            for thread in senders:
+                thread.join()
+        finally:
+            sys.setswitchinterval(switch_interval_s)
+        self.transport.flush()
+        receiver.join()
+        messages = []
+        offset = 0
+        while offset < len(received):
+            (length,) = FRAME_HEADER.unpack_from(received, offset)
+            messages.append(bytes(received[offset + FRAME_HEADER.size:offset + FRAME_HEADER.size + length]))
+            offset += FRAME_HEADER.size + length
+
+        # Assert
+        expected = {f"{sender}:{i}".encode() for sender in range(sender_count) for i in range(message_count)}
+        self.assertEqual(len(messages), sender_count * message_count)
+        self.assertEqual(set(messages), expected)
+
+
+class TestLoopbackTransport(unittest.TestCase):
+    """
+    Unit tests for the `transport.LoopbackTransport` class
+    """
+
+    def test_send_and_receive_on_a_loopback_network(self) -> None:
+        """
+        Purpose:
+        Ensure that messages sent between loopback transports are received whole and in order along with the endpoint
+        of their sender, that an unbound sender is given an ephemeral endpoint, and that messages to unbound endpoints
+        are dropped.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - The bound transport receives both messages, in order, from the ephemeral endpoint of the sender
+        - A message longer than the buffer size is truncated to one byte more than it, as by a datagram socket
+        - The reply reaches the sender at its ephemeral endpoint
+        - The message to an unbound endpoint is counted as dropped, and closing a transport unbinds its endpoint
+        """
+        # Arrange
+        network = LoopbackNetwork()
+        receiver = LoopbackTransport(0.1, 8, network)
+        sender = LoopbackTransport(0.1, 8, network)
+        endpoint = IPEndpoint("127.0.0.1", 5005)
+        receiver.bind(endpoint)
+
+        # Act
+        sender.send(b"first", endpoint)
+        sender.send(b"second-and-longer", endpoint)
+        sender.send(b"lost", IPEndpoint("127.0.0.1", 5006))
+        received = receiver.receive_waiting()
+        receiver.send(b"reply", received[0][1])
+        replies = sender.receive_waiting()
+        receiver.close()
+
+        # Assert
+        self.assertEqual(received, [(b"first", sender.endpoint), (b"second-an", sender.endpoint)])
+        self.assertEqual(sender.endpoint, IPEndpoint("127.0.0.1", LoopbackNetwork.FIRST_EPHEMERAL_PORT))
+        self.assertEqual(replies, [(b"reply", endpoint)])
+        self.assertEqual(sender.metrics()["loopback-dropped"], 1)
+        self.assertNotIn(endpoint, network)
+
+
+if __name__ == "__main__":
+    unittest.main()
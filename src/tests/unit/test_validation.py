@@ -0,0 +1,128 @@
+"""
+Unit tests for the `validation` module
+"""
+from datetime import datetime
+import unittest
+
+from src.ipendpoint import IPEndpoint
+from src.message import Message, MessageType
+from src.schema import SchemaRegistry
+from src.validation import DatagramValidator, Quarantine
+
+
+class TestDatagramValidator(unittest.TestCase):
+    """
+    Unit tests for the `validation.DatagramValidator` class
+    """
+
+    def setUp(self) -> None:
+        """
+        Create a validator with a typed publication and a buffer size of 128 bytes.
+        """
+        self.registry = SchemaRegistry.from_definitions({"sensor": ["temperature:float64"]})
+        self.validator = DatagramValidator(self.registry, 128)
+
+    def test_valid_messages_pass(self) -> None:
+        """
+        Purpose:
+        Ensure that well-formed text and binary messages are let through to be decoded.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - No reason is returned for text messages with full, short, and traced timestamps, or for a binary message
+        - A message longer than the buffer size is not rejected if it was received over a stream connection
+        """
+        # Arrange
+        binary = bytes(Message(
+            MessageType.SUBMIT, datetime.now(), "sensor", 0.5, schema=self.registry.for_publication("sensor")
+        ))
+
+        # Act / Assert
+        self.assertIsNone(self.validator.check(b"submit,20211017150434567854,publication," + b"x" * 128, False))
+        for data in [
+            b"submit,20211017150434567854,publication,0.5",
+            b"HEARTBEAT,20211017150434567854",
+            b"heartbeat,2021101715175612",
+            b"publish,20211017151756123456;20211017151756100000;20211017151756110000;20211017151756120000,publication",
+            binary
+        ]:
+            self.assertIsNone(self.validator.check(data), data)
+
+    def test_malformed_messages_are_rejected_by_reason(self) -> None:
+        """
+        Purpose:
+        Ensure that malformed messages are rejected with the reason they fail the checks for.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - Each malformed message is rejected for the expected reason
+        """
+        # Arrange
+        header = bytes(Message(
+            MessageType.SUBMIT, datetime.now(), "sensor", 0.5, schema=self.registry.for_publication("sensor")
+        ))[:16]
+
+        # Act / Assert
+        for data, reason in [
+            (b"", "empty"),
+            (b"submit,20211017150434567854,publication," + b"x" * 128, "oversized"),
+            (b"subscribed,20211017150434567854,publication", "invalid-type"),
+            (b"\xff\xfe garbage", "invalid-type"),
+            (b"heartbeat", "invalid-type"),
+            (b"heartbeat,", "invalid-timestamp"),
+            (b"heartbeat,2021101715", "invalid-timestamp"),
+            (b"heartbeat,2021101715175612345x", "invalid-timestamp"),
+            (header[:8], "invalid-header"),
+            (header[:1] + b"\x7f" + header[2:], "invalid-type"),
+            (header[:11] + b"\x00\x00\x00\x00" + header[15:], "unknown-schema")
+        ]:
+            self.assertEqual(self.validator.check(data), reason, data)
+
+
+class TestQuarantine(unittest.TestCase):
+    """
+    Unit tests for the `validation.Quarantine` class
+    """
+
+    def test_repeated_strikes_quarantine_a_source(self) -> None:
+        """
+        Purpose:
+        Ensure that a source is quarantined once it reaches the threshold of strikes within the duration, only for the
+        duration, and that strikes spread over longer than the duration do not add up.
+
+        Prerequisites:
+        N/A
+
+        Pass condition(s):
+        - Strikes spread out over more than the duration do not quarantine the source
+        - The strike that reaches the threshold quarantines the source, and only that source
+        - The quarantine ends after the duration, and expired entries are forgotten
+        """
+        # Arrange
+        quarantine = Quarantine(3, 10.0)
+        bad, good = IPEndpoint("127.0.0.1", 5001), IPEndpoint("127.0.0.1", 5002)
+
+        # Act
+        spread = [quarantine.strike(bad, now_s) for now_s in [0.0, 6.0, 12.0]]
+        burst = [quarantine.strike(bad, now_s) for now_s in [13.0, 14.0]]
+        quarantined = (quarantine.is_quarantined(bad, 20.0), quarantine.is_quarantined(good, 20.0))
+        released = quarantine.is_quarantined(bad, 24.0)
+        quarantine.strike(good, 25.0)
+        quarantine.forget(40.0)
+
+        # Assert
+        self.assertEqual(spread, [False, False, False])
+        self.assertEqual(burst, [False, True])
+        self.assertEqual(quarantined, (True, False))
+        self.assertFalse(released)
+        self.assertEqual(quarantine.quarantined_count, 1)
+        self.assertEqual(len(quarantine), 0)
+        self.assertEqual(quarantine._strikes, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
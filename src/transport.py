@@ -0,0 +1,838 @@
+"""
+Transport module
+"""
+from __future__ import annotations
+from collections import deque
+from itertools import islice
+import os
+import select
+import selectors
+import socket
+import stat
+import struct
+import threading
+import time
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from src.configuration import (
+    Configuration,
+    STREAM_HIGH_WATERMARK_B,
+    STREAM_LOW_WATERMARK_B,
+    TRANSPORT_TCP,
+    TRANSPORT_UDP,
+    TRANSPORT_UNIX
+)
+from src.endpoint import Endpoint, UnixEndpoint
+from src.ipendpoint import IPEndpoint, StreamEndpoint
+
+
+FRAME_HEADER: struct.Struct = struct.Struct("!I")
+MAX_FRAME_SIZE_B: int = 16777216
+STREAM_RECEIVE_CHUNK_SIZE_B: int = 65536
+MAX_WRITE_BUFFERS: int = 1024
+
+
+class Transport(object):
+    """
+    Transport base class
+
+    A transport moves binary messages between endpoints. `Messager` objects send and receive all of their messages
+    through a transport, so the underlying socket type can be chosen by configuration.
+
+    Transports with sockets are waited on with a selector. In-memory transports have no sockets, and are instead asked
+    for their waiting messages before the selector is.
+    """
+
+    IN_MEMORY: bool = False
+
+    @classmethod
+    def from_configuration(cls: Transport, configuration: Configuration, endpoint: Endpoint) -> Transport:
+        """
+        Create the transport selected by a configuration. The endpoint determines the address family of the socket.
+        """
+        if configuration.transport == TRANSPORT_TCP or isinstance(endpoint, StreamEndpoint):
+            return StreamTransport(
+                configuration.socket_timeout_s,
+                configuration.buffer_size_b,
+                endpoint.family,
+                configuration.stream_high_watermark_b,
+                configuration.stream_low_watermark_b
+            )
+        transport_types = {
+            TRANSPORT_UDP: UDPTransport,
+            TRANSPORT_UNIX: UnixDatagramTransport
+        }
+        return transport_types[configuration.transport](
+            configuration.socket_timeout_s,
+            configuration.buffer_size_b,
+            endpoint.family
+        )
+
+    def __init__(self: Transport, socket_timeout_s: float, buffer_size_b: int) -> None:
+        """
+        Initialize a `Transport` object with a socket timeout (in seconds) and a buffer size.
+        """
+        self._socket_timeout_s: float = socket_timeout_s
+        self._buffer_size_b: int = buffer_size_b
+
+    def bind(self: Transport, endpoint: Endpoint) -> None:
+        """
+        Abstract method. Bind the transport to a local endpoint.
+        """
+        raise NotImplementedError(f"Attempted to call abstract method {__class__.__name__}.bind")
+
+    def send(self: Transport, data: bytes, endpoint: Endpoint) -> None:
+        """
+        Abstract method. Send a binary message to an endpoint.
+        """
+        raise NotImplementedError(f"Attempted to call abstract method {__class__.__name__}.send")
+
+    def handles(self: Transport, endpoint: Endpoint) -> bool:
+        """
+        Abstract method. Check whether messages to an endpoint should be sent through this transport.
+        """
+        raise NotImplementedError(f"Attempted to call abstract method {__class__.__name__}.handles")
+
+    def register(self: Transport, selector: selectors.BaseSelector) -> None:
+        """
+        Abstract method. Register the sockets of the transport with a selector, with the transport as the key data, so
+        that one event loop can wait on several transports. Sockets are non-blocking once registered.
+        """
+        raise NotImplementedError(f"Attempted to call abstract method {__class__.__name__}.register")
+
+    def poll(self: Transport, fileobj: Any, events: int) -> List[Tuple[bytes, Endpoint]]:
+        """
+        Abstract method. Handle readiness of one of the registered sockets, returning any binary messages that were
+        received along with the endpoints they came from.
+        """
+        raise NotImplementedError(f"Attempted to call abstract method {__class__.__name__}.poll")
+
+    def receive_waiting(self: Transport) -> List[Tuple[bytes, Endpoint]]:
+        """
+        Get any binary messages waiting in memory, along with the endpoints they came from. Transports with sockets
+        return none.
+        """
+        return []
+
+    def flush(self: Transport) -> None:
+        """
+        Write out any buffered messages. Transports that do not buffer writes do nothing.
+        """
+        pass
+
+    def metrics(self: Transport) -> Dict[str, int]:
+        """
+        Get the transport's counters. Transports that keep none return no counters.
+        """
+        return {}
+
+    def buffered_b(self: Transport) -> int:
+        """
+        Get the bytes held in the transport's buffers. Transports that do not buffer hold none.
+        """
+        return 0
+
+    def close(self: Transport) -> None:
+        """
+        Abstract method. Release any resources held by the transport.
+        """
+        raise NotImplementedError(f"Attempted to call abstract method {__class__.__name__}.close")
+
+
+class DatagramTransport(Transport):
+    """
+    Datagram transport base class
+    """
+
+    ENDPOINT_TYPE: type = Endpoint
+    RECEIVE_BATCH_SIZE: int = 64
+    ENDPOINT_CACHE_SIZE: int = 1024
+
+    def __init__(self: DatagramTransport, socket_timeout_s: float, buffer_size_b: int, family: int) -> None:
+        """
+        Initialize a `DatagramTransport` object with a socket timeout (in seconds), a buffer size, and a socket address
+        family.
+        """
+        super().__init__(socket_timeout_s, buffer_size_b)
+        self.family: int = family
+        self._socket = socket.socket(family, socket.SOCK_DGRAM)
+        self._socket.settimeout(socket_timeout_s)
+        self._endpoints: Dict[Any, Endpoint] = {}
+
+    def bind(self: DatagramTransport, endpoint: Endpoint) -> None:
+        """
+        Bind the socket to a local endpoint.
+        """
+        self._socket.bind(endpoint.address)
+
+    def send(self: DatagramTransport, data: bytes, endpoint: Endpoint) -> None:
+        """
+        Send a binary message to an endpoint as a single datagram.
+        """
+        self._socket.sendto(data, endpoint.address)
+
+    def receive(self: DatagramTransport) -> Tuple[bytes, Endpoint]:
+        """
+        Receive a single datagram and the endpoint it came from. Raise `socket.timeout` if no datagram arrives within
+        the socket timeout, or `BlockingIOError` if none is waiting once the transport is registered with a selector.
+        One byte more than the buffer size is received, so that a datagram too large for the buffer, which would
+        otherwise be silently truncated to fit, is longer than the buffer size and can be told apart.
+        """
+        data, address = self._socket.recvfrom(self._buffer_size_b + 1)
+        return data, self._endpoint_for(address)
+
+    def handles(self: DatagramTransport, endpoint: Endpoint) -> bool:
+        """
+        Check whether an endpoint is of the type and address family this transport sends to.
+        """
+        return type(endpoint) is self.ENDPOINT_TYPE and endpoint.family == self.family
+
+    def register(self: DatagramTransport, selector: selectors.BaseSelector) -> None:
+        """
+        Register the socket with a selector.
+        """
+        self._socket.setblocking(False)
+        selector.register(self._socket, selectors.EVENT_READ, self)
+
+    def poll(self: DatagramTransport, fileobj: Any, events: int) -> List[Tuple[bytes, Endpoint]]:
+        """
+        Drain up to a batch of waiting datagrams, so that a burst is handled without a selector wakeup per datagram.
+        """
+        received: List[Tuple[bytes, Endpoint]] = []
+        for _ in range(self.RECEIVE_BATCH_SIZE):
+            try:
+                received.append(self.receive())
+            except BlockingIOError:
+                break
+        return received
+
+    def close(self: DatagramTransport) -> None:
+        """
+        Close the socket.
+        """
+        self._socket.close()
+
+    def _endpoint_for(self: DatagramTransport, address: Any) -> Endpoint:
+        """
+        Get the endpoint of a socket address returned by `recvfrom`, reusing the one created for the last datagram
+        from it, so that a steady stream of datagrams from the same peers does not create an endpoint for each. The
+        cache is cleared once it holds too many peers.
+        """
+        endpoint: Optional[Endpoint] = self._endpoints.get(address)
+        if endpoint is None:
+            if len(self._endpoints) >= self.ENDPOINT_CACHE_SIZE:
+                self._endpoints.clear()
+            endpoint = self._endpoints[address] = self._endpoint_from_address(address)
+        return endpoint
+
+    def _endpoint_from_address(self: DatagramTransport, address: Any) -> Endpoint:
+        """
+        Abstract method. Convert a socket address returned by `recvfrom` to an endpoint.
+        """
+        raise NotImplementedError(f"Attempted to call abstract method {__class__.__name__}._endpoint_from_address")
+
+
+class UDPTransport(DatagramTransport):
+    """
+    UDP transport class
+    """
+
+    ENDPOINT_TYPE: type = IPEndpoint
+
+    def __init__(
+        self: UDPTransport,
+        socket_timeout_s: float,
+        buffer_size_b: int,
+        family: int = socket.AF_INET
+    ) -> None:
+        """
+        Initialize a `UDPTransport` object with a socket timeout (in seconds), a buffer size, and an IP address family.
+        """
+        if family not in (socket.AF_INET, socket.AF_INET6):
+            raise ValueError(f"Invalid address family for UDP transport: {family}")
+        super().__init__(socket_timeout_s, buffer_size_b, family)
+
+    def _endpoint_from_address(self: UDPTransport, address: Tuple) -> IPEndpoint:
+        """
+        Convert an IPv4 `(host, port)` or IPv6 `(host, port, flowinfo, scope_id)` address to an `IPEndpoint`.
+        """
+        return IPEndpoint(address[0], address[1])
+
+
+class UnixDatagramTransport(DatagramTransport):
+    """
+    Unix domain datagram transport class
+
+    Suitable for co-located processes: datagrams bypass the IP stack and access to the socket is controlled by
+    filesystem permissions. Both ends must bind to a path for replies to be deliverable.
+    """
+
+    ENDPOINT_TYPE: type = UnixEndpoint
+
+    def __init__(
+        self: UnixDatagramTransport,
+        socket_timeout_s: float,
+        buffer_size_b: int,
+        family: int = socket.AF_UNIX
+    ) -> None:
+        """
+        Initialize a `UnixDatagramTransport` object with a socket timeout (in seconds) and a buffer size.
+        """
+        if family != socket.AF_UNIX:
+            raise ValueError(f"Invalid address family for Unix datagram transport: {family}")
+        super().__init__(socket_timeout_s, buffer_size_b, family)
+        self._bound_path: Optional[str] = None
+
+    def bind(self: UnixDatagramTransport, endpoint: UnixEndpoint) -> None:
+        """
+        Bind the socket to a path, replacing a stale socket file left behind by a previous process.
+        """
+        try:
+            if stat.S_ISSOCK(os.stat(endpoint.path).st_mode):
+                os.unlink(endpoint.path)
+        except FileNotFoundError:
+            pass
+        super().bind(endpoint)
+        self._bound_path = endpoint.path
+
+    def receive(self: UnixDatagramTransport) -> Tuple[bytes, Endpoint]:
+        """
+        Receive a single datagram and the endpoint it came from. Datagrams from unbound sockets cannot be replied to,
+        so they are discarded. As with any datagram transport, a datagram too large for the buffer is longer than the
+        buffer size.
+        """
+        while True:
+            data, address = self._socket.recvfrom(self._buffer_size_b + 1)
+            if address:
+                return data, self._endpoint_for(address)
+            print("Discarding datagram from unbound Unix socket")
+
+    def close(self: UnixDatagramTransport) -> None:
+        """
+        Close the socket and remove its socket file.
+        """
+        super().close()
+        if self._bound_path is not None:
+            try:
+                os.unlink(self._bound_path)
+            except FileNotFoundError:
+                pass
+            self._bound_path = None
+
+    def _endpoint_from_address(self: UnixDatagramTransport, address: str) -> UnixEndpoint:
+        """
+        Convert a socket path to a `UnixEndpoint`.
+        """
+        return UnixEndpoint(address)
+
+
+class StreamConnection(object):
+    """
+    Stream connection class
+
+    Wraps one connected stream socket. Outgoing messages are length-prefixed and queued in a per-connection write
+    buffer, which is written out with as few `sendmsg` (writev) calls as possible. The connection is paused once the
+    buffered bytes exceed the high watermark and resumes once they drop to the low watermark, and keeps when it was
+    paused.
+    """
+
+    def __init__(
+        self: StreamConnection,
+        sock: socket.socket,
+        endpoint: StreamEndpoint,
+        high_watermark_b: int,
+        low_watermark_b: int
+    ) -> None:
+        """
+        Initialize a `StreamConnection` object with a connected socket, the endpoint of its peer, and the high and low
+        write buffer watermarks (in bytes).
+        """
+        self.socket: socket.socket = sock
+        self.socket.setblocking(False)
+        self.socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.endpoint: StreamEndpoint = endpoint
+        self._high_watermark_b: int = high_watermark_b
+        self._low_watermark_b: int = low_watermark_b
+        self._read_buffer: bytearray = bytearray()
+        self._write_buffers: Deque[bytes] = deque()
+        self.buffered_b: int = 0
+        self.paused: bool = False
+        self.paused_at_s: float = 0.0
+
+    @property
+    def read_buffered_b(self: StreamConnection) -> int:
+        """
+        Get the bytes of incomplete messages held until the rest arrives.
+        """
+        return len(self._read_buffer)
+
+    def write(self: StreamConnection, data: bytes) -> None:
+        """
+        Queue a length-prefixed message for writing.
+        """
+        if len(data) > MAX_FRAME_SIZE_B:
+            raise ValueError(f"Message too large for stream transport: {len(data)} B")
+        self._write_buffers.append(FRAME_HEADER.pack(len(data)))
+        self._write_buffers.append(data)
+        self.buffered_b += FRAME_HEADER.size + len(data)
+        if self.buffered_b > self._high_watermark_b and not self.paused:
+            self.paused = True
+            self.paused_at_s = time.monotonic()
+
+    def flush(self: StreamConnection) -> bool:
+        """
+        Write as much of the write buffer as the socket will accept without blocking. Return whether the write buffer
+        is now empty.
+        """
+        while self._write_buffers:
+            try:
+                sent: int = self.socket.sendmsg(list(islice(self._write_buffers, MAX_WRITE_BUFFERS)))
+            except (BlockingIOError, InterruptedError):
+                break
+            self._consume(sent)
+        if self.paused and self.buffered_b <= self._low_watermark_b:
+            self.paused = False
+        return not self._write_buffers
+
+    def drain(self: StreamConnection, timeout_s: float) -> bool:
+        """
+        Block until the write buffer is at or below the low watermark, or the timeout (in seconds) expires. Return
+        whether the connection was resumed.
+        """
+        deadline: float = time.monotonic() + timeout_s
+        while not self.flush() and self.paused:
+            remaining_s: float = deadline - time.monotonic()
+            if remaining_s <= 0:
+                return False
+            select.select([], [self.socket], [], remaining_s)
+        return True
+
+    def read(self: StreamConnection) -> List[bytes]:
+        """
+        Read whatever the socket has available and return the complete messages it contains. Incomplete messages are
+        kept until the rest arrives. Raise `ConnectionResetError` if the peer has closed the connection.
+        """
+        chunk: bytes = self.socket.recv(STREAM_RECEIVE_CHUNK_SIZE_B)
+        if not chunk:
+            raise ConnectionResetError(f"Stream connection closed by {self.endpoint}")
+        self._read_buffer += chunk
+        messages: List[bytes] = []
+        offset: int = 0
+        while len(self._read_buffer) - offset >= FRAME_HEADER.size:
+            (length,) = FRAME_HEADER.unpack_from(self._read_buffer, offset)
+            if length > MAX_FRAME_SIZE_B:
+                raise ConnectionResetError(f"Invalid frame length from {self.endpoint}: {length} B")
+            end: int = offset + FRAME_HEADER.size + length
+            if end > len(self._read_buffer):
+                break
+            messages.append(bytes(self._read_buffer[offset + FRAME_HEADER.size:end]))
+            offset = end
+        del self._read_buffer[:offset]
+        return messages
+
+    def close(self: StreamConnection) -> None:
+        """
+        Close the socket and discard any unwritten data.
+        """
+        self.socket.close()
+        self._write_buffers.clear()
+        self.buffered_b = 0
+
+    def _consume(self: StreamConnection, sent_b: int) -> None:
+        """
+        Remove bytes that have been written from the front of the write buffer.
+        """
+        self.buffered_b -= sent_b
+        while sent_b:
+            head: bytes = self._write_buffers[0]
+            if len(head) <= sent_b:
+                sent_b -= len(head)
+                self._write_buffers.popleft()
+            else:
+                self._write_buffers[0] = memoryview(head)[sent_b:]
+                sent_b = 0
+
+
+class StreamTransport(Transport):
+    """
+    Stream transport class
+
+    Carries length-prefixed messages over persistent TCP connections, for publications that need in-order, lossless
+    delivery or payloads larger than a datagram. Bound, it accepts connections from subscribers; unbound, it connects
+    to an endpoint on first send and keeps the connection open.
+
+    Messages sent to a connection that is paused, because its write buffer crossed the high watermark, are dropped
+    rather than waited for, so that a slow consumer never blocks the sender. A connection whose write buffer stays above
+    the low watermark for longer than the socket timeout after crossing the high watermark is a slow consumer, and is
+    closed rather than buffered without limit.
+
+    The transport may be sent through from several threads, such as pipeline senders, shard workers or a submitter's
+    flusher, while another polls and flushes it, so every operation on its connections holds one lock.
+    """
+
+    def __init__(
+        self: StreamTransport,
+        socket_timeout_s: float,
+        buffer_size_b: int,
+        family: int = socket.AF_INET,
+        high_watermark_b: int = Configuration.DEFAULTS[STREAM_HIGH_WATERMARK_B],
+        low_watermark_b: int = Configuration.DEFAULTS[STREAM_LOW_WATERMARK_B]
+    ) -> None:
+        """
+        Initialize a `StreamTransport` object with a socket timeout (in seconds), a buffer size, an IP address family,
+        and the high and low write buffer watermarks (in bytes) of its connections.
+        """
+        if family not in (socket.AF_INET, socket.AF_INET6):
+            raise ValueError(f"Invalid address family for stream transport: {family}")
+        super().__init__(socket_timeout_s, buffer_size_b)
+        self._family: int = family
+        self._high_watermark_b: int = high_watermark_b
+        self._low_watermark_b: int = low_watermark_b
+        self._listener: Optional[socket.socket] = None
+        self._selector: Optional[selectors.BaseSelector] = None
+        self._connections: Dict[StreamEndpoint, StreamConnection] = {}
+        self._connections_by_socket: Dict[socket.socket, StreamConnection] = {}
+        self._dropped_count: int = 0
+        self._slow_consumer_count: int = 0
+        self._lock = threading.RLock()
+
+    def bind(self: StreamTransport, endpoint: StreamEndpoint) -> None:
+        """
+        Listen for connections on a local endpoint.
+        """
+        self._listener = socket.socket(self._family, socket.SOCK_STREAM)
+        self._listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._listener.bind(endpoint.address)
+        self._listener.listen()
+        self._listener.setblocking(False)
+        if self._selector is not None:
+            self._selector.register(self._listener, selectors.EVENT_READ, self)
+
+    def send(self: StreamTransport, data: bytes, endpoint: StreamEndpoint) -> None:
+        """
+        Queue a message for an endpoint, connecting to it first if this is not a listening transport. Writes are
+        coalesced until the next `flush`. A message to a paused connection is dropped, unless what the socket accepts
+        without blocking resumes it.
+        """
+        with self._lock:
+            connection: Optional[StreamConnection] = self._connections.get(endpoint)
+            if connection is None:
+                if self._listener is not None:
+                    print(f"No stream connection to {endpoint}, dropping message")
+                    self._dropped_count += 1
+                    return
+                connection = self._connect(endpoint)
+            if connection.paused and not self._resume(connection):
+                self._dropped_count += 1
+                return
+            connection.write(data)
+
+    def handles(self: StreamTransport, endpoint: Endpoint) -> bool:
+        """
+        Check whether an endpoint is a stream endpoint.
+        """
+        return isinstance(endpoint, StreamEndpoint)
+
+    def register(self: StreamTransport, selector: selectors.BaseSelector) -> None:
+        """
+        Register the listening socket and any open connections with a selector. Connections opened later are
+        registered as they are opened.
+        """
+        with self._lock:
+            self._selector = selector
+            if self._listener is not None:
+                selector.register(self._listener, selectors.EVENT_READ, self)
+            for connection in self._connections.values():
+                selector.register(connection.socket, selectors.EVENT_READ, self)
+
+    def poll(self: StreamTransport, fileobj: Any, events: int) -> List[Tuple[bytes, Endpoint]]:
+        """
+        Accept a pending connection, continue a blocked write, or read complete messages from a connection.
+        """
+        with self._lock:
+            if fileobj is self._listener:
+                self._accept()
+                return []
+            connection: StreamConnection = self._connections_by_socket[fileobj]
+            try:
+                if events & selectors.EVENT_WRITE and connection.flush():
+                    self._selector.modify(connection.socket, selectors.EVENT_READ, self)
+                if events & selectors.EVENT_READ:
+                    return [(data, connection.endpoint) for data in connection.read()]
+            except (ConnectionError, OSError) as e:
+                print(f"Stream connection to {connection.endpoint} closed: {e}")
+                self._close_connection(connection)
+            return []
+
+    def flush(self: StreamTransport) -> None:
+        """
+        Write out the buffered messages of every connection. Connections that cannot take everything without blocking
+        are watched for writability and finished from `poll`.
+        """
+        with self._lock:
+            for connection in list(self._connections.values()):
+                if not connection.buffered_b:
+                    continue
+                try:
+                    if not connection.flush() and self._selector is not None:
+                        self._selector.modify(connection.socket, selectors.EVENT_READ | selectors.EVENT_WRITE, self)
+                except (ConnectionError, OSError) as e:
+                    print(f"Stream connection to {connection.endpoint} closed: {e}")
+                    self._close_connection(connection)
+
+    def metrics(self: StreamTransport) -> Dict[str, int]:
+        """
+        Get the number of open connections, the bytes buffered for writing and of incomplete messages read across
+        them, and the number of messages dropped for want of a connection and of connections closed as slow consumers.
+        """
+        with self._lock:
+            return {
+                "stream-connections": len(self._connections),
+                "stream-buffered-b": sum(connection.buffered_b for connection in self._connections.values()),
+                "stream-read-buffered-b": sum(connection.read_buffered_b for connection in self._connections.values()),
+                "stream-dropped": self._dropped_count,
+                "stream-slow-consumers": self._slow_consumer_count
+            }
+
+    def buffered_b(self: StreamTransport) -> int:
+        """
+        Get the bytes buffered for writing and of incomplete messages read across every connection.
+        """
+        with self._lock:
+            return sum(connection.buffered_b + connection.read_buffered_b for connection in self._connections.values())
+
+    def close(self: StreamTransport) -> None:
+        """
+        Flush and close every connection, then the listening socket.
+        """
+        with self._lock:
+            for connection in list(self._connections.values()):
+                try:
+                    connection.drain(self._socket_timeout_s)
+                except OSError:
+                    pass
+                self._close_connection(connection)
+            if self._listener is not None:
+                if self._selector is not None:
+                    self._selector.unregister(self._listener)
+                self._listener.close()
+                self._listener = None
+
+    def _resume(self: StreamTransport, connection: StreamConnection) -> bool:
+        """
+        Write as much of a paused connection's buffer as the socket accepts without blocking, and return whether that
+        resumed it. A connection that fails is closed, as is one that has been paused for longer than the socket
+        timeout, as a slow consumer.
+        """
+        try:
+            connection.flush()
+        except (ConnectionError, OSError) as e:
+            print(f"Stream connection to {connection.endpoint} closed: {e}")
+            self._close_connection(connection)
+            return False
+        if not connection.paused:
+            return True
+        if time.monotonic() - connection.paused_at_s > self._socket_timeout_s:
+            print(
+                f"Closing stream connection to slow consumer {connection.endpoint} ({connection.buffered_b} B buffered)"
+            )
+            self._close_connection(connection)
+            self._slow_consumer_count += 1
+        return False
+
+    def _accept(self: StreamTransport) -> None:
+        """
+        Accept a pending connection.
+        """
+        try:
+            sock, address = self._listener.accept()
+        except BlockingIOError:
+            return
+        self._add_connection(sock, StreamEndpoint(address[0], address[1]))
+
+    def _connect(self: StreamTransport, endpoint: StreamEndpoint) -> StreamConnection:
+        """
+        Open a connection to an endpoint.
+        """
+        sock: socket.socket = socket.create_connection(endpoint.address, timeout=self._socket_timeout_s)
+        return self._add_connection(sock, endpoint)
+
+    def _add_connection(self: StreamTransport, sock: socket.socket, endpoint: StreamEndpoint) -> StreamConnection:
+        """
+        Track and register a newly connected socket.
+        """
+        connection = StreamConnection(sock, endpoint, self._high_watermark_b, self._low_watermark_b)
+        self._connections[endpoint] = connection
+        self._connections_by_socket[sock] = connection
+        if self._selector is not None:
+            self._selector.register(sock, selectors.EVENT_READ, self)
+        print(f"Opened stream connection to {endpoint}")
+        return connection
+
+    def _close_connection(self: StreamTransport, connection: StreamConnection) -> None:
+        """
+        Stop tracking and close a connection.
+        """
+        self._connections.pop(connection.endpoint, None)
+        self._connections_by_socket.pop(connection.socket, None)
+        if self._selector is not None:
+            try:
+                self._selector.unregister(connection.socket)
+            except (KeyError, ValueError):
+                pass
+        connection.close()
+
+
+class LoopbackNetwork(object):
+    """
+    Loopback network class
+
+    Connects the loopback transports of one process in place of the kernel. It holds a queue of received messages for
+    each bound endpoint, and binds transports that send before binding to an endpoint of their own, as the kernel
+    binds an unbound datagram socket to an ephemeral port.
+    """
+
+    EPHEMERAL_IP_ADDRESS: str = "127.0.0.1"
+    FIRST_EPHEMERAL_PORT: int = 49152
+
+    def __init__(self: LoopbackNetwork) -> None:
+        """
+        Initialize a `LoopbackNetwork` object with no endpoints bound.
+        """
+        self._queues: Dict[Endpoint, Deque[Tuple[bytes, Endpoint]]] = {}
+        self._next_port: int = self.FIRST_EPHEMERAL_PORT
+
+    def __contains__(self: LoopbackNetwork, endpoint: Endpoint) -> bool:
+        """
+        Check whether an endpoint is bound.
+        """
+        return endpoint in self._queues
+
+    def bind(self: LoopbackNetwork, endpoint: Endpoint) -> Deque[Tuple[bytes, Endpoint]]:
+        """
+        Bind an endpoint, and return the queue of the messages sent to it. Raise `OSError` if it is already bound.
+        """
+        if endpoint in self._queues:
+            raise OSError(f"Loopback endpoint already bound: {endpoint}")
+        queue: Deque[Tuple[bytes, Endpoint]] = deque()
+        self._queues[endpoint] = queue
+        return queue
+
+    def bind_ephemeral(self: LoopbackNetwork) -> Tuple[Endpoint, Deque[Tuple[bytes, Endpoint]]]:
+        """
+        Bind the next free ephemeral endpoint, and return it with the queue of the messages sent to it.
+        """
+        while IPEndpoint(self.EPHEMERAL_IP_ADDRESS, self._next_port) in self._queues:
+            self._next_port += 1
+        endpoint = IPEndpoint(self.EPHEMERAL_IP_ADDRESS, self._next_port)
+        self._next_port += 1
+        return endpoint, self.bind(endpoint)
+
+    def unbind(self: LoopbackNetwork, endpoint: Endpoint) -> None:
+        """
+        Unbind an endpoint, discarding any messages waiting for it.
+        """
+        self._queues.pop(endpoint, None)
+
+    def deliver(self: LoopbackNetwork, data: bytes, source: Endpoint, destination: Endpoint) -> bool:
+        """
+        Queue a binary message for the endpoint it is sent to, and return whether that endpoint is bound.
+        """
+        queue: Optional[Deque[Tuple[bytes, Endpoint]]] = self._queues.get(destination)
+        if queue is None:
+            return False
+        queue.append((data, source))
+        return True
+
+
+class LoopbackTransport(Transport):
+    """
+    Loopback transport class
+
+    Carries binary messages between transports on the same `LoopbackNetwork` through in-memory queues, with the
+    semantics of datagrams: each message is delivered whole or not at all, is truncated to one byte more than the
+    buffer size of the receiving transport, as datagram sockets receive, and is dropped if nothing is bound to its
+    endpoint. Nothing passes through the kernel, so routing can be exercised and measured without sockets. Queues are
+    unbounded, so whatever drives the transports must keep receiving from them.
+    """
+
+    IN_MEMORY: bool = True
+    RECEIVE_BATCH_SIZE: int = 64
+
+    def __init__(
+        self: LoopbackTransport,
+        socket_timeout_s: float,
+        buffer_size_b: int,
+        network: LoopbackNetwork
+    ) -> None:
+        """
+        Initialize a `LoopbackTransport` object with a socket timeout (in seconds), a buffer size, and the network it
+        sends and receives on.
+        """
+        super().__init__(socket_timeout_s, buffer_size_b)
+        self.network: LoopbackNetwork = network
+        self.endpoint: Optional[Endpoint] = None
+        self._queue: Deque[Tuple[bytes, Endpoint]] = deque()
+        self._dropped_count: int = 0
+
+    def bind(self: LoopbackTransport, endpoint: Endpoint) -> None:
+        """
+        Bind the transport to an endpoint on its network.
+        """
+        self._queue = self.network.bind(endpoint)
+        self.endpoint = endpoint
+
+    def send(self: LoopbackTransport, data: bytes, endpoint: Endpoint) -> None:
+        """
+        Send a binary message to an endpoint on the network, binding the transport to an ephemeral endpoint first if it
+        is not bound.
+        """
+        if self.endpoint is None:
+            self.endpoint, self._queue = self.network.bind_ephemeral()
+        if not self.network.deliver(data, self.endpoint, endpoint):
+            self._dropped_count += 1
+
+    def handles(self: LoopbackTransport, endpoint: Endpoint) -> bool:
+        """
+        Check whether an endpoint is bound on the network.
+        """
+        return endpoint in self.network
+
+    def register(self: LoopbackTransport, selector: selectors.BaseSelector) -> None:
+        """
+        Do nothing, as there is no socket to register.
+        """
+        pass
+
+    def poll(self: LoopbackTransport, fileobj: Any, events: int) -> List[Tuple[bytes, Endpoint]]:
+        """
+        Get the waiting messages, as there is no socket to be ready.
+        """
+        return self.receive_waiting()
+
+    def receive_waiting(self: LoopbackTransport) -> List[Tuple[bytes, Endpoint]]:
+        """
+        Take up to a batch of the messages waiting for the transport. As with a datagram socket, a message too large for
+        the buffer is truncated to one byte more than the buffer size, so that it can be told apart and rejected.
+        """
+        received: List[Tuple[bytes, Endpoint]] = []
+        queue: Deque[Tuple[bytes, Endpoint]] = self._queue
+        max_size_b: int = self._buffer_size_b + 1
+        for _ in range(min(len(queue), self.RECEIVE_BATCH_SIZE)):
+            data, endpoint = queue.popleft()
+            received.append((data if len(data) <= max_size_b else data[:max_size_b], endpoint))
+        return received
+
+    def metrics(self: LoopbackTransport) -> Dict[str, int]:
+        """
+        Get the number of messages waiting and of messages dropped for want of a bound endpoint.
+        """
+        return {"loopback-waiting": len(self._queue), "loopback-dropped": self._dropped_count}
+
+    def close(self: LoopbackTransport) -> None:
+        """
+        Unbind the transport from its endpoint.
+        """
+        if self.endpoint is not None:
+            self.network.unbind(self.endpoint)
+            self.endpoint = None
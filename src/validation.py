@@ -0,0 +1,142 @@
+"""
+Validation module
+"""
+from __future__ import annotations
+import re
+from typing import Dict, FrozenSet, List, Optional
+
+from src.endpoint import Endpoint
+from src.message import MessageType
+from src.schema import BINARY_MARKER, HEADER, SchemaRegistry
+
+
+EMPTY: str = "empty"
+OVERSIZED: str = "oversized"
+INVALID_TYPE: str = "invalid-type"
+INVALID_TIMESTAMP: str = "invalid-timestamp"
+INVALID_HEADER: str = "invalid-header"
+UNKNOWN_SCHEMA: str = "unknown-schema"
+MALFORMED: str = "malformed"
+QUARANTINED: str = "quarantined"
+
+TYPE_TOKENS: FrozenSet[bytes] = frozenset(str(message_type).encode("utf-8") for message_type in MessageType)
+TYPE_VALUES: FrozenSet[int] = frozenset(MessageType)
+MAX_TYPE_LENGTH: int = max(len(token) for token in TYPE_TOKENS)
+TIMESTAMP_PATTERN = re.compile(rb"[0-9]{15,20}(?:[,;]|$)")
+
+
+class DatagramValidator(object):
+    """
+    Datagram validator class
+
+    Checks the parts of a binary message that decoding would otherwise trip over, on the raw bytes and without
+    allocating, so that garbage is rejected for the cost of a few comparisons rather than an exception from deep in
+    the decoder. A text message must start with a known message type and a timestamp of 15 to 20 digits, as
+    `datetime.strptime` parses them; a binary message must have a whole header, with a known message type and schema
+    ID. A datagram longer than the buffer size is rejected as oversized, since it was truncated to fit the buffer;
+    messages received over a stream connection are not truncated, and are bounded by its frame size instead. Passing
+    the checks does not guarantee that a message decodes, only that most garbage does not get that far.
+    """
+
+    def __init__(self: DatagramValidator, schemas: SchemaRegistry, max_size_b: int) -> None:
+        """
+        Initialize a `DatagramValidator` object with the schema registry and the buffer size (in bytes).
+        """
+        self._schemas: SchemaRegistry = schemas
+        self.max_size_b: int = max_size_b
+
+    def check(self: DatagramValidator, data: bytes, datagram: bool = True) -> Optional[str]:
+        """
+        Check a binary message, received as a datagram or over a stream connection, and return the reason it is
+        rejected for, or `None` if it may be decoded.
+        """
+        if not data:
+            return EMPTY
+        if datagram and len(data) > self.max_size_b:
+            return OVERSIZED
+        if data[:1] == BINARY_MARKER:
+            if len(data) < HEADER.size:
+                return INVALID_HEADER
+            _, message_type, _, _, schema_id = HEADER.unpack_from(data)
+            if message_type not in TYPE_VALUES:
+                return INVALID_TYPE
+            if self._schemas.for_id(schema_id) is None:
+                return UNKNOWN_SCHEMA
+            return None
+        comma: int = data.find(b",", 0, MAX_TYPE_LENGTH + 1)
+        if comma < 0 or data[:comma].lower() not in TYPE_TOKENS:
+            return INVALID_TYPE
+        if TIMESTAMP_PATTERN.match(data, comma + 1) is None:
+            return INVALID_TIMESTAMP
+        return None
+
+
+class Quarantine(object):
+    """
+    Quarantine class
+
+    Counts the messages rejected from each source endpoint. A source with a threshold of rejected messages within the
+    quarantine duration is quarantined for that duration, during which its messages are dropped on arrival, before they
+    are validated. Sources are only tracked once they have sent a rejected message, so well-behaved traffic costs one
+    dictionary lookup, and entries are forgotten once their duration has passed.
+    """
+
+    MAX_SOURCES: int = 65536
+
+    def __init__(self: Quarantine, threshold: int, duration_s: float) -> None:
+        """
+        Initialize a `Quarantine` object with the number of rejected messages that quarantines a source and the
+        quarantine duration (in seconds).
+        """
+        self.threshold: int = threshold
+        self.duration_s: float = duration_s
+        self._strikes: Dict[Endpoint, List[float]] = {}
+        self._quarantined: Dict[Endpoint, float] = {}
+        self.quarantined_count: int = 0
+
+    def __len__(self: Quarantine) -> int:
+        """
+        Get the number of sources in quarantine, including any whose quarantine has passed but not been forgotten.
+        """
+        return len(self._quarantined)
+
+    def is_quarantined(self: Quarantine, endpoint: Endpoint, now_s: float) -> bool:
+        """
+        Check whether a source endpoint is in quarantine as of a time (in seconds).
+        """
+        if not self._quarantined:
+            return False
+        until_s: Optional[float] = self._quarantined.get(endpoint)
+        if until_s is None:
+            return False
+        if now_s < until_s:
+            return True
+        del self._quarantined[endpoint]
+        return False
+
+    def strike(self: Quarantine, endpoint: Endpoint, now_s: float) -> bool:
+        """
+        Count a message rejected from a source endpoint as of a time (in seconds), and return whether it put the source
+        in quarantine.
+        """
+        strikes: Optional[List[float]] = self._strikes.get(endpoint)
+        if strikes is None or now_s - strikes[1] >= self.duration_s:
+            if len(self._strikes) >= self.MAX_SOURCES:
+                self.forget(now_s)
+            strikes = self._strikes[endpoint] = [0, now_s]
+        strikes[0] += 1
+        if strikes[0] < self.threshold:
+            return False
+        del self._strikes[endpoint]
+        self._quarantined[endpoint] = now_s + self.duration_s
+        self.quarantined_count += 1
+        return True
+
+    def forget(self: Quarantine, now_s: float) -> None:
+        """
+        Forget the sources whose counting window or quarantine has passed as of a time (in seconds).
+        """
+        self._strikes = {
+            endpoint: strikes for endpoint, strikes in self._strikes.items() if now_s - strikes[1] < self.duration_s
+        }
+        self._quarantined = {endpoint: until_s for endpoint, until_s in self._quarantined.items() if now_s < until_s}